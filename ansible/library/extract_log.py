@@ -2,16 +2,16 @@
 
 from ansible.module_utils.basic import AnsibleModule
 from functools import cmp_to_key
-import datetime
 import traceback
 import logging.handlers
 import logging
-import hashlib
+import json
+import mmap
+import shutil
 import sys
 import re
 import gzip
 import os
-import locale
 DOCUMENTATION = '''
 module:  extract_log
 version_added:  "1.0"
@@ -42,6 +42,12 @@ Options:
       required: True
       Default: None
 
+    - option-name: marker_index
+      description: a JSON file with the offsets recorded by loganalyzer when it placed its markers, used to
+                   seek to the marker instead of searching the whole file
+      required: False
+      Default: /tmp/extract_log_markers.json
+
 '''
 
 EXAMPLES = '''
@@ -88,26 +94,9 @@ EXAMPLES = '''
 
 logger = logging.getLogger('ExtractLog')
 
-
-def extract_lines(directory, filename, target_string):
-    path = os.path.join(directory, filename)
-    file = None
-    if 'gz' in path:
-        file = gzip.open(path, mode='rt')
-    else:
-        file = open(path)
-    result = None
-    with file:
-        # This might be a gunzip file or logrotate issue, there has
-        # been '\x00's in front of the log entry timestamp which
-        # messes up with the comparator.
-        # Prehandle lines to remove these sub-strings
-        dt = datetime.datetime.fromtimestamp(os.path.getctime(path))
-        sz = os.path.getsize(path)
-        result = [(filename, dt, line.replace('\x00', ''), sz)
-                  for line in file if target_string in line and 'extract_log' not in line]
-
-    return result
+CHUNK_SIZE = 1024 * 1024
+SKIP_STRING = b'extract_log'
+MARKER_INDEX = '/tmp/extract_log_markers.json'
 
 
 def extract_number(s):
@@ -119,79 +108,6 @@ def extract_number(s):
         return int(ns[0])
 
 
-def convert_date(fct, s):
-    dt = None
-    re_result = re.findall(r'^\S{3}\s{1,2}\d{1,2} \d{2}:\d{2}:\d{2}\.?\d*', s)
-    if len(re_result) == 0:
-        re_result_with_year = re.findall(r'^\d{4}\s{1}\S{3}\s{1,2}\d{1,2} \d{2}:\d{2}:\d{2}\.?\d*', s)
-    else:
-        re_result_with_year = list()
-    # Workaround for pytest-ansible
-    loc = locale.getlocale()
-    locale.setlocale(locale.LC_ALL, (None, None))
-
-    if len(re_result) > 0:
-        str_date = '{:04d} '.format(fct.year) + re_result[0]
-        try:
-            dt = datetime.datetime.strptime(str_date, '%Y %b %d %X.%f')
-        except ValueError:
-            dt = datetime.datetime.strptime(str_date, '%Y %b %d %X')
-        # Handle the wrap around of year (Dec 31 to Jan 1)
-        # Generally, last metadata change time should be larger than generated log message timestamp
-        # but we still perform some wrap around test to avoid the race condition
-        # 183 is the number of days in half year, just a reasonable choice
-        if (dt - fct).days > 183:
-            dt.replace(year=dt.year - 1)
-    elif len(re_result_with_year) > 0:
-        str_date = re_result_with_year[0]
-        dt = datetime.datetime.strptime(str_date, '%Y %b %d %X.%f')
-    else:
-        re_result = re.findall(
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}', s)
-        if len(re_result) > 0:
-            str_date = re_result[0]
-            str_date = str_date.replace("T", " ")
-            dt = datetime.datetime.strptime(str_date, '%Y-%m-%d %X.%f')
-        else:
-            re_result = re.findall(
-                r'^\d{4}-\d{2}-\d{2}\.\d{2}:\d{2}:\d{2}\.\d{6}', s)
-            if len(re_result) > 0:
-                str_date = re_result[0]
-                dt = datetime.datetime.strptime(str_date, '%Y-%m-%d.%X.%f')
-
-            else:
-                re_result = re.findall(
-                    r'^\d{4} \w{3} \d{2} \d{2}:\d{2}:\d{2}\.\d{6}', s)
-                if len(re_result) > 0:
-                    str_date = re_result[0]
-                    dt = datetime.datetime.strptime(str_date, '%Y %b %d %H:%M:%S.%f')
-
-    locale.setlocale(locale.LC_ALL, loc)
-
-    if dt is None:
-        dt = 0
-        logger.warning(f"Failed to convert date from string, skipping unparseable line: {s}")
-    return dt
-
-
-def comparator(left, right):
-    nl = extract_number(left[0])
-    nr = extract_number(right[0])
-    if nl == nr:
-        dl = convert_date(left[1], left[2])
-        dr = convert_date(right[1], right[2])
-        if dl == dr:
-            return 0
-        elif dl < dr:
-            return -1
-        else:
-            return 1
-    elif nl > nr:
-        return -1
-    else:
-        return 1
-
-
 def filename_comparator(left, right):
     """Compares log filenames, assumes file with greater number is
     older, e.g syslog.2 is older than syslog.1. This is how logrotate is currently configured.
@@ -221,85 +137,143 @@ def list_files(directory, prefixname):
                        if filename.startswith(prefixname)], key=cmp_to_key(filename_comparator))
 
 
-def extract_latest_line_with_string(directory, filenames, start_string):
-    """Extracts latest line with string @start_string. Assumes @filenames are sorted
-    and first file in @filenames is the newest log file"""
+def calculate_files_to_copy(filenames, file_with_latest_line):
+    files_to_copy = filenames[:filenames.index(file_with_latest_line) + 1]
+    return files_to_copy
 
-    target_lines = []
-    for filename in filenames:
-        extracted_lines = extract_lines(directory, filename, start_string)
-        if extracted_lines:
-            # found lines are the lates since we start from the newest file
-            # assignt to target_lines and break the loop
-            target_lines = extracted_lines
-            break
 
-    # find the latest line from traget_lines comparing by date in line
-    target = target_lines[0] if len(target_lines) > 0 else None
-    for line in target_lines:
-        if comparator(line, target) > 0:
-            target = line
+def load_marker_offsets(marker_index, start_string):
+    """Returns {inode: offset} recorded by loganalyzer when @start_string was placed"""
+    try:
+        with open(marker_index) as f:
+            return {int(inode): offset for inode, offset in json.load(f).get(start_string, {}).items()}
+    except (IOError, OSError, ValueError):
+        return {}
 
-    if target is None:
-        raise Exception("{} was not found in {}".format(
-            start_string, directory))
 
-    return target
+def line_start(data, pos):
+    return data.rfind(b'\n', 0, pos) + 1
 
 
-def calculate_files_to_copy(filenames, file_with_latest_line):
-    files_to_copy = filenames[:filenames.index(file_with_latest_line) + 1]
-    return files_to_copy
+def line_end(data, pos):
+    end = data.find(b'\n', pos)
+    return len(data) if end < 0 else end + 1
 
 
-def combine_logs_and_save(directory, filenames, start_string, target_string, target_filename):
-    do_copy = False
-    line_processed = 0
-    line_copied = 0
-    with open(target_filename, 'w') as fp:
-        for filename in reversed(filenames):
-            path = os.path.join(directory, filename)
-            dt = datetime.datetime.fromtimestamp(os.path.getctime(path))
-            sz = os.path.getsize(path)
-            logger.debug(
-                "extract_log combine_logs from file {} create time {}, size {}".format(path, dt, sz))
-            file = None
-            if 'gz' in path:
-                file = gzip.open(path, mode='rt')
-            else:
-                file = open(path)
-
-            with file:
-                for line in file:
-                    line_processed += 1
-                    if do_copy is False:
-                        if line == start_string or target_string in line:
-                            do_copy = True
-                            fp.write(line)
-                            line_copied += 1
-                    else:
-                        fp.write(line)
-                        line_copied += 1
+def is_start_line(line, target):
+    # Lines logged for the extract_log invocation itself carry the start string as an argument
+    return target in line and SKIP_STRING not in line
 
-            logger.debug("extract_log combine_logs from file {}, {} lines processed, {} lines copied".format(
-                path, line_processed, line_copied))
 
-
-def extract_log(directory, prefixname, target_string, target_filename):
+def find_start_in_plain_file(path, target, hint=0):
+    """Searches a plain log file backwards for the latest start line.
+    Returns the offset of the first line containing @target, or None if the file has no start line.
+    @hint is an offset recorded when the marker was placed, the forward search starts there"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return None
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            pos = data.rfind(target)
+            while pos >= 0:
+                start = line_start(data, pos)
+                if is_start_line(data[start:line_end(data, pos)], target):
+                    break
+                pos = data.rfind(target, 0, start)
+            if pos < 0:
+                return None
+            if hint > pos:
+                hint = 0
+            return line_start(data, data.find(target, hint))
+        finally:
+            data.close()
+
+
+def copy_from_start_in_gz_file(path, target, fp):
+    """Decompresses @path once, writing everything from the first line containing @target to @fp.
+    Returns True if the file has a start line, otherwise whatever was written is truncated again."""
+    begin = fp.tell()
+    found = False
+    copying = False
+    tail = b''
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            data = tail + chunk
+            if not chunk:
+                tail = b''
+            else:
+                # keep the last incomplete line for the next chunk
+                cut = data.rfind(b'\n') + 1
+                data, tail = data[:cut], data[cut:]
+            if not copying:
+                pos = data.find(target)
+                if pos >= 0:
+                    copying = True
+                    data = data[line_start(data, pos):]
+            if copying and not found:
+                pos = data.find(target)
+                while pos >= 0:
+                    end = line_end(data, pos)
+                    if is_start_line(data[line_start(data, pos):end], target):
+                        found = True
+                        break
+                    pos = data.find(target, end)
+            if copying:
+                fp.write(data)
+            if not chunk:
+                break
+    if not found:
+        fp.seek(begin)
+        fp.truncate()
+    return found
+
+
+def copy_file(path, fp):
+    with (gzip.open(path, 'rb') if 'gz' in path else open(path, 'rb')) as f:
+        shutil.copyfileobj(f, fp, CHUNK_SIZE)
+
+
+def extract_log(directory, prefixname, target_string, target_filename, marker_index=MARKER_INDEX):
+    """Copies everything from the latest @target_string in the rotated logs @directory/@prefixname* to
+    @target_filename. Logs are searched from the newest file as bytes: plain files backwards via mmap, gz files
+    with one streaming decompression that starts copying at the marker. Only the part after the marker and the
+    newer files are copied; decompressed data is not kept in memory."""
     logger.debug("extract_log for start string {}".format(
         target_string.replace("start-", "")))
     filenames = list_files(directory, prefixname)
     logger.debug("extract_log from files {}".format(filenames))
-    file_with_latest_line, file_create_time, latest_line, file_size = extract_latest_line_with_string(
-        directory, filenames, target_string)
-    m = hashlib.md5()
-    m.update(latest_line.encode('utf-8'))
-    logger.debug("extract_log start file {} size {}, ctime {}, latest line md5sum {}".format(
-        file_with_latest_line, file_size, file_create_time, m.hexdigest()))
-    files_to_copy = calculate_files_to_copy(filenames, file_with_latest_line)
-    logger.debug("extract_log subsequent files {}".format(files_to_copy))
-    combine_logs_and_save(directory, files_to_copy,
-                          latest_line, target_string, target_filename)
+    target = target_string.encode('utf-8')
+    offsets = load_marker_offsets(marker_index, target_string)
+
+    file_with_latest_line = None
+    with open(target_filename, 'wb') as fp:
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if 'gz' in path:
+                if copy_from_start_in_gz_file(path, target, fp):
+                    file_with_latest_line = filename
+                    break
+                continue
+            start = find_start_in_plain_file(path, target, offsets.get(os.stat(path).st_ino, 0))
+            if start is not None:
+                file_with_latest_line = filename
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    shutil.copyfileobj(f, fp, CHUNK_SIZE)
+                break
+
+        if file_with_latest_line is None:
+            raise Exception("{} was not found in {}".format(
+                target_string, directory))
+
+        files_to_copy = calculate_files_to_copy(filenames, file_with_latest_line)
+        logger.debug("extract_log start file {}, subsequent files {}".format(file_with_latest_line, files_to_copy))
+        # newer files follow the one with the start line
+        for filename in reversed(files_to_copy[:-1]):
+            copy_file(os.path.join(directory, filename), fp)
+        logger.debug("extract_log copied {} bytes".format(fp.tell()))
     filenames = list_files(directory, prefixname)
     logger.debug("extract_log check logs files {}".format(filenames))
 
@@ -311,6 +285,7 @@ def main():
             file_prefix=dict(required=True, type='str'),
             start_string=dict(required=True, type='str'),
             target_filename=dict(required=True, type='str'),
+            marker_index=dict(required=False, type='str', default=MARKER_INDEX),
         ),
         supports_check_mode=False)
 
@@ -322,7 +297,7 @@ def main():
 
     try:
         extract_log(p['directory'], p['file_prefix'],
-                    p['start_string'], p['target_filename'])
+                    p['start_string'], p['target_filename'], p['marker_index'])
     except Exception:
         tb = traceback.format_exc()
         module.fail_json(msg=tb)
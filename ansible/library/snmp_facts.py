@@ -39,6 +39,7 @@ else:
         Udp6TransportTarget,
         get_cmd,
         walk_cmd,
+        bulk_walk_cmd,
         SnmpEngine,
         ContextData,
         ObjectType,
@@ -115,6 +116,25 @@ options:
         description:
             - Encryption key, required if version is authPriv
         required: false
+    facts:
+        description:
+            - Fact groups to collect, all of them by default. Only the tables of the requested groups are walked.
+              Requires pysnmp 5 or newer.
+        choices: [ 'system', 'interfaces', 'entity', 'sensors', 'ipaddr', 'lldp', 'cpu', 'memory', 'pfc', 'qos',
+                   'psu', 'route', 'fdb' ]
+        required: false
+    max_repetitions:
+        description:
+            - Number of rows requested per GETBULK PDU when walking tables. Set to 0 to walk with GETNEXT, one row
+              per request. Requires pysnmp 5 or newer.
+        default: 25
+        required: false
+    max_concurrency:
+        description:
+            - Maximum number of tables walked at the same time on the agent, 0 for no limit.
+              Requires pysnmp 5 or newer.
+        default: 4
+        required: false
 '''
 
 EXAMPLES = '''
@@ -131,6 +151,14 @@ EXAMPLES = '''
     username=snmp-user
     authkey=abc12345
     privkey=def6789
+
+# Only walk the interface and LLDP tables, 50 rows per GETBULK request
+- snmp_facts:
+    host={{ inventory_hostname }}
+    version=v2c
+    community=public
+    facts=interfaces,lldp
+    max_repetitions=50
 '''
 
 
@@ -1117,6 +1145,24 @@ def main_legacy(module):
 
 
 class SnmpFactsCollector:
+    # Fact group -> collectors to run for it
+    FACT_GROUPS = {
+        'system': ['_collect_system'],
+        'interfaces': ['_collect_interfaces'],
+        'entity': ['_collect_physical_entities'],
+        'sensors': ['_collect_sensors'],
+        'ipaddr': ['_collect_ipaddr'],
+        'lldp': ['_collect_lldp_sys', '_collect_lldp_ports', '_collect_lldp_locman', '_collect_lldp_rem',
+                 '_collect_lldp_rem_man_addr'],
+        'cpu': ['_collect_dell_cpu'],
+        'memory': ['_collect_sys_mem', '_collect_swap'],
+        'pfc': ['_collect_cisco_pfc_if', '_collect_cisco_pfc_priority'],
+        'qos': ['_collect_cisco_qos'],
+        'psu': ['_collect_cisco_psu'],
+        'route': ['_collect_ip_route'],
+        'fdb': ['_collect_fdb'],
+    }
+
     def __init__(self, module):
         self.module = module
         self.m_args = module.params
@@ -1125,6 +1171,9 @@ class SnmpFactsCollector:
         self.snmp_engine = SnmpEngine()
         self.transport = None
         self.logger = logging.getLogger(__name__)
+        self.max_repetitions = self.m_args.get('max_repetitions') or 0
+        max_concurrency = self.m_args.get('max_concurrency') or 0
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
 
         self._init_auth()
 
@@ -1189,6 +1238,37 @@ class SnmpFactsCollector:
                 timeout=self.m_args['timeout']
         )
 
+    def _walk(self, oid):
+        """Walk the table under oid, with GETBULK unless max_repetitions is 0."""
+        if self.max_repetitions > 0:
+            return bulk_walk_cmd(
+                self.snmp_engine,
+                self.snmp_auth,
+                self.transport,
+                ContextData(),
+                0,
+                self.max_repetitions,
+                ObjectType(ObjectIdentity(oid)),
+                lookupMib=False,
+                lexicographicMode=False
+            )
+        return walk_cmd(
+            self.snmp_engine,
+            self.snmp_auth,
+            self.transport,
+            ContextData(),
+            ObjectType(ObjectIdentity(oid)),
+            lookupMib=False,
+            lexicographicMode=False
+        )
+
+    async def _limited(self, collector):
+        if self.semaphore is None:
+            await collector()
+            return
+        async with self.semaphore:
+            await collector()
+
     async def _collect_system(self):
         self.logger.info("Starting _collect_system")
         errorIndication, errorStatus, errorIndex, varBinds = await get_cmd(
@@ -1228,15 +1308,7 @@ class SnmpFactsCollector:
 
     async def _collect_interfaces(self):
         self.logger.info("Starting _collect_interfaces")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.ifEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.ifEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying ifTable."
@@ -1276,15 +1348,7 @@ class SnmpFactsCollector:
                 elif oid_parent_child(self.v.ifOutErrors, current_oid):
                     self.results['snmp_interfaces'][ifIndex]['ifOutErrors'] = current_val
 
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.ifXEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.ifXEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying ifXTable."
@@ -1307,15 +1371,7 @@ class SnmpFactsCollector:
 
     async def _collect_physical_entities(self):
         self.logger.info("Starting _collect_physical_entities")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.entPhysicalEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.entPhysicalEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying entPhysicalTable."
@@ -1354,15 +1410,7 @@ class SnmpFactsCollector:
 
     async def _collect_sensors(self):
         self.logger.info("Starting _collect_sensors")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.entPhySensorEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.entPhySensorEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying entPhySensorEntry."
@@ -1389,15 +1437,7 @@ class SnmpFactsCollector:
         self.logger.info("Starting _collect_ipaddr")
         ipv4_networks = Tree()
         all_ipv4_addresses = []
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.ipAddrEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.ipAddrEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying ipAddrEntry."
@@ -1469,15 +1509,7 @@ class SnmpFactsCollector:
 
     async def _collect_lldp_ports(self):
         self.logger.info("Starting _collect_lldp_ports")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.lldpLocPortEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.lldpLocPortEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying lldpLocPortEntry."
@@ -1498,15 +1530,7 @@ class SnmpFactsCollector:
 
     async def _collect_lldp_locman(self):
         self.logger.info("Starting _collect_lldp_locman")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.lldpLocManAddrEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.lldpLocManAddrEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying lldpLocManAddrEntry."
@@ -1528,15 +1552,7 @@ class SnmpFactsCollector:
 
     async def _collect_lldp_rem(self):
         self.logger.info("Starting _collect_lldp_rem")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.lldpRemEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.lldpRemEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying lldpRemEntry."
@@ -1569,15 +1585,7 @@ class SnmpFactsCollector:
 
     async def _collect_lldp_rem_man_addr(self):
         self.logger.info("Starting _collect_lldp_rem_man_addr")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.lldpRemManAddrEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.lldpRemManAddrEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying lldpRemManAddrEntry."
@@ -1679,15 +1687,7 @@ class SnmpFactsCollector:
 
     async def _collect_cisco_pfc_if(self):
         self.logger.info("Starting _collect_cisco_pfc_if")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.cpfcIfEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.cpfcIfEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying cpfcIfEntry."
@@ -1706,15 +1706,7 @@ class SnmpFactsCollector:
 
     async def _collect_cisco_pfc_priority(self):
         self.logger.info("Starting _collect_cisco_pfc_priority")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.cpfcIfPriorityEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.cpfcIfPriorityEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying cpfcIfPriorityEntry."
@@ -1736,15 +1728,7 @@ class SnmpFactsCollector:
 
     async def _collect_cisco_qos(self):
         self.logger.info("Starting _collect_cisco_qos")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.csqIfQosGroupStatsEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.csqIfQosGroupStatsEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying csqIfQosGroupStatsEntry."
@@ -1764,15 +1748,7 @@ class SnmpFactsCollector:
 
     async def _collect_cisco_psu(self):
         self.logger.info("Starting _collect_cisco_psu")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.cefcFRUPowerStatusEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.cefcFRUPowerStatusEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying cefcFRUPowerStatusEntry."
@@ -1789,15 +1765,7 @@ class SnmpFactsCollector:
 
     async def _collect_ip_route(self):
         self.logger.info("Starting _collect_ip_route")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.ipCidrRouteDest)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.ipCidrRouteDest):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying ipCidrRouteDest."
@@ -1811,15 +1779,7 @@ class SnmpFactsCollector:
                     next_hop = current_oid.split(self.v.ipCidrRouteDest + ".")[1]
                     self.results['snmp_cidr_route'][next_hop]['route_dest'] = current_val
 
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.ipCidrRouteStatus)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.ipCidrRouteStatus):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying ipCidrRouteStatus."
@@ -1837,15 +1797,7 @@ class SnmpFactsCollector:
 
     async def _collect_fdb(self):
         self.logger.info("Starting _collect_fdb")
-        async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-            self.snmp_engine,
-            self.snmp_auth,
-            self.transport,
-            ContextData(),
-            ObjectType(ObjectIdentity(self.p.dot1qTpFdbEntry)),
-            lookupMib=False,
-            lexicographicMode=False
-        ):
+        async for errorIndication, errorStatus, errorIndex, varBinds in self._walk(self.p.dot1qTpFdbEntry):
             if errorIndication:
                 self.module.fail_json(
                     msg=f"{str(errorIndication)} querying dot1qTpFdbEntry."
@@ -1872,27 +1824,11 @@ class SnmpFactsCollector:
     async def collect_all(self):
         if self.transport is None:
             raise Exception("Transport not initialized. Call setup() first.")
-        await asyncio.gather(
-            self._collect_system(),
-            self._collect_interfaces(),
-            self._collect_physical_entities(),
-            self._collect_sensors(),
-            self._collect_ipaddr(),
-            self._collect_lldp_sys(),
-            self._collect_lldp_ports(),
-            self._collect_lldp_locman(),
-            self._collect_lldp_rem(),
-            self._collect_lldp_rem_man_addr(),
-            self._collect_dell_cpu(),
-            self._collect_sys_mem(),
-            self._collect_swap(),
-            self._collect_cisco_pfc_if(),
-            self._collect_cisco_pfc_priority(),
-            self._collect_cisco_qos(),
-            self._collect_cisco_psu(),
-            self._collect_ip_route(),
-            self._collect_fdb()
-        )
+        groups = self.m_args.get('facts') or list(self.FACT_GROUPS.keys())
+        collectors = []
+        for group in groups:
+            collectors.extend(getattr(self, name) for name in self.FACT_GROUPS[group])
+        await asyncio.gather(*[self._limited(collector) for collector in collectors])
 
 
 async def main(module):
@@ -1921,6 +1857,10 @@ if __name__ == "__main__":
             is_dell=dict(required=False, default=False, type='bool'),
             is_eos=dict(required=False, default=False, type='bool'),
             include_swap=dict(required=False, default=False, type='bool'),
+            facts=dict(required=False, type='list', elements='str',
+                       choices=list(SnmpFactsCollector.FACT_GROUPS.keys())),
+            max_repetitions=dict(required=False, type='int', default=25),
+            max_concurrency=dict(required=False, type='int', default=4),
             removeplaceholder=dict(required=False)
         ),
         required_together=(
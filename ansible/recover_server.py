@@ -5,11 +5,17 @@ Script used to recover testbed servers after reboot/upgrade/black-out.
     - Start vms
     - Add topos
     - Deploy minigraphs
+
+Per server, cleanup and start-vms run alone, then the add-topo/deploy-mg jobs of the testbeds run concurrently,
+as far as the per-server limits (--max-parallel-testbeds, --server-cpus, --server-mem-gb) allow. All servers are
+recovered at the same time. The duration of every phase is printed at the end and saved to durations.json in the
+log directory, use --dry-run with --dry-run-task-duration to try a schedule without touching the servers.
 """
 from __future__ import print_function
 import argparse
-import collections
 import datetime
+import fnmatch
+import json
 import logging
 import os
 import subprocess
@@ -37,6 +43,9 @@ handler.setFormatter(formatter)
 root.addHandler(handler)
 
 
+PROGRESS_INTERVAL = 60
+
+
 def parse_testbed(testbedfile, testbed_servers):
     """Return a dictionary containing mapping from server name to testbeds."""
     testbed = load_source('testbed', os.path.join(
@@ -51,6 +60,10 @@ def parse_testbed(testbedfile, testbed_servers):
 class Task(object):
     """Wrapper class to call testbed-cli.sh."""
 
+    # Dry run stubs: how long every task pretends to run, and glob patterns of the task names that pretend to fail
+    dry_run_duration = 0
+    dry_run_failures = []
+
     def __init__(self, taskname, log_save_dir=None, tbfile=None, vmfile=None, vmtype=None, dry_run=False):
         self.taskname = taskname
         self.args = ['./testbed-cli.sh']
@@ -63,12 +76,18 @@ class Task(object):
         self.log_save_dir = log_save_dir or tempfile.gettempdir()
         self.dry_run = dry_run
         self.returncode = None
+        self.duration = None
 
     def __call__(self):
         logging.info('Start running task %s', self)
         logging.debug('task %s CMD: %s', self, ' '.join(self.args))
+        start_time = time.time()
 
-        if not self.dry_run:
+        if self.dry_run:
+            time.sleep(self.dry_run_duration)
+            if any(fnmatch.fnmatch(self.taskname, pattern) for pattern in self.dry_run_failures):
+                self.returncode = 1
+        else:
             log_file = '%s.log' % self.taskname
             log_file = os.path.join(self.log_save_dir, log_file)
             with open(log_file, 'w') as lf:
@@ -78,10 +97,11 @@ class Task(object):
                 self._p.communicate()
                 self.returncode = self._p.returncode
 
-        if self.dry_run or self.returncode == 0:
-            logging.info('Finish running task %s', self)
+        self.duration = time.time() - start_time
+        if self.returncode is None or self.returncode == 0:
+            logging.info('Finish running task %s in %s', self, _format_duration(self.duration))
         else:
-            logging.error('Fail to run task %s', self)
+            logging.error('Fail to run task %s after %s', self, _format_duration(self.duration))
 
     def __str__(self):
         return self.taskname
@@ -135,6 +155,12 @@ class TaskCleanupVMHosts(Task):
         self.args.extend(('cleanup-vmhost', server, passfile))
 
 
+def _format_duration(seconds):
+    if seconds is None:
+        return '-'
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
 class JobRuntimeError(Exception):
     pass
 
@@ -142,10 +168,27 @@ class JobRuntimeError(Exception):
 class Job(object):
     """Runs multiple Tasks."""
 
+    PENDING = 'pending'
+    RUNNING = 'running'
+    PASSED = 'passed'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
     def __init__(self, jobname, **kwargs):
         self.jobname = jobname
         self.failed_task = None
         self.dry_run = kwargs.get('dry_run', False)
+        self.server = kwargs.get('server')
+        # Scheduling: jobs that must pass first, resources the job needs on the server,
+        # and whether it needs the server for itself
+        self.depends_on = kwargs.get('depends_on', [])
+        self.cpus = kwargs.get('cpus', 0)
+        self.mem_gb = kwargs.get('mem_gb', 0)
+        self.exclusive = jobname in ('cleanup', 'start-vms')
+        self.status = Job.PENDING
+        self.queued_time = time.time()
+        self.start_time = None
+        self.end_time = None
         passfile = kwargs['passfile']
         tbfile = kwargs.get('tbfile')
         vmfile = kwargs.get('vmfile')
@@ -186,111 +229,212 @@ class Job(object):
         """
         for task in self.tasks:
             task()
-            if not self.dry_run and task.returncode != 0:
+            if task.returncode is not None and task.returncode != 0:
                 self.failed_task = task
                 break
         if self.failed_task is not None and not self.ignore_errors:
             raise JobRuntimeError
 
-
-def do_jobs(testbeds, passfile, tbfile=None, vmfile=None, vmtype=None, skip_cleanup=False, dry_run=False):
-
-    def _print_summary(jobs):
-        server = threading.current_thread().name
+    def __str__(self):
+        return '%s_%s' % (getattr(self, 'tbname', self.server), self.jobname)
+
+
+class ServerLimits(object):
+    """Resources of one testbed server available to the recovery jobs."""
+
+    def __init__(self, max_parallel=1, cpus=None, mem_gb=None):
+        self.max_parallel = max_parallel
+        self.cpus = cpus
+        self.mem_gb = mem_gb
+
+
+class JobScheduler(object):
+    """
+    Run the recovery jobs of all servers, each job as soon as its dependencies passed and its server can take it.
+
+    A job is skipped if one of its dependencies failed or was skipped. Exclusive jobs (cleanup, start-vms) run alone
+    on their server, other jobs run concurrently as long as the server's ServerLimits are respected. A job that does
+    not fit into the limits even on an idle server still runs, alone.
+    """
+
+    def __init__(self, jobs, limits):
+        self.jobs = jobs
+        self.limits = limits
+        self._cond = threading.Condition()
+        self._start_time = None
+
+    def _running_on(self, server):
+        return [job for job in self.jobs if job.server == server and job.status == Job.RUNNING]
+
+    def _fits(self, job):
+        running = self._running_on(job.server)
+        if not running:
+            return True
+        if job.exclusive or any(other.exclusive for other in running):
+            return False
+        limits = self.limits[job.server]
+        if len(running) >= limits.max_parallel:
+            return False
+        if limits.cpus is not None and sum(other.cpus for other in running) + job.cpus > limits.cpus:
+            return False
+        if limits.mem_gb is not None and sum(other.mem_gb for other in running) + job.mem_gb > limits.mem_gb:
+            return False
+        return True
+
+    def _run_job(self, job):
+        try:
+            job()
+        except JobRuntimeError:
+            pass
+        except Exception:
+            logging.exception('Job %s raised an exception', job)
+            job.failed_task = job.failed_task or job.tasks[0]
+        with self._cond:
+            job.end_time = time.time()
+            job.status = Job.FAILED if job.failed_task is not None else Job.PASSED
+            self._log_progress('%s %s in %s' % (job, job.status, _format_duration(job.end_time - job.start_time)))
+            self._cond.notify()
+
+    def _log_progress(self, event):
+        counts = dict((status, 0) for status in (Job.PENDING, Job.RUNNING, Job.PASSED, Job.FAILED, Job.SKIPPED))
+        for job in self.jobs:
+            counts[job.status] += 1
+        done = counts[Job.PASSED] + counts[Job.FAILED] + counts[Job.SKIPPED]
+        logging.info('[%s] %s; %d/%d jobs done (%d passed, %d failed, %d skipped), running: %s',
+                     _format_duration(time.time() - self._start_time), event, done, len(self.jobs),
+                     counts[Job.PASSED], counts[Job.FAILED], counts[Job.SKIPPED],
+                     ', '.join(str(job) for job in self.jobs if job.status == Job.RUNNING) or 'none')
+
+    def _schedule(self):
+        """Start or skip every pending job that can be decided now. Called with the condition held."""
+        for job in self.jobs:
+            if job.status != Job.PENDING:
+                continue
+            deps_status = [dep.status for dep in job.depends_on]
+            if any(status in (Job.FAILED, Job.SKIPPED) for status in deps_status):
+                job.status = Job.SKIPPED
+                self._log_progress('%s skipped' % job)
+            elif all(status == Job.PASSED for status in deps_status) and self._fits(job):
+                job.status = Job.RUNNING
+                job.start_time = time.time()
+                self._log_progress('%s started after %s in queue' %
+                                   (job, _format_duration(job.start_time - job.queued_time)))
+                thread = threading.Thread(name=str(job), target=self._run_job, args=(job,))
+                thread.daemon = True
+                thread.start()
+
+    def run(self):
+        self._start_time = time.time()
+        for job in self.jobs:
+            job.queued_time = self._start_time
+        with self._cond:
+            while True:
+                self._schedule()
+                if all(job.status not in (Job.PENDING, Job.RUNNING) for job in self.jobs):
+                    break
+                if not self._cond.wait(timeout=PROGRESS_INTERVAL):
+                    self._log_progress('waiting')
+
+    def durations(self):
+        """Per-job and per-task durations, for capacity planning."""
+        records = []
+        for job in self.jobs:
+            records.append({
+                'server': job.server,
+                'job': str(job),
+                'status': job.status,
+                'queued': (job.start_time - job.queued_time) if job.start_time else None,
+                'duration': (job.end_time - job.start_time) if job.end_time else None,
+                'tasks': dict((task.taskname, task.duration) for task in job.tasks),
+            })
+        return records
+
+
+def count_testbed_vms(tb):
+    """Number of VMs of a testbed, from the topology loaded by TestbedInfo."""
+    try:
+        return len(tb['topo']['properties']['topology'].get('VMs') or {})
+    except (KeyError, TypeError, AttributeError):
+        return 0
+
+
+def do_jobs(testbeds, passfile, tbfile=None, vmfile=None, vmtype=None, skip_cleanup=False, dry_run=False,
+            limits=None, vm_cpus=1, vm_mem_gb=2):
+    """
+    Recover the servers.
+
+    @param limits: Dictionary from server name to ServerLimits, servers not in it run one testbed at a time.
+    @param vm_cpus, vm_mem_gb: Resources one VM of a testbed topology is expected to use on the server.
+    """
+
+    def _print_summary(server, jobs):
         HEAD_LINE = '\n============= %s recovery summary =============\n' % server
         END_LINE = '\n' + ('=' * (len(HEAD_LINE) - 2)) + '\n'
         output = [HEAD_LINE]
-        if not skip_cleanup:
-            if jobs[0].failed_task is not None:
-                output.append(
-                    'Server %s cleanup failed, skip recovery.' % server)
-            jobs = jobs[1:]
-
-        if vmtype != 'ceos':
-            # start-vms output. If vmtype is ceos, start-vms is not required
-            if jobs[0].failed_task is None:
-                start_vms_result = 'Succeed.'
+        tb_jobs = []
+        for job in jobs:
+            if job.jobname == 'cleanup':
+                if job.status != Job.PASSED:
+                    output.append('Server %s cleanup failed, skip recovery.' % server)
+            elif job.jobname == 'start-vms':
+                output.append('Server %s start-vms result: %s in %s' %
+                              (server, job.status, _format_duration(job.tasks[0].duration)))
             else:
-                start_vms_result = 'Failed.'
-            output.append('Server %s start-vms result: %s ' %
-                          (server, start_vms_result))
-            jobs = jobs[1:]
+                tb_jobs.append(job)
 
         output.append('Server %s recovery result:' % server)
-        headers = [server, 'add-topo', 'deploy-mg']
+        headers = [server, 'add-topo', 'deploy-mg', 'queued', 'add-topo time', 'deploy-mg time']
         table = []
-        for job in jobs:
+        for job in tb_jobs:
             line = [job.tbname, ]
             for task in job.tasks:
-                if task.returncode is None:
+                if task.returncode is None and task.duration is None:
                     line.append('skipped')
-                elif task.returncode == 0:
+                elif not task.returncode:
                     line.append('passed')
                 else:
                     line.append('failed')
+            line.append(_format_duration(job.start_time - job.queued_time if job.start_time else None))
+            line.extend(_format_duration(task.duration) for task in job.tasks)
             table.append(line)
         output.append(tabulate(table, headers, tablefmt='simple'))
         output.append(END_LINE)
         print('\n'.join(output))
 
-    def _do_jobs(jobs):
-        for job in jobs:
-            try:
-                job()
-            except JobRuntimeError:
-                # if one job raises JobRunTimeRrror signaling its failure,
-                # we need to skip all jobs after. This enable us to skip all
-                # those tasks after the server cleanup if cleanup fails.
-                break
-
-        _print_summary(jobs)
-
-    def _join_all(threads):
-        alive_threads = collections.deque(threads)
-        while True:
-            for _ in range(len(alive_threads)):
-                alive_thread = alive_threads.popleft()
-                alive_thread.join(timeout=0)
-                if alive_thread.is_alive():
-                    alive_threads.append(alive_thread)
-            if not alive_threads:
-                break
-            time.sleep(5)
-
-    utilities = load_source('utilities', os.path.join(
-        SONIC_MGMT_DIR, 'tests/common/utilities.py'))
-
+    limits = limits or {}
     curr_date = datetime.datetime.today().strftime('%Y-%m-%d_%H-%M-%S')
     log_save_dir = os.path.join(
         tempfile.gettempdir(), 'recover_server_' + curr_date)
     logging.info('LOG PATH: %s', log_save_dir)
-    threads = []
+    all_jobs = []
+    server_jobs = {}
     for server, tbs in testbeds.items():
         log_save_dir_per_server = os.path.join(log_save_dir, server)
         os.makedirs(log_save_dir_per_server)
-        jobs = [
-            Job(
-                'init_testbed',
-                server=server,
-                tbname=tb['conf-name'],
-                inventory=tb['inv_name'],
-                passfile=passfile,
-                tbfile=tbfile,
-                vmfile=vmfile,
-                vmtype=vmtype,
-                log_save_dir=log_save_dir_per_server,
-                dry_run=dry_run
-            ) for tb in tbs
-        ]
+        limits.setdefault(server, ServerLimits())
+        jobs = []
+        if not skip_cleanup:
+            jobs.append(
+                Job(
+                    'cleanup',
+                    server=server,
+                    passfile=passfile,
+                    tbfile=tbfile,
+                    vmfile=vmfile,
+                    log_save_dir=log_save_dir_per_server,
+                    dry_run=dry_run
+                )
+            )
 
         # only cEOS container doesn't need to start-vm
         need_start_vms = vmtype != 'ceos'
 
         if need_start_vms:
-            jobs = [
+            jobs.append(
                 Job(
                     'start-vms',
                     server=server,
+                    depends_on=jobs[-1:],
                     passfile=passfile,
                     tbfile=tbfile,
                     vmfile=vmfile,
@@ -298,25 +442,42 @@ def do_jobs(testbeds, passfile, tbfile=None, vmfile=None, vmtype=None, skip_clea
                     log_save_dir=log_save_dir_per_server,
                     dry_run=dry_run
                 )
-            ] + jobs
-        if not skip_cleanup:
-            jobs = [
+            )
+
+        # Testbeds of a server only depend on the server preparation, not on each other
+        server_prepare_jobs = list(jobs)
+        for tb in tbs:
+            vms = count_testbed_vms(tb)
+            jobs.append(
                 Job(
-                    'cleanup',
+                    'init_testbed',
                     server=server,
+                    depends_on=server_prepare_jobs,
+                    cpus=vms * vm_cpus,
+                    mem_gb=vms * vm_mem_gb,
+                    tbname=tb['conf-name'],
+                    inventory=tb['inv_name'],
                     passfile=passfile,
                     tbfile=tbfile,
                     vmfile=vmfile,
+                    vmtype=vmtype,
                     log_save_dir=log_save_dir_per_server,
                     dry_run=dry_run
                 )
-            ] + jobs
-        thread = utilities.InterruptableThread(
-            name=server, target=_do_jobs, args=(jobs,))
-        thread.start()
-        threads.append(thread)
+            )
+        server_jobs[server] = jobs
+        all_jobs.extend(jobs)
 
-    _join_all(threads)
+    scheduler = JobScheduler(all_jobs, limits)
+    scheduler.run()
+
+    for server, jobs in server_jobs.items():
+        _print_summary(server, jobs)
+
+    durations_file = os.path.join(log_save_dir, 'durations.json')
+    with open(durations_file, 'w') as f:
+        json.dump(scheduler.durations(), f, indent=4)
+    logging.info('Phase durations saved to %s', durations_file)
 
 
 if __name__ == '__main__':
@@ -336,7 +497,25 @@ if __name__ == '__main__':
                         help='Ansible vault password file(default: password.txt)')
     parser.add_argument('--skip-cleanup', action='store_true',
                         help='Skip cleanup server')
+    parser.add_argument('--max-parallel-testbeds', type=int, default=1,
+                        help='max number of testbeds recovered at the same time per server(default: 1)')
+    parser.add_argument('--server-cpus', type=int,
+                        help='CPUs per server the VMs of concurrently recovered testbeds may use(default: no limit)')
+    parser.add_argument('--server-mem-gb', type=float,
+                        help='memory(GB) per server the VMs of concurrently recovered testbeds may use'
+                             '(default: no limit)')
+    parser.add_argument('--server-limits', action='append', default=[],
+                        help='limits of one server, overriding the options above, as '
+                             '<server>:<max parallel testbeds>:<cpus>:<mem GB>, empty fields mean no limit')
+    parser.add_argument('--vm-cpus', type=float, default=1,
+                        help='CPUs used by one VM, to estimate the CPUs used by a testbed(default: 1)')
+    parser.add_argument('--vm-mem-gb', type=float, default=2,
+                        help='memory(GB) used by one VM, to estimate the memory used by a testbed(default: 2)')
     parser.add_argument('--dry-run', action='store_true', help='Dry run')
+    parser.add_argument('--dry-run-task-duration', type=float, default=0,
+                        help='seconds every task pretends to run in dry run(default: 0)')
+    parser.add_argument('--dry-run-fail', action='append', default=[],
+                        help='glob pattern of task names that pretend to fail in dry run, e.g. "*_add_topo"')
     parser.add_argument('--log-level', choices=['debug', 'info', 'warn',
                         'error', 'critical'], default='info', help='logging output level')
     args = parser.parse_args()
@@ -352,6 +531,18 @@ if __name__ == '__main__':
 
     handler.setLevel(getattr(logging, log_level.upper()))
 
+    Task.dry_run_duration = args.dry_run_task_duration
+    Task.dry_run_failures = args.dry_run_fail
+
+    limits = {server: ServerLimits(args.max_parallel_testbeds, args.server_cpus, args.server_mem_gb)
+              for server in servers}
+    for server_limits in args.server_limits:
+        server, max_parallel, cpus, mem_gb = server_limits.split(':')
+        limits[server] = ServerLimits(int(max_parallel) if max_parallel else float('inf'),
+                                      float(cpus) if cpus else None,
+                                      float(mem_gb) if mem_gb else None)
+
     testbeds = parse_testbed(tbfile, servers)
     do_jobs(testbeds, passfile, tbfile=tbfile, vmfile=vmfile,
-            vmtype=vmtype, skip_cleanup=skip_cleanup, dry_run=dry_run)
+            vmtype=vmtype, skip_cleanup=skip_cleanup, dry_run=dry_run,
+            limits=limits, vm_cpus=args.vm_cpus, vm_mem_gb=args.vm_mem_gb)
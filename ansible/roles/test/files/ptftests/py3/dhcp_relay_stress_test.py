@@ -3,9 +3,8 @@ import logging
 import subprocess
 import signal
 import os
-import ptf.testutils as testutils
-import ptf.packet as scapy
 from dhcp_relay_test import DHCPTest
+from packet_emitter import PacketTemplate, send_bulk
 
 logger = logging.getLogger(__name__)
 
@@ -19,31 +18,25 @@ class DHCPContinuousStressTest(DHCPTest):
 
     def setUp(self):
         DHCPTest.setUp(self)
-        self.send_interval = 1 / self.test_params["pps"]
+        self.pps = self.test_params["pps"]
         self.duration = self.test_params["duration"]
         self.client_ports = self.other_client_port
         self.client_ports.append(self.client_port_index)
 
-    def send_packet_with_interval(self, pkt, index):
-        testutils.send_packet(self, index, pkt)
-        time.sleep(self.send_interval)
-
     def runTest(self):
         dhcp_discover = self.create_dhcp_discover_packet(self.dest_mac_address, self.client_udp_src_port)
         dhcp_offer = self.create_dhcp_offer_packet()
         dhcp_request = self.create_dhcp_request_packet(self.dest_mac_address, self.client_udp_src_port)
         dhcp_ack = self.create_dhcp_ack_packet()
 
-        start_time = time.time()
-        while time.time() - start_time <= self.duration:
-            for client_port in self.client_ports:
-                self.send_packet_with_interval(dhcp_discover, client_port)
-            for server_port in self.server_port_indices:
-                self.send_packet_with_interval(dhcp_offer, server_port)
-            for client_port in self.client_ports:
-                self.send_packet_with_interval(dhcp_request, client_port)
-            for server_port in self.server_port_indices:
-                self.send_packet_with_interval(dhcp_ack, server_port)
+        # One round: DISCOVER from every client port, OFFER from every server port, then REQUEST and ACK
+        packets = []
+        ports = []
+        for pkt, pkt_ports in [(dhcp_discover, self.client_ports), (dhcp_offer, self.server_port_indices),
+                               (dhcp_request, self.client_ports), (dhcp_ack, self.server_port_indices)]:
+            packets += [bytes(pkt)] * len(pkt_ports)
+            ports += list(pkt_ports)
+        send_bulk(self, packets, ports, pps=self.pps, duration=self.duration)
 
 
 class DHCPStressTest(DHCPTest):
@@ -66,13 +59,10 @@ class DHCPStressTest(DHCPTest):
             dhcp_packet = self.create_packet(self.dest_mac_address, self.client_udp_src_port)
         else:
             dhcp_packet = self.create_packet()
-        end_time = time.time() + self.packets_send_duration
-        xid = 0
-        while time.time() < end_time:
-            dhcp_packet[scapy.BOOTP].xid = xid
-            xid += 1
-            testutils.send_packet(self, self.send_port_indices[0], dhcp_packet)
-            time.sleep(1/self.client_packets_per_sec)
+        # Every packet gets its own xid, patched in the raw packet
+        count = int(self.packets_send_duration * self.client_packets_per_sec)
+        packets = PacketTemplate(dhcp_packet).variants(bootp_xid=range(count))
+        send_bulk(self, packets, self.send_port_indices[0], pps=self.client_packets_per_sec)
 
         # Wait until tcpdump stops receiving packets (idle for 5s, max 120s)
         log_file = "/tmp/dhcp_stress_test_{}.log".format(self.packet_type)
@@ -0,0 +1,329 @@
+"""
+Bulk packet emitter for PTF scale generators.
+
+Scale generators used to mutate a scapy packet and call testutils.send() once per packet, so every packet paid
+for a scapy rebuild and checksum computation in Python. PacketTemplate serializes the packet once and renders the
+variants by patching the raw bytes of the fields that change (MAC, VLAN ID, IP addresses, L4 ports, BOOTP xid);
+the IPv4 header and TCP/UDP checksums are fixed up incrementally (RFC 1624) instead of being recomputed.
+send_bulk() sends the rendered packets straight to the dataplane in bursts, optionally rate limited, and
+verify_bulk() matches the packets received for a burst in any order.
+
+    template = PacketTemplate(testutils.simple_tcp_packet(eth_dst=router_mac))
+    packets = template.render(eth_src=mac_range("00:01:00:00:00:00", 10000),
+                              ip_src=ip_range("192.168.0.2", 10000))
+    send_bulk(self, packets, ports=[1, 2, 3], pps=5000)
+
+Packets are sent with dataplane.send(), so the macsec send hook (macsec.py) is not applied to them.
+"""
+import ipaddress
+import itertools
+import logging
+import struct
+import time
+
+import ptf.packet as scapy
+import ptf.testutils as testutils
+from ptf.dataplane import match_exp_pkt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BURST = 64
+
+# field name: (layers it can be found in, offset in the layer, length)
+FIELDS = {
+    "eth_dst": ((scapy.Ether,), 0, 6),
+    "eth_src": ((scapy.Ether,), 6, 6),
+    "vlan_vid": ((scapy.Dot1Q,), 0, 2),
+    "ip_id": ((scapy.IP,), 4, 2),
+    "ip_src": ((scapy.IP, scapy.IPv6), None, None),
+    "ip_dst": ((scapy.IP, scapy.IPv6), None, None),
+    "sport": ((scapy.TCP, scapy.UDP), 0, 2),
+    "dport": ((scapy.TCP, scapy.UDP), 2, 2),
+    "bootp_xid": ((scapy.BOOTP,), 4, 4),
+}
+IP_ADDRESS_FIELDS = {
+    (scapy.IP, "ip_src"): (12, 4),
+    (scapy.IP, "ip_dst"): (16, 4),
+    (scapy.IPv6, "ip_src"): (8, 16),
+    (scapy.IPv6, "ip_dst"): (24, 16),
+}
+L4_CHECKSUM_OFFSET = {scapy.TCP: 16, scapy.UDP: 6}
+
+
+def mac_to_int(mac):
+    return int(mac.translate(str.maketrans("", "", ":.- ")), 16)
+
+
+def mac_range(start, count, step=1):
+    """MAC addresses (as integers) start, start + step, ..."""
+    start = mac_to_int(start) if isinstance(start, str) else start
+    return range(start, start + count * step, step)
+
+
+def ip_range(start, count, step=1):
+    """IPv4/IPv6 addresses (as integers) start, start + step, ..."""
+    start = int(ipaddress.ip_address(str(start)))
+    return range(start, start + count * step, step)
+
+
+def _to_bytes(value, length):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, int):
+        return value.to_bytes(length, "big")
+    if length == 6:
+        return mac_to_int(value).to_bytes(6, "big")
+    return ipaddress.ip_address(str(value)).packed
+
+
+def _word_sum(data):
+    """One's complement sum of the 16 bit words of data (even length)."""
+    total = sum(struct.unpack("!%dH" % (len(data) // 2), data))
+    while total >> 16:
+        total = (total & 0xffff) + (total >> 16)
+    return total
+
+
+class _Checksum(object):
+    """A checksum at 'offset' covering the template fields in 'covers'."""
+
+    def __init__(self, offset, covers, udp=False):
+        self.offset = offset
+        self.covers = covers
+        # A UDP checksum of 0 means no checksum, a computed 0 is sent as 0xffff
+        self.udp = udp
+
+
+class PacketTemplate(object):
+    """
+    Raw bytes of a packet and the location of the fields that render() can patch.
+
+    Supported fields: eth_dst, eth_src, vlan_vid (of the outer VLAN tag), ip_id, ip_src, ip_dst (of the outer
+    IPv4/IPv6 header), sport, dport (of the first TCP/UDP header) and bootp_xid. MAC addresses and IP addresses are
+    given as strings or integers, the other fields as integers.
+    """
+
+    def __init__(self, pkt):
+        self.raw = bytes(pkt)
+        self.fields = {}
+        self.checksums = []
+
+        layers = {}
+        for layer_type in (scapy.Ether, scapy.Dot1Q, scapy.IP, scapy.IPv6, scapy.TCP, scapy.UDP, scapy.BOOTP):
+            if pkt.haslayer(layer_type):
+                # The offset of a layer is what precedes its own serialization
+                layers[layer_type] = len(self.raw) - len(bytes(pkt[layer_type]))
+
+        def _outer(layer_types):
+            found = [layer_type for layer_type in layer_types if layer_type in layers]
+            return min(found, key=layers.get) if found else None
+
+        for name, (layer_types, offset, length) in FIELDS.items():
+            layer_type = _outer(layer_types)
+            if layer_type is None:
+                continue
+            if offset is None:
+                offset, length = IP_ADDRESS_FIELDS[(layer_type, name)]
+            self.fields[name] = (layers[layer_type] + offset, length)
+
+        ip_type = _outer((scapy.IP, scapy.IPv6))
+        if ip_type == scapy.IP:
+            self.checksums.append(_Checksum(layers[scapy.IP] + 10, ("ip_id", "ip_src", "ip_dst")))
+        l4_type = _outer((scapy.TCP, scapy.UDP))
+        if l4_type is not None:
+            offset = layers[l4_type] + L4_CHECKSUM_OFFSET[l4_type]
+            if l4_type == scapy.TCP or self.raw[offset:offset + 2] != b"\x00\x00":
+                covers = ["sport", "dport", "bootp_xid"]
+                underlayer = pkt[l4_type].underlayer
+                if ip_type is not None and type(underlayer) is ip_type and \
+                        len(self.raw) - len(bytes(underlayer)) == layers[ip_type]:
+                    # The pseudo header holds the addresses of the IP header right before the L4 header
+                    covers += ["ip_src", "ip_dst"]
+                self.checksums.append(_Checksum(offset, covers, udp=l4_type == scapy.UDP))
+
+    def render(self, count=None, **fields):
+        """
+        Returns the list of packet variants (bytes), see variants().
+        """
+        return list(self.variants(count, **fields))
+
+    def variants(self, count=None, **fields):
+        """
+        Generates packet variants.
+
+        Args:
+            count: number of variants, default: the length of the shortest sequence in 'fields'.
+            fields: field name -> value or sequence of values, sequences are consumed one value per variant.
+
+        Yields:
+            bytes of each variant.
+        """
+        for name in fields:
+            if name not in self.fields:
+                raise ValueError("Packet has no field '{}'".format(name))
+        sequences = {}
+        constants = {}
+        for name, value in fields.items():
+            if isinstance(value, (str, int, bytes)):
+                constants[name] = value
+            else:
+                sequences[name] = value
+        if count is None and not sequences:
+            count = 1
+
+        base = bytearray(self.raw)
+        for name, value in constants.items():
+            self._patch(base, name, value)
+        for checksum in self.checksums:
+            self._fix_checksum(base, checksum, constants)
+        base = bytes(base)
+
+        names = list(sequences)
+        offsets = [self.fields[name] for name in names]
+        vlan = [name == "vlan_vid" for name in names]
+        # For every checksum: its value before patching and the one's complement sum of the fields it covers
+        checksums = []
+        for checksum in self.checksums:
+            covered = [i for i, name in enumerate(names) if name in checksum.covers]
+            if not covered:
+                continue
+            old = struct.unpack_from("!H", base, checksum.offset)[0]
+            old_sum = (~old & 0xffff) + sum(~_word_sum(base[offsets[i][0]:offsets[i][0] + offsets[i][1]]) & 0xffff
+                                            for i in covered)
+            checksums.append((checksum.offset, covered, old_sum, checksum.udp))
+
+        values = zip(*[sequences[name] for name in names]) if names else itertools.repeat(())
+        if count is not None:
+            values = itertools.islice(values, count)
+        for row in values:
+            pkt = bytearray(base)
+            patched = []
+            for i, value in enumerate(row):
+                offset, length = offsets[i]
+                if vlan[i]:
+                    value = (base[offset] & 0xf0) << 8 | (value & 0x0fff)
+                data = _to_bytes(value, length)
+                pkt[offset:offset + length] = data
+                patched.append(data)
+            for offset, covered, old_sum, udp in checksums:
+                total = old_sum + sum(_word_sum(patched[i]) for i in covered)
+                while total >> 16:
+                    total = (total & 0xffff) + (total >> 16)
+                total = ~total & 0xffff
+                if udp and total == 0:
+                    total = 0xffff
+                pkt[offset:offset + 2] = struct.pack("!H", total)
+            yield bytes(pkt)
+
+    def _patch(self, buf, name, value):
+        offset, length = self.fields[name]
+        if name == "vlan_vid":
+            value = (buf[offset] & 0xf0) << 8 | (value & 0x0fff)
+        buf[offset:offset + length] = _to_bytes(value, length)
+
+    def _fix_checksum(self, buf, checksum, constants):
+        covered = [name for name in constants if name in checksum.covers]
+        if not covered:
+            return
+        old = struct.unpack_from("!H", buf, checksum.offset)[0]
+        total = ~old & 0xffff
+        for name in covered:
+            offset, length = self.fields[name]
+            total += ~_word_sum(self.raw[offset:offset + length]) & 0xffff
+            total += _word_sum(bytes(buf[offset:offset + length]))
+        while total >> 16:
+            total = (total & 0xffff) + (total >> 16)
+        total = ~total & 0xffff
+        if checksum.udp and total == 0:
+            total = 0xffff
+        buf[checksum.offset:checksum.offset + 2] = struct.pack("!H", total)
+
+
+def send_bulk(test, packets, ports, pps=None, burst=DEFAULT_BURST, duration=None):
+    """
+    Sends raw packets in bursts.
+
+    Args:
+        test: the PTF test.
+        packets: iterable of packets (bytes or scapy packets).
+        ports: a port, or a list of ports used round robin (one port per packet if it is as long as 'packets').
+        pps: packets per second, default: as fast as possible.
+        burst: packets sent back to back before the rate is checked.
+        duration: if set, the packets are sent repeatedly (they must be a sequence) until 'duration' seconds
+            elapsed.
+
+    Returns:
+        Number of packets sent.
+    """
+    if isinstance(ports, list):
+        targets = [testutils.port_to_tuple(port) for port in ports]
+    else:
+        targets = [testutils.port_to_tuple(ports)]
+    dataplane_send = test.dataplane.send
+    if duration is not None:
+        packets = [bytes(pkt) for pkt in packets]
+        if not packets:
+            return 0
+        stream = itertools.cycle(packets)
+    else:
+        stream = iter(packets)
+    ports_cycle = itertools.cycle(targets)
+
+    sent = 0
+    start = time.time()
+    end = start + duration if duration is not None else None
+    while True:
+        batch = list(itertools.islice(stream, burst))
+        for pkt in batch:
+            device, port = next(ports_cycle)
+            dataplane_send(device, port, pkt if isinstance(pkt, bytes) else bytes(pkt))
+        sent += len(batch)
+        now = time.time()
+        if len(batch) < burst or (end is not None and now >= end):
+            break
+        if pps:
+            delay = start + float(sent) / pps - now
+            if end is not None:
+                delay = min(delay, end - now)
+            if delay > 0:
+                time.sleep(delay)
+
+    elapsed = time.time() - start
+    logger.info("Sent {} packets in {:.3f}s ({:.0f} pps)".format(sent, elapsed, sent / elapsed if elapsed else 0))
+    return sent
+
+
+def verify_bulk(test, expected, ports, key, timeout=3):
+    """
+    Matches received packets against many expected packets, in any order.
+
+    testutils.verify_packet_any_port() polls for one expected packet and drops the packets received before it, so
+    the packets of a burst have to be verified by looking each received packet up by its key instead.
+
+    Args:
+        test: the PTF test.
+        expected: key -> expected packet (scapy packet or Mask).
+        ports: ports the packets are expected on.
+        key: function returning the key of a received packet (bytes), None for a packet that is not expected.
+        timeout: seconds to wait for the next expected packet.
+
+    Returns:
+        The keys of the packets that were not received.
+    """
+    pending = dict(expected)
+    ports = set(ports)
+    deadline = time.time() + timeout
+    while pending:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        result = testutils.dp_poll(test, device_number=0, timeout=remaining)
+        if not isinstance(result, test.dataplane.PollSuccess):
+            break
+        if result.port not in ports:
+            continue
+        pkt_key = key(result.packet)
+        if pkt_key in pending and match_exp_pkt(pending[pkt_key], result.packet):
+            del pending[pkt_key]
+            deadline = time.time() + timeout
+    return list(pending)
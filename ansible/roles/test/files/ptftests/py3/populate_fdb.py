@@ -6,10 +6,10 @@ import os
 
 # Packet Test Framework imports
 import ptf
-import ptf.packet as scapy
 import ptf.testutils as testutils
 from ptf import config
 from ptf.base_tests import BaseTest
+from packet_emitter import PacketTemplate, send_bulk
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +49,8 @@ class PopulateFdb(BaseTest):
         self.testParams = testutils.test_params_get()
         self.packetCount = self.testParams["packet_count"]
         self.startMac = self.testParams["start_mac"]
+        # Send rate, default: as fast as the PTF host can
+        self.pps = self.testParams.get("pps")
 
         self.configFile = self.testParams["config_data"]
         with open(self.configFile) as fp:
@@ -96,19 +98,6 @@ class PopulateFdb(BaseTest):
         mac_as_int = int(mac_without_delimiters, 16)
         return mac_as_int
 
-    def __convertMacToStr(self, mac):
-        """
-            Converts MAC address to string
-
-            Args:
-                mac (int): MAC Address
-
-            Returns:
-                mac (str): string representation of MAC address
-        """
-        mac = "{:012x}".format(mac)
-        return ":".join(mac[i: i + 2] for i in range(0, len(mac), 2))
-
     def __prepareVmIp(self):
         """
             Prepares VM IP addresses
@@ -162,23 +151,27 @@ class PopulateFdb(BaseTest):
         vmIp = self.__prepareVmIp()
         macInt = self.__convertMacToInt(self.startMac)
         numMac = numIp = 0
+        macs, ips, dstIps = [], [], []
         for i in range(self.packetCount):
             port = i % len(self.configData["vlan_ports"])
             vlan = self.configData["vlan_ports"][port]["vlan"]
 
             if i % self.macToIpRatio[1] == 0:
-                mac = self.__convertMacToStr(macInt + i)
+                mac = macInt + i
                 numMac += 1
             if i % self.macToIpRatio[0] == 0:
                 vmIp[vlan] = ipaddress.ip_address(
                     six.text_type(vmIp[vlan])) + 1
                 numIp += 1
 
-            packet[scapy.Ether].src = mac
-            packet[scapy.IP].src = str(vmIp[vlan])
-            packet[scapy.IP].dst = self.configData["vlan_interfaces"][vlan]["addr"]
-            testutils.send(
-                self, self.configData["vlan_ports"][port]["index"], packet)
+            macs.append(mac)
+            ips.append(int(vmIp[vlan]))
+            dstIps.append(self.configData["vlan_interfaces"][vlan]["addr"])
+
+        packets = PacketTemplate(packet).variants(eth_src=macs, ip_src=ips, ip_dst=dstIps)
+        # Packet i goes out of VLAN port i % len(vlan_ports)
+        ports = [vlanPort["index"] for vlanPort in self.configData["vlan_ports"]]
+        send_bulk(self, packets, ports, pps=self.pps)
 
         logger.info(
             "Generated {0} packets with distinct {1} MAC addresses and {2} IP addresses".format(
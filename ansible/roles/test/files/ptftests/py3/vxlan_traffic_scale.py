@@ -7,10 +7,9 @@ import ptf.packet as scapy
 from ptf.testutils import (
     simple_tcp_packet,
     simple_vxlan_packet,
-    verify_packet_any_port,
-    send_packet,
     test_params_get,
 )
+from packet_emitter import PacketTemplate, send_bulk, verify_bulk
 
 
 class VXLANScaleTest(BaseTest):
@@ -59,6 +58,9 @@ class VXLANScaleTest(BaseTest):
         self.tcp_dport = 5000
         self.vxlan_port = self.test_params['vxlan_port']
         self.udp_sport = 49366
+        # Packets sent back to back before their encapsulated copies are verified, must fit in the PTF queue
+        self.window = int(self.test_params.get("window", 256))
+        self.pps = self.test_params.get("pps")
 
         self.logger = logging.getLogger("VXLANScaleTest")
         self.logger.setLevel(logging.INFO)
@@ -107,46 +109,65 @@ class VXLANScaleTest(BaseTest):
         m.set_do_not_care_scapy(scapy.UDP, "sport")
         return m
 
-    def _build_packets_for_test(self, ingress_port, dst_ip, src_ip, programmed_mac, vni, endpoint):
+    def _build_expected(self, inner_pkt, programmed_mac, vni, endpoint):
         """
-        Returns: (inner_packet, masked_expected_encap)
+        Returns the masked expected encapsulated packet for an inner packet (bytes).
         """
-
-        src_mac = self.dataplane.get_mac(0, ingress_port)
-
-        # Base inner packet
-        inner = simple_tcp_packet(
+        # Expected inner after DUT rewrite
+        inner_exp = scapy.Ether(inner_pkt)
+        inner_exp[scapy.Ether].src = self.router_mac
+        inner_exp[scapy.Ether].dst = programmed_mac
+        inner_exp[scapy.IP].ttl = 63
+        del inner_exp[scapy.IP].chksum
+
+        return self.build_masked_encap(inner_exp, vni, endpoint)
+
+    @staticmethod
+    def _inner_key(pkt):
+        """Inner destination IP and TCP ports of an encapsulated packet."""
+        pkt = scapy.Ether(pkt)
+        if not pkt.haslayer(scapy.VXLAN):
+            return None
+        inner = pkt[scapy.VXLAN].payload
+        if not inner.haslayer(scapy.TCP):
+            return None
+        return inner[scapy.IP].dst, inner[scapy.TCP].sport, inner[scapy.TCP].dport
+
+    def _send_and_verify(self, vnet_name, ingress_port, src_ip, samples, failures, log_prefix):
+        """
+        Sends one packet per sample (dst_ip, programmed_mac, vni, endpoint) and verifies that each is
+        encapsulated. Packets are rendered from one template and sent in windows of self.window packets,
+        the encapsulated packets of a window are matched in any order.
+        """
+        if not samples:
+            return
+        template = PacketTemplate(simple_tcp_packet(
             eth_dst=self.router_mac,
-            eth_src=src_mac,
-            ip_dst=dst_ip,
+            eth_src=self.dataplane.get_mac(0, ingress_port),
+            ip_dst=samples[0][0],
             ip_src=src_ip,
             ip_id=105,
             ip_ttl=64,
-            tcp_sport=self._next_port("sport"),
-            tcp_dport=self._next_port("dport"),
             pktlen=100,
-        )
-
-        # Expected inner after DUT rewrite
-        inner_exp = inner.copy()
-        inner_exp[scapy.Ether].src = self.router_mac
-        inner_exp[scapy.Ether].dst = programmed_mac
-        inner_exp[scapy.IP].ttl = 63
-
-        # Masked expected encap
-        masked = self.build_masked_encap(inner_exp, vni, endpoint)
-        return inner, masked
-
-    def _send_and_verify(self, vnet_name, ingress_port, inner_pkt, exp_pkt, failures, log_prefix):
-        try:
-            send_packet(self, ingress_port, inner_pkt)
-            verify_packet_any_port(self, exp_pkt, self.egress_ptf_if, timeout=3)
-            self.logger.info(f"[{log_prefix}] {vnet_name} PASSED")
-        except Exception as e:
-            failures[vnet_name] += 1
-            self.logger.error(
-                f"[{log_prefix} FAIL] {vnet_name}: ingress={ingress_port}, error={repr(e)}"
-            )
+        ))
+        for start in range(0, len(samples), self.window):
+            window = samples[start:start + self.window]
+            sports = [self._next_port("sport") for _ in window]
+            dports = [self._next_port("dport") for _ in window]
+            packets = template.render(ip_dst=[sample[0] for sample in window], sport=sports, dport=dports)
+            expected = {}
+            for pkt, (dst_ip, mac, vni, endpoint), sport, dport in zip(packets, window, sports, dports):
+                expected[(dst_ip, sport, dport)] = self._build_expected(pkt, mac, vni, endpoint)
+
+            send_bulk(self, packets, ingress_port, pps=self.pps)
+            missing = verify_bulk(self, expected, self.egress_ptf_if, self._inner_key, timeout=3)
+            failures[vnet_name] += len(missing)
+            self.logger.info(f"[{log_prefix}] {vnet_name}: {len(window) - len(missing)}/{len(window)} PASSED")
+            for dst_ip, sport, dport in missing:
+                self.logger.error(
+                    f"[{log_prefix} FAIL] {vnet_name}: ingress={ingress_port}, dst={dst_ip}, "
+                    f"sport={sport}, dport={dport}: no encapsulated packet"
+                )
 
     def run_mac_vni_per_vnet_test(self):
         self.logger.info("=== Running deterministic MAC+VNI validation ===")
@@ -157,20 +178,13 @@ class VXLANScaleTest(BaseTest):
             vnet_id = mapping["vnet_id"]
             ingress = int(mapping["ptf_ifindex"])
 
+            src_ip = f"201.0.{vnet_id}.101"
+            samples = []
             for idx in range(self.samples_per_vnet):
-                dst_ip = self.routes_to_test[vnet_name][idx]["route"]
-                src_ip = f"201.0.{vnet_id}.101"
+                route = self.routes_to_test[vnet_name][idx]
+                samples.append((route["route"], route["mac_address"], route["vni"], route["endpoint"]))
 
-                mac = self.routes_to_test[vnet_name][idx]["mac_address"]
-                vni = self.routes_to_test[vnet_name][idx]["vni"]
-                endpoint = self.routes_to_test[vnet_name][idx]["endpoint"]
-
-                inner, exp = self._build_packets_for_test(
-                    ingress, dst_ip, src_ip, mac, vni, endpoint
-                )
-
-                self._send_and_verify(vnet_name, ingress, inner, exp,
-                                      failures, "MAC+VNI")
+            self._send_and_verify(vnet_name, ingress, src_ip, samples, failures, "MAC+VNI")
 
         # Summary
         total = sum(failures.values())
@@ -196,18 +210,13 @@ class VXLANScaleTest(BaseTest):
                 f"DUT intf={dut_intf_name}, VNI={vni}"
             )
 
+            ip_src = f"201.0.{vnet_id}.101"
+            samples = []
             for i in range(self.samples_per_vnet):
-                dst_ip = self.routes_to_test[vnet_name][i]["route"]
-                ip_src = f"201.0.{vnet_id}.101"
-
-                endpoint = self.routes_to_test[vnet_name][i]["endpoint"]
-
-                inner, masked = self._build_packets_for_test(
-                    ingress_port, dst_ip, ip_src, self.mac_switch, vni, endpoint
-                )
+                route = self.routes_to_test[vnet_name][i]
+                samples.append((route["route"], self.mac_switch, vni, route["endpoint"]))
 
-                self._send_and_verify(vnet_name, ingress_port, inner, masked,
-                                      failures, "SCALE")
+            self._send_and_verify(vnet_name, ingress_port, ip_src, samples, failures, "SCALE")
 
         # ---- Summary ----
         self.logger.info("---- VXLAN Scale Test Failure Summary ----")
@@ -29,6 +29,7 @@ import re
 import os
 import os.path
 import csv
+import json
 import time
 import logging
 import logging.handlers
@@ -40,6 +41,9 @@ from datetime import datetime
 tokenizer = ','
 comment_key = '#'
 system_log_file = '/var/log/syslog'
+# Offsets of placed markers, read by the extract_log module to seek to the start marker
+marker_index_file = '/tmp/extract_log_markers.json'
+max_indexed_markers = 100
 
 # -- List of ERROR codes to be returned by AnsibleLogAnalyzer
 err_duplicate_start_marker = -1
@@ -167,6 +171,33 @@ class AnsibleLogAnalyzer:
         os.system("sudo systemctl reload rsyslog 2>/dev/null || true")
         time.sleep(0.5)
 
+    def record_marker_offset(self, log_file, marker):
+        '''
+        @summary: Record the current size of a log file in marker_index_file, keyed by inode.
+                  A marker appended now starts at or after this offset, so extract_log can
+                  seek there instead of searching the whole file, also after the file was rotated.
+        @param log_file : File path the marker is about to be written to.
+        @param marker:    Marker to be placed into the log file.
+        '''
+        try:
+            stat = os.stat(log_file)
+            try:
+                with open(marker_index_file) as f:
+                    index = json.load(f)
+            except (IOError, OSError, ValueError):
+                index = {}
+            index.setdefault(marker, {})[str(stat.st_ino)] = stat.st_size
+            index['_order'] = [m for m in index.get('_order', []) if m != marker] + [marker]
+            for old_marker in index['_order'][:-max_indexed_markers]:
+                index.pop(old_marker, None)
+            index['_order'] = index['_order'][-max_indexed_markers:]
+            tmp_file = '{}.{}'.format(marker_index_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(index, f)
+            os.rename(tmp_file, marker_index_file)
+        except (IOError, OSError) as e:
+            self.print_diagnostic_message('Failed to record marker offset of {}: {}'.format(log_file, e))
+
     def place_marker_to_file(self, log_file, marker):
         '''
         @summary: Place marker into each log file specified.
@@ -178,6 +209,7 @@ class AnsibleLogAnalyzer:
                 'Log file {} not found. Skip adding marker.'.format(log_file))
         self.print_diagnostic_message(
             'log file:{}, place marker {}'.format(log_file, marker))
+        self.record_marker_offset(log_file, marker)
         with open(log_file, 'a') as file:
             file.write(datetime.now().strftime("%b %d %H:%M:%S.%f") + ' ')
             file.write(marker)
@@ -199,6 +231,7 @@ class AnsibleLogAnalyzer:
         # Flush any previously buffered messages first, so the reload
         # does not interfere with the marker we are about to write.
         self.flush_rsyslogd()
+        self.record_marker_offset(system_log_file, marker)
 
         syslogger = self.init_sys_logger()
         syslogger.info(marker)
@@ -80,6 +80,8 @@ defaults = {
     "SPYTEST_SYSTEM_NREADY_RECOVERY_METHODS": "normal",
     "SPYTEST_DETECT_CONCURRENT_ACCESS": "1",
     "SPYTEST_SYSLOG_ANALYSIS": "1",
+    # 0: disabled, dut: trace track per DUT, thread: trace track per thread
+    "SPYTEST_PROFILE_TRACE": "0",
     "SPYTEST_USE_NO_MORE": "0",
     "SPYTEST_PRESERVE_GNMI_CERT": "1",
     "SPYTEST_CMD_FAIL_RESULT_SUPPORT": "1",
@@ -109,6 +111,7 @@ dev_defaults = {
     "SPYTEST_BATCH_RERUN": None,
     "SPYTEST_TESTBED_FILE": "testbed.yaml",
     "SPYTEST_FILE_MODE": "0",
+    "SPYTEST_GNMI_NATIVE": "0",
     "SPYTEST_SCHEDULING": None,
     "SPYTEST_BATCH_RUN": None,
     "PYTEST_XDIST_WORKER": None,
@@ -121,6 +124,11 @@ dev_defaults = {
     "SPYTEST_TESTBED_INCLUDE_DEVICES": None,
     "SPYTEST_LOGS_PATH": None,
     "SPYTEST_LOGS_LEVEL": "info",
+    "SPYTEST_LOGS_ASYNC": "0",
+    "SPYTEST_LOGS_ASYNC_BATCH": "256",
+    "SPYTEST_LOGS_ASYNC_INTERVAL": "0.5",
+    "SPYTEST_LOGS_ROTATE_SIZE_MB": "0",
+    "SPYTEST_LOGS_ROTATE_COMPRESS": "1",
     "SPYTEST_APPLY_BASE_CONFIG_AFTER_MODULE": "0",
     "SPYTEST_COMMUNITY_BUILD_FEATURES": "0",
     "SPYTEST_SYSTEM_READY_AFTER_PORT_SETTINGS": "0",
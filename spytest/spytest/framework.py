@@ -52,6 +52,7 @@ from spytest import env
 from spytest import syslog
 from spytest import generate
 from spytest import item_utils
+from spytest import profile
 
 root_path = os.path.join(os.path.dirname(__file__), '..')
 root_path = os.path.abspath(root_path)
@@ -933,6 +934,7 @@ class WorkArea(object):
 
         self.base_config_verified = False
         self.module_tc_fails = 0
+        self.module_profile_stats = []
         self.module_get_tech_support = False
         self.module_fetch_core_files = False
         self.module_tscount = {}
@@ -2547,6 +2549,7 @@ class WorkArea(object):
         self.min_topo_called = False
         self.module_tc_executed = 0
         self.module_tc_fails = 0
+        self.module_profile_stats = []
         self.module_get_tech_support = False
         self.module_fetch_core_files = False
         self.abort_module_msg = None
@@ -2603,6 +2606,7 @@ class WorkArea(object):
     def _post_module_prolog(self, name, res, desc):
         self.debug_check_min_topology_abort()
         self._trace_missing_parallel_operations(name)
+        self._collect_profile_stats(name)
         if not batch.is_infra_test(name):
             self.fetch_support(None, "post-module-prolog", res, desc, name)
         if self.cfg.skip_load_config not in ["base"]:
@@ -2809,6 +2813,7 @@ class WorkArea(object):
         if not batch.is_infra_test(filepath):
             self._save_msysinfo(nodeid)
             self._module_save_coverage()
+            self._module_save_profile(nodeid, filepath)
 
         # update the node report files for every module
         # if we are not reporting run progress
@@ -3168,12 +3173,42 @@ class WorkArea(object):
                 ftrace(start_time, msg, dut1, dut2)
             utils.banner(None, func=ftrace)
 
+    def _collect_profile_stats(self, name):
+        if env.get("SPYTEST_PROFILE_TRACE", "0") != "0":
+            self.module_profile_stats.append([name, self._context.net.get_stats()])
+
+    def _module_save_profile(self, nodeid, filepath):
+        if env.get("SPYTEST_PROFILE_TRACE", "0") == "0":
+            return
+
+        # the module cleanup is recorded after the last test case
+        self._collect_profile_stats("{} cleanup".format(filepath))
+        self._context.net.tc_start()
+
+        track_by = "thread" if env.get("SPYTEST_PROFILE_TRACE") == "thread" else "dut"
+        events = []
+        for name, stats in self.module_profile_stats:
+            events.extend(profile.get_trace_events(stats, name, 1, track_by))
+        logs_path = _get_logs_path()[1]
+        trace_path = paths.get_mtrace_path(nodeid, logs_path)
+        profile.write_trace(trace_path, events, {1: filepath})
+
+        stats_list = [stats for _, stats in self.module_profile_stats]
+        lines = profile.get_hotspots_report(profile.get_hotspots(stats_list))
+        utils.write_file(paths.get_mhotspots_path(nodeid, logs_path), "\n".join(lines) + "\n")
+        utils.banner("profile hot spots: {}".format(filepath), func=ftrace)
+        for line in lines:
+            ftrace(line)
+        utils.banner(None, func=ftrace)
+        self.module_profile_stats = []
+
     def _test_log_finish(self, nodeid, func_name, res, desc, time_taken):
 
         if isinstance(time_taken, int):
             time_taken = utils.time_format(time_taken)
 
         self._trace_missing_parallel_operations(nodeid)
+        self._collect_profile_stats(nodeid)
 
         # Construct the final result log message to print in all log files.
         msg = "Report({}):{} {} {}".format(res, nodeid, time_taken, desc)
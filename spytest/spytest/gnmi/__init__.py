@@ -4,7 +4,9 @@ import traceback
 import json
 import pprint
 
+from spytest import env
 from spytest.dicts import SpyTestDict
+from spytest.gnmi import client as native_client
 from spytest.gnmi.wrapper import _gnmi_get, _gnmi_set, gnmiCreateJsonFile, gnmiCreateProtoFile
 
 
@@ -18,10 +20,12 @@ class gNMI(object):
         self.timeout = 10
         self.ip = None
         self.inSecure = True
+        self.native = False
+        self.client = None
 
     def configure(self, ip=None, port=8080, targetName=None, username='admin',
                   password=None, ca=None, cert=None, inSecure=True, noTls=False,
-                  timeout=10, params=None):
+                  timeout=10, params=None, native=None):
         self.target_name = targetName
         self.username = username
         self.password = password
@@ -32,6 +36,10 @@ class gNMI(object):
         self.timeout = timeout
         self.defTimeout = timeout
         self.params = params
+        if native is None:
+            native = env.get("SPYTEST_GNMI_NATIVE", "0") != "0"
+        self.native = native
+        self.client = None
 
         if ip:
             self.reinit(ip, port=port)
@@ -41,8 +49,25 @@ class gNMI(object):
         self.ip = ip.decode('utf-8') if isinstance(ip, bytes) else str(ip)
         self.port = int(port)
         self.target_addr = "{}:{}".format(self.ip, self.port)
+        self.client = None
         return self
 
+    def _get_client(self):
+        if self.client is None:
+            self.client = native_client.gNMIClient(self.ip, port=self.port, username=self.username,
+                                                   password=self.password, inSecure=self.inSecure,
+                                                   noTls=self.noTls, ca=self.ca, timeout=self.defTimeout)
+        return self.client
+
+    def _native(self, params='', encoding=None):
+        """In-process client to use for this request, None to run the gnmi_get/gnmi_set binaries."""
+        if not self.native or params or not self.ip or not native_client.is_supported(encoding):
+            return None
+        if self.cert:
+            # Only the binaries take a client certificate without its key (-cert)
+            return None
+        return self._get_client()
+
     def _compose_params(self, action, path, *args):
         param = [action, path]
         if self.target_addr:
@@ -95,6 +120,24 @@ class gNMI(object):
         self._log(json.dumps(resp))
         return resp
 
+    def _rekey_output(self, ret_val, attr):
+        """Reduces the output of a GET whose path was changed by SanitizePathPayload to {"<module>:<attr>": value}."""
+        if "return" not in ret_val:
+            return
+        output = json.loads(ret_val["return"])
+        self._log("GNMI [GET] original : {}".format(output))
+
+        if output:
+            new_key = list(output.keys())[0]
+            output = output[new_key]
+            ret_val["return"] = {}
+            if attr in output:
+                if ":" in attr:
+                    new_key = attr
+                else:
+                    new_key = new_key.split(":")[0] + ":" + attr
+                ret_val["return"] = {new_key: output[attr]}
+
     def get(self, path, params='', encoding=None):
         from apis.gnmi.gnmi_utils import SanitizePathPayload
         path_change = False
@@ -105,6 +148,16 @@ class gNMI(object):
                 path_change = True
                 self._warn("GNMI GET with Encoding Path/Data changed:\n... From path='{}'\n...   To path='{}'".format(path, new_path))
             path = new_path
+        client = self._native(params, encoding)
+        if client:
+            self._log("GNMI [GET]: {}".format(path))
+            if os.getenv("SPYTEST_FILE_MODE", "0") != "0":
+                return self._result('GET', path, {"ok": False})
+            ret_val = client.get(path, encoding=encoding, timeout=self.timeout)
+            if path_change:
+                self._rekey_output(ret_val, attr)
+            return self._result('GET', path, ret_val)
+
         param = self._compose_params('-xpath', path, "-alsologtostderr")
         if params:
             param.extend(params.split())
@@ -112,20 +165,8 @@ class gNMI(object):
         try:
             ret_val = _gnmi_get(param, display=False, encoding=encoding)
 
-            if path_change and "return" in ret_val:
-                output = json.loads(ret_val["return"])
-                self._log("GNMI [GET] original : {}".format(output))
-
-                if output:
-                    new_key = list(output.keys())[0]
-                    output = output[new_key]
-                    ret_val["return"] = {}
-                    if attr in output:
-                        if ":" in attr:
-                            new_key = attr
-                        else:
-                            new_key = new_key.split(":")[0] + ":" + attr
-                        ret_val["return"] = {new_key: output[attr]}
+            if path_change:
+                self._rekey_output(ret_val, attr)
 
             return self._result('GET', path, ret_val)
         except Exception as e:
@@ -134,6 +175,16 @@ class gNMI(object):
             raise e
 
     def _set(self, path, action, params='', data={}, encoding=None):
+        client = self._native(params, encoding)
+        if client:
+            self._log("GNMI [{}]: {}".format(action.upper(), path))
+            if data:
+                self._log("data:\n{}".format(pprint.pformat(data)))
+            if os.getenv("SPYTEST_FILE_MODE", "0") != "0":
+                return self._result(action.upper(), path, {"ok": False}, data)
+            ret_val = client.set(action, path, data=data, timeout=self.timeout)
+            return self._result(action.upper(), path, ret_val, data)
+
         data_path = None
         if data and len(data):
             if encoding == 'ANY' and action.lower() not in ['delete']:
@@ -173,6 +224,20 @@ class gNMI(object):
     def delete(self, path, params='', data={}, encoding=None):
         return self._set(path, 'delete', params=params, data=data, encoding=encoding)
 
+    def subscribe(self, path, mode='ONCE', stream_mode='SAMPLE', sample_interval=10, count=None, timeout=None):
+        """
+        Subscribe to one or more paths with the in-process client, output is the list of notifications.
+        Always uses the in-process client, as there is no subscribe binary.
+        """
+        paths = [path] if isinstance(path, str) else path
+        self._log("GNMI [SUBSCRIBE {}]: {}".format(mode, paths))
+        if not native_client.is_supported() or not self.ip:
+            return self._result('SUBSCRIBE', path, {"ok": False, "message": "gNMI subscribe is not supported"})
+        ret_val = self._get_client().subscribe(paths, mode=mode, stream_mode=stream_mode,
+                                        sample_interval=sample_interval, count=count,
+                                        timeout=timeout or self.timeout)
+        return self._result('SUBSCRIBE', path, ret_val)
+
     def send(self, path, action='', params='', data=None, encoding=None, timeout=None):
         self.timeout = timeout if timeout else self.defTimeout
         if action.lower() in ['create', 'update', 'replace', 'delete']:
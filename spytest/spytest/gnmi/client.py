@@ -0,0 +1,285 @@
+"""
+In-process gNMI client.
+
+The gnmi_get/gnmi_set binaries used by wrapper.py cost a process start, a TLS handshake and
+a temporary file per operation. This client keeps one gRPC channel per target for the whole
+run and returns the same dictionaries as _gnmi_get/_gnmi_set:
+
+    GET:       {"ok": True, "return": "<json string>"}
+    SET:       {"ok": True, "return": "", "operation": "REPLACE"}
+    SUBSCRIBE: {"ok": True, "return": "<json list of notifications>"}
+    failure:   {"ok": False, "errorCode": <grpc status code>, "message": "<details>"}
+
+The generated gNMI protobuf modules are looked up in pygnmi and in the sonic-mgmt SAI
+validation stubs (tests/build-gnmi-stubs.sh); is_supported() is False when neither is
+available, and callers fall back to the gnmi_get/gnmi_set binaries.
+"""
+
+import json
+import re
+import ssl
+import threading
+import time
+
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+STUB_MODULES = [
+    ("pygnmi.spec.v080.gnmi_pb2", "pygnmi.spec.v080.gnmi_pb2_grpc"),
+    ("tests.common.sai_validation.generated.github.com.openconfig.gnmi.proto.gnmi.gnmi_pb2",
+     "tests.common.sai_validation.generated.github.com.openconfig.gnmi.proto.gnmi.gnmi_pb2_grpc"),
+]
+
+# encodings the client can decode, others are left to the binaries
+NATIVE_ENCODINGS = [None, "JSON", "JSON_IETF"]
+
+_pb2, _pb2_grpc = None, None
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def _load_stubs():
+    global _pb2, _pb2_grpc
+    if _pb2 is None:
+        import importlib
+        for pb2_name, pb2_grpc_name in STUB_MODULES:
+            try:
+                _pb2 = importlib.import_module(pb2_name)
+                _pb2_grpc = importlib.import_module(pb2_grpc_name)
+                break
+            except ImportError:
+                _pb2, _pb2_grpc = None, None
+    return _pb2
+
+
+def is_supported(encoding=None):
+    if grpc is None or encoding not in NATIVE_ENCODINGS:
+        return False
+    return _load_stubs() is not None
+
+
+def parse_path(xpath, origin=None):
+    """
+    Convert an xpath like /openconfig-interfaces:interfaces/interface[name=Ethernet0]/config/
+    to a gNMI Path. Key values may contain '/' and escaped ']' (as in [name=a\\]b]).
+    """
+    elems = []
+    for part in re.findall(r"(?:[^/\[]|\[(?:[^\]\\]|\\.)*\])+", xpath):
+        name = part.split("[", 1)[0]
+        keys = {}
+        for key, value in re.findall(r"\[([^=\]]+)=((?:[^\]\\]|\\.)*)\]", part):
+            keys[key] = re.sub(r"\\(.)", r"\1", value)
+        elems.append(_pb2.PathElem(name=name, key=keys))
+    if origin:
+        return _pb2.Path(elem=elems, origin=origin)
+    return _pb2.Path(elem=elems)
+
+
+def format_path(path):
+    parts = []
+    for elem in path.elem:
+        keys = "".join("[{}={}]".format(k, v) for k, v in sorted(elem.key.items()))
+        parts.append(elem.name + keys)
+    return "/" + "/".join(parts)
+
+
+def _decode_value(typed_value):
+    kind = typed_value.WhichOneof("value")
+    if kind in ("json_ietf_val", "json_val"):
+        raw = getattr(typed_value, kind)
+        return json.loads(raw) if raw else {}
+    if kind is None:
+        return None
+    value = getattr(typed_value, kind)
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _server_certificate(host, port, timeout):
+    """Fetch the server certificate so that an -insecure connection can trust it as is."""
+    pem = ssl.get_server_certificate((host, port), timeout=timeout)
+    target_name = None
+    try:
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
+        cert = x509.load_pem_x509_certificate(pem.encode())
+        try:
+            san = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+            names = san.value.get_values_for_type(x509.DNSName)
+            target_name = names[0] if names else None
+        except x509.ExtensionNotFound:
+            pass
+        if not target_name:
+            cn = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+            target_name = cn[0].value if cn else None
+    except ImportError:
+        pass
+    return pem.encode(), target_name
+
+
+def get_channel(ip, port, inSecure=True, noTls=False, ca=None, cert=None, key=None, timeout=10):
+    """Return the persistent channel for a target, creating it on first use."""
+    cache_key = (ip, int(port), inSecure, noTls, ca, cert, key)
+    with _channels_lock:
+        channel = _channels.get(cache_key)
+        if channel is not None:
+            return channel
+
+        target = "{}:{}".format(ip, port)
+        options = [("grpc.max_receive_message_length", 64 * 1024 * 1024),
+                   ("grpc.keepalive_time_ms", 30000)]
+        if noTls:
+            channel = grpc.insecure_channel(target, options=options)
+        else:
+            root_cert, cert_chain, private_key = None, None, None
+            if ca:
+                with open(ca, "rb") as fh:
+                    root_cert = fh.read()
+            elif inSecure:
+                root_cert, target_name = _server_certificate(ip, int(port), timeout)
+                if target_name:
+                    options.append(("grpc.ssl_target_name_override", target_name))
+            if cert and key:
+                with open(cert, "rb") as fh:
+                    cert_chain = fh.read()
+                with open(key, "rb") as fh:
+                    private_key = fh.read()
+            creds = grpc.ssl_channel_credentials(root_certificates=root_cert, private_key=private_key,
+                                                 certificate_chain=cert_chain)
+            channel = grpc.secure_channel(target, creds, options=options)
+        _channels[cache_key] = channel
+        return channel
+
+
+def close_channels():
+    with _channels_lock:
+        for channel in _channels.values():
+            channel.close()
+        _channels.clear()
+
+
+class gNMIClient(object):
+    """
+    gNMI Get/Set/Subscribe over a persistent channel.
+    """
+
+    def __init__(self, ip, port=8080, username=None, password=None, inSecure=True, noTls=False,
+                 ca=None, cert=None, key=None, timeout=10):
+        if not is_supported():
+            raise ImportError("grpc or gNMI protobuf modules are not available")
+        self.ip = ip
+        self.port = int(port)
+        self.inSecure = inSecure
+        self.noTls = noTls
+        self.ca = ca
+        self.cert = cert
+        self.key = key
+        self.timeout = timeout
+        self.metadata = []
+        if username:
+            self.metadata.append(("username", username))
+        if password:
+            self.metadata.append(("password", password))
+
+    def _stub(self):
+        channel = get_channel(self.ip, self.port, inSecure=self.inSecure, noTls=self.noTls,
+                              ca=self.ca, cert=self.cert, key=self.key, timeout=self.timeout)
+        return _pb2_grpc.gNMIStub(channel)
+
+    def _error(self, exp):
+        if isinstance(exp, grpc.RpcError):
+            code = exp.code()
+            return {"ok": False, "errorCode": code.value[0] if code else -1,
+                    "message": "failed: {}".format(exp.details())}
+        return {"ok": False, "errorCode": -1, "message": "failed: {}".format(exp)}
+
+    def get(self, xpath, encoding=None, timeout=None):
+        encoding = _pb2.Encoding.Value(encoding or "JSON_IETF")
+        request = _pb2.GetRequest(path=[parse_path(xpath)], encoding=encoding)
+        try:
+            response = self._stub().Get(request, metadata=self.metadata, timeout=timeout or self.timeout)
+        except Exception as exp:
+            return self._error(exp)
+
+        js = {}
+        for notification in response.notification:
+            for update in notification.update:
+                value = _decode_value(update.val)
+                if isinstance(value, dict):
+                    js.update(value)
+                elif value is not None:
+                    js[format_path(update.path).split("/")[-1]] = value
+        return {"ok": True, "return": json.dumps(js, ensure_ascii=False)}
+
+    def set(self, action, xpath, data=None, timeout=None):
+        action = action.lower()
+        path = parse_path(xpath)
+        request = _pb2.SetRequest()
+        if action == "delete":
+            request.delete.append(path)
+        else:
+            update = _pb2.Update(path=path, val=_pb2.TypedValue(
+                json_ietf_val=json.dumps(data or {}, ensure_ascii=False).encode()))
+            if action == "replace":
+                request.replace.append(update)
+            else:
+                # create and update both map to gNMI update
+                request.update.append(update)
+        try:
+            response = self._stub().Set(request, metadata=self.metadata, timeout=timeout or self.timeout)
+        except Exception as exp:
+            return self._error(exp)
+
+        ops = [_pb2.UpdateResult.Operation.Name(result.op) for result in response.response]
+        return {"ok": True, "return": "", "operation": ops[0] if ops else ""}
+
+    def subscribe(self, xpaths, mode="ONCE", stream_mode="SAMPLE", sample_interval=10,
+                  count=None, timeout=None):
+        """
+        Subscribe to one or more xpaths.
+
+        ONCE returns the initial notifications. STREAM collects notifications until
+        'count' updates arrived or 'timeout' seconds elapsed. POLL is sent as ONCE.
+        Each notification is {"timestamp", "path", "val"} or {"sync_response": True}.
+        """
+        if isinstance(xpaths, str):
+            xpaths = [xpaths]
+        timeout = timeout or self.timeout
+        subscriptions = [_pb2.Subscription(path=parse_path(xpath),
+                                           mode=_pb2.SubscriptionMode.Value(stream_mode),
+                                           sample_interval=int(sample_interval * 1e9))
+                         for xpath in xpaths]
+        sub_list = _pb2.SubscriptionList(
+            subscription=subscriptions, encoding=_pb2.Encoding.Value("JSON_IETF"),
+            mode=_pb2.SubscriptionList.Mode.Value("ONCE" if mode == "POLL" else mode))
+
+        def _requests():
+            yield _pb2.SubscribeRequest(subscribe=sub_list)
+
+        notifications = []
+        deadline = time.time() + timeout
+        updates = 0
+        call = self._stub().Subscribe(_requests(), metadata=self.metadata, timeout=timeout)
+        try:
+            for response in call:
+                if response.HasField("sync_response"):
+                    notifications.append({"sync_response": True})
+                    if mode != "STREAM":
+                        break
+                    continue
+                notification = response.update
+                prefix = format_path(notification.prefix) if notification.prefix.elem else ""
+                for update in notification.update:
+                    notifications.append({"timestamp": notification.timestamp,
+                                          "path": prefix + format_path(update.path),
+                                          "val": _decode_value(update.val)})
+                    updates += 1
+                if (count and updates >= count) or time.time() >= deadline:
+                    break
+        except grpc.RpcError as exp:
+            if exp.code() != grpc.StatusCode.DEADLINE_EXCEEDED:
+                return self._error(exp)
+        finally:
+            call.cancel()
+        return {"ok": True, "return": json.dumps(notifications, ensure_ascii=False)}
@@ -4,6 +4,15 @@ import traceback
 import os
 import time
 import datetime
+import gzip
+import shutil
+import atexit
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 from spytest.st_time import get_timestamp
 from spytest import env
@@ -71,6 +80,152 @@ class LogFormatter(object):
         return self.bld(record.getMessage(), record.levelname, ts=record.created)
 
 
+class AsyncLogWriter(object):
+    """
+    Single writer thread for the log files of AsyncFileHandler.
+
+    Records are formatted by the logging thread and queued here; the writer
+    takes up to 'batch' queued records at a time, buffers them per file and
+    writes each file at most every 'interval' seconds. There is one queue,
+    so records reach every file in the order they were logged.
+    """
+
+    def __init__(self, batch=256, interval=0.5):
+        self.batch = batch
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.dirty = []
+        self.thread = threading.Thread(target=self._run, name="log-writer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def write(self, handler, text):
+        self.queue.put((handler, text))
+
+    def flush(self, timeout=60):
+        """wait until everything logged so far is written to the files"""
+        if threading.current_thread() is self.thread:
+            return
+        done = threading.Event()
+        self.queue.put((None, done))
+        done.wait(timeout)
+
+    def _write_dirty(self):
+        for handler in self.dirty:
+            try:
+                handler.write_pending()
+            except Exception:
+                traceback.print_exc()
+        self.dirty = []
+
+    def _run(self):
+        last_write = time.time()
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.interval)]
+            except queue.Empty:
+                items = []
+            while items and len(items) < self.batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for handler, data in items:
+                if handler is None:
+                    self._write_dirty()
+                    data.set()
+                    continue
+                if not handler.pending:
+                    self.dirty.append(handler)
+                handler.pending.append(data)
+            if not items or time.time() - last_write >= self.interval:
+                self._write_dirty()
+                last_write = time.time()
+
+
+_async_writer = None
+
+
+def get_async_writer():
+    global _async_writer
+    if _async_writer is None:
+        batch = env.getint("SPYTEST_LOGS_ASYNC_BATCH", 256)
+        interval = float(env.get("SPYTEST_LOGS_ASYNC_INTERVAL", "0.5"))
+        _async_writer = AsyncLogWriter(batch, interval)
+        atexit.register(_async_writer.flush)
+    return _async_writer
+
+
+class AsyncFileHandler(logging.FileHandler):
+    """
+    File handler that leaves the writing to the AsyncLogWriter thread.
+
+    With max_bytes, the file is rotated to <file>.1, <file>.2 ... once it
+    grows past max_bytes, and the rotated files are gzipped when compress
+    is set.
+    """
+
+    def __init__(self, filename, mode="a", writer=None, max_bytes=0, compress=True):
+        logging.FileHandler.__init__(self, filename, mode)
+        self.writer = writer or get_async_writer()
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.rotations = 0
+        self.pending = []
+        self.closed = False
+        try:
+            self.size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self.size = 0
+
+    def emit(self, record):
+        try:
+            # format here: the timestamp and thread name are the caller's
+            self.writer.write(self, self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        # the writer thread flushes the file after each batch
+        pass
+
+    def sync(self):
+        self.writer.flush()
+
+    def write_pending(self):
+        """called by the writer thread"""
+        text, self.pending = "".join(self.pending), []
+        if not text:
+            return
+        if self.stream is None:
+            # closed while records were queued
+            self.stream = self._open()
+        self.stream.write(text)
+        self.stream.flush()
+        self.size += len(text)
+        if self.max_bytes and self.size >= self.max_bytes:
+            self._rotate()
+        if self.closed:
+            logging.FileHandler.close(self)
+
+    def _rotate(self):
+        self.stream.close()
+        self.rotations += 1
+        rotated = "{}.{}".format(self.baseFilename, self.rotations)
+        os.rename(self.baseFilename, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self.stream = self._open()
+        self.size = 0
+
+    def close(self):
+        self.sync()
+        self.closed = True
+        logging.FileHandler.close(self)
+
+
 class Logger(object):
 
     def __init__(self, file_prefix=None, filename=None, name='SPyTest', level=logging.INFO, tlog=False, mlog=True):
@@ -102,6 +257,11 @@ class Logger(object):
         self.use_elapsed_time_fmt = env.match("SPYTEST_LOGS_TIME_FMT_ELAPSED", "1", "0")
         self.dut_log_support = env.match("SPYTEST_LOGS_PER_DUT_SUPPORT", "1", "1")
         self.audit_log_support = env.match("SPYTEST_LOGS_AUDIT_SUPPORT", "1", "1")
+        self.async_writer = None
+        if env.match("SPYTEST_LOGS_ASYNC", "1", "0"):
+            self.async_writer = get_async_writer()
+        self.rotate_bytes = env.getint("SPYTEST_LOGS_ROTATE_SIZE_MB", 0) * 1024 * 1024
+        self.rotate_compress = env.match("SPYTEST_LOGS_ROTATE_COMPRESS", "1", "1")
 
         logfile = filename if filename else "spytest.log"
         logfile = self._add_prefix(logfile)
@@ -153,7 +313,11 @@ class Logger(object):
                 os.remove(logfile)
             except Exception:
                 pass
-        file_handler = logging.FileHandler(logfile, "a")
+        if self.async_writer:
+            file_handler = AsyncFileHandler(logfile, "a", self.async_writer,
+                                            self.rotate_bytes, self.rotate_compress)
+        else:
+            file_handler = logging.FileHandler(logfile, "a")
         fmt = self.fmt[show_lvl]
         file_handler.setFormatter(fmt)
         logger.addHandler(file_handler)
@@ -319,10 +483,19 @@ class Logger(object):
             self.audit_logger.log(lvl, msg, exc_info=exc_info)
             self.flush_handlers(self.audit_logger)
 
+        # errors are on disk before the caller goes on
+        if lvl >= logging.ERROR:
+            self.flush()
+
     def flush_handlers(self, logger):
         for handler in logger.handlers:
             handler.flush()
 
+    def flush(self):
+        # wait for the asynchronous writer
+        if self.async_writer:
+            self.async_writer.flush()
+
     def close_handler(self, handler, logger=None):
         if handler:
             handler.close()
@@ -331,6 +504,7 @@ class Logger(object):
         return None
 
     def tc_log_init(self, test_name):
+        self.flush()
         if not self.tc_log_support:
             return
         self.tc_log_handler = self.close_handler(self.tc_log_handler)
@@ -375,6 +549,7 @@ class Logger(object):
         if self.alert_logger:
             self.alert_logger.log(lvl, msg, exc_info=exc_info)
             self.flush_handlers(self.alert_logger)
+            self.flush()
 
 
 class NullHandler(logging.Handler):
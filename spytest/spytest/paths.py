@@ -342,6 +342,16 @@ def get_mtgen_path(module, prefix=None):
     return get_file_path(log_name, "tgen", prefix)
 
 
+def get_mtrace_path(module, prefix=None):
+    log_name = get_mlog_name(module)
+    return get_file_path(log_name, "trace.json", prefix)
+
+
+def get_mhotspots_path(module, prefix=None):
+    log_name = get_mlog_name(module)
+    return get_file_path(log_name, "hotspots.txt", prefix)
+
+
 def get_stdout_log(prefix=None):
     return get_file_path("stdout", "log", prefix)
 
@@ -1,8 +1,11 @@
+import os
+import json
 
 from spytest.st_time import get_timenow
 from spytest.dicts import SpyTestDict
 
 from utilities.parallel import get_thread_name
+import utilities.common as utils
 
 
 class Profile(object):
@@ -21,7 +24,10 @@ class Profile(object):
         self.helper_cmds = []
         self.cmds = []
         self.profile_ids = dict()
+        self.cmd_times = dict()
         self.canbe_parallel = []
+        self.serial_cmds = []
+        self.wait_cmds = []
 
     def __init__(self):
         self.init()
@@ -38,11 +44,15 @@ class Profile(object):
         delta = get_timenow() - start_time
         cmd_time = int(delta.total_seconds() * 1000)
         thid = get_thread_name()
+        self.cmd_times[pid] = cmd_time
         if dut:
             if pid > 0 and thid == "T0000: ":
                 [_, pdut, pmsg, _] = self.profile_ids[pid - 1]
                 if pmsg == msg and dut != pdut:
                     self.canbe_parallel.append([start_time, msg, dut, pdut])
+                    # time saved if both ran in parallel
+                    saving = min(cmd_time, self.cmd_times.get(pid - 1, 0))
+                    self.serial_cmds.append([start_time, msg, dut, pdut, saving, get_caller()])
             if "spytest-helper.py" in msg:
                 self.helper_cmds.append([start_time, thid, dut, msg, cmd_time])
                 self.helper_cmd_time = self.helper_cmd_time + cmd_time
@@ -60,6 +70,7 @@ class Profile(object):
     def wait(self, val, is_tg=False):
         start_time = get_timenow()
         thid = get_thread_name()
+        self.wait_cmds.append([start_time, thid, val, is_tg, get_caller()])
         if is_tg:
             self.tg_total_wait = self.tg_total_wait + val
             self.cmds.append([start_time, thid, "TGWAIT", None, "TG sleep", val])
@@ -91,11 +102,155 @@ class Profile(object):
         stats.helper_cmds = self.helper_cmds
         stats.cmds = self.cmds
         stats.canbe_parallel = self.canbe_parallel
+        stats.serial_cmds = self.serial_cmds
+        stats.wait_cmds = self.wait_cmds
         stats.pnfound = self.pnfound
         stats.ts_files = self.ts_files
         return stats
 
 
+def get_caller():
+    """
+    Location of the test or API code calling into the framework, as "file:line function"
+    """
+    lines = utils.get_call_stack(2)
+    for prefixes in [["tests" + os.sep], [""]]:
+        for line in lines:
+            fname_line, func = line.split(" ")[:2]
+            if fname_line.startswith(("spytest" + os.sep, "utilities" + os.sep)):
+                continue
+            for prefix in prefixes:
+                if fname_line.startswith(prefix):
+                    return "{} {}".format(fname_line, func)
+    return ""
+
+
+def _trace_ts(start_time):
+    return int(start_time.timestamp() * 1000000)
+
+
+def get_trace_events(stats, name, pid=1, track_by="dut"):
+    """
+    Converts the records of a test into Chrome trace (Perfetto) events
+
+    :param stats: output of get_stats
+    :param name: name of the test, shown as a span in the "TEST" track
+    :param pid: trace process the events belong to
+    :param track_by: "dut" to have a track per DUT, "thread" to have a track per thread
+    :return: list of trace events, to be passed to write_trace
+    """
+    events, start, end = [], None, None
+    for [start_time, thid, ctype, dut, cmd, ctime] in stats.cmds:
+        thread = thid.strip(": ")
+        if track_by == "thread":
+            track = thread
+        elif ctype in ["CMD", "HELPER"]:
+            track = dut
+        elif ctype == "TG":
+            track = "TG"
+        else:
+            track = thread
+        event = {"name": cmd, "cat": ctype, "pid": pid, "tid": track,
+                 "ts": _trace_ts(start_time), "args": {"thread": thread, "dut": dut}}
+        if ctype in ["CMD", "HELPER", "TG"]:
+            event.update(ph="X", dur=ctime * 1000)
+        elif ctype in ["WAIT", "TGWAIT"]:
+            event.update(ph="X", dur=int(ctime * 1000000))
+        else:
+            event.update(ph="i", s="t")
+        events.append(event)
+        start = event["ts"] if start is None else min(start, event["ts"])
+        end = max(end or 0, event["ts"] + event.get("dur", 0))
+    for [start_time, msg, dut, pdut, saving, caller] in stats.serial_cmds:
+        events.append({"name": "can be parallel: {}".format(msg), "cat": "PARALLEL", "ph": "i", "s": "p",
+                       "pid": pid, "tid": dut, "ts": _trace_ts(start_time),
+                       "args": {"duts": [pdut, dut], "saving_ms": saving, "caller": caller}})
+    if start is not None:
+        events.append({"name": name, "cat": "TEST", "ph": "X", "pid": pid, "tid": "TEST",
+                       "ts": start, "dur": end - start})
+    return events
+
+
+def write_trace(file_path, events, process_names=None):
+    """
+    Writes trace events in the Chrome trace JSON format, to be opened with
+    chrome://tracing or https://ui.perfetto.dev
+
+    :param file_path: output file
+    :param events: trace events from get_trace_events, track names are
+                   converted to the numeric thread ids of the format
+    :param process_names: dictionary of pid to process name
+    """
+    tids, trace = dict(), []
+    for pid, pname in (process_names or {}).items():
+        trace.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": pname}})
+    for event in events:
+        key = (event["pid"], str(event["tid"]))
+        if key not in tids:
+            tids[key] = len(tids) + 1
+            trace.append({"name": "thread_name", "ph": "M", "pid": event["pid"],
+                          "tid": tids[key], "args": {"name": key[1]}})
+        trace.append(dict(event, tid=tids[key]))
+    utils.write_file(file_path, json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}))
+
+
+def get_hotspots(stats_list, count=10):
+    """
+    Ranks the serial hot spots and static waits of a set of tests, like a module
+
+    :param stats_list: output of get_stats for each test
+    :param count: number of entries per category
+    :return: SpyTestDict of
+        serial: [caller, command, duts, occurrences, saving msec] of the commands
+                run back to back on different DUTs, by time that running them
+                in parallel (exec_all) would save
+        waits: [caller, occurrences, total seconds] of the static waits
+        cmds: [command, occurrences, total msec] of the slowest commands
+    """
+    serial, waits, cmds = dict(), dict(), dict()
+    for stats in stats_list:
+        for [_, msg, dut, pdut, saving, caller] in stats.serial_cmds:
+            entry = serial.setdefault((caller, msg), [caller, msg, set(), 0, 0])
+            entry[2].update([dut, pdut])
+            entry[3] = entry[3] + 1
+            entry[4] = entry[4] + saving
+        for [_, _, val, _, caller] in stats.wait_cmds:
+            entry = waits.setdefault(caller, [caller, 0, 0])
+            entry[1] = entry[1] + 1
+            entry[2] = entry[2] + val
+        for [_, _, ctype, _, cmd, ctime] in stats.cmds:
+            if ctype in ["CMD", "HELPER", "TG"]:
+                entry = cmds.setdefault(cmd, [cmd, 0, 0])
+                entry[1] = entry[1] + 1
+                entry[2] = entry[2] + ctime
+    retval = SpyTestDict()
+    retval.serial = sorted(serial.values(), key=lambda x: x[4], reverse=True)[:count]
+    for entry in retval.serial:
+        entry[2] = sorted(entry[2])
+    retval.waits = sorted(waits.values(), key=lambda x: x[2], reverse=True)[:count]
+    retval.cmds = sorted(cmds.values(), key=lambda x: x[2], reverse=True)[:count]
+    return retval
+
+
+def get_hotspots_report(hotspots):
+    """
+    Formats the output of get_hotspots, with the exec_all advice
+    """
+    lines = ["Serial hot spots (same command on different DUTs from the main thread):"]
+    for [caller, msg, duts, occurrences, saving] in hotspots.serial:
+        lines.append("  {} saved by running in parallel: {} x '{}' on {} at {}".format(
+            utils.time_format(saving, True), occurrences, msg, ",".join(duts), caller or "unknown"))
+        lines.append("    run it with st.exec_each([{}], func, ...) or st.exec_all([[func, {}, ...], ...])".format(
+            ", ".join(duts), duts[0]))
+    lines.append("Static waits:")
+    for [caller, occurrences, total] in hotspots.waits:
+        lines.append("  {} in {} waits at {}".format(utils.time_format(total), occurrences, caller or "unknown"))
+    lines.append("Slowest commands:")
+    for [cmd, occurrences, total] in hotspots.cmds:
+        lines.append("  {} in {} runs of '{}'".format(utils.time_format(total, True), occurrences, cmd))
+    return lines
+
+
 obj = Profile()
 
 
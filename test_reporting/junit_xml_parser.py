@@ -30,6 +30,7 @@ import sys
 import os
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from utilities import TestResultJSONValidationError
 from utilities import validate_json_file
@@ -226,6 +227,189 @@ def validate_junit_xml_path(path, strict=False):
     return roots
 
 
+def stream_junit_xml_file(document_name):
+    """Validate and parse an XML file incrementally.
+
+    Unlike validate_junit_xml_file, the document is never loaded as a whole: each test case is
+    validated, parsed and discarded as soon as it has been read, so there is no limit on the file size.
+
+    Args:
+        document_name: The name of the document.
+
+    Returns:
+        A dict containing the parsed test result, the same as parse_test_result for this file.
+
+    Raises:
+        JUnitXMLValidationError: if any of the following are true:
+            - The provided file doesn't exist
+            - The provided file is unparseable
+            - The provided file is missing required fields
+    """
+    _, document_result = _stream_junit_xml(document_name)
+    test_result_json = defaultdict(dict)
+    _add_document_result(test_result_json, *document_result)
+    print("Parsed 1 XML document(s) into test result JSON.")
+    return test_result_json
+
+
+def stream_junit_xml_archive(directory_name, strict=False, processes=None):
+    """Validate and parse an XML archive incrementally.
+
+    The files are streamed like in stream_junit_xml_file by a pool of processes and merged in the
+    order of their path, so there is no limit on the archive size either.
+
+    Args:
+        directory_name: The name of the directory containing XML documents.
+        strict: Fail if any of the files is invalid instead of skipping it.
+        processes: The number of worker processes, one per CPU by default.
+
+    Returns:
+        A dict containing the parsed test result, the same as parse_test_result for the valid files.
+
+    Raises:
+        JUnitXMLValidationError: in strict mode, if any of the following are true:
+            - Any of the provided files are unparseable
+            - Any of the provided files are missing required fields
+            - The metadata of the provided files differs
+    """
+    if not os.path.exists(directory_name) or not os.path.isdir(directory_name):
+        print("directory {} not found".format(directory_name))
+        return
+
+    documents = sorted(set(glob.glob(os.path.join(directory_name, "**", "*.xml"), recursive=True)))
+    processes = min(processes or os.cpu_count() or 1, len(documents))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            outcomes = list(executor.map(_stream_junit_xml_document, documents))
+    else:
+        outcomes = [_stream_junit_xml_document(document) for document in documents]
+
+    test_result_json = defaultdict(dict)
+    parsed = 0
+    metadata_source = None
+    metadata = {}
+    for document, outcome in zip(documents, outcomes):
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+
+            root_metadata, document_result = outcome
+            root_metadata = {k: v for k, v in root_metadata.items()
+                             if k in REQUIRED_METADATA_PROPERTIES and k != "timestamp"}
+            if root_metadata:
+                if not metadata_source:
+                    metadata_source = document
+                    metadata = root_metadata
+
+                if root_metadata != metadata:
+                    raise JUnitXMLValidationError(f"{document} metadata differs from {metadata_source}\n"
+                                                  f"{document}: {root_metadata}\n"
+                                                  f"{metadata_source}: {metadata}")
+
+            _add_document_result(test_result_json, *document_result)
+            parsed += 1
+        except Exception as e:
+            if strict:
+                raise JUnitXMLValidationError(f"could not parse {document}: {e}") from e
+
+            print(f"could not parse {document}: {e} - skipping")
+
+    if not parsed:
+        print("provided directory {} does not contain any valid XML files".format(directory_name))
+        return
+    print(f"Parsed {parsed} XML document(s) into test result JSON.")
+    return test_result_json
+
+
+def stream_junit_xml_path(path, strict=False, processes=None):
+    if os.path.isfile(path):
+        return stream_junit_xml_file(path)
+
+    return stream_junit_xml_archive(path, strict, processes)
+
+
+def _stream_junit_xml_document(document_name):
+    # Runs in the worker processes of stream_junit_xml_archive: errors are returned to be reported
+    # with the name of the document instead of aborting the whole archive.
+    try:
+        return _stream_junit_xml(document_name)
+    except Exception as e:
+        return e
+
+
+def _stream_junit_xml(document_name):
+    """Validate and parse an XML file with iterparse.
+
+    The same checks as _validate_junit_xml are made, on the same elements: the summary and the test
+    cases of the first <testsuite>, the metadata and the test cases directly under the root element.
+    The children of the root and <testsuite> elements are removed from the tree once they have been
+    read, so that only one test case is held in memory at a time.
+
+    Returns:
+        The metadata of the root element and the (test_metadata, test_cases, test_summary) of the
+        document as parse_test_result would extract them.
+    """
+    if not os.path.exists(document_name) or not os.path.isfile(document_name):
+        raise JUnitXMLValidationError("file not found")
+
+    root = None
+    testsuite = None
+    root_properties = None
+    testsuite_properties = None
+    test_summary = {}
+    test_cases = defaultdict(list)
+    parents = []
+    try:
+        for event, element in ET.iterparse(document_name, events=("start", "end"), forbid_dtd=True):
+            if event == "start":
+                if root is None:
+                    root = element
+                    if root.tag == TESTSUITE_TAG:
+                        testsuite = root
+                    elif root.tag != TESTSUITES_TAG:
+                        raise JUnitXMLValidationError(f"Either {TESTSUITES_TAG} or {TESTSUITE_TAG} tag "
+                                                      f"are not found on root element")
+                elif testsuite is None and element.tag == TESTSUITE_TAG and len(parents) == 1:
+                    testsuite = element
+                if element is testsuite:
+                    # The attributes are complete on the start event
+                    _validate_test_summary(testsuite)
+                    test_summary = _parse_test_summary(testsuite)
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if not parents:
+                break
+            parent = parents[-1]
+            if parent is not root and not (len(parents) == 2 and parent.tag == TESTSUITE_TAG):
+                continue
+
+            if parent is root:
+                if element.tag == PROPERTIES_TAG and root_properties is None:
+                    _validate_metadata_properties(element)
+                    root_properties = _parse_metadata_properties(element)
+                elif element.tag == TESTCASE_TAG:
+                    _validate_test_case(element)
+            if parent is testsuite:
+                if element.tag == PROPERTIES_TAG and testsuite_properties is None:
+                    testsuite_properties = _parse_metadata_properties(element)
+                elif element.tag == TESTCASE_TAG:
+                    feature, result = _parse_test_case(element)
+                    if feature is not None and result is not None:
+                        test_cases[feature].append(result)
+            parent.remove(element)
+    except JUnitXMLValidationError:
+        raise
+    except Exception as e:
+        raise JUnitXMLValidationError(f"could not parse {document_name}: {e}") from e
+
+    if testsuite is None:
+        raise JUnitXMLValidationError(f"{TESTSUITE_TAG} tag not found")
+
+    return root_properties or {}, (testsuite_properties or {}, dict(test_cases), test_summary)
+
+
 def _validate_junit_xml(root):
     _validate_test_summary(root)
     _validate_test_metadata(root)
@@ -259,8 +443,10 @@ def _validate_test_summary(root):
 
 
 def _validate_test_metadata(root):
-    properties_element = root.find(PROPERTIES_TAG)
+    _validate_metadata_properties(root.find(PROPERTIES_TAG))
+
 
+def _validate_metadata_properties(properties_element):
     if not properties_element:
         return
 
@@ -327,16 +513,17 @@ def _validate_test_case_properties(root):
         print("missing testcase property: {}".format(list(missing_testcase_property)))
 
 
-def _validate_test_cases(root):
-    def _validate_test_case(test_case):
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            if attribute not in test_case.keys():
-                raise JUnitXMLValidationError(
-                    f'"{attribute}" not found in test case '
-                    f"\"{test_case.get('name', 'Name Not Found')}\""
-                )
-        _validate_test_case_properties(test_case)
+def _validate_test_case(test_case):
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        if attribute not in test_case.keys():
+            raise JUnitXMLValidationError(
+                f'"{attribute}" not found in test case '
+                f"\"{test_case.get('name', 'Name Not Found')}\""
+            )
+    _validate_test_case_properties(test_case)
 
+
+def _validate_test_cases(root):
     cases = root.findall(TESTCASE_TAG)
 
     for test_case in cases:
@@ -361,16 +548,18 @@ def parse_test_result(roots):
         if root.tag == TESTSUITES_TAG:
             root = root.find(TESTSUITE_TAG)
 
-        test_result_json["test_metadata"] = _update_test_metadata(test_result_json["test_metadata"],
-                                                                  _parse_test_metadata(root))
-        test_cases = _parse_test_cases(root)
-        test_result_json["test_cases"] = _update_test_cases(test_result_json["test_cases"], test_cases)
-        test_result_json["test_summary"] = _update_test_summary(test_result_json["test_summary"],
-                                                                _parse_test_summary(root))
+        _add_document_result(test_result_json, _parse_test_metadata(root), _parse_test_cases(root),
+                             _parse_test_summary(root))
     print(f"Parsed {len(roots)} XML document(s) into test result JSON.")
     return test_result_json
 
 
+def _add_document_result(test_result_json, test_metadata, test_cases, test_summary):
+    test_result_json["test_metadata"] = _update_test_metadata(test_result_json["test_metadata"], test_metadata)
+    test_result_json["test_cases"] = _update_test_cases(test_result_json["test_cases"], test_cases)
+    test_result_json["test_summary"] = _update_test_summary(test_result_json["test_summary"], test_summary)
+
+
 def _parse_test_summary(root):
     test_result_summary = {}
     for attribute, _ in REQUIRED_TESTSUITE_ATTRIBUTES:
@@ -412,8 +601,10 @@ def _extract_test_summary(test_cases):
 
 
 def _parse_test_metadata(root):
-    properties_element = root.find(PROPERTIES_TAG)
+    return _parse_metadata_properties(root.find(PROPERTIES_TAG))
+
 
+def _parse_metadata_properties(properties_element):
     if not properties_element:
         return {}
 
@@ -446,69 +637,69 @@ def _parse_testcase_properties(root):
     return testcase_properties
 
 
-def _parse_test_cases(root):
-    test_case_results = defaultdict(list)
-
-    def _parse_test_case(test_case):
-
-        # For special case like: <testcase time="17.190" />
-        # There is no required attributes in it, then just return None, None
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            if attribute not in test_case.keys():
-                return None, None
+def _parse_test_case(test_case):
+    # For special case like: <testcase time="17.190" />
+    # There is no required attributes in it, then just return None, None
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        if attribute not in test_case.keys():
+            return None, None
+
+    result = {}
+
+    # FIXME: This is specific to pytest, needs to be extended to support spytest.
+    test_class_tokens = test_case.get("classname").split(".")
+    feature = test_class_tokens[0]
+
+    for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
+        result[attribute] = test_case.get(attribute)
+    for attribute in REQUIRED_TESTCASE_PROPERTIES:
+        testcase_properties = _parse_testcase_properties(test_case)
+        if attribute in testcase_properties:
+            result[attribute] = testcase_properties[attribute]
+
+    # NOTE: "if failure" and "if error" does not work with the ETree library.
+    failure = test_case.find("failure")
+    error = test_case.find("error")
+    skipped = test_case.find("skipped")
+
+    # Any test which marked as xfail will drop out a property to the report xml file.
+    # Add prefix "xfail_" to tests which are marked with xfail
+    properties_element = test_case.find(PROPERTIES_TAG)
+    xfail_case = ""
+    if properties_element:
+        for prop in properties_element.iterfind(PROPERTY_TAG):
+            if prop.get("name") == "xfail":
+                xfail_case = "xfail_"
+                break
+
+    # NOTE: "error" is unique in that it can occur alongside a succesful, failed, or skipped test result.
+    # Because of this, we track errors separately so that the error can be correlated with the stage it
+    # occurred.
+    # By looking into test results from past 300 days, error only occur with skipped test result.
+    #
+    # If there is *only* an error tag we note that as well, as this indicates that the framework
+    # errored out during setup or teardown.
+    if failure is not None:
+        result["result"] = "{}failure".format(xfail_case)
+        summary = failure.get("message", "")
+    elif skipped is not None:
+        result["result"] = "{}skipped".format(xfail_case)
+        summary = skipped.get("message", "")
+    elif error is not None:
+        result["result"] = "{}error".format(xfail_case)
+        summary = error.get("message", "")
+    else:
+        result["result"] = "{}success".format(xfail_case)
+        summary = ""
 
-        result = {}
+    result["summary"] = summary[:min(len(summary), MAXIMUM_SUMMARY_SIZE)]
+    result["error"] = error is not None
 
-        # FIXME: This is specific to pytest, needs to be extended to support spytest.
-        test_class_tokens = test_case.get("classname").split(".")
-        feature = test_class_tokens[0]
+    return feature, result
 
-        for attribute in REQUIRED_TESTCASE_ATTRIBUTES:
-            result[attribute] = test_case.get(attribute)
-        for attribute in REQUIRED_TESTCASE_PROPERTIES:
-            testcase_properties = _parse_testcase_properties(test_case)
-            if attribute in testcase_properties:
-                result[attribute] = testcase_properties[attribute]
-
-        # NOTE: "if failure" and "if error" does not work with the ETree library.
-        failure = test_case.find("failure")
-        error = test_case.find("error")
-        skipped = test_case.find("skipped")
-
-        # Any test which marked as xfail will drop out a property to the report xml file.
-        # Add prefix "xfail_" to tests which are marked with xfail
-        properties_element = test_case.find(PROPERTIES_TAG)
-        xfail_case = ""
-        if properties_element:
-            for prop in properties_element.iterfind(PROPERTY_TAG):
-                if prop.get("name") == "xfail":
-                    xfail_case = "xfail_"
-                    break
-
-        # NOTE: "error" is unique in that it can occur alongside a succesful, failed, or skipped test result.
-        # Because of this, we track errors separately so that the error can be correlated with the stage it
-        # occurred.
-        # By looking into test results from past 300 days, error only occur with skipped test result.
-        #
-        # If there is *only* an error tag we note that as well, as this indicates that the framework
-        # errored out during setup or teardown.
-        if failure is not None:
-            result["result"] = "{}failure".format(xfail_case)
-            summary = failure.get("message", "")
-        elif skipped is not None:
-            result["result"] = "{}skipped".format(xfail_case)
-            summary = skipped.get("message", "")
-        elif error is not None:
-            result["result"] = "{}error".format(xfail_case)
-            summary = error.get("message", "")
-        else:
-            result["result"] = "{}success".format(xfail_case)
-            summary = ""
 
-        result["summary"] = summary[:min(len(summary), MAXIMUM_SUMMARY_SIZE)]
-        result["error"] = error is not None
-
-        return feature, result
+def _parse_test_cases(root):
+    test_case_results = defaultdict(list)
 
     for test_case in root.findall("testcase"):
         feature, result = _parse_test_case(test_case)
@@ -690,6 +881,11 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
         action="store_true",
         help="Fail validation checks if ANY file in a given directory is not parseable."
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Validate and parse the XML incrementally, in parallel for a directory, without size limit."
+    )
     parser.add_argument(
         "--json",
         "-j",
@@ -703,6 +899,8 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
     try:
         if args.json:
             validate_junit_json_file(args.file_name)
+        elif args.stream:
+            test_result_json = stream_junit_xml_path(args.file_name, args.strict)
         elif args.directory:
             roots = validate_junit_xml_archive(args.file_name, args.strict)
         else:
@@ -721,7 +919,8 @@ python3 junit_xml_parser.py tests/files/sample_tr.xml
         print(f"{args.file_name} validated succesfully!")
         sys.exit(0)
 
-    test_result_json = parse_test_result(roots)
+    if not args.stream:
+        test_result_json = parse_test_result(roots)
     if test_result_json is None:
         print("XML file doesn't exist or no data in the file.")
         sys.exit(1)
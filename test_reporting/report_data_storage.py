@@ -1,23 +1,29 @@
 """Wrappers and utilities for storing test reports."""
 import json
 import os
+import sqlite3
 import tempfile
 
 from abc import ABC, abstractmethod
-from azure.kusto.data import KustoConnectionStringBuilder
-
+# The Kusto SDK is only needed by KustoConnector, SQLiteConnector works without it
 try:
-    from azure.kusto.ingest import KustoIngestClient
-except ImportError:
-    from azure.kusto.ingest import QueuedIngestClient as KustoIngestClient
+    from azure.kusto.data import KustoConnectionStringBuilder
 
-from azure.kusto.ingest import IngestionProperties
+    try:
+        from azure.kusto.ingest import KustoIngestClient
+    except ImportError:
+        from azure.kusto.ingest import QueuedIngestClient as KustoIngestClient
 
-# Resolve azure.kusto.ingest compatibility issue
-try:
-    from azure.kusto.ingest import DataFormat
-except ImportError:
-    from azure.kusto.data.data_format import DataFormat
+    from azure.kusto.ingest import IngestionProperties
+
+    # Resolve azure.kusto.ingest compatibility issue
+    try:
+        from azure.kusto.ingest import DataFormat
+    except ImportError:
+        from azure.kusto.data.data_format import DataFormat
+except ImportError as e:
+    KustoConnectionStringBuilder = KustoIngestClient = IngestionProperties = DataFormat = None
+    _kusto_import_error = e
 
 # Import DefaultAzureCredential for token-based authentication
 try:
@@ -110,22 +116,23 @@ class KustoConnector(ReportDBConnector):
     CASE_INVOC_TABLE = "CaseInvocationCoverage"
     SAI_HEADER_INVOC_TABLE = "SAIHeaderDefinition"
 
+    # DataFormat member names, the Kusto SDK is imported only if available
     TABLE_FORMAT_LOOKUP = {
-        METADATA_TABLE: DataFormat.JSON,
-        SWSSDATA_TABLE: DataFormat.MULTIJSON,
-        SUMMARY_TABLE: DataFormat.JSON,
-        RAW_CASE_TABLE: DataFormat.MULTIJSON,
-        RAW_REACHABILITY_TABLE: DataFormat.MULTIJSON,
-        TESTBEDREACHABILITY_TABLE: DataFormat.JSON,
-        RAW_PDU_STATUS_TABLE: DataFormat.MULTIJSON,
-        RAW_REBOOT_TIMING_TABLE: DataFormat.JSON,
-        REBOOT_TIMING_TABLE: DataFormat.MULTIJSON,
-        TEST_CASE_TABLE: DataFormat.JSON,
-        EXPECTED_TEST_RUNS_TABLE: DataFormat.JSON,
-        TEST_CASE_NUMBERS_TABLE: DataFormat.JSON,
-        PIPELINE_TABLE: DataFormat.JSON,
-        CASE_INVOC_TABLE: DataFormat.MULTIJSON,
-        SAI_HEADER_INVOC_TABLE: DataFormat.MULTIJSON,
+        METADATA_TABLE: "JSON",
+        SWSSDATA_TABLE: "MULTIJSON",
+        SUMMARY_TABLE: "JSON",
+        RAW_CASE_TABLE: "MULTIJSON",
+        RAW_REACHABILITY_TABLE: "MULTIJSON",
+        TESTBEDREACHABILITY_TABLE: "JSON",
+        RAW_PDU_STATUS_TABLE: "MULTIJSON",
+        RAW_REBOOT_TIMING_TABLE: "JSON",
+        REBOOT_TIMING_TABLE: "MULTIJSON",
+        TEST_CASE_TABLE: "JSON",
+        EXPECTED_TEST_RUNS_TABLE: "JSON",
+        TEST_CASE_NUMBERS_TABLE: "JSON",
+        PIPELINE_TABLE: "JSON",
+        CASE_INVOC_TABLE: "MULTIJSON",
+        SAI_HEADER_INVOC_TABLE: "MULTIJSON",
     }
 
     TABLE_MAPPING_LOOKUP = {
@@ -155,6 +162,9 @@ class KustoConnector(ReportDBConnector):
                 Supported methods: appKey, managedId, interactive, azureCli,
                 deviceCode, userToken, appToken, defaultCredential
         """
+        if DataFormat is None:
+            raise ImportError("azure-kusto-data and azure-kusto-ingest are required to upload to Kusto: {}".format(
+                _kusto_import_error))
         self.db_name = db_name
         self.auth_method = auth_method
 
@@ -430,7 +440,7 @@ class KustoConnector(ReportDBConnector):
         props = IngestionProperties(
             database=self.db_name,
             table=table,
-            data_format=self.TABLE_FORMAT_LOOKUP[table],
+            data_format=DataFormat[self.TABLE_FORMAT_LOOKUP[table]],
             ingestion_mapping_reference=self.TABLE_MAPPING_LOOKUP[table]
         )
 
@@ -467,10 +477,283 @@ class KustoConnector(ReportDBConnector):
         props = IngestionProperties(
             database=self.db_name,
             table=table,
-            data_format=self.TABLE_FORMAT_LOOKUP[table],
+            data_format=DataFormat[self.TABLE_FORMAT_LOOKUP[table]],
             ingestion_mapping_reference=self.TABLE_MAPPING_LOOKUP[table],
             flush_immediately=True
         )
 
         self._ingestion_client.ingest_from_file(
             data_file, ingestion_properties=props)
+
+
+class SQLiteConnector(ReportDBConnector):
+    """SQLiteConnector stores test reports in a local SQLite database for offline analysis.
+
+    Every test case is a row of the indexed test_cases table, together with the testbed and the
+    timestamp of its run, so that the history of a test or a testbed can be aggregated without
+    a Kusto round trip. The query methods return lists of dicts; the database can also be read
+    directly by other tools (it is opened in WAL mode, so readers do not block uploads).
+    """
+
+    # Results that count as a pass or a failure of a test, the others (skipped, xfail_*) are neither.
+    PASS_RESULTS = ("success",)
+    FAIL_RESULTS = ("failure", "error")
+    # Results whose duration is not the duration of the test.
+    SKIP_RESULTS = ("skipped", "xfail_skipped")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reports (
+            id TEXT, tracking_id TEXT, testbed TEXT, os_version TEXT, upload_time TEXT,
+            timestamp TEXT, topology TEXT, asic TEXT, platform TEXT, hwsku TEXT, host TEXT,
+            tests INTEGER, failures INTEGER, errors INTEGER, skipped INTEGER, xfails INTEGER, time REAL);
+        CREATE INDEX IF NOT EXISTS reports_testbed ON reports (testbed, timestamp);
+        CREATE INDEX IF NOT EXISTS reports_id ON reports (id, timestamp);
+
+        CREATE TABLE IF NOT EXISTS test_cases (
+            report_id TEXT, testbed TEXT, timestamp TEXT, feature TEXT, file TEXT, classname TEXT,
+            name TEXT, line INTEGER, time REAL, result TEXT, error INTEGER, summary TEXT,
+            start TEXT, end TEXT, custom_msg TEXT);
+        CREATE INDEX IF NOT EXISTS test_cases_test ON test_cases (file, name, timestamp);
+        CREATE INDEX IF NOT EXISTS test_cases_testbed ON test_cases (testbed, timestamp);
+        CREATE INDEX IF NOT EXISTS test_cases_report ON test_cases (report_id);
+
+        CREATE TABLE IF NOT EXISTS reboot_timings (
+            report_id TEXT, tracking_id TEXT, upload_time TEXT, kind TEXT, hostname TEXT,
+            reboot_type TEXT, data TEXT);
+        CREATE INDEX IF NOT EXISTS reboot_timings_host ON reboot_timings (hostname, reboot_type, upload_time);
+
+        CREATE TABLE IF NOT EXISTS reachability (timestamp TEXT, testbed TEXT, data TEXT);
+        CREATE TABLE IF NOT EXISTS pdu_status (timestamp TEXT, host TEXT, data TEXT);
+        CREATE TABLE IF NOT EXISTS expected_runs (timestamp TEXT, testbed TEXT);
+        CREATE TABLE IF NOT EXISTS case_numbers (upload_time TEXT, data TEXT);
+    """
+
+    def __init__(self, db_path: str):
+        """Initialize a SQLite report DB connector.
+
+        Args:
+            db_path: The SQLite database file, created if it does not exist.
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode, NORMAL only skips the sync of each commit, the database cannot be corrupted
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def upload_report(self, report_json: Dict,
+                      external_tracking_id: str = "",
+                      report_guid: str = "",
+                      testbed: str = "",
+                      os_version: str = "") -> None:
+        metadata = report_json.get("test_metadata", {}) if report_json else {}
+        summary = report_json.get("test_summary", {}) if report_json else {}
+        testbed = testbed or metadata.get("testbed", "")
+        timestamp = metadata.get("timestamp", "") or str(datetime.utcnow())
+
+        with self._conn:
+            # Like the Kusto tables, a report GUID is shared by all the files of one upload, each file being
+            # a report of its own; only a report uploaded again (same GUID and timestamp) replaces its rows
+            self._conn.execute("DELETE FROM reports WHERE id = ? AND timestamp = ?", (report_guid, timestamp))
+            self._conn.execute("DELETE FROM test_cases WHERE report_id = ? AND timestamp = ?",
+                               (report_guid, timestamp))
+            self._conn.execute(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (report_guid, external_tracking_id, testbed, os_version or metadata.get("os_version", ""),
+                 str(datetime.utcnow()), timestamp, metadata.get("topology"), metadata.get("asic"),
+                 metadata.get("platform"), metadata.get("hwsku"), metadata.get("host"),
+                 int(summary.get("tests", 0)), int(summary.get("failures", 0)), int(summary.get("errors", 0)),
+                 int(summary.get("skipped", 0)), int(summary.get("xfails", 0)), float(summary.get("time", 0))))
+            if not report_json:
+                return
+            self._conn.executemany(
+                "INSERT INTO test_cases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((report_guid, testbed, timestamp, feature, case.get("file"), case.get("classname"),
+                  case.get("name"), case.get("line"), float(case.get("time", 0)), case.get("result"),
+                  int(bool(case.get("error"))), case.get("summary"), case.get("start"), case.get("end"),
+                  case.get("CustomMsg"))
+                 for feature, cases in report_json.get("test_cases", {}).items() for case in cases))
+        print("Stored report {} in {}".format(report_guid, self.db_path))
+
+    def upload_reachability_data(self, ping_output: List) -> None:
+        ping_time = str(datetime.utcnow())
+        with self._conn:
+            self._conn.executemany("INSERT INTO reachability VALUES (?, ?, ?)",
+                                   ((ping_time, result.get("TestbedName"), json.dumps(result))
+                                    for result in ping_output))
+
+    def upload_pdu_status_data(self, pdu_status_output: List) -> None:
+        time = str(datetime.utcnow())
+        with self._conn:
+            self._conn.executemany("INSERT INTO pdu_status VALUES (?, ?, ?)",
+                                   ((time, result.get("Host"), json.dumps(result.get("PDU status")))
+                                    for result in pdu_status_output))
+
+    def upload_reboot_report(self, path_name: str = "", tracking_id: str = "", report_guid: str = "") -> None:
+        reboot_timing_dict = validate_json_file(path_name)
+        kind = "summary" if "summary.json" in path_name else "report"
+        with self._conn:
+            self._conn.execute("INSERT INTO reboot_timings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (report_guid, tracking_id, str(datetime.utcnow()), kind,
+                                reboot_timing_dict.get("hostname"), reboot_timing_dict.get("reboot_type"),
+                                json.dumps(reboot_timing_dict)))
+
+    def upload_expected_runs(self, expected_runs: List) -> None:
+        with self._conn:
+            self._conn.executemany("INSERT INTO expected_runs VALUES (?, ?)",
+                                   ((run.get("timestamp"), run.get("testbed")) for run in expected_runs))
+
+    def upload_case_numbers(self, case_numbers: List) -> None:
+        with self._conn:
+            self._conn.execute("INSERT INTO case_numbers VALUES (?, ?)",
+                               (str(datetime.utcnow()), json.dumps(case_numbers)))
+
+    def query(self, sql: str, params=()) -> List[Dict]:
+        """Run a read-only SQL query and return the rows as dicts."""
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    @staticmethod
+    def _filters(testbed=None, since=None, until=None, test=None, column_prefix=""):
+        clauses, params = [], []
+        if testbed:
+            clauses.append(f"{column_prefix}testbed = ?")
+            params.append(testbed)
+        if since:
+            clauses.append(f"{column_prefix}timestamp >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append(f"{column_prefix}timestamp < ?")
+            params.append(str(until))
+        if test:
+            # "file::name" or just "name"
+            file_name, _, name = test.rpartition("::")
+            clauses.append(f"{column_prefix}name = ?")
+            params.append(name)
+            if file_name:
+                clauses.append(f"{column_prefix}file = ?")
+                params.append(file_name)
+        return " AND ".join(clauses) or "1", params
+
+    def duration_percentiles(self, testbed: str = None, since: str = None, until: str = None,
+                             test: str = None, percentiles=(50, 95)) -> List[Dict]:
+        """Duration percentiles of every test, skipped runs excluded.
+
+        Args:
+            testbed: Only the runs on this testbed.
+            since, until: Only the runs with a timestamp in [since, until), "YYYY-MM-DD[ HH:MM:SS]".
+            test: Only this test, "name" or "file::name".
+            percentiles: The percentiles to compute (nearest rank), each returned as "p<N>".
+
+        Returns:
+            A list of {"file", "name", "runs", "avg", "max", "p<N>"...} sorted by the highest percentile.
+        """
+        where, params = self._filters(testbed, since, until, test)
+        skip = ", ".join("?" * len(self.SKIP_RESULTS))
+        # Nearest rank: the first duration at or above position ceil(p * runs / 100)
+        columns = ", ".join(f"MIN(CASE WHEN position >= MAX(1, ({int(p)} * runs + 99) / 100) THEN time END)"
+                            f" AS p{int(p)}" for p in percentiles)
+        sql = f"""
+            WITH ranked AS (
+                SELECT file, name, time,
+                       ROW_NUMBER() OVER (PARTITION BY file, name ORDER BY time) AS position,
+                       COUNT(*) OVER (PARTITION BY file, name) AS runs
+                FROM test_cases WHERE {where} AND result NOT IN ({skip}))
+            SELECT file, name, runs, AVG(time) AS avg, MAX(time) AS max, {columns}
+            FROM ranked GROUP BY file, name ORDER BY p{int(max(percentiles))} DESC"""
+        return self.query(sql, params + list(self.SKIP_RESULTS))
+
+    def failure_rates(self, testbed: str = None, since: str = None, until: str = None,
+                      test: str = None, min_runs: int = 1) -> List[Dict]:
+        """Failure rate and flakiness of every test.
+
+        "flips" counts the changes between pass and failure from one run to the next (skipped and
+        xfail runs ignored): a test that fails often with a low number of flips is broken, a test
+        with many flips is flaky.
+
+        Returns:
+            A list of {"file", "name", "runs", "passes", "failures", "failure_rate", "flips",
+            "last_failure"} sorted by failure rate.
+        """
+        where, params = self._filters(testbed, since, until, test)
+        outcomes = self.PASS_RESULTS + self.FAIL_RESULTS
+        fail = ", ".join("?" * len(self.FAIL_RESULTS))
+        sql = f"""
+            WITH runs AS (
+                SELECT file, name, timestamp, result IN ({fail}) AS failed
+                FROM test_cases WHERE {where} AND result IN ({", ".join("?" * len(outcomes))})),
+            ordered AS (
+                SELECT *, LAG(failed) OVER (PARTITION BY file, name ORDER BY timestamp) AS previous FROM runs)
+            SELECT file, name, COUNT(*) AS runs, SUM(1 - failed) AS passes, SUM(failed) AS failures,
+                   ROUND(1.0 * SUM(failed) / COUNT(*), 4) AS failure_rate,
+                   SUM(previous IS NOT NULL AND previous != failed) AS flips,
+                   MAX(CASE WHEN failed THEN timestamp END) AS last_failure
+            FROM ordered GROUP BY file, name HAVING COUNT(*) >= ?
+            ORDER BY failure_rate DESC, flips DESC"""
+        return self.query(sql, list(self.FAIL_RESULTS) + params + list(outcomes) + [min_runs])
+
+    def failure_streaks(self, testbed: str = None, min_length: int = 2) -> List[Dict]:
+        """Tests whose latest runs all failed.
+
+        The streak of a test is the number of failed runs since its last pass, skipped and xfail
+        runs neither break nor extend it.
+
+        Returns:
+            A list of {"file", "name", "streak", "first_failure", "last_failure", "last_pass"}
+            sorted by streak length.
+        """
+        where, params = self._filters(testbed)
+        t_where, _ = self._filters(testbed, column_prefix="t.")
+        fail = ", ".join("?" * len(self.FAIL_RESULTS))
+        passed = ", ".join("?" * len(self.PASS_RESULTS))
+        sql = f"""
+            WITH last_pass AS (
+                SELECT file, name, MAX(timestamp) AS timestamp FROM test_cases
+                WHERE {where} AND result IN ({passed}) GROUP BY file, name)
+            SELECT t.file, t.name, COUNT(*) AS streak, MIN(t.timestamp) AS first_failure,
+                   MAX(t.timestamp) AS last_failure, p.timestamp AS last_pass
+            FROM test_cases t LEFT JOIN last_pass p ON p.file = t.file AND p.name = t.name
+            WHERE {t_where} AND t.result IN ({fail})
+                  AND (p.timestamp IS NULL OR t.timestamp > p.timestamp)
+            GROUP BY t.file, t.name HAVING COUNT(*) >= ? ORDER BY streak DESC, last_failure DESC"""
+        return self.query(sql, params + list(self.PASS_RESULTS) + params + list(self.FAIL_RESULTS) + [min_length])
+
+    def testbed_trends(self, testbed: str = None, since: str = None, until: str = None,
+                       period: str = "day") -> List[Dict]:
+        """Runs, tests, failures and pass rate per testbed and per day, week or month.
+
+        Returns:
+            A list of {"testbed", "period", "reports", "tests", "failures", "errors", "skipped",
+            "pass_rate", "time"} sorted by testbed and period.
+        """
+        formats = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+        if period not in formats:
+            raise ValueError(f"Unsupported period: {period}, expected one of {sorted(formats)}")
+        where, params = self._filters(testbed, since, until)
+        sql = f"""
+            SELECT testbed, strftime('{formats[period]}', timestamp) AS period, COUNT(*) AS reports,
+                   SUM(tests) AS tests, SUM(failures) AS failures, SUM(errors) AS errors, SUM(skipped) AS skipped,
+                   ROUND(1.0 * (SUM(tests) - SUM(failures) - SUM(errors) - SUM(skipped))
+                         / MAX(1, SUM(tests) - SUM(skipped)), 4) AS pass_rate,
+                   SUM(time) AS time
+            FROM reports WHERE {where} GROUP BY testbed, period ORDER BY testbed, period"""
+        return self.query(sql, params)
+
+    def reboot_timings(self, hostname: str = None, reboot_type: str = None, since: str = None) -> List[Dict]:
+        """Reboot timing summaries and reports, oldest first, with the uploaded JSON in "data"."""
+        clauses, params = [], []
+        for column, value in (("hostname", hostname), ("reboot_type", reboot_type)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("upload_time >= ?")
+            params.append(str(since))
+        rows = self.query("SELECT * FROM reboot_timings WHERE {} ORDER BY upload_time".format(
+            " AND ".join(clauses) or "1"), params)
+        for row in rows:
+            row["data"] = json.loads(row["data"])
+        return rows
@@ -7,10 +7,9 @@ import os
 
 from junit_xml_parser import (
     validate_junit_json_file,
-    validate_junit_xml_path,
-    parse_test_result
+    stream_junit_xml_path
 )
-from report_data_storage import KustoConnector
+from report_data_storage import KustoConnector, SQLiteConnector
 
 
 def _parse_os_version(image_url):
@@ -61,6 +60,10 @@ python3 report_uploader.py tests/files/sample_tr.xml -e TRACKING_ID#22
         default="appKey",
         help="Authentication method for Kusto connection."
     )
+    parser.add_argument(
+        "--backend", "-b", type=str, choices=["kusto", "sqlite"], default="kusto",
+        help="Where to store the data: the Kusto DB or, with sqlite, the local SQLite database file 'database'."
+    )
     os_version = parser.add_mutually_exclusive_group(required=False)
     os_version.add_argument(
         "--image_url", "-i", type=str,
@@ -74,9 +77,12 @@ python3 report_uploader.py tests/files/sample_tr.xml -e TRACKING_ID#22
     args = parser.parse_args()
 
     try:
-        kusto_db = KustoConnector(args.db_name, args.auth_method)
+        if args.backend == "sqlite":
+            kusto_db = SQLiteConnector(args.db_name)
+        else:
+            kusto_db = KustoConnector(args.db_name, args.auth_method)
     except Exception as e:
-        print(f"Failed to create KustoConnector: {e}")
+        print(f"Failed to create {args.backend} connector: {e}")
         import traceback
         traceback.print_exc()
         raise
@@ -101,8 +107,7 @@ python3 report_uploader.py tests/files/sample_tr.xml -e TRACKING_ID#22
                     if args.json:
                         test_result_json = validate_junit_json_file(path_name)
                     else:
-                        roots = validate_junit_xml_path(path_name)
-                        test_result_json = parse_test_result(roots)
+                        test_result_json = stream_junit_xml_path(path_name)
                     kusto_db.upload_report(test_result_json, tracking_id, report_guid, testbed, version)
             except Exception as e:
                 print(f"Failed to upload report '{path_name}', exception: {repr(e)}")
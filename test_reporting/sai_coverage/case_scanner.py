@@ -12,11 +12,16 @@ import uuid
 from datetime import date
 from multipledispatch import dispatch
 
-from constant import (FINAL_RESULT_SAVE_DIR, IGNORE_FILE_LIST,
-                      PRIORI_RESULT_SAVE_DIR, SAI_API_PREFIX,
-                      SAI_HEADER_FILENAME, UNRUNNABLE_TAG_LIST)
+from constant import (CASE_SCAN_CACHE_FILENAME, FINAL_RESULT_SAVE_DIR,
+                      IGNORE_FILE_LIST, PRIORI_RESULT_SAVE_DIR,
+                      SAI_ADAPTER_FILENAME, SAI_API_PREFIX,
+                      SAI_HEADER_FILENAME, SCAN_CACHE_DIR,
+                      UNRUNNABLE_TAG_LIST)
 from data_model.test_invocation import TestInvocation
-from sai_report_utils import seach_defalt_parms
+from sai_report_utils import (ScanCache, file_digest, load_json,
+                              parallel_map, seach_defalt_parms)
+
+_worker_scanner = None
 
 
 def get_parser(description="SAI Interface Scanner"):
@@ -28,6 +33,10 @@ def get_parser(description="SAI Interface Scanner"):
                         default="../CaseScanner/files/ptf", help="directory to scan.")
     parser.add_argument("--save_path", "-sp", type=str, default=FINAL_RESULT_SAVE_DIR,
                         help="directory to save the compressed results.")
+    parser.add_argument("--cache", type=str, default=os.path.join(SCAN_CACHE_DIR, CASE_SCAN_CACHE_FILENAME),
+                        help="cache of the results of unchanged files, empty to disable.")
+    parser.add_argument("--processes", "-j", type=int, default=None,
+                        help="number of processes parsing the files, one per CPU by default.")
     args = parser.parse_args()
     return args
 
@@ -42,6 +51,9 @@ class SAICoverageScanner(object):
         self.save_path = parser.save_path
         os.makedirs(self.save_path, exist_ok=True)
 
+        self.cache_path = getattr(parser, "cache", None) or None
+        self.processes = getattr(parser, "processes", None)
+
         self.header_path = os.path.join(
             PRIORI_RESULT_SAVE_DIR, SAI_HEADER_FILENAME)
         self.final_coverage = list()
@@ -50,19 +62,61 @@ class SAICoverageScanner(object):
     def parse(self):
         '''
         Parse file level
+
+        The results of the files whose content (and the SAI header and adapter scan
+        results they are matched against) did not change since the previous run are
+        taken from the cache, the other files are parsed in a process pool.
         '''
+        cache = ScanCache(self.cache_path, salt=file_digest(
+            self.header_path, os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME)))
+        scanned = []
+        pending = []
         for (root, _, filenames) in os.walk(self.case_path):
             for filename in filenames:
                 if filename.endswith(".py") and \
                    filename not in IGNORE_FILE_LIST and \
                    "helper" not in filename.lower():
-                    with open(root + "/" + filename, "r") as f:
-                        test_set = "t0" if 'sai_test' in root else "ptf"
-                        code = f.read()
-                        f_ast = ast.parse(code)
-                        self.parse_class(f_ast, filename, test_set, root)
-                        self.file_dict[filename[:-3]] = self.final_coverage
-                        self.final_coverage = []
+                    path = root + "/" + filename
+                    test_set = "t0" if 'sai_test' in root else "ptf"
+                    key = cache.key(path, test_set, root)
+                    coverage = cache.get(path, key)
+                    if coverage is None:
+                        pending.append((path, filename, test_set, root))
+                    scanned.append((path, filename, key, coverage))
+
+        results = dict(zip((item[0] for item in pending),
+                           parallel_map(_parse_case_file, pending, self.processes,
+                                        _init_case_worker, (self.case_path, self.save_path))))
+        today = str(date.today())
+        for (path, filename, key, coverage) in scanned:
+            if coverage is None:
+                coverage = results[path]
+                cache.set(path, key, coverage)
+            else:
+                # Cached records get the id and upload time of this run
+                coverage = [dict(record, id=str(uuid.uuid4()), upload_time=today) for record in coverage]
+            self.file_dict[filename[:-3]] = coverage
+        cache.save(self.case_path)
+
+    def parse_file(self, path, filename, test_set, root):
+        '''
+        Parse one file
+
+        Args:
+            path: file path
+            filename: file name
+            test_set: distinguish test set ("t0" or "ptf")
+            root: folder name of the scanning file
+
+        Return:
+            list of invocation records of the file
+        '''
+        with open(path, "r") as f:
+            code = f.read()
+            f_ast = ast.parse(code)
+            self.parse_class(f_ast, filename, test_set, root)
+        coverage, self.final_coverage = self.final_coverage, []
+        return coverage
 
     def parse_class(self, raw_ast, file_name, test_set, sai_folder):
         '''
@@ -226,7 +280,7 @@ class SAICoverageScanner(object):
             runnable: distinguish whether case runnable
             sai_folder: folder name of the scanning file
         '''
-        header_data = self.parse_header(self.header_path)
+        header_data = load_json(self.header_path)
         header_key = "sai_" + sai_interface.split("sai_thrift_")[1] + "_fn"
         if header_key not in header_data:
             return
@@ -253,7 +307,7 @@ class SAICoverageScanner(object):
             if len(res) == 0:
                 continue
             with open(os.path.join(self.save_path, file_name+'.json'), 'w+') as f:
-                json.dump(res, f, indent=4)
+                f.write(json.dumps(res, indent=4))
 
     @dispatch(ast.Name)
     def get_attr_and_values_arg(self, arg: ast.Name) -> str:  # noqa: F811
@@ -354,6 +408,15 @@ class SAICoverageScanner(object):
         return True
 
 
+def _init_case_worker(case_path, save_path):
+    global _worker_scanner
+    _worker_scanner = SAICoverageScanner(argparse.Namespace(path=case_path, save_path=save_path))
+
+
+def _parse_case_file(item):
+    return _worker_scanner.parse_file(*item)
+
+
 if __name__ == '__main__':
     parser = get_parser()
     scanner = SAICoverageScanner(parser)
@@ -4,6 +4,7 @@ This file defines SAI qualification report constant variables
 
 PRIORI_RESULT_SAVE_DIR = "result"
 FINAL_RESULT_SAVE_DIR = "result/scan"
+SCAN_CACHE_DIR = "result/cache"
 
 SAI_API_PREFIX = "sai_thrift"
 IGNORE_FILE_LIST = ["sai_adapter.py",
@@ -14,4 +15,8 @@ SAI_HEADER_FILENAME = "sai_header_scan_result.json"
 SAI_HEADER_FILENAME_UPLOAD = "sai_header.json"
 SAI_ADAPTER_FILENAME = "sai_adapter_scan_result.json"
 
+CASE_SCAN_CACHE_FILENAME = "case_scan_cache.json"
+SAI_HEADER_SCAN_CACHE_FILENAME = "sai_header_scan_cache.json"
+SAI_ADAPTER_SCAN_CACHE_FILENAME = "sai_adapter_scan_cache.json"
+
 UNRUNNABLE_TAG_LIST = ["draft"]
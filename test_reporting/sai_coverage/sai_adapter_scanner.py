@@ -7,7 +7,9 @@ import ast
 import json
 import os
 
-from constant import PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME
+from constant import (PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME,
+                      SAI_ADAPTER_SCAN_CACHE_FILENAME, SCAN_CACHE_DIR)
+from sai_report_utils import ScanCache, parallel_map
 
 
 def get_parser(description="SAI Adapter Scanner"):
@@ -18,38 +20,75 @@ def get_parser(description="SAI Adapter Scanner"):
         description=description, formatter_class=argparse.RawTextHelpFormatter)
     parser.add_argument("path_list", metavar="path", nargs="+",
                         type=str, help="list of file/directory to scan.")
+    parser.add_argument("--cache", type=str, default=os.path.join(SCAN_CACHE_DIR, SAI_ADAPTER_SCAN_CACHE_FILENAME),
+                        help="cache of the definitions of unchanged files, empty to disable.")
+    parser.add_argument("--processes", "-j", type=int, default=None,
+                        help="number of processes parsing the files, one per CPU by default.")
     args = parser.parse_args()
     return args
 
 
-def seach_defalt_parms(root_path, save_path):
+def seach_defalt_parms(root_path, save_path, cache_path=None, processes=None):
     """
     Scan the definitions in sai_adapter
 
     Args:
         root_path: sai_adapter path
         save_path: path to save result
+        cache_path: cache of the definitions of each file, None to disable it
+        processes: number of processes parsing the files, one per CPU by default
     """
-    good_file = (file for file in os.listdir(root_path)
-                 if file[-3:] == '.py' and file != '__init__.py')
+    good_file = [file for file in os.listdir(root_path)
+                 if file[-3:] == '.py' and file != '__init__.py']
     functions = {}
+    cache = ScanCache(cache_path)
+    definitions = []
+    pending = []
+    for file in good_file:
+        path = os.path.join(root_path, file)
+        key = cache.key(path)
+        file_functions = cache.get(path, key)
+        if file_functions is None:
+            pending.append(path)
+        definitions.append((path, key, file_functions))
+    results = dict(zip(pending, parallel_map(_parse_adapter_file, pending, processes)))
 
     with open(save_path, 'w') as wf:
-        for file in good_file:
-            with open(os.path.join(root_path, file), 'r') as f:
-                module = ast.parse(f.read(), filename='<string>')
-
-            for node in module.body:
-                if isinstance(node, ast.FunctionDef):
-                    args = []
-                    for a in node.args.args:
-                        if a.arg == 'client' or a.arg == 'self':
-                            continue
-                        args.append(a.arg)
-                    if node.name not in functions:
-                        functions[node.name] = args
+        for (path, key, file_functions) in definitions:
+            if file_functions is None:
+                file_functions = results[path]
+                cache.set(path, key, file_functions)
+            for (name, args) in file_functions:
+                if name not in functions:
+                    functions[name] = args
 
         json.dump(functions, wf)
+    cache.save(root_path)
+
+
+def _parse_adapter_file(path):
+    """
+    Parse the function definitions of a file
+
+    Args:
+        path: file path
+
+    Return:
+        list of [function name, argument names]
+    """
+    with open(path, 'r') as f:
+        module = ast.parse(f.read(), filename='<string>')
+
+    file_functions = []
+    for node in module.body:
+        if isinstance(node, ast.FunctionDef):
+            args = []
+            for a in node.args.args:
+                if a.arg == 'client' or a.arg == 'self':
+                    continue
+                args.append(a.arg)
+            file_functions.append([node.name, args])
+    return file_functions
 
 
 if __name__ == "__main__":
@@ -57,4 +96,4 @@ if __name__ == "__main__":
     os.makedirs(PRIORI_RESULT_SAVE_DIR, exist_ok=True)
     save_path = os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME)
     for root_path in parser.path_list:
-        seach_defalt_parms(root_path, save_path)  # Static Scanning
+        seach_defalt_parms(root_path, save_path, parser.cache or None, parser.processes)  # Static Scanning
@@ -9,35 +9,50 @@ import sys
 from pyclibrary import CParser
 
 from constant import (IGNORE_HEADER_FILE_LIST, PRIORI_RESULT_SAVE_DIR,
-                      SAI_HEADER_FILENAME, SAI_HEADER_FILENAME_UPLOAD)
+                      SAI_HEADER_FILENAME, SAI_HEADER_FILENAME_UPLOAD,
+                      SAI_HEADER_SCAN_CACHE_FILENAME, SCAN_CACHE_DIR)
 from data_model.sai_interface_header import SAIInterfaceHeader
-from sai_report_utils import store_result
+from sai_report_utils import ScanCache, parallel_map, store_result
 
 
-def parse(dir_path):
+def parse(dir_path, cache_path=os.path.join(SCAN_CACHE_DIR, SAI_HEADER_SCAN_CACHE_FILENAME), processes=None):
     """
     Parse SAI hearder files to a json file
 
+    The API structs of the headers that did not change since the previous run are
+    taken from the cache, the other headers are parsed in a process pool.
+
     Args:
         dir_path: path of SAI headers
+        cache_path: cache of the API structs of each header, None to disable it
+        processes: number of processes parsing the headers, one per CPU by default
     """
     sai_apis = dict()
     sai_apis_upload = list()
+    cache = ScanCache(cache_path)
+    headers = list()
+    pending = list()
     for (root, _, filenames) in os.walk(dir_path):
         for filename in filenames:
             if filename.endswith(".h") and filename not in IGNORE_HEADER_FILE_LIST:
-                parser = CParser([root + "/" + filename])
-                for key in parser.defs['structs']:
-                    if "api" in key:
-                        sai_api_list = _parse_api_list_struct(parser, key)
-                        intf_groupname = "SAI_API_" + \
-                            filename.split(".")[0].split("sai")[1].upper()
-                        intf_groupalias = key[1:]
-                        filename = filename.split(".")[0]
-                        sai_apis = generate_sai_header_json(
-                            intf_groupname, intf_groupalias, sai_api_list, filename, sai_apis)
-                        generate_sai_header_upload_json(
-                            intf_groupname, intf_groupalias, sai_api_list, filename, sai_apis_upload)
+                path = root + "/" + filename
+                key = cache.key(path, filename)
+                api_structs = cache.get(path, key)
+                if api_structs is None:
+                    pending.append((path, filename))
+                headers.append((path, key, api_structs))
+
+    results = dict(zip((path for path, _ in pending), parallel_map(_parse_header_file, pending, processes)))
+    for (path, key, api_structs) in headers:
+        if api_structs is None:
+            api_structs = results[path]
+            cache.set(path, key, api_structs)
+        for (intf_groupname, intf_groupalias, sai_api_list, filename) in api_structs:
+            sai_apis = generate_sai_header_json(
+                intf_groupname, intf_groupalias, sai_api_list, filename, sai_apis)
+            generate_sai_header_upload_json(
+                intf_groupname, intf_groupalias, sai_api_list, filename, sai_apis_upload)
+    cache.save(dir_path)
     os.makedirs(PRIORI_RESULT_SAVE_DIR, exist_ok=True)
     store_result(sai_apis, os.path.join(
         PRIORI_RESULT_SAVE_DIR, SAI_HEADER_FILENAME))
@@ -45,6 +60,30 @@ def parse(dir_path):
         PRIORI_RESULT_SAVE_DIR, SAI_HEADER_FILENAME_UPLOAD))
 
 
+def _parse_header_file(item):
+    """
+    Parse the API structs of a SAI header
+
+    Args:
+        item: (path, filename) of the header
+
+    Return:
+        list of [intf_groupname, intf_groupalias, sai_api_list, filename]
+    """
+    path, filename = item
+    api_structs = list()
+    parser = CParser([path])
+    for key in parser.defs['structs']:
+        if "api" in key:
+            sai_api_list = _parse_api_list_struct(parser, key)
+            intf_groupname = "SAI_API_" + \
+                filename.split(".")[0].split("sai")[1].upper()
+            intf_groupalias = key[1:]
+            filename = filename.split(".")[0]
+            api_structs.append([intf_groupname, intf_groupalias, sai_api_list, filename])
+    return api_structs
+
+
 def generate_sai_header_json(intf_groupname, intf_groupalias, intf_list, filename, sai_apis):
     """
     Generate SAI header json file
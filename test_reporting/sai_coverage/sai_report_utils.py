@@ -2,11 +2,15 @@
 This file defines SAI qualification report utils
 """
 
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from constant import PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME
 
+_json_files = dict()
+
 
 def store_result(data, file_name):
     """
@@ -32,8 +36,139 @@ def seach_defalt_parms(sai_interface, idx):
         the name of attribute
     """
     file_name = os.path.join(PRIORI_RESULT_SAVE_DIR, SAI_ADAPTER_FILENAME)
-    with open(file_name, 'r') as rf:
-        dic = json.load(rf)
-        if sai_interface in dic:
-            return dic[sai_interface][idx - 1]
+    dic = load_json(file_name)
+    if sai_interface in dic:
+        return dic[sai_interface][idx - 1]
     return "unknown"
+
+
+def load_json(file_name):
+    """
+    Load a json file, the content is kept until the file is modified
+
+    Args:
+        file_name: file name
+
+    Return:
+        the loaded json data
+    """
+    mtime = os.stat(file_name).st_mtime_ns
+    if file_name not in _json_files or _json_files[file_name][0] != mtime:
+        with open(file_name, 'r') as f:
+            _json_files[file_name] = (mtime, json.load(f))
+    return _json_files[file_name][1]
+
+
+def file_digest(*file_names):
+    """
+    SHA-256 of the content of files, missing files are skipped
+
+    Args:
+        file_names: file names
+
+    Return:
+        the hex digest
+    """
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        if os.path.isfile(file_name):
+            with open(file_name, 'rb') as f:
+                digest.update(f.read())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def parallel_map(func, items, processes=None, initializer=None, initargs=()):
+    """
+    Apply func to every item in a process pool, in order
+
+    Args:
+        func: module level function
+        items: list of arguments of func
+        processes: number of worker processes, one per CPU by default, 1 to run in this process
+        initializer: function run by each worker before func
+        initargs: arguments of initializer
+
+    Return:
+        the list of results
+    """
+    processes = min(processes or os.cpu_count() or 1, len(items))
+    if processes <= 1:
+        if initializer and items:
+            initializer(*initargs)
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=processes, initializer=initializer, initargs=initargs) as executor:
+        return list(executor.map(func, items))
+
+
+class ScanCache(object):
+    """
+    Per-file scan results keyed by the hash of the file content
+
+    Args:
+        path: cache file, None to disable the cache
+        salt: mixed into every key, e.g. the digest of the inputs the results depend on
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, salt=""):
+        self.path = path
+        self.salt = salt
+        self.entries = dict()
+        self.seen = dict()
+        self.hits = 0
+        self.dirty = False
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.entries = data["entries"]
+            except (ValueError, KeyError):
+                print("Ignoring corrupted scan cache " + path)
+
+    def key(self, file_name, *extra):
+        digest = hashlib.sha256(self.salt.encode())
+        for value in extra:
+            digest.update(str(value).encode() + b'\0')
+        with open(file_name, 'rb') as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    def get(self, file_name, key):
+        """
+        Return the cached result of file_name if it was scanned with the same key, else None
+        """
+        entry = self.entries.get(file_name)
+        if self.path is None or entry is None or entry["key"] != key:
+            return None
+        self.seen[file_name] = entry
+        self.hits += 1
+        return entry["result"]
+
+    def set(self, file_name, key, result):
+        self.seen[file_name] = {"key": key, "result": result}
+        self.dirty = True
+
+    def save(self, root=None):
+        """
+        Save the entries of the files scanned in this run, those of deleted files are dropped
+
+        Args:
+            root: directory scanned in this run, the entries of files outside of it are kept,
+                  as the same cache file is shared by the scans of several directories
+        """
+        if self.path is None:
+            return
+        print("Scan cache: {} of {} files unchanged".format(self.hits, len(self.seen)))
+        prefix = os.path.join(root, "") if root else ""
+        entries = {name: entry for name, entry in self.entries.items() if not name.startswith(prefix)}
+        entries.update(self.seen)
+        if not self.dirty and entries.keys() == self.entries.keys():
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", 'w') as f:
+            # json.dumps encodes in C, json.dump does not
+            f.write(json.dumps({"version": self.VERSION, "entries": entries}))
+        os.replace(self.path + ".tmp", self.path)
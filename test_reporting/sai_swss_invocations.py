@@ -1,6 +1,10 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from curses.ascii import isupper
+import gzip
 import json
+import os
+import re
 
 from os import listdir
 from os.path import isfile, join, basename
@@ -8,11 +12,18 @@ from typing import Dict, List, Tuple
 from report_data_storage import KustoConnector
 import yaml
 
+# timestamp|op|...|SAI_OBJECT_TYPE_X[:key]|attributes: the object type is the first field starting with
+# SAI_OBJECT_TYPE, like in get_object_type_from_log
+SAIREDIS_LINE_RE = re.compile(r'([^|]*)\|([^|])\|(?:[^|]*\|)*?(SAI_OBJECT_TYPE_[^|:]*)(?::[^|]*)?(.*)')
+# sairedis.rec, sairedis.rec.1, sairedis.rec.2.gz, sairedis.asic0.rec...
+SAIREDIS_RECORDING_RE = re.compile(r'sairedis.*\.rec(\.\d+)?(\.gz)?$')
 
-def _run_script() -> Dict:
+
+def _run_script() -> Tuple:
     '''
     Return:
         config: swss file
+        args: command line arguments
     '''
     parser = argparse.ArgumentParser(
         description="Upload sairedis log to Kusto.",
@@ -26,10 +37,16 @@ def _run_script() -> Dict:
     )
     parser.add_argument('--config_path', type=str,
                         help="your yaml file path\n")
+    parser.add_argument('--summary', action='store_true',
+                        help="stream the recordings (rotated and gzipped ones included)\n"
+                             "and write the invocation counts per API, object type and\n"
+                             "attribute instead of one item per invocation\n")
+    parser.add_argument('--processes', '-j', type=int, default=None,
+                        help="number of recordings scanned in parallel with --summary\n")
     args = parser.parse_args()
     with open(args.config_path, 'r', encoding='utf-8') as f:
         yaml_config = yaml.safe_load(f)
-    return yaml_config
+    return yaml_config, args
 
 
 def get_files_from_path(path: str) -> List:
@@ -329,6 +346,135 @@ def generate_json_logs(config: Dict,
                          sai_obj_feature_map, info)
 
 
+def get_recordings_from_path(path: str) -> List:
+    '''
+    Args:
+        path: where we search the recordings
+    Return:
+        sairedis recordings, rotated and gzipped ones included
+    '''
+    return sorted(join(path, f) for f in listdir(path)
+                  if isfile(join(path, f)) and SAIREDIS_RECORDING_RE.search(f))
+
+
+def scan_recording(log_file: str, operation_map: Dict) -> Dict:
+    '''count the invocations of a recording, streaming it line by line
+    Args:
+        log_file: sairedis recording, gzipped or not
+        operation_map: single character to operation name   eg: c -> create
+    Return:
+        counts: (sai_op, sai_obj, attribute key) -> [count, first log time, last log time],
+                the attribute key is None for the invocations without attributes
+    '''
+    counts = {}
+    opener = gzip.open if log_file.endswith('.gz') else open
+    with opener(log_file, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if 'SAI_OBJECT_TYPE' not in line:
+                continue
+            match = SAIREDIS_LINE_RE.match(line)
+            if not match:
+                continue
+            log_time, op_char, sai_obj, rest = match.groups()
+            op = operation_map.get(op_char)
+            if not op:
+                continue
+            rest = rest.rstrip()
+            if isupper(op_char):
+                # ||object_id|attr=value|...||object_id|attr=value|...
+                attr_keys = []
+                for joined in rest.split('||')[1:]:
+                    splits = joined.split('|')[1:]
+                    attr_keys.extend([split.split('=', 1)[0] for split in splits] or [None])
+            else:
+                attr_keys = [item.split('=', 1)[0] for item in rest.split('|') if '=' in item] or [None]
+            for attr_key in attr_keys:
+                key = (op, sai_obj, attr_key)
+                entry = counts.get(key)
+                if entry is None:
+                    counts[key] = [1, log_time, log_time]
+                else:
+                    entry[0] += 1
+                    entry[2] = log_time
+    return counts
+
+
+def _scan_recording(item: Tuple) -> Dict:
+    return scan_recording(*item)
+
+
+def summarize_json_logs(config: Dict,
+                        info: Dict,
+                        sai_obj_feature_map: Dict,
+                        processes: int = None) -> str:
+    '''count the invocations of the recordings of a device per API, object type and attribute
+    Args:
+        config: swss config
+        info: info of the one device log config
+        sai_obj_feature_map: sai obgject maps to feature
+        processes: number of recordings scanned in parallel, one per CPU by default
+    Return:
+        path of the json summary
+    '''
+    file_list = get_files_from_path(config['sai_path'])
+    sai_feature_file_map = generate_sai_feature_file_map_from_header_files(
+        file_list)
+    features = generate_sai_feature_from_header_files(file_list)
+    files = get_recordings_from_path(info['log_path'])
+    print("Summarize {} recordings of {}".format(len(files), info['device']))
+
+    items = [(f, config['operation_map']) for f in files]
+    processes = min(processes or os.cpu_count() or 1, len(items))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_scan_recording, items))
+    else:
+        results = [_scan_recording(item) for item in items]
+
+    totals = {}
+    for counts in results:
+        for key, (count, first_time, last_time) in counts.items():
+            total = totals.get(key)
+            if total is None:
+                totals[key] = [count, first_time, last_time]
+            else:
+                total[0] += count
+                total[1] = min(total[1], first_time)
+                total[2] = max(total[2], last_time)
+
+    summary = []
+    for (op, sai_obj, attr_key), (count, first_time, last_time) in sorted(
+            totals.items(), key=lambda item: (item[0][1], item[0][0], item[0][2] or '')):
+        sai_feature = get_sai_feature_from_sai_obj(
+            sai_obj, features, sai_obj_feature_map)
+        header_file = get_sai_header_file_from_sai_obj(
+            sai_feature, sai_feature_file_map)
+        if not sai_feature or not header_file:
+            continue
+        summary.append({
+            'sai_api': get_sai_api(op, sai_obj),
+            'sai_op': op,
+            'sai_obj': sai_obj,
+            'sai_feature': sai_feature,
+            'header_file': header_file,
+            'sai_obj_attr_key': attr_key,
+            'count': count,
+            'first_log_time': first_time,
+            'last_log_time': last_time,
+            'device': info['device'],
+            'os_version': info['os_version'],
+            'deployment_type': info['deployment_type'],
+            'deployment_subtype': info['deployment_subtype'],
+            'ngsdevice_type': config['ngsdevice_type'],
+        })
+
+    json_file = config['json_log_path'] + "/" + info['device'] + ".sairedis_summary.json"
+    print("write to file {}".format(json_file))
+    with open(json_file, 'w') as f:
+        json.dump(summary, f, sort_keys=True, indent=4)
+    return json_file
+
+
 def ingest_json_logs(json_log_path: str) -> None:
     '''ingest json to the kusto table
     Args:
@@ -390,8 +536,12 @@ if __name__ == "__main__":
        and os_version in swss_device_log_items
     3. set the swss log input folders swss_log_paths
     '''
-    config = _run_script()
+    config, args = _run_script()
     sai_obj_feature_map = {}
     for info in config['swss_device_log_items']:
-        generate_json_logs(config, info, sai_obj_feature_map)
-    ingest_json_logs(config['json_log_path'])
+        if args.summary:
+            summarize_json_logs(config, info, sai_obj_feature_map, args.processes)
+        else:
+            generate_json_logs(config, info, sai_obj_feature_map)
+    if not args.summary:
+        ingest_json_logs(config['json_log_path'])
@@ -4,6 +4,7 @@ import pytest
 
 from test_reporting.junit_xml_parser import validate_junit_xml_stream, validate_junit_xml_file
 from test_reporting.junit_xml_parser import validate_junit_xml_archive, parse_test_result, JUnitXMLValidationError
+from test_reporting.junit_xml_parser import stream_junit_xml_file, stream_junit_xml_archive
 
 
 VALID_TEST_RESULT = """<?xml version="1.0" encoding="utf-8"?>
@@ -242,6 +243,59 @@ def test_json_output_from_archive():
     assert ordered(parse_test_result(roots)) == ordered(EXPECTED_JSON_OUTPUT)
 
 
+def test_stream_json_output_from_file():
+    expected = parse_test_result([(validate_junit_xml_file(VALID_TEST_RESULT_FILE), VALID_TEST_RESULT_FILE)])
+    assert stream_junit_xml_file(VALID_TEST_RESULT_FILE) == expected
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_stream_json_output_from_archive(processes):
+    roots = sorted(validate_junit_xml_archive(VALID_TEST_RESULT_ARCHIVE), key=lambda root: root[1])
+    assert stream_junit_xml_archive(VALID_TEST_RESULT_ARCHIVE, processes=processes) == parse_test_result(roots)
+
+
+def test_stream_json_output_from_testsuites(tmp_path):
+    document = tmp_path / "testsuites.xml"
+    testsuite = VALID_TEST_RESULT.split("?>", 1)[1]
+    document.write_text(f"<testsuites>{testsuite}{testsuite}</testsuites>")
+    expected = parse_test_result([(validate_junit_xml_file(str(document)), str(document))])
+    assert stream_junit_xml_file(str(document)) == expected
+
+
+@pytest.mark.parametrize(
+    "token,replacement,message",
+    [
+        ("</", "<", "could not parse"),
+        ("testsuite", "fail", ".* not found on root element"),
+        ("errors", "bunnies", ".* not found in .* element"),
+        ("hwsku", "host", "duplicate metadata element: .*"),
+        ("classname", "hehe", ".* not found in test case .*"),
+    ],
+)
+def test_stream_invalid_junit_xml(tmp_path, token, replacement, message):
+    document = tmp_path / "invalid.xml"
+    document.write_text(VALID_TEST_RESULT.replace(token, replacement))
+    with pytest.raises(JUnitXMLValidationError, match=message):
+        stream_junit_xml_file(str(document))
+
+
+def test_stream_invalid_junit_xml_archive(tmp_path):
+    (tmp_path / "valid.xml").write_text(VALID_TEST_RESULT)
+    (tmp_path / "invalid.xml").write_text(VALID_TEST_RESULT.replace("classname", "hehe"))
+    expected = parse_test_result([(validate_junit_xml_file(str(tmp_path / "valid.xml")), "valid.xml")])
+    assert stream_junit_xml_archive(str(tmp_path), processes=1) == expected
+    with pytest.raises(JUnitXMLValidationError, match="could not parse .*invalid.xml"):
+        stream_junit_xml_archive(str(tmp_path), strict=True, processes=1)
+
+
+@pytest.mark.parametrize("exploit_string", ["billion laughs", "external entity", "dtd retrieval"])
+def test_stream_junit_xml_exploits(tmp_path, exploit_string):
+    document = tmp_path / "exploit.xml"
+    document.write_text(exploits[exploit_string])
+    with pytest.raises(JUnitXMLValidationError, match="could not parse"):
+        stream_junit_xml_file(str(document))
+
+
 def test_xml_file_not_found():
     with pytest.raises(JUnitXMLValidationError, match="file not found"):
         validate_junit_xml_file("nonexistent.xml")
@@ -0,0 +1,93 @@
+"""Tests for the local SQLite report store."""
+import os
+import pytest
+
+from test_reporting.junit_xml_parser import stream_junit_xml_file
+from test_reporting.report_data_storage import SQLiteConnector
+
+
+VALID_TEST_RESULT_FILE = os.path.join(os.path.dirname(__file__), "files", "sample_tr.xml")
+
+
+def _report(timestamp, results, testbed="vms-kvm-t0"):
+    cases = {}
+    for name, (result, time) in results.items():
+        cases.setdefault("bgp", []).append({
+            "classname": "bgp.test_bgp", "file": "bgp/test_bgp.py", "line": "1", "name": name,
+            "time": str(time), "result": result, "error": result == "error", "summary": ""})
+    failures = sum(result == "failure" for result, _ in results.values())
+    return {
+        "test_metadata": {"testbed": testbed, "timestamp": timestamp},
+        "test_cases": cases,
+        "test_summary": {"tests": str(len(results)), "failures": str(failures), "errors": "0",
+                         "skipped": "0", "time": str(sum(time for _, time in results.values()))},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    connector = SQLiteConnector(str(tmp_path / "history.db"))
+    yield connector
+    connector.close()
+
+
+def test_upload_parsed_report(store):
+    store.upload_report(stream_junit_xml_file(VALID_TEST_RESULT_FILE), "TRACKING_ID#1", "guid-1")
+    report = store.query("SELECT * FROM reports")[0]
+    assert report["id"] == "guid-1"
+    assert report["testbed"] == "vms-kvm-t0"
+    assert report["tests"] == 4
+    assert store.query("SELECT COUNT(*) AS cases FROM test_cases WHERE report_id = ?", ["guid-1"]) == [{"cases": 4}]
+
+
+def test_upload_same_guid(store):
+    # One upload shares its GUID between all its files, each file is a report
+    store.upload_report(_report("2026-10-01 01:00:00.000000", {"test_a": ("success", 1)}), "", "guid-1")
+    store.upload_report(_report("2026-10-01 02:00:00.000000", {"test_b": ("failure", 1)}), "", "guid-1")
+    assert store.query("SELECT COUNT(*) AS reports FROM reports") == [{"reports": 2}]
+    assert store.query("SELECT COUNT(*) AS cases FROM test_cases") == [{"cases": 2}]
+
+    # The same report uploaded again replaces its rows
+    store.upload_report(_report("2026-10-01 02:00:00.000000", {"test_b": ("failure", 1)}), "", "guid-1")
+    assert store.query("SELECT COUNT(*) AS reports FROM reports") == [{"reports": 2}]
+    assert store.query("SELECT COUNT(*) AS cases FROM test_cases") == [{"cases": 2}]
+    assert [(row["name"], row["runs"]) for row in store.failure_rates()] == [("test_b", 1), ("test_a", 1)]
+    assert [(row["name"], row["runs"]) for row in store.duration_percentiles()] == [("test_a", 1), ("test_b", 1)]
+
+
+def test_duration_percentiles(store):
+    for i in range(1, 11):
+        store.upload_report(_report(f"2026-10-{i:02d} 00:00:00.000000",
+                                    {"test_a": ("success", i), "test_b": ("skipped", 0)}), "", f"guid-{i}")
+    durations = store.duration_percentiles(percentiles=(50, 90))
+    assert len(durations) == 1
+    assert durations[0]["name"] == "test_a"
+    assert durations[0]["runs"] == 10
+    assert (durations[0]["p50"], durations[0]["p90"], durations[0]["max"]) == (5, 9, 10)
+
+
+def test_failure_rates_and_streaks(store):
+    results = ["success", "failure", "success", "failure", "success", "failure", "failure", "failure"]
+    for i, result in enumerate(results):
+        store.upload_report(_report(f"2026-10-{i + 1:02d} 00:00:00.000000",
+                                    {"test_flaky": (result, 1), "test_stable": ("success", 1)}), "", f"guid-{i}")
+
+    rates = {row["name"]: row for row in store.failure_rates()}
+    assert rates["test_flaky"]["failures"] == 5
+    assert rates["test_flaky"]["flips"] == 5
+    assert rates["test_stable"]["failure_rate"] == 0
+
+    streaks = store.failure_streaks()
+    assert [(row["name"], row["streak"]) for row in streaks] == [("test_flaky", 3)]
+    assert streaks[0]["last_pass"] == "2026-10-05 00:00:00.000000"
+
+
+def test_testbed_trends(store):
+    store.upload_report(_report("2026-10-01 01:00:00.000000", {"test_a": ("success", 1)}, "tb1"), "", "guid-1")
+    store.upload_report(_report("2026-10-01 02:00:00.000000", {"test_a": ("failure", 1)}, "tb1"), "", "guid-2")
+    store.upload_report(_report("2026-10-02 01:00:00.000000", {"test_a": ("success", 1)}, "tb2"), "", "guid-3")
+    trends = store.testbed_trends()
+    assert [(row["testbed"], row["period"], row["reports"], row["pass_rate"]) for row in trends] == [
+        ("tb1", "2026-10-01", 2, 0.5), ("tb2", "2026-10-02", 1, 1.0)]
+    with pytest.raises(ValueError):
+        store.testbed_trends(period="year")
@@ -0,0 +1,40 @@
+"""Tests for the scan cache of the SAI coverage scanners."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sai_coverage"))
+
+from sai_report_utils import ScanCache  # noqa: E402
+
+
+def _scan(cache_path, root):
+    cache = ScanCache(cache_path)
+    for filename in sorted(os.listdir(root)):
+        path = os.path.join(root, filename)
+        key = cache.key(path)
+        if cache.get(path, key) is None:
+            cache.set(path, key, filename)
+    cache.save(root)
+    return cache.hits
+
+
+def test_scan_cache_shared_by_roots(tmp_path):
+    cache_path = str(tmp_path / "cache" / "scan.json")
+    roots = []
+    for name in ["sai_test", "ptf"]:
+        root = tmp_path / name
+        root.mkdir()
+        for i in range(3):
+            (root / "test_{}.py".format(i)).write_text(name + str(i))
+        roots.append(str(root))
+
+    # Scanning one root keeps the entries of the other one
+    assert [_scan(cache_path, root) for root in roots] == [0, 0]
+    assert [_scan(cache_path, root) for root in roots] == [3, 3]
+
+    # Changed and deleted files are only dropped from the root they are in
+    (tmp_path / "ptf" / "test_0.py").write_text("changed")
+    (tmp_path / "ptf" / "test_1.py").unlink()
+    assert _scan(cache_path, roots[1]) == 1
+    assert [_scan(cache_path, root) for root in roots] == [3, 2]
+    assert len(ScanCache(cache_path).entries) == 5
@@ -8,6 +8,7 @@ Can be used for any TLS-based service testing: gNOI, gNMI, REST API, etc.
 """
 import os
 import ipaddress
+import tempfile
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple, List
 
@@ -387,3 +388,201 @@ def create_gnmi_cert_generator(server_ip: str, **kwargs) -> TlsCertificateGenera
     gnmi_defaults.update(kwargs)
 
     return TlsCertificateGenerator(server_ip=server_ip, **gnmi_defaults)
+
+
+class CertificateFactory:
+    """
+    Session-cached certificate factory.
+
+    RSA key generation is the expensive part of a certificate set, so CA certificates and
+    private keys are created once and kept in a cache directory; leaf certificates, CSRs and
+    CRLs are signed in memory on request. Tests that rebuild the same CA/server/client set for
+    every module reuse the cached material instead of running openssl for each file.
+
+    Example:
+        factory = get_certificate_factory()
+        ca_key, ca_cert = factory.ca("gnmiCA", "test.gnmi.sonic", days=1825)
+        key = factory.key("gnmiserver")
+        cert = factory.issue(ca_key, ca_cert, key.public_key(), "test.server.gnmi.sonic",
+                             ip_addresses=["10.0.0.1"], dns_names=["hostname.com"])
+    """
+
+    def __init__(self, cache_dir: str, key_size: int = 2048, backdate_days: int = 1):
+        """
+        Args:
+            cache_dir: Directory holding the cached CA certificates and keys
+            key_size: RSA key size in bits
+            backdate_days: Days to backdate not_valid_before to handle clock skew
+        """
+        self.cache_dir = cache_dir
+        self.key_size = key_size
+        self.backdate_days = backdate_days
+        self._keys = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _validity(self, days: int) -> Tuple[datetime, datetime]:
+        now = datetime.now(timezone.utc)
+        return now - timedelta(days=self.backdate_days), now + timedelta(days=int(days))
+
+    def load_key(self, pem: bytes) -> rsa.RSAPrivateKey:
+        """Load a PEM private key, parsed keys are kept in memory since loading validates the key."""
+        if pem not in self._keys:
+            self._keys[pem] = serialization.load_pem_private_key(pem, password=None)
+        return self._keys[pem]
+
+    def key(self, name: str) -> rsa.RSAPrivateKey:
+        """Return the cached private key 'name', generating it on first use."""
+        path = self._path(name + ".key")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return self.load_key(f.read())
+        key = rsa.generate_private_key(public_exponent=65537, key_size=self.key_size)
+        pem = key_pem(key)
+        with open(path, "wb") as f:
+            f.write(pem)
+        self._keys[pem] = key
+        return key
+
+    def ca(self, name: str, cn: str, days: int = 1825) -> Tuple[rsa.RSAPrivateKey, x509.Certificate]:
+        """Return the cached self-signed CA 'name' valid for 'days', generating it on first use."""
+        key = self.key(name)
+        path = self._path("{}-{}.pem".format(name, days))
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return key, x509.load_pem_x509_certificate(f.read())
+
+        not_valid_before, not_valid_after = self._validity(days)
+        subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)])
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(subject)
+            .issuer_name(subject)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(not_valid_before)
+            .not_valid_after(not_valid_after)
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+            .add_extension(x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False)
+            .sign(key, hashes.SHA256())
+        )
+        with open(path, "wb") as f:
+            f.write(cert_pem(cert))
+        return key, cert
+
+    @staticmethod
+    def csr(key: rsa.RSAPrivateKey, cn: str) -> x509.CertificateSigningRequest:
+        """Create a certificate signing request for 'cn'."""
+        return (
+            x509.CertificateSigningRequestBuilder()
+            .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)]))
+            .sign(key, hashes.SHA256())
+        )
+
+    def issue(
+        self,
+        ca_key: rsa.RSAPrivateKey,
+        ca_cert: x509.Certificate,
+        public_key,
+        cn: str,
+        days: int = 825,
+        ip_addresses: Optional[List[str]] = None,
+        dns_names: Optional[List[str]] = None,
+        crl_url: Optional[str] = None,
+    ) -> x509.Certificate:
+        """
+        Sign a leaf certificate with the given CA.
+
+        Args:
+            ca_key, ca_cert: Signing CA
+            public_key: Public key of the certificate
+            cn: Common Name of the certificate
+            days: Validity period in days
+            ip_addresses, dns_names: Subject Alternative Names
+            crl_url: CRL distribution point
+        """
+        not_valid_before, not_valid_after = self._validity(days)
+        builder = (
+            x509.CertificateBuilder()
+            .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)]))
+            .issuer_name(ca_cert.subject)
+            .public_key(public_key)
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(not_valid_before)
+            .not_valid_after(not_valid_after)
+        )
+        san = [x509.DNSName(name) for name in dns_names or []]
+        san += [x509.IPAddress(ipaddress.ip_address(ip)) for ip in ip_addresses or []]
+        if san:
+            builder = builder.add_extension(x509.SubjectAlternativeName(san), critical=False)
+        if crl_url:
+            builder = builder.add_extension(
+                x509.CRLDistributionPoints([
+                    x509.DistributionPoint(
+                        full_name=[x509.UniformResourceIdentifier(crl_url)],
+                        relative_name=None, reasons=None, crl_issuer=None,
+                    )
+                ]),
+                critical=False,
+            )
+        return builder.sign(ca_key, hashes.SHA256())
+
+    def crl(
+        self,
+        ca_key: rsa.RSAPrivateKey,
+        ca_cert: x509.Certificate,
+        revoked: List[x509.Certificate],
+        days: int = 30,
+        number: int = 0,
+    ) -> x509.CertificateRevocationList:
+        """Create a CRL signed by the given CA that revokes the given certificates."""
+        now = datetime.now(timezone.utc)
+        builder = (
+            x509.CertificateRevocationListBuilder()
+            .issuer_name(ca_cert.subject)
+            .last_update(now - timedelta(days=self.backdate_days))
+            .next_update(now + timedelta(days=days))
+            .add_extension(x509.CRLNumber(number), critical=False)
+            .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(ca_key.public_key()), critical=False)
+        )
+        for cert in revoked:
+            builder = builder.add_revoked_certificate(
+                x509.RevokedCertificateBuilder()
+                .serial_number(cert.serial_number)
+                .revocation_date(now)
+                .build()
+            )
+        return builder.sign(ca_key, hashes.SHA256())
+
+
+def cert_pem(cert) -> bytes:
+    """Serialize a certificate, CSR or CRL to PEM format."""
+    return cert.public_bytes(serialization.Encoding.PEM)
+
+
+def key_pem(key: rsa.RSAPrivateKey) -> bytes:
+    """Serialize a private key to PEM format (unencrypted, same layout as 'openssl genrsa')."""
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+_certificate_factory = None
+
+
+def get_certificate_factory() -> CertificateFactory:
+    """
+    Return the certificate factory of the test session.
+
+    The cache directory is SONIC_MGMT_CERT_CACHE when set, otherwise a temporary directory
+    created once per session.
+    """
+    global _certificate_factory
+    if _certificate_factory is None:
+        cache_dir = os.environ.get("SONIC_MGMT_CERT_CACHE") or tempfile.mkdtemp(prefix="sonic_mgmt_certs_")
+        _certificate_factory = CertificateFactory(cache_dir)
+    return _certificate_factory
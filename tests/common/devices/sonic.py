@@ -438,9 +438,17 @@ class SonicHost(AnsibleHostBase):
         @return: A dictionary in which key is the service name and values are service status
                  and service type.
         """
-        monit_services_status = {}
         services_status_result = self.shell("sudo monit status", module_ignore_errors=True, verbose=True)
+        return self.parse_monit_services_status(services_status_result)
 
+    @staticmethod
+    def parse_monit_services_status(services_status_result):
+        """
+        @summary: Parse the result of the 'sudo monit status' command.
+        @param services_status_result: Ansible shell result of 'sudo monit status'.
+        @return: Same as get_monit_services_status.
+        """
+        monit_services_status = {}
         exit_code = services_status_result["rc"]
         if exit_code != 0:
             return monit_services_status
@@ -0,0 +1,131 @@
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+BOOT_READINESS_SCRIPT_SRC = "scripts/boot_readiness.py"
+BOOT_READINESS_SCRIPT_DEST = "/tmp/boot_readiness.py"
+
+# Milestones reported by the DUT-side helper, in boot order
+BOOT_MILESTONES = ["kernel", "docker", "database", "swss", "syncd", "services", "ports", "bgp"]
+
+# Boot timeline of the last reboot of each DUT, recorded in the test results by the record_boot_timelines fixture
+_boot_timelines = {}
+
+
+class BootReadinessError(Exception):
+    """The DUT-side helper could not run, the caller falls back to polling from the test server."""
+
+
+class BootReadinessTracker(object):
+    """Waits on the DUT until it is ready after a reboot, and records its boot timeline.
+
+    One run of the DUT-side helper ``scripts/boot_readiness.py`` watches the systemd units, the containers, the port
+    oper status and the BGP sessions of the DUT, and returns as soon as the requested milestones are reached, with
+    the time since boot at which every milestone was reached.
+
+    Attributes:
+        duthost: the SonicHost (or MultiAsicSonicHost) being rebooted.
+        timeline: dictionary of milestone to seconds since boot, of the last wait.
+        pending: dictionary of missing milestone to what was not ready yet, of the last wait.
+    """
+
+    def __init__(self, duthost):
+        self.duthost = duthost
+        self.timeline = {}
+        self.pending = {}
+
+    def _deploy_script(self):
+        logger.debug("Copying %s to %s", BOOT_READINESS_SCRIPT_SRC, self.duthost.hostname)
+        self.duthost.copy(src=BOOT_READINESS_SCRIPT_SRC, dest=BOOT_READINESS_SCRIPT_DEST)
+
+    def _run(self, request):
+        encoded = base64.b64encode(json.dumps(request).encode("utf-8")).decode("ascii")
+        cmd = "python3 {} {}".format(BOOT_READINESS_SCRIPT_DEST, encoded)
+        result = self.duthost.shell(cmd, module_ignore_errors=True, verbose=False)
+        if result["rc"] != 0 and "No such file" in result.get("stderr", ""):
+            # /tmp does not survive a reboot, so the helper is (re)deployed lazily.
+            self._deploy_script()
+            result = self.duthost.shell(cmd, module_ignore_errors=True, verbose=False)
+        return result
+
+    def wait(self, wait_for, timeout, critical_services, check_ports=False, ibgp=True):
+        """
+        Waits until the DUT reaches some milestones.
+
+        Args:
+            wait_for: milestone to wait for, like "services"; the milestones before it are waited for as well.
+            timeout: seconds to wait for.
+            critical_services: containers that have to be running for the "services" milestone.
+            check_ports: whether the "ports" milestone is waited for, when waiting for "bgp".
+            ibgp: whether iBGP sessions are waited for, for the "bgp" milestone.
+
+        Returns:
+            True if all milestones were reached, False on timeout, see self.pending for what was missing.
+
+        Raises:
+            BootReadinessError: the helper failed on the DUT.
+        """
+        milestones = BOOT_MILESTONES[:BOOT_MILESTONES.index(wait_for) + 1]
+        if "ports" in milestones and not check_ports and wait_for != "ports":
+            milestones.remove("ports")
+        asics = getattr(self.duthost, "asics", [])
+        namespaces = [asic.namespace or "" for asic in asics] or [""]
+        frontend_asics = getattr(self.duthost, "frontend_asics", asics)
+        request = {
+            "wait_for": [milestone for milestone in milestones if milestone not in ["swss", "syncd"]],
+            "timeout": timeout,
+            "critical_services": list(critical_services),
+            "namespaces": namespaces,
+            "port_namespaces": [asic.namespace or "" for asic in frontend_asics] or [""],
+            "ibgp": ibgp,
+        }
+        logger.info("Waiting up to {}s for {} to reach milestones {}".format(
+            timeout, self.duthost.hostname, request["wait_for"]))
+        result = self._run(request)
+
+        self.timeline = {}
+        self.pending = {}
+        summary = None
+        for line in result.get("stdout_lines", []):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if "milestone" in event:
+                self.timeline[event["milestone"]] = event["uptime"]
+            elif "done" in event:
+                summary = event
+        if summary is None:
+            raise BootReadinessError("Boot readiness helper failed on {}: {}".format(
+                self.duthost.hostname, result.get("stderr")))
+        self.pending = summary["pending"]
+        if self.timeline:
+            _boot_timelines[self.duthost.hostname] = dict(self.timeline)
+        logger.info("Boot timeline of {}: {}".format(self.duthost.hostname, self.format_timeline()))
+        if not summary["done"]:
+            logger.warning("{} did not reach milestones {}: {}".format(
+                self.duthost.hostname, summary["missing"], self.pending))
+        return summary["done"]
+
+    def format_timeline(self):
+        """Timeline as "kernel 12.3s -> docker 35.0s (+22.7s) -> ...", ordered by time since boot."""
+        steps = []
+        previous = None
+        for milestone, at in sorted(self.timeline.items(), key=lambda item: item[1]):
+            if previous is None:
+                steps.append("{} {:.1f}s".format(milestone, at))
+            else:
+                steps.append("{} {:.1f}s (+{:.1f}s)".format(milestone, at, at - previous))
+            previous = at
+        return " -> ".join(steps)
+
+
+def pop_boot_timelines():
+    """Returns the boot timelines recorded since the last call, as a dictionary of DUT hostname to timeline."""
+    timelines = {}
+    # Reboots of several DUTs run in parallel threads
+    for hostname in list(_boot_timelines):
+        timelines[hostname] = _boot_timelines.pop(hostname)
+    return timelines
@@ -0,0 +1,157 @@
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIGEST_SCRIPT_SRC = "scripts/config_digest.py"
+CONFIG_DIGEST_SCRIPT_DEST = "/tmp/config_digest.py"
+
+
+class ConfigDigest(object):
+    """Digests and partial dumps of the config of a DUT, computed on the DUT.
+
+    Every call runs the DUT-side helper ``scripts/config_digest.py`` once, on the running config (CONFIG_DB) of the
+    host or of an ASIC namespace, or on a config file saved on the DUT. Only the digests, or the requested tables,
+    are sent back to the test server.
+
+    Attributes:
+        duthost: the SonicHost the config belongs to.
+        exclude_tables: tables left out of digests and dumps.
+        exclude_keys: "TABLE|key" entries left out of digests and dumps.
+    """
+
+    def __init__(self, duthost, exclude_tables=None, exclude_keys=None):
+        self.duthost = duthost
+        self.exclude_tables = list(exclude_tables or [])
+        self.exclude_keys = list(exclude_keys or [])
+
+    def _deploy_script(self):
+        logger.debug("Copying %s to %s", CONFIG_DIGEST_SCRIPT_SRC, self.duthost.hostname)
+        self.duthost.copy(src=CONFIG_DIGEST_SCRIPT_SRC, dest=CONFIG_DIGEST_SCRIPT_DEST)
+
+    def _run(self, request):
+        request = dict(request, exclude_tables=self.exclude_tables, exclude_keys=self.exclude_keys)
+        encoded = base64.b64encode(json.dumps(request).encode("utf-8")).decode("ascii")
+        cmd = "python3 {} {}".format(CONFIG_DIGEST_SCRIPT_DEST, encoded)
+        result = self.duthost.shell(cmd, module_ignore_errors=True, verbose=False)
+        if result["rc"] != 0 and "No such file" in result.get("stderr", ""):
+            # /tmp does not survive a reboot, so the helper is (re)deployed lazily.
+            self._deploy_script()
+            result = self.duthost.shell(cmd, module_ignore_errors=True, verbose=False)
+        if result["rc"] != 0:
+            raise RuntimeError("Config digest {} failed on {}: {}".format(
+                request["action"], self.duthost.hostname, result.get("stderr")))
+        return json.loads(result["stdout"])
+
+    def digest(self, namespace=None, config_file=None):
+        """
+        Returns the digests of a config.
+
+        Args:
+            namespace: ASIC namespace of the running config, None for the host.
+            config_file: config file on the DUT to digest instead of the running config.
+
+        Returns:
+            Dictionary of table name to {"digest": table digest, "keys": {key: key digest}}.
+        """
+        return self._run({"action": "digest", "namespace": namespace, "file": config_file})
+
+    def dump(self, tables=None, namespace=None, config_file=None):
+        """
+        Returns the content of some tables of a config, in the `sonic-cfggen --print-data` format.
+
+        Args:
+            tables: table names, None for all tables.
+            namespace: ASIC namespace of the running config, None for the host.
+            config_file: config file on the DUT to read instead of the running config.
+        """
+        if tables is not None and not tables:
+            return {}
+        return self._run({"action": "dump", "namespace": namespace, "file": config_file,
+                          "tables": None if tables is None else sorted(tables)})
+
+
+def changed_tables(pre_digest, cur_digest):
+    """
+    Compares two digests returned by ConfigDigest.digest.
+
+    Returns:
+        Tuple of the sets of tables only in pre_digest, only in cur_digest and in both with a different digest.
+    """
+    pre_tables = set(pre_digest)
+    cur_tables = set(cur_digest)
+    changed = set(table for table in pre_tables & cur_tables
+                  if pre_digest[table]["digest"] != cur_digest[table]["digest"])
+    return pre_tables - cur_tables, cur_tables - pre_tables, changed
+
+
+def changed_keys(pre_table_digest, cur_table_digest):
+    """
+    Compares the key digests of one table.
+
+    Returns:
+        Tuple of the sets of keys only in pre_table_digest, only in cur_table_digest and in both with a different
+        digest.
+    """
+    pre_keys = pre_table_digest["keys"]
+    cur_keys = cur_table_digest["keys"]
+    changed = set(key for key in set(pre_keys) & set(cur_keys) if pre_keys[key] != cur_keys[key])
+    return set(pre_keys) - set(cur_keys), set(cur_keys) - set(pre_keys), changed
+
+
+# Tables whose changes are only taken into account by a service restart or a config reload, a config drift touching
+# them is not restored with a patch
+RELOAD_REQUIRED_TABLES = {
+    "DEVICE_METADATA", "FEATURE", "BREAKOUT_CFG", "PORTCHANNEL", "PORTCHANNEL_MEMBER", "MGMT_INTERFACE",
+    "MGMT_VRF_CONFIG", "MUX_CABLE", "SYSTEM_DEFAULTS", "BUFFER_POOL", "BUFFER_PROFILE", "BUFFER_PG", "BUFFER_QUEUE",
+    "BUFFER_PORT_INGRESS_PROFILE_LIST", "BUFFER_PORT_EGRESS_PROFILE_LIST", "CABLE_LENGTH", "PORT_QOS_MAP", "QUEUE",
+    "SCHEDULER", "WRED_PROFILE", "DSCP_TO_TC_MAP", "TC_TO_QUEUE_MAP", "TC_TO_PRIORITY_GROUP_MAP",
+    "PFC_PRIORITY_TO_PRIORITY_GROUP_MAP", "MAP_PFC_PRIORITY_TO_QUEUE",
+}
+
+
+def _pointer(*tokens):
+    return "".join("/" + token.replace("~", "~0").replace("/", "~1") for token in tokens)
+
+
+def config_patch(pre_config, cur_config, prefix=None, partial_tables=()):
+    """
+    Computes the JSON patch turning cur_config back into pre_config, at key granularity.
+
+    Args:
+        pre_config: config to restore, in the `sonic-cfggen --print-data` format.
+        cur_config: current config, only the tables present in either config are compared.
+        prefix: first token of the paths, like "localhost" or "asic0" for the generic config updater on multi-ASIC
+            DUTs.
+        partial_tables: tables some keys of which were left out of both configs. Such a table missing from one
+            config may still hold the left out keys on the DUT, so it is patched key by key, never as a whole.
+
+    Returns:
+        List of JSON patch operations.
+    """
+    base = (prefix,) if prefix else ()
+    patch = []
+    for table in sorted(set(pre_config) | set(cur_config)):
+        pre_table = pre_config.get(table)
+        cur_table = cur_config.get(table)
+        if table in partial_tables:
+            pre_table = {} if pre_table is None else pre_table
+            cur_table = {} if cur_table is None else cur_table
+        if pre_table is None:
+            patch.append({"op": "remove", "path": _pointer(*(base + (table,)))})
+        elif cur_table is None:
+            patch.append({"op": "add", "path": _pointer(*(base + (table,))), "value": pre_table})
+        elif pre_table != cur_table:
+            if not isinstance(pre_table, dict) or not isinstance(cur_table, dict):
+                patch.append({"op": "replace", "path": _pointer(*(base + (table,))), "value": pre_table})
+                continue
+            for key in sorted(set(pre_table) | set(cur_table)):
+                path = _pointer(*(base + (table, key)))
+                if key not in pre_table:
+                    patch.append({"op": "remove", "path": path})
+                elif key not in cur_table:
+                    patch.append({"op": "add", "path": path, "value": pre_table[key]})
+                elif pre_table[key] != cur_table[key]:
+                    patch.append({"op": "replace", "path": path, "value": pre_table[key]})
+    return patch
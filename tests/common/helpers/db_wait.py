@@ -0,0 +1,231 @@
+"""
+Wait for SONiC database state without polling the DUT over Ansible.
+
+Most state waits in the tests look like:
+
+    pytest_assert(wait_until(60, 5, 0, check_key_in_db, duthost, ...))
+
+where every poll tick runs ``show`` or ``sonic-db-cli`` through Ansible. ``wait_for_db`` expresses the same wait
+as a condition on a table and blocks until the condition holds, using one of the following backends:
+
+    gnmi:     a gNMI STREAM subscription (the ``gnmi_connection`` fixture) on the table, see
+              tests/common/sai_validation/sonic_db.py.
+    keyspace: one Ansible call that runs tests/scripts/sonic_db_batch.py on the DUT, which subscribes to Redis
+              keyspace notifications for the key pattern and re-checks the condition on every change.
+    poll:     the classic wait_until loop with one sonic-db-dump per tick.
+
+With the default ``DB_WAIT_AUTO`` mode, gNMI is used when a connection is given and the condition can be
+observed from update notifications, then keyspace notifications, and polling only if the DUT-side helper
+cannot run. Either way the wait returns within milliseconds of the change instead of on the next poll tick.
+
+Example:
+
+    pytest_assert(wait_for_db(duthost, "STATE_DB", "BFD_SESSION_TABLE", "default|default|*",
+                              field="state", value="Up", min_keys=len(neighbor_addrs), timeout=120),
+                  "BFD sessions did not come up")
+"""
+import fnmatch
+import logging
+import queue
+import time
+
+from tests.common.helpers.constants import DEFAULT_NAMESPACE
+from tests.common.helpers.multi_thread_utils import SafeThreadPoolExecutor
+from tests.common.helpers.sonic_db import SonicDbCli, SonicDbNoCommandOutput, SonicDbPipeline
+from tests.common.utilities import wait_until
+
+logger = logging.getLogger(__name__)
+
+DB_WAIT_AUTO = "auto"
+DB_WAIT_GNMI = "gnmi"
+DB_WAIT_KEYSPACE = "keyspace"
+DB_WAIT_POLL = "poll"
+
+# Databases whose keys are "TABLE|key", all others use "TABLE:key".
+PIPE_SEPARATED_DBS = ("CONFIG_DB", "STATE_DB", "CHASSIS_APP_DB", "CHASSIS_STATE_DB")
+
+
+def get_db_separator(db):
+    return "|" if db in PIPE_SEPARATED_DBS else ":"
+
+
+class DbCondition(object):
+    """
+    Condition on the set of hashes matching a key pattern.
+
+    Attributes:
+        field: Optional hash field the entries must have.
+        value: Optional value the field must have; requires field.
+        absent: If True, the condition holds when no key matches the pattern.
+        min_keys: If set, the condition holds when at least this many entries match field/value. Otherwise it holds
+            when at least one key exists and every matching key satisfies field/value.
+    """
+
+    def __init__(self, field=None, value=None, absent=False, min_keys=None):
+        if value is not None and field is None:
+            raise ValueError("A value can only be checked for a field")
+        self.field = field
+        self.value = None if value is None else str(value)
+        self.absent = absent
+        self.min_keys = min_keys
+
+    def is_met(self, entries):
+        """
+        Evaluates the condition against {key: fields} entries.
+
+        Keep in sync with condition_met in tests/scripts/sonic_db_batch.py, which evaluates it on the DUT.
+        """
+        if self.absent:
+            return not entries
+
+        matched = [key for key, fields in entries.items()
+                   if self.field is None or (self.field in fields and
+                                             (self.value is None or fields[self.field] == self.value))]
+        if self.min_keys is not None:
+            return len(matched) >= self.min_keys
+        return bool(entries) and len(matched) == len(entries)
+
+    def to_dict(self):
+        return {"field": self.field, "value": self.value, "absent": self.absent, "min_keys": self.min_keys}
+
+    def __str__(self):
+        if self.absent:
+            return "absent"
+        desc = "{}={}".format(self.field, self.value) if self.field else "present"
+        if self.min_keys is not None:
+            desc += " for at least {} keys".format(self.min_keys)
+        return desc
+
+
+def _wait_gnmi(gnmi_conn, db, namespace, table, key, condition, timeout):
+    """
+    Waits on a gNMI STREAM subscription of the table.
+
+    The condition is only evaluated once the initial sync completed, so that a partially received table can not
+    satisfy an "every key" condition.
+    """
+    from tests.common.sai_validation.sonic_db import start_db_monitor, stop_db_monitor
+
+    path = "{}/{}/{}".format(db, namespace or "localhost", table)
+    event_queue = queue.Queue()
+    entries = {}
+    synced = False
+    deadline = time.time() + timeout
+
+    with SafeThreadPoolExecutor(max_workers=2) as executor:
+        ctx = start_db_monitor(executor, gnmi_conn, path, event_queue)
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                try:
+                    event = event_queue.get(timeout=remaining)
+                except queue.Empty:
+                    return False
+
+                if event.get("type") == "sync_response":
+                    synced = True
+                elif event.get("type") == "update" and isinstance(event.get("value"), dict):
+                    for event_key, fields in event["value"].items():
+                        if fnmatch.fnmatchcase(event_key, key) and isinstance(fields, dict):
+                            entries.setdefault(event_key, {}).update(fields)
+                elif event.get("type") == "error":
+                    raise RuntimeError(event.get("message"))
+                else:
+                    continue
+
+                if synced and condition.is_met(entries):
+                    return True
+        finally:
+            stop_db_monitor(ctx)
+
+
+def _wait_keyspace(host, db, pattern, condition, timeout):
+    result = SonicDbPipeline(host, db).wait(pattern, condition.to_dict(), timeout)
+    logger.debug("DUT-side wait on %s %s finished: %s", db, pattern, result)
+    return result["satisfied"]
+
+
+def _wait_poll(host, db, table, pattern, condition, timeout, interval):
+    dbcli = SonicDbCli(host, db)
+    prefix = table + get_db_separator(db)
+
+    def _db_condition_met():
+        dump = dbcli.dump(prefix)
+        entries = {k: v.get("value", {}) for k, v in dump.items() if fnmatch.fnmatchcase(k, pattern)}
+        return condition.is_met(entries)
+
+    return wait_until(timeout, interval, 0, _db_condition_met)
+
+
+def wait_for_db(host, db, table, key="*", field=None, value=None, absent=False, min_keys=None,
+                timeout=60, interval=1, delay=0, gnmi_conn=None, mode=DB_WAIT_AUTO):
+    """
+    Waits until the entries of a SONiC database table satisfy a condition.
+
+    Args:
+        host: SonicHost, MultiAsicSonicHost or SonicAsic the database belongs to.
+        db: Database name, e.g. "STATE_DB".
+        table: Table name, e.g. "PORT_TABLE".
+        key: Glob pattern for the key within the table, e.g. "Ethernet0" or "default|default|*".
+        field: Optional hash field the entries must have.
+        value: Optional expected value of field.
+        absent: Wait for no key to match instead.
+        min_keys: Wait for at least this many matching entries instead of all of them.
+        timeout: Maximum time to wait in seconds.
+        interval: Poll interval in seconds, only used by the polling backend.
+        delay: Seconds to sleep before starting to wait.
+        gnmi_conn: Optional gNMI stub (the gnmi_connection fixture) to subscribe with.
+        mode: One of DB_WAIT_AUTO, DB_WAIT_GNMI, DB_WAIT_KEYSPACE and DB_WAIT_POLL.
+
+    Returns:
+        True if the condition was met before the timeout, False otherwise, like wait_until.
+    """
+    condition = DbCondition(field=field, value=value, absent=absent, min_keys=min_keys)
+    pattern = table + get_db_separator(db) + key
+    namespace = getattr(host, "namespace", DEFAULT_NAMESPACE)
+
+    logger.debug("Wait for %s %s to be %s, timeout is %s seconds, mode is %s", db, pattern, condition, timeout, mode)
+    if delay > 0:
+        time.sleep(delay)
+
+    if mode == DB_WAIT_AUTO:
+        # Deletions are not reported by the gNMI subscription, so absence can only be observed in Redis.
+        if gnmi_conn is not None and not absent:
+            mode = DB_WAIT_GNMI
+        else:
+            mode = DB_WAIT_KEYSPACE
+        auto = True
+    else:
+        auto = False
+    if mode == DB_WAIT_GNMI and gnmi_conn is None:
+        raise ValueError("A gNMI connection is needed to wait for {} {} with gNMI".format(db, pattern))
+
+    start = time.time()
+    if mode == DB_WAIT_GNMI:
+        try:
+            result = _wait_gnmi(gnmi_conn, db, namespace, table, key, condition, timeout)
+        except RuntimeError as e:
+            if not auto:
+                raise
+            logger.warning("gNMI subscription failed, falling back to keyspace notifications: %s", e)
+            mode = DB_WAIT_KEYSPACE
+            timeout = max(0, timeout - (time.time() - start))
+
+    if mode == DB_WAIT_KEYSPACE:
+        try:
+            result = _wait_keyspace(host, db, pattern, condition, timeout)
+        except SonicDbNoCommandOutput as e:
+            if not auto:
+                raise
+            logger.warning("DUT-side wait is not available, falling back to polling: %s", e)
+            result = _wait_poll(host, db, table, pattern, condition, max(0, timeout - (time.time() - start)),
+                                interval)
+    elif mode == DB_WAIT_POLL:
+        result = _wait_poll(host, db, table, pattern, condition, timeout, interval)
+    elif mode != DB_WAIT_GNMI:
+        raise ValueError("Unknown wait mode: {}".format(mode))
+
+    logger.debug("Wait for %s %s finished with %s after %.3f seconds", db, pattern, result, time.time() - start)
+    return result
@@ -1,4 +1,15 @@
+import glob
+import itertools
 import logging
+import os
+import re
+import shutil
+import tempfile
+
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+
+from tests.common.cert_utils import CertificateFactory, cert_pem, get_certificate_factory, key_pem
 
 logger = logging.getLogger(__name__)
 
@@ -7,6 +18,9 @@ GNMI_CERT_NAME = "test.client.gnmi.sonic"
 REVOKED_GNMICERT_NAME = "test.client.revoked.gnmi.sonic"
 TELEMETRY_CONTAINER = "telemetry"
 
+# Number of root CA rotations in this session, each one gets a new CA
+_root_rotations = itertools.count(1)
+
 
 class GNMIEnvironment(object):
     TELEMETRY_MODE = 0
@@ -189,6 +203,48 @@ def get_ptf_crl_server_ip(duthost, ptfhost):
         return ptfhost.mgmt_ip
 
 
+# Certificates are generated in-process by the session certificate factory: the CA and all
+# private keys are created once per session and cached, certificates and CRLs are signed in
+# memory. The files are still written to the current directory under the names the openssl
+# based flow used, so tests and the CRL server keep finding them where they expect.
+
+def _write(filename, data):
+    with open(filename, 'wb') as file:
+        file.write(data)
+
+
+def _load_ca():
+    with open('gnmiCA.key', 'rb') as file:
+        ca_key = get_certificate_factory().load_key(file.read())
+    with open('gnmiCA.pem', 'rb') as file:
+        ca_cert = x509.load_pem_x509_certificate(file.read())
+    return ca_key, ca_cert
+
+
+def _sign_csr(csr_file, cert_file, days, ip_addresses=None, dns_names=None, crl_url=None):
+    with open(csr_file, 'rb') as file:
+        csr = x509.load_pem_x509_csr(file.read())
+    ca_key, ca_cert = _load_ca()
+    cn = csr.subject.get_attributes_for_oid(NameOID.COMMON_NAME)[0].value
+    cert = get_certificate_factory().issue(ca_key, ca_cert, csr.public_key(), cn, days=int(days),
+                                           ip_addresses=ip_addresses, dns_names=dns_names, crl_url=crl_url)
+    _write(cert_file, cert_pem(cert))
+    return cert
+
+
+def _copy_bundle(host, files, dest):
+    """
+    Copy local files to a host with a single copy task
+    """
+    bundle_dir = tempfile.mkdtemp(prefix='gnmi_certs_')
+    try:
+        for filename in files:
+            shutil.copy(filename, bundle_dir)
+        host.copy(src=bundle_dir + '/', dest=dest)
+    finally:
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+
+
 def create_revoked_cert_and_crl(localhost, ptfhost, duthost=None):
     create_client_key(localhost, revoke=True)
 
@@ -198,50 +254,16 @@ def create_revoked_cert_and_crl(localhost, ptfhost, duthost=None):
     # Get appropriate PTF IP address based on DUT management IP type
     ptf_ip = get_ptf_crl_server_ip(duthost, ptfhost) if duthost else ptfhost.mgmt_ip
     crl_url = "http://{}:1234/crl".format(ptf_ip)
-    create_ca_conf(crl_url, "crlext.cnf")
-    sign_client_certificate(localhost, revoke=True, extension_file="crlext.cnf")
-
-    # create crl config file
-    local_command = "rm -f gnmi/crl/index.txt"
-    localhost.shell(local_command)
-    local_command = "touch gnmi/crl/index.txt"
-    localhost.shell(local_command)
-
-    local_command = "rm -f gnmi/crl/sonic_crl_number"
-    localhost.shell(local_command)
-    local_command = "echo 00 > gnmi/crl/sonic_crl_number"
-    localhost.shell(local_command)
-
-    # revoke cert CRL
-    local_command = "openssl ca \
-                        -revoke gnmiclient.revoked.crt \
-                        -keyfile gnmiCA.key \
-                        -cert gnmiCA.pem \
-                        -config gnmi/crl/crl.cnf"
-
-    localhost.shell(local_command)
-
-    # re-create CRL
-    local_command = "openssl ca \
-                        -gencrl \
-                        -keyfile gnmiCA.key \
-                        -cert gnmiCA.pem \
-                        -out sonic.crl.pem \
-                        -config gnmi/crl/crl.cnf"
-
-    localhost.shell(local_command)
+    revoked_cert = _sign_csr('gnmiclient.revoked.csr', 'gnmiclient.revoked.crt', "825", crl_url=crl_url)
 
-    # copy to PTF for test
-    ptfhost.copy(src='gnmiclient.revoked.crt', dest='/root/')
-    ptfhost.copy(src='gnmiclient.revoked.key', dest='/root/')
-    ptfhost.copy(src='sonic.crl.pem', dest='/root/')
-    ptfhost.copy(src='gnmi/crl/crl_server.py', dest='/root/')
+    # revoke cert and create CRL
+    ca_key, ca_cert = _load_ca()
+    crl = get_certificate_factory().crl(ca_key, ca_cert, [revoked_cert])
+    _write('sonic.crl.pem', cert_pem(crl))
 
-    local_command = "rm \
-                        crlext.cnf \
-                        gnmi/crl/index.* \
-                        gnmi/crl/sonic_crl_number.*"
-    localhost.shell(local_command)
+    # copy to PTF for test
+    _copy_bundle(ptfhost, ['gnmiclient.revoked.crt', 'gnmiclient.revoked.key', 'sonic.crl.pem',
+                           'gnmi/crl/crl_server.py'], '/root/')
 
 
 def create_gnmi_certs(duthost, localhost, ptfhost):
@@ -256,27 +278,35 @@ def create_gnmi_certs(duthost, localhost, ptfhost):
     copy_certificate_to_ptf(ptfhost)
 
 
-def prepare_root_cert(localhost, days="1825"):
-    create_root_key(localhost)
-    create_root_cert(localhost, days)
+def prepare_root_cert(localhost, days="1825", rotate=False):
+    '''
+    Create the root certificate
 
+    The CA is cached for the session. A CA with a non-default validity, and every rotate=True
+    call, get a CA of their own with a new key, so that certificates signed by the previous
+    root no longer verify.
+    '''
+    name = _root_name(days, rotate)
+    create_root_key(localhost, name)
+    create_root_cert(localhost, days, name)
 
-def create_root_key(localhost):
-    local_command = "openssl genrsa -out gnmiCA.key 2048"
-    localhost.shell(local_command)
 
+def _root_name(days, rotate):
+    name = 'gnmiCA'
+    if int(days) != 1825:
+        name += '.{}d'.format(days)
+    if rotate:
+        name += '.rotated{}'.format(next(_root_rotations))
+    return name
 
-def create_root_cert(localhost, days):
-    local_command = "openssl req \
-                            -x509 \
-                            -new \
-                            -nodes \
-                            -key gnmiCA.key \
-                            -sha256 \
-                            -days {} \
-                            -subj '/CN=test.gnmi.sonic' \
-                            -out gnmiCA.pem".format(days)
-    localhost.shell(local_command)
+
+def create_root_key(localhost, name='gnmiCA'):
+    _write('gnmiCA.key', key_pem(get_certificate_factory().key(name)))
+
+
+def create_root_cert(localhost, days, name='gnmiCA'):
+    _, ca_cert = get_certificate_factory().ca(name, 'test.gnmi.sonic', days=int(days))
+    _write('gnmiCA.pem', cert_pem(ca_cert))
 
 
 def prepare_server_cert(duthost, localhost, days="825"):
@@ -286,33 +316,16 @@ def prepare_server_cert(duthost, localhost, days="825"):
 
 
 def create_server_key(localhost):
-    local_command = "openssl genrsa -out gnmiserver.key 2048"
-    localhost.shell(local_command)
+    _write('gnmiserver.key', key_pem(get_certificate_factory().key('gnmiserver')))
 
 
 def create_server_csr(localhost):
-    local_command = "openssl req \
-                            -new \
-                            -key gnmiserver.key \
-                            -subj '/CN=test.server.gnmi.sonic' \
-                            -out gnmiserver.csr"
-    localhost.shell(local_command)
+    key = get_certificate_factory().key('gnmiserver')
+    _write('gnmiserver.csr', cert_pem(CertificateFactory.csr(key, 'test.server.gnmi.sonic')))
 
 
 def sign_server_certificate(duthost, localhost, days):
-    create_ext_conf(duthost.mgmt_ip, "extfile.cnf")
-    local_command = "openssl x509 \
-                            -req \
-                            -in gnmiserver.csr \
-                            -CA gnmiCA.pem \
-                            -CAkey gnmiCA.key \
-                            -CAcreateserial \
-                            -out gnmiserver.crt \
-                            -days {} \
-                            -sha256 \
-                            -extensions req_ext \
-                            -extfile extfile.cnf".format(days)
-    localhost.shell(local_command)
+    _sign_csr('gnmiserver.csr', 'gnmiserver.crt', days, ip_addresses=[duthost.mgmt_ip], dns_names=['hostname.com'])
 
 
 def prepare_client_cert(localhost, days="825"):
@@ -323,62 +336,49 @@ def prepare_client_cert(localhost, days="825"):
 
 def create_client_key(localhost, revoke=False):
     revoke_suffix = "revoked." if revoke else ""
-    local_command = "openssl genrsa -out gnmiclient.{}key 2048".format(revoke_suffix)
-    localhost.shell(local_command)
+    key = get_certificate_factory().key('gnmiclient.revoked' if revoke else 'gnmiclient')
+    _write('gnmiclient.{}key'.format(revoke_suffix), key_pem(key))
 
 
 def create_client_csr(localhost, revoke=False):
     revoke_suffix = "revoked." if revoke else ""
     cn = REVOKED_GNMICERT_NAME if revoke else GNMI_CERT_NAME
-    local_command = "openssl req \
-                            -new \
-                            -key gnmiclient.{}key \
-                            -subj '/CN={}' \
-                            -out gnmiclient.{}csr".format(revoke_suffix, cn, revoke_suffix)
-    localhost.shell(local_command)
+    key = get_certificate_factory().key('gnmiclient.revoked' if revoke else 'gnmiclient')
+    _write('gnmiclient.{}csr'.format(revoke_suffix), cert_pem(CertificateFactory.csr(key, cn)))
 
 
 def sign_client_certificate(localhost, days="825", revoke=False, extension_file=None):
+    '''
+    Sign the client certificate, extension_file is a create_ca_conf file adding a CRL distribution point
+    '''
     revoke_suffix = "revoked." if revoke else ""
-    extensions = "-extensions req_ext -extfile {}".format(extension_file) if extension_file else ""
-    local_command = "openssl x509 \
-                            -req \
-                            -in gnmiclient.{}csr \
-                            -CA gnmiCA.pem \
-                            -CAkey gnmiCA.key \
-                            -CAcreateserial \
-                            -out gnmiclient.{}crt \
-                            -days {} \
-                            -sha256 {}".format(revoke_suffix, revoke_suffix, days, extensions)
-    localhost.shell(local_command)
+    crl_url = None
+    if extension_file:
+        with open(extension_file) as file:
+            match = re.search(r'crlDistributionPoints=URI:(\S+)', file.read())
+        crl_url = match.group(1) if match else None
+    _sign_csr('gnmiclient.{}csr'.format(revoke_suffix), 'gnmiclient.{}crt'.format(revoke_suffix), days,
+              crl_url=crl_url)
 
 
 def copy_certificate_to_dut(duthost):
     # Copy CA certificate, server certificate and client certificate over to the DUT
-    duthost.copy(src='gnmiCA.pem', dest='/etc/sonic/telemetry/')
-    duthost.copy(src='gnmiserver.crt', dest='/etc/sonic/telemetry/')
-    duthost.copy(src='gnmiserver.key', dest='/etc/sonic/telemetry/')
-    duthost.copy(src='gnmiclient.crt', dest='/etc/sonic/telemetry/')
-    duthost.copy(src='gnmiclient.key', dest='/etc/sonic/telemetry/')
+    _copy_bundle(duthost, ['gnmiCA.pem', 'gnmiserver.crt', 'gnmiserver.key', 'gnmiclient.crt', 'gnmiclient.key'],
+                 '/etc/sonic/telemetry/')
 
 
 def copy_certificate_to_ptf(ptfhost):
     # Copy CA certificate and client certificate over to the PTF
-    ptfhost.copy(src='gnmiCA.pem', dest='/root/')
-    ptfhost.copy(src='gnmiclient.crt', dest='/root/')
-    ptfhost.copy(src='gnmiclient.key', dest='/root/')
+    _copy_bundle(ptfhost, ['gnmiCA.pem', 'gnmiclient.crt', 'gnmiclient.key'], '/root/')
 
 
 def delete_gnmi_certs(localhost):
     '''
     Delete GNMI client certificates
     '''
-    local_command = "rm \
-                        extfile.cnf \
-                        gnmiCA.* \
-                        gnmiserver.* \
-                        gnmiclient.*"
-    localhost.shell(local_command)
+    for pattern in ['extfile.cnf', 'gnmiCA.*', 'gnmiserver.*', 'gnmiclient.*', 'sonic.crl.pem']:
+        for filename in glob.glob(pattern):
+            os.remove(filename)
 
 
 def dump_gnmi_log(duthost):
@@ -3,14 +3,23 @@
 """
 Script to generate PFC packets.
 
+With -S (link speed) or --pps the frames are paced: the frame rate needed to keep the queues paused is
+computed from the link speed and the pause quanta, every interface gets its own sender process (up to the number
+of CPUs) and frames are sent on a busy-wait schedule, since time.sleep() cannot hold sub-millisecond intervals.
+With --stats the achieved rate and the send jitter are written as JSON when the generator ends or is killed
+with SIGTERM.
 """
 import binascii
+import json
+import os
 import sys
 import optparse
 import logging
 import logging.handlers
+import signal
 import time
 import multiprocessing
+from array import array
 
 from socket import socket, AF_PACKET, SOCK_RAW
 
@@ -19,13 +28,47 @@ logger.setLevel(logging.DEBUG)
 
 # Maximum number of processes to be created
 MAX_PROCESS_NUM = 4
+# Bit times per pause quanta
+QUANTA_BITS = 512
+# Remaining time to the next frame below which the sender spins instead of sleeping
+SPIN_THRESHOLD = 0.002
+# Maximum number of send intervals kept for the jitter percentiles
+MAX_INTERVAL_SAMPLES = 1000000
+
+clock = getattr(time, "perf_counter", time.time)
+
+_stop = [False]
+
+
+def _request_stop(signum, frame):
+    _stop[0] = True
+
+
+def frame_interval(speed_gbps, quanta, refresh):
+    """
+    Interval between frames that keeps a queue paused: a frame pauses the queue for quanta * 512 bit times,
+    it is refreshed after 'refresh' of that time.
+    """
+    return refresh * quanta * QUANTA_BITS / (speed_gbps * 1e9)
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def _at(percent):
+        return round(values[min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))] * 1e6, 3)
+
+    return {"avg": round(sum(values) / len(values) * 1e6, 3), "p50": _at(50), "p99": _at(99),
+            "max": round(values[-1] * 1e6, 3)}
 
 
 class PacketSender():
     """
     A class to send PFC pause frames
     """
-    def __init__(self, interfaces, packet, num, interval):
+    def __init__(self, interfaces, packet, num, interval, burst=1):
         # Create RAW socket to send PFC pause frames
         self.sockets = []
         try:
@@ -36,22 +79,64 @@ class PacketSender():
         except Exception as e:
             print("Unable to create socket. Check your permissions: %s" % e)
             sys.exit(1)
+        self.interfaces = interfaces
         self.packet_num = num
         self.packet_interval = interval
+        # Frames sent back to back to catch up after the sender fell behind the schedule
+        self.burst = burst
         self.process = None
+        self.results = None
         self.packet = packet
 
     def send_packets(self):
-        iteration = self.packet_num
-        while iteration > 0:
-            for s in self.sockets:
-                s.send(self.packet)
-                if self.packet_interval > 0:
-                    time.sleep(self.packet_interval)
-            iteration -= 1
-
-    def start(self):
-        self.process = multiprocessing.Process(target=self.send_packets)
+        """
+        Sends the frames, one per interface every packet_interval seconds, and returns the send statistics.
+        """
+        sockets = self.sockets
+        packet = self.packet
+        interval = self.packet_interval
+        intervals = array('d')
+        sent = 0
+        late = 0
+        start = last = next_send = clock()
+        while sent < self.packet_num and not _stop[0]:
+            now = clock()
+            if now < next_send:
+                if next_send - now > SPIN_THRESHOLD:
+                    time.sleep(next_send - now - SPIN_THRESHOLD)
+                continue
+            for s in sockets:
+                s.send(packet)
+            if sent and len(intervals) < MAX_INTERVAL_SAMPLES:
+                intervals.append(now - last)
+            last = now
+            sent += 1
+            next_send += interval
+            if interval and now - next_send > self.burst * interval:
+                # Too far behind, drop the backlog instead of bursting
+                late += 1
+                next_send = now
+        elapsed = clock() - start
+
+        stats = {
+            "interfaces": self.interfaces,
+            "frames": sent,
+            "elapsed": round(elapsed, 6),
+            "target_pps": round(1.0 / interval, 3) if interval else None,
+            "achieved_pps": round(sent / elapsed, 3) if elapsed else 0,
+            "interval_us": _percentiles(intervals),
+            "late": late,
+        }
+        if interval:
+            stats["jitter_us"] = _percentiles([abs(gap - interval) for gap in intervals])
+        return stats
+
+    def _run(self, results):
+        signal.signal(signal.SIGTERM, _request_stop)
+        results.put(self.send_packets())
+
+    def start(self, results):
+        self.process = multiprocessing.Process(target=self._run, args=(results,))
         self.process.start()
 
     def stop(self, timeout=None):
@@ -61,6 +146,27 @@ class PacketSender():
             s.close()
 
 
+def write_stats(path, options, senders_stats):
+    """
+    Writes the statistics of all the senders. 'achieved_pps' is the lowest rate achieved on an interface,
+    'jitter_p99_us' the highest 99th percentile send jitter.
+    """
+    stats = {
+        "priority": options.priority,
+        "quanta": options.time,
+        "frames": sum(s["frames"] for s in senders_stats),
+        "target_pps": senders_stats[0]["target_pps"] if senders_stats else None,
+        "achieved_pps": min(s["achieved_pps"] for s in senders_stats) if senders_stats else 0,
+        "jitter_p99_us": max(s.get("jitter_us", {}).get("p99", 0) for s in senders_stats) if senders_stats else 0,
+        "late": sum(s["late"] for s in senders_stats),
+        "senders": senders_stats,
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(stats, f)
+    # Readers never see a partial file
+    os.rename(path + ".tmp", path)
+
+
 def main():
     usage = "usage: %prog [options] arg1 arg2"
     parser = optparse.OptionParser(usage=usage)
@@ -80,6 +186,16 @@ def main():
                       help="Interval sending pfc frame", metavar="send_pfc_frame_interval", default=0)
     parser.add_option("-m", "--multiprocess", action="store_true", dest="multiprocess",
                       help="Use multiple processes to send packets", default=False)
+    parser.add_option("-S", "--speed", type="float", dest="speed",
+                      help="Link speed in Gbps, frames are paced to keep the queues paused", metavar="speed")
+    parser.add_option("--refresh", type="float", dest="refresh", default=0.5,
+                      help="Fraction of the pause time after which the pause is refreshed (with -S)")
+    parser.add_option("--pps", type="float", dest="pps",
+                      help="Frames per second per interface, overrides the rate computed from -S", metavar="pps")
+    parser.add_option("--burst", type="int", dest="burst", default=4,
+                      help="Frames sent back to back to catch up with the schedule (paced mode)")
+    parser.add_option("--stats", type="string", dest="stats",
+                      help="File to write the achieved rate and jitter to (JSON)", metavar="stats")
 
     (options, args) = parser.parse_args()
 
@@ -107,6 +223,17 @@ def main():
 
     interfaces = options.interface.split(',')
 
+    interval = options.send_pfc_frame_interval
+    paced = options.speed is not None or options.pps is not None
+    if options.pps:
+        interval = 1.0 / options.pps
+    elif options.speed:
+        if not options.time:
+            print("'-S' needs a non-zero pause time ('-t').")
+            parser.print_help()
+            sys.exit(1)
+        interval = frame_interval(options.speed, options.time, options.refresh)
+
     # Configure logging
     handler = logging.handlers.SysLogHandler(address=(options.rsyslog_server, 514))
     handler.ident = 'pfc_gen: '
@@ -177,27 +304,50 @@ def main():
     pre_str = 'GLOBAL_PF' if options.global_pf else 'PFC'
     logger.debug(pre_str + '_STORM_DEBUG')
 
+    signal.signal(signal.SIGTERM, _request_stop)
+
     # Start sending PFC pause frames
-    if options.multiprocess:
+    if options.multiprocess or paced:
+        if paced:
+            # One interface per process, so that each interface keeps its own schedule
+            process_num = min(len(interfaces), multiprocessing.cpu_count())
+        else:
+            process_num = MAX_PROCESS_NUM
         senders = []
-        interface_slices = [[] for i in range(MAX_PROCESS_NUM)]
+        interface_slices = [[] for i in range(process_num)]
         for i in range(0, len(interfaces)):
-            interface_slices[i % MAX_PROCESS_NUM].append(interfaces[i])
+            interface_slices[i % process_num].append(interfaces[i])
 
+        results = multiprocessing.Queue()
         for interface_slice in interface_slices:
             if interface_slice:
-                s = PacketSender(interface_slice, packet, options.num, options.send_pfc_frame_interval)
-                s.start()
+                s = PacketSender(interface_slice, packet, options.num, interval, options.burst)
+                s.start(results)
                 senders.append(s)
 
         logger.debug(pre_str + '_STORM_START')
-        # Wait PFC packets to be sent
+        # Wait PFC packets to be sent, forwarding a stop request to the senders
+        senders_stats = []
+        while len(senders_stats) < len(senders):
+            try:
+                senders_stats.append(results.get(timeout=0.5))
+            except Exception:
+                alive = [sender.process for sender in senders if sender.process.is_alive()]
+                if _stop[0]:
+                    for process in alive:
+                        process.terminate()
+                if not alive:
+                    # A sender died without reporting its statistics
+                    break
         for sender in senders:
             sender.stop()
     else:
-        sender = PacketSender(interfaces, packet, options.num, options.send_pfc_frame_interval)
+        sender = PacketSender(interfaces, packet, options.num, interval, options.burst)
         logger.debug(pre_str + '_STORM_START')
-        sender.send_packets()
+        senders_stats = [sender.send_packets()]
+
+    if options.stats:
+        write_stats(options.stats, options, senders_stats)
 
     logger.debug(pre_str + '_STORM_END')
 
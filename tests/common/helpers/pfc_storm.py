@@ -61,6 +61,10 @@ class PFCStorm(object):
                 pfc_queue_index(int) : queue on which the PFC storm should be generated. default: 3
                 pfc_frames_number(int) : Number of PFC frames to generate. default: 100000
                 pfc_gen_file(string): Script which generates the PFC traffic. default: 'pfc_gen.py'
+                pfc_gen_link_speed(float): link speed in Gbps of the fanout interfaces. pfc_gen.py then paces
+                    the frames at the rate needed to keep the queue paused. default: None
+                pfc_gen_stats(bool): pfc_gen.py records the achieved frame rate and jitter, see
+                    get_storm_stats(). default: False
                 Other keys: 'pfc_storm_defer_time', 'pfc_storm_stop_defer_time', 'pfc_asym'
         """
         self.dut = duthost
@@ -77,6 +81,8 @@ class PFCStorm(object):
         self.pfc_frames_number = kwargs.pop('pfc_frames_number', 100000)
         self.send_pfc_frame_interval = kwargs.pop('send_pfc_frame_interval', 0)
         self.pfc_send_period = kwargs.pop('pfc_send_period', None)
+        self.pfc_gen_link_speed = kwargs.pop('pfc_gen_link_speed', None)
+        self.pfc_gen_stats = kwargs.pop('pfc_gen_stats', False)
         self.peer_info = kwargs.pop('peer_info')
         self._validate_params(expected_args=['pfc_fanout_interface', 'peerdevice'])
         if 'hwsku' not in self.peer_info:
@@ -245,7 +251,8 @@ class PFCStorm(object):
             "ansible_eth0_ipv4_addr": self.ip_addr,
             "peer_hwsku": self.peer_info['hwsku'] if self.asic_type != 'vs' else "",
             "send_pfc_frame_interval": self.send_pfc_frame_interval,
-            "pfc_send_period": self.pfc_send_period
+            "pfc_send_period": self.pfc_send_period,
+            "pfc_gen_rate_args": self._pfc_gen_rate_args()
             }
         if getattr(self, "pfc_storm_defer_time", None):
             self.extra_vars.update({"pfc_storm_defer_time": self.pfc_storm_defer_time})
@@ -262,6 +269,59 @@ class PFCStorm(object):
             if self.fanout_asic_type == 'mellanox' and self.peer_device.os == 'sonic':
                 self.extra_vars.update({"pfc_fanout_label_port": self._generate_mellanox_label_ports()})
 
+    def _pfc_gen_stats_file(self):
+        """
+        Statistics file of pfc_gen.py on the fanout, one per storm
+        """
+        name = "pfc_gen_stats_{}_{}.json".format(
+            re.sub(r"[^\w]", "_", self.peer_info['pfc_fanout_interface']), self.pfc_queue_idx)
+        return os.path.join(self._PFC_GEN_DIR[self.peer_device.os], name)
+
+    def _pfc_gen_rate_args(self):
+        """
+        Pacing and statistics arguments of pfc_gen.py, appended to the storm command line
+        """
+        if self.asic_type == 'vs' or self.pfc_gen_file != "pfc_gen.py" or self.fanout_asic_type == 'mellanox' or \
+                self.peer_device.os not in self._PFC_GEN_DIR:
+            return ""
+        args = []
+        if self.pfc_gen_link_speed:
+            args.append("-S {}".format(self.pfc_gen_link_speed))
+        if self.pfc_gen_stats:
+            args.append("--stats {}".format(self._pfc_gen_stats_file()))
+        return " ".join(args)
+
+    def _run_fanout_shell(self, cmd):
+        """
+        Run a shell command on a SONiC or EOS fanout and return its output
+        """
+        if self.peer_device.os == 'eos':
+            return self.peer_device.eos_command(commands=["bash timeout 10 {}".format(cmd)])['stdout'][0]
+        return self.peer_device.shell(cmd, module_ignore_errors=True)['stdout']
+
+    def get_storm_stats(self):
+        """
+        Statistics of the last storm, available once pfc_gen.py ended or was stopped. Needs 'pfc_gen_stats'.
+
+        Returns:
+            dict: 'target_pps' and 'achieved_pps' (frames per second per interface, lowest of all interfaces),
+                'jitter_p99_us' (highest 99th percentile deviation from the frame schedule), 'frames', 'late'
+                (number of times the generator fell behind) and the statistics of every sender process.
+                None if there are no statistics.
+        """
+        if self.asic_type == 'vs' or not self._pfc_gen_rate_args():
+            return None
+        output = self._run_fanout_shell("cat {}".format(self._pfc_gen_stats_file()))
+        try:
+            stats = json.loads(output)
+        except ValueError:
+            logger.warning("No PFC storm statistics on {}: {}".format(self.peer_info['peerdevice'], output))
+            return None
+        logger.info("PFC storm on {}: {} frames, {} pps (target {}), jitter p99 {}us".format(
+            self.peer_info['pfc_fanout_interface'], stats['frames'], stats['achieved_pps'], stats['target_pps'],
+            stats['jitter_p99_us']))
+        return stats
+
     def _prepare_start_template(self):
         """
         Populates the pfc storm start template
@@ -347,6 +407,8 @@ class PFCStorm(object):
                     .format(self.peer_info['peerdevice'],
                             self.peer_info['pfc_fanout_interface'],
                             self.pfc_queue_idx))
+        if self.pfc_gen_stats and self._pfc_gen_rate_args():
+            self._run_fanout_shell("rm -f {}".format(self._pfc_gen_stats_file()))
         self._run_pfc_gen_template()
 
     def stop_storm(self):
@@ -382,6 +444,7 @@ class PFCMultiStorm(object):
             pfc_queue_index(int) : queue on which the PFC storm should be generated. default: 4
             pfc_frames_number(int) : Number of PFC frames to generate. default: 100000000
             pfc_gen_file(string): Script which generates the PFC traffic. default: pfc_gen.py
+            'pfc_gen_link_speed' and 'pfc_gen_stats' in peer_params are passed to PFCStorm
             storm_handle(dict): PFCStorm instance for each fanout connected to the DUT
         """
         self.duthost = duthost
@@ -444,6 +507,10 @@ class PFCMultiStorm(object):
                                                    pfc_frames_number=frames_cnt,
                                                    pfc_gen_file=gen_file,
                                                    pfc_send_period=pfc_send_time,
+                                                   pfc_gen_link_speed=self.peer_params[peer_dev].get(
+                                                       'pfc_gen_link_speed'),
+                                                   pfc_gen_stats=self.peer_params[peer_dev].get(
+                                                       'pfc_gen_stats', False),
                                                    peer_info=peer_info)
 
             self.storm_handle[peer_dev].deploy_pfc_gen()
@@ -461,3 +528,9 @@ class PFCMultiStorm(object):
         """
         for hndle in self.storm_handle:
             self.storm_handle[hndle].stop_storm()
+
+    def get_storm_stats(self):
+        """
+        PFC storm statistics of every fanout, see PFCStorm.get_storm_stats()
+        """
+        return {hndle: self.storm_handle[hndle].get_storm_stats() for hndle in self.storm_handle}
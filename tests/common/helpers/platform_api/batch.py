@@ -0,0 +1,128 @@
+"""
+This module provides an interface to make many platform API calls in one
+round trip, with the /batch endpoint of the platform API test service
+"""
+
+import http.client
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Calls taking longer than this, in seconds, are logged as slow
+SLOW_API_THRESHOLD = 1.0
+
+
+class PlatformApiLatency(object):
+    """ Collects the time taken by platform API calls, per API
+
+    The API name is the path of the call without the component indices,
+    e.g. "chassis/sfp/get_voltage" for all the SFPs.
+    """
+
+    def __init__(self):
+        self.times = {}
+
+    def record(self, name, seconds):
+        self.times.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        summary = {}
+        for name, times in self.times.items():
+            summary[name] = {
+                'count': len(times),
+                'total': sum(times),
+                'mean': sum(times) / len(times),
+                'max': max(times),
+            }
+        return summary
+
+    def log(self, threshold=SLOW_API_THRESHOLD):
+        """ Logs the latency of every API, slowest first, and returns the names
+            of the APIs whose slowest call exceeded threshold """
+        slow = []
+        for name, stats in sorted(self.summary().items(), key=lambda item: item[1]['max'], reverse=True):
+            message = 'Platform API "{}": {} calls, mean {:.3f}s, max {:.3f}s'.format(
+                name, stats['count'], stats['mean'], stats['max'])
+            if stats['max'] > threshold:
+                slow.append(name)
+                logger.warning(message)
+            else:
+                logger.info(message)
+        return slow
+
+
+def _api_name(path):
+    return '/'.join(token for token in path.split('/') if not token.isdigit())
+
+
+def _call_one_by_one(conn, calls):
+    results = []
+    for path, args in calls:
+        start = time.time()
+        conn.request('POST', '/platform/{}'.format(path), json.dumps({'args': args}))
+        resp = conn.getresponse()
+        res = json.loads(resp.read())['res']
+        results.append({'res': res, 'time': time.time() - start, 'error': None})
+    return results
+
+
+def batch_api(conn, calls, workers=1, latency=None):
+    """ Makes platform API calls in one request
+
+    Args:
+        conn: HTTP connection to the platform API test service
+        calls: list of (path, args), path being relative to /platform,
+            e.g. ("chassis/sfp/0/get_voltage", [])
+        workers: number of threads running the calls on the DUT, they are run
+            one after the other by default as not all platform APIs are thread safe
+        latency: PlatformApiLatency recording the time taken by each call
+
+    Returns:
+        List of {"res": result, "time": seconds, "error": error}, in the order of calls
+    """
+    if not calls:
+        return []
+    body = {'calls': [{'path': '/platform/{}'.format(path), 'args': args} for path, args in calls],
+            'workers': workers}
+    try:
+        conn.request('POST', '/batch', json.dumps(body))
+        resp = conn.getresponse()
+        data = resp.read()
+        results = json.loads(data)['res'] if resp.status == 200 else None
+    except (http.client.HTTPException, ConnectionError):
+        # A service started by an older version of this repo closes the connection
+        conn.close()
+        results = None
+    if results is None:
+        logger.info('Platform API test service does not support batches, calling APIs one by one')
+        results = _call_one_by_one(conn, calls)
+
+    for (path, args), result in zip(calls, results):
+        logger.info('Executing platform API: "{}", arguments: "{}", result: "{}", time: {:.3f}s'.format(
+            path, args, result['res'], result['time']))
+        if result['error']:
+            logger.error('Platform API "{}" failed: {}'.format(path, result['error']))
+        if result['time'] > SLOW_API_THRESHOLD:
+            logger.warning('Platform API "{}" took {:.3f}s'.format(path, result['time']))
+        if latency is not None:
+            latency.record(_api_name(path), result['time'])
+    return results
+
+
+def component_getters(conn, component, indices, getters, workers=1, latency=None):
+    """ Calls getters of a set of components in one batch
+
+    Args:
+        conn: HTTP connection to the platform API test service
+        component: path of the component relative to /platform, e.g. "chassis/sfp"
+        indices: indices of the components, e.g. SFP indices
+        getters: API names, e.g. ["get_voltage", "get_temperature"]
+
+    Returns:
+        Dictionary of index to dictionary of getter to result
+    """
+    calls = [('{}/{}/{}'.format(component, index, getter), []) for index in indices for getter in getters]
+    results = iter(batch_api(conn, calls, workers=workers, latency=latency))
+    return {index: {getter: next(results)['res'] for getter in getters} for index in indices}
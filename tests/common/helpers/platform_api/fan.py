@@ -4,6 +4,8 @@
 import json
 import logging
 
+from tests.common.helpers.platform_api.batch import component_getters
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,12 @@ def fan_api(conn, index, name, args=None):
     logger.info('Executing fan API: "{}", index: {}, arguments: "{}", result: "{}"'.format(name, index, args, res))
     return res
 
+
+def get_all(conn, indices, names, latency=None):
+    """ Calls the getters "names" of the fans at "indices" in one batch,
+        returns a dictionary of index to dictionary of getter to result """
+    return component_getters(conn, 'chassis/fan', indices, names, latency=latency)
+
 #
 # Methods inherited from DeviceBase class
 #
@@ -6,6 +6,8 @@ supply units of the DUT via platform API
 import json
 import logging
 
+from tests.common.helpers.platform_api.batch import component_getters
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,12 @@ def psu_api(conn, psu_id, name, args=None):
     return res
 
 
+def get_all(conn, indices, names, latency=None):
+    """ Calls the getters "names" of the PSUs at "indices" in one batch,
+        returns a dictionary of index to dictionary of getter to result """
+    return component_getters(conn, 'chassis/psu', indices, names, latency=latency)
+
+
 #
 # Methods inherited from DeviceBase class
 #
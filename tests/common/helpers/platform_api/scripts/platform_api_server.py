@@ -5,12 +5,16 @@ import os
 import socket
 import sys
 import syslog
+import time
+from multiprocessing.pool import ThreadPool
 
 # TODO: Clean this up once we no longer need to support Python 2
 if sys.version_info.major == 3:
     from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
 else:
     from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
 
 import sonic_platform
 
@@ -19,10 +23,18 @@ SYSLOG_IDENTIFIER = os.path.basename(__file__)
 platform = sonic_platform.platform.Platform()
 
 
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
 class HTTPServerV6(HTTPServer):
     address_family = socket.AF_INET6
 
 
+class ThreadingHTTPServerV6(ThreadingHTTPServer):
+    address_family = socket.AF_INET6
+
+
 def obj_serialize(obj):
     ''' JSON serializer for objects not serializable by default json library code
         We simply return a dictionary containing the object's class and module
@@ -38,6 +50,53 @@ def obj_serialize(obj):
     return data
 
 
+def call_api(url_path, args):
+    ''' Calls the platform API at url_path (/platform/...) with args
+        Returns the result of the API, or None if it raised
+    '''
+    path = list(reversed(url_path.strip('/').split('/')))
+    if path.pop() != 'platform':
+        raise Exception("invalid path " + url_path)
+
+    obj = platform
+    while len(path) != 1:
+        _dir = path.pop()
+
+        signature = inspect.signature(getattr(obj, 'get_' + _dir))
+        params = list(signature.parameters.keys())
+
+        if 'index' in params:
+            _idx = int(path.pop())
+            obj = getattr(obj, 'get_' + _dir)(_idx)
+        else:
+            obj = getattr(obj, 'get_' + _dir)()
+
+    api = path.pop()
+
+    res = None
+
+    try:
+        res = getattr(obj, api)(*args)
+    except NotImplementedError:
+        syslog.syslog(syslog.LOG_WARNING, "API '{}' not implemented".format(api))
+    except Exception as e:
+        syslog.syslog(syslog.LOG_ERR, "Error executing API '{}': {}".format(api, repr(e)))
+
+    return res
+
+
+def timed_call(call):
+    ''' Runs one call of a batch, returns its result and how long it took in seconds '''
+    start = time.time()
+    try:
+        res = call_api(call['path'], call.get('args', []))
+        error = None
+    except Exception as e:
+        res = None
+        error = repr(e)
+    return {'res': res, 'time': time.time() - start, 'error': error}
+
+
 class PlatformAPITestService(BaseHTTPRequestHandler):
     ''' Handles HTTP POST requests and translated them into platform API call.
     The expected URL path format is the following:
@@ -56,67 +115,77 @@ class PlatformAPITestService(BaseHTTPRequestHandler):
     the get_<component_1> is a method of <component_0> object.
     If the <component_n> is a list accessed by index, it is assumed that get_<component_n>
     is a method of <compoment_n-1> object which accepts "index" as parameter.
+
+    Several API calls can be made in one request with a POST to /batch, the body being a JSON
+    object with a "calls" key holding the list of calls, and optionally a "workers" key to run
+    them in that many threads instead of one after the other:
+       {"calls": [{"path": "/platform/chassis/sfp/0/get_voltage", "args": []}, ...], "workers": 1}
+    The response "res" key holds one object per call, in request order, with the result ("res"),
+    the time the call took in seconds ("time") and the error if the path could not be resolved ("error").
     '''
 
+    # Keep the connection open between requests
+    protocol_version = 'HTTP/1.1'
+
     def do_POST(self):
         if self.path.startswith('/platform/'):
             self.do_platform_api()
+        elif self.path == '/batch':
+            self.do_batch()
         else:
-            return
+            self.send_error(404)
 
-    def do_platform_api(self):
+    def read_request(self):
         content_length = int(self.headers['Content-Length'])
         body = self.rfile.read(content_length)
+        return json.loads(body)
 
-        request = json.loads(body)
-
-        path = list(reversed(self.path.strip('/').split('/')))
-        if path.pop() != 'platform':
-            raise Exception("invalid path " + self.path)
-
-        obj = platform
-        while len(path) != 1:
-            _dir = path.pop()
-
-            signature = inspect.signature(getattr(obj, 'get_' + _dir))
-            args = list(signature.parameters.keys())
-
-            if 'index' in args:
-                _idx = int(path.pop())
-                obj = getattr(obj, 'get_' + _dir)(_idx)
-            else:
-                obj = getattr(obj, 'get_' + _dir)()
-
-        api = path.pop()
-        args = request['args']
-
-        res = None
-
-        try:
-            res = getattr(obj, api)(*args)
-        except NotImplementedError:
-            syslog.syslog(syslog.LOG_WARNING, "API '{}' not implemented".format(api))
-        except Exception as e:
-            syslog.syslog(syslog.LOG_ERR, "Error executing API '{}': {}".format(api, repr(e)))
-
+    def send_result(self, res):
+        data = json.dumps({'res': res}, default=obj_serialize).encode('utf-8')
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
         self.end_headers()
-        self.wfile.write(json.dumps({'res': res}, default=obj_serialize).encode('utf-8'))
+        self.wfile.write(data)
+
+    def do_platform_api(self):
+        request = self.read_request()
+        self.send_result(call_api(self.path, request['args']))
+
+    def do_batch(self):
+        request = self.read_request()
+        calls = request['calls']
+        workers = request.get('workers', 1)
+        if workers > 1 and len(calls) > 1:
+            pool = ThreadPool(min(workers, len(calls)))
+            try:
+                results = pool.map(timed_call, calls)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [timed_call(call) for call in calls]
+        self.send_result(results)
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-p', '--port', type=int, help='port to listen to', required=True)
     parser.add_argument('-6', '--ipv6', action='store_true', help='Set server to use IPv6', )
+    parser.add_argument('--single-thread', action='store_true',
+                        help='Serve one request at a time instead of one thread per connection')
     args = parser.parse_args()
 
     syslog.openlog(SYSLOG_IDENTIFIER)
 
+    if args.single_thread:
+        server_class = HTTPServerV6 if args.ipv6 else HTTPServer
+    else:
+        server_class = ThreadingHTTPServerV6 if args.ipv6 else ThreadingHTTPServer
     if args.ipv6:
-        httpd = HTTPServerV6(('::', args.port), PlatformAPITestService)
+        httpd = server_class(('::', args.port), PlatformAPITestService)
     else:
-        httpd = HTTPServer(('', args.port), PlatformAPITestService)
+        httpd = server_class(('', args.port), PlatformAPITestService)
     httpd.serve_forever()
 
     syslog.closelog()
@@ -6,6 +6,8 @@ transceivers connected to the DUT via platform API
 import json
 import logging
 
+from tests.common.helpers.platform_api.batch import component_getters
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,12 @@ def sfp_api(conn, index, name, args=None):
     return res
 
 
+def get_all(conn, indices, names, latency=None):
+    """ Calls the getters "names" of the SFPs at "indices" in one batch,
+        returns a dictionary of index to dictionary of getter to result """
+    return component_getters(conn, 'chassis/sfp', indices, names, latency=latency)
+
+
 #
 # Methods inherited from DeviceBase class
 #
@@ -0,0 +1,139 @@
+"""
+Millisecond timestamps for route programming on a DUT.
+
+Route scale and performance tests used to poll the route count in ASIC_DB through Ansible, which only
+resolves install/withdraw times to seconds and loads the DUT while routes are being programmed. The
+DUT-side helper scripts/route_profiler.py subscribes to keyspace notifications of the APPL_DB and ASIC_DB
+route tables instead and reports, per run:
+    - when the routes arrived in APPL_DB and ASIC_DB and the rate curve of both,
+    - p50/p90/p99/max per-route latency from the start of the run to ASIC_DB,
+    - p50/p90/p99/max APPL_DB -> ASIC_DB lag.
+
+Routes pushed by the test (swssconfig):
+    profiler = RouteProfiler(asichost)
+    report = profiler.run("docker exec -i swss swssconfig /dev/stdin < /tmp/routes.json", op="SET",
+                          route_file="/tmp/routes.json", timeout=60)
+
+Routes learnt or withdrawn by other means (BGP, link flap):
+    profiler.start(op="DEL", prefix_file="/tmp/prefixes", expected=len(prefixes))
+    ...shut down the BGP sessions...
+    report = profiler.stop()
+"""
+import json
+import logging
+import shlex
+
+from tests.common.helpers.constants import DEFAULT_NAMESPACE
+from tests.common.helpers.sonic_db import SONIC_DB_BATCH_SCRIPT_SRC, SONIC_DB_BATCH_SCRIPT_DEST
+
+logger = logging.getLogger(__name__)
+
+ROUTE_PROFILER_SCRIPT_SRC = "scripts/route_profiler.py"
+ROUTE_PROFILER_SCRIPT_DEST = "/tmp/route_profiler.py"
+ROUTE_PROFILER_OUTPUT = "/tmp/route_profile.json"
+ROUTE_PROFILER_LOG = "/tmp/route_profiler.log"
+
+
+class RouteProfiler(object):
+    """Route programming profiler for one DUT or ASIC namespace.
+
+    Attributes:
+        host: a SonicHost or SonicAsic whose route tables are profiled.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.sonichost = getattr(host, "sonichost", host)
+        namespace = getattr(host, "namespace", DEFAULT_NAMESPACE)
+        self.namespace = namespace if namespace != DEFAULT_NAMESPACE else None
+        self._deployed = False
+
+    def _deploy_scripts(self):
+        if not self._deployed:
+            self.sonichost.copy(src=SONIC_DB_BATCH_SCRIPT_SRC, dest=SONIC_DB_BATCH_SCRIPT_DEST)
+            self.sonichost.copy(src=ROUTE_PROFILER_SCRIPT_SRC, dest=ROUTE_PROFILER_SCRIPT_DEST)
+            self._deployed = True
+
+    def _args(self, op, route_file, prefix_file, expected, timeout, bucket):
+        args = ["--op", op, "--bucket", str(bucket)]
+        if self.namespace:
+            args += ["--namespace", self.namespace]
+        if route_file:
+            args += ["--route-file", route_file]
+        if prefix_file:
+            args += ["--prefix-file", prefix_file]
+        if expected is not None:
+            args += ["--expected", str(expected)]
+        if timeout is not None:
+            args += ["--timeout", str(timeout)]
+        return args
+
+    def run(self, command, op="SET", route_file=None, prefix_file=None, expected=None, timeout=60, bucket=0.5):
+        """
+        Runs a command that programs routes and waits until the routes are in (SET) or gone from (DEL) ASIC_DB.
+
+        Args:
+            command: shell command run on the DUT once the notifications are subscribed.
+            op: SET or DEL.
+            route_file: swssconfig route file on the DUT, its prefixes are tracked.
+            prefix_file: file on the DUT with one prefix to track per line.
+            expected: number of routes to wait for, default: all tracked prefixes.
+            timeout: seconds to wait after the command completed.
+            bucket: rate curve resolution in seconds.
+
+        Returns:
+            The report dictionary, see scripts/route_profiler.py. 'complete' is False on timeout.
+        """
+        self._deploy_scripts()
+        cmd = " ".join(["python3", ROUTE_PROFILER_SCRIPT_DEST, "run", "--command", shlex.quote(command)] +
+                       [shlex.quote(arg) for arg in self._args(op, route_file, prefix_file, expected, timeout,
+                                                               bucket)])
+        result = self.sonichost.shell(cmd, module_ignore_errors=True)
+        if result["rc"] != 0:
+            raise Exception("Route profiler failed: {}".format(result["stderr"]))
+        report = json.loads(result["stdout"])
+        logger.info("Route profile: %s", self.summary(report))
+        return report
+
+    def start(self, op="SET", route_file=None, prefix_file=None, expected=None, timeout=3600, bucket=0.5):
+        """
+        Starts recording in the background, see run() for the arguments. Recording ends after 'expected'
+        routes reached ASIC_DB, on timeout or on stop().
+        """
+        self._deploy_scripts()
+        self.sonichost.shell("rm -f {} {}".format(ROUTE_PROFILER_OUTPUT, ROUTE_PROFILER_LOG))
+        args = self._args(op, route_file, prefix_file, expected, timeout, bucket)
+        self.sonichost.shell("nohup python3 {} record {} --output {} > {} 2>&1 &".format(
+            ROUTE_PROFILER_SCRIPT_DEST, " ".join(shlex.quote(arg) for arg in args), ROUTE_PROFILER_OUTPUT,
+            ROUTE_PROFILER_LOG))
+        # Routes changed before the subscriptions are in place would be missed
+        self.sonichost.shell("timeout 30 sh -c 'until grep -q ready {}; do sleep 0.1; done'".format(
+            ROUTE_PROFILER_LOG))
+
+    def stop(self, timeout=30):
+        """
+        Stops recording and returns the report.
+        """
+        self.sonichost.shell("pkill -TERM -f '{} record'".format(ROUTE_PROFILER_SCRIPT_DEST), module_ignore_errors=True)
+        result = self.sonichost.shell("timeout {} sh -c 'until [ -f {} ]; do sleep 0.1; done'; cat {}".format(
+            timeout, ROUTE_PROFILER_OUTPUT, ROUTE_PROFILER_OUTPUT), module_ignore_errors=True)
+        if result["rc"] != 0:
+            log = self.sonichost.shell("cat {}".format(ROUTE_PROFILER_LOG), module_ignore_errors=True)["stdout"]
+            raise Exception("Route profiler did not produce a report: {}".format(log))
+        report = json.loads(result["stdout"])
+        logger.info("Route profile: %s", self.summary(report))
+        return report
+
+    @staticmethod
+    def summary(report):
+        """One line summary of a report for the test log."""
+        asic = report["asic_db"]
+        text = "{} {}/{} routes programmed in ASIC_DB".format(report["op"], asic["count"], report["expected"])
+        if asic["count"]:
+            rates = [rate for _, _, rate in report["rate_curve"]]
+            text += ", last at {:.3f}s, peak {:.0f} routes/s".format(asic["last"], max(rates))
+        if report["latency"]:
+            text += ", latency p50 {p50:.3f}s p99 {p99:.3f}s".format(**report["latency"])
+        if report["lag"]:
+            text += ", APPL_DB->ASIC_DB lag p50 {p50:.3f}s p99 {p99:.3f}s".format(**report["lag"])
+        return text
@@ -2,11 +2,92 @@ import logging
 import json
 import six
 import ast
+import base64
 from tests.common.helpers.constants import DEFAULT_NAMESPACE
 from tests.common.devices.sonic_asic import SonicAsic
 
 logger = logging.getLogger(__name__)
 
+SONIC_DB_BATCH_SCRIPT_SRC = "scripts/sonic_db_batch.py"
+SONIC_DB_BATCH_SCRIPT_DEST = "/tmp/sonic_db_batch.py"
+
+
+class SonicDbPipeline(object):
+    """Batched, pipelined reader for one database on a DUT or ASIC namespace.
+
+    Every call to ``execute`` runs the DUT-side helper ``scripts/sonic_db_batch.py`` once. The helper opens a
+    single Redis connection, resolves key patterns with SCAN and reads all requested hashes in one pipeline, so
+    a batch of any size costs one Ansible round trip.
+
+    Attributes:
+        host: a SonicHost or SonicAsic the database belongs to.
+        database: database name, e.g. ASIC_DB.
+    """
+
+    def __init__(self, host, database):
+        self.host = host
+        self.database = database
+        self.sonichost = getattr(host, "sonichost", host)
+        namespace = getattr(host, "namespace", DEFAULT_NAMESPACE)
+        self.namespace = namespace if namespace != DEFAULT_NAMESPACE else None
+
+    def _deploy_script(self):
+        logger.debug("Copying %s to %s", SONIC_DB_BATCH_SCRIPT_SRC, self.sonichost.hostname)
+        self.sonichost.copy(src=SONIC_DB_BATCH_SCRIPT_SRC, dest=SONIC_DB_BATCH_SCRIPT_DEST)
+
+    def execute(self, ops):
+        """
+        Runs a list of read operations in one batch.
+
+        Args:
+            ops: list of operations, each one of ["hget", key, field], ["hgetall", key], ["keys", pattern] or
+                ["scan_hgetall", pattern].
+
+        Returns:
+            A list with one result per operation, in the same order as ops.
+        """
+        if not ops:
+            return []
+
+        request = {"db": self.database, "namespace": self.namespace, "ops": ops}
+        encoded = base64.b64encode(json.dumps(request).encode("utf-8")).decode("ascii")
+        cmd = "python3 {} {}".format(SONIC_DB_BATCH_SCRIPT_DEST, encoded)
+
+        logger.debug("SONIC-DB-BATCH: %s %d ops on %s", self.database, len(ops), self.sonichost.hostname)
+        result = self.sonichost.shell(cmd, module_ignore_errors=True, verbose=False)
+        if result["rc"] != 0 and "No such file" in result.get("stderr", ""):
+            # /tmp does not survive a reboot, so the helper is (re)deployed lazily.
+            self._deploy_script()
+            result = self.sonichost.shell(cmd, module_ignore_errors=True, verbose=False)
+        if result["rc"] != 0:
+            raise SonicDbNoCommandOutput("Batch read of {} failed: {}".format(self.database, result.get("stderr")))
+
+        return json.loads(result["stdout"])
+
+    def hget(self, key, field):
+        return self.execute([["hget", key, field]])[0]
+
+    def hgetall(self, key):
+        return self.execute([["hgetall", key]])[0]
+
+    def keys(self, pattern):
+        return self.execute([["keys", pattern]])[0]
+
+    def scan_hgetall(self, pattern):
+        return self.execute([["scan_hgetall", pattern]])[0]
+
+    def wait(self, pattern, condition, timeout):
+        """
+        Blocks on the DUT until the hashes matching pattern satisfy condition or timeout seconds pass.
+
+        The helper re-evaluates the condition on keyspace notifications, so this returns as soon as the change
+        lands in the database. See tests/common/helpers/db_wait.py for the condition format.
+
+        Returns:
+            Dictionary with "satisfied", "elapsed", "events" and "mode" keys.
+        """
+        return self.execute([["wait", pattern, condition, timeout]])[0]
+
 
 class SonicDbCli(object):
     """Base class for interface to SonicDb using sonic-db-cli command.
@@ -14,12 +95,14 @@ class SonicDbCli(object):
         Attributes:
             host: a SonicHost or SonicAsic.  Commands will be run on this shell.
             database: database number.
+            pipeline: SonicDbPipeline used instead of sonic-db-cli when use_pipeline is set.
         """
 
-    def __init__(self, host, database='APPL_DB'):
+    def __init__(self, host, database='APPL_DB', use_pipeline=False):
         """Initializes base class with defaults"""
         self.host = host
         self.database = database
+        self.pipeline = SonicDbPipeline(host, database) if use_pipeline else None
 
     def _cli_prefix(self):
         """Builds opening of sonic-db-cli command for other methods."""
@@ -84,6 +167,12 @@ class SonicDbCli(object):
 
 
         """
+        if self.pipeline:
+            value = self.pipeline.hget(key, field)
+            if value is None:
+                raise SonicDbKeyNotFound("Key: %s, field: %s not found in %s" % (key, field, self.database))
+            return value
+
         cmd = self._cli_prefix() + "hget {} {}".format(key, field)
         result = self._run_and_check(cmd)
         if result == {}:
@@ -104,6 +193,11 @@ class SonicDbCli(object):
         Raises:
             SonicDbKeyNotFound: If the key is not found.
         """
+        if self.pipeline:
+            value = self.pipeline.hgetall(key)
+            if not value:
+                raise SonicDbKeyNotFound("Key: %s not found in %s" % (key, self.database))
+            return value
 
         cmd = self._cli_prefix() + "HGETALL {}".format(key)
         result = self._run_and_check(cmd)
@@ -161,6 +255,12 @@ class SonicDbCli(object):
                 SonicDbKeyNotFound: If the key or field has no value or is not present.
 
         """
+        if self.pipeline:
+            keys = self.pipeline.keys(table)
+            if not keys and raise_error_when_not_found:
+                raise SonicDbKeyNotFound("No keys for %s found in %s" % (table, self.database))
+            return keys
+
         cmd = self._cli_prefix() + " keys {}".format(table)
         result = self._run_and_check(cmd)
         if result == {}:
@@ -184,6 +284,9 @@ class SonicDbCli(object):
             Dictionary containing the parsed json output of the sonic-db-dump.
 
         """
+        if self.pipeline:
+            return self._format_dump(self.pipeline.scan_hgetall("*{}*".format(table)))
+
         cli = "sonic-db-dump"
         cmd_str = ""
 
@@ -206,6 +309,26 @@ class SonicDbCli(object):
         parsed = json.loads(output["stdout"])
         return parsed
 
+    @staticmethod
+    def _format_dump(entries):
+        """Shapes a {key: fields} mapping like the output of sonic-db-dump."""
+        return {key: {"type": "hash", "value": value} for key, value in entries.items()}
+
+    def _get_key_list(self, pattern):
+        """
+        Returns the keys matching a pattern.
+
+        Raises:
+            SonicDbNoCommandOutput: If no key matches the pattern.
+        """
+        if self.pipeline:
+            keys = self.pipeline.keys(pattern)
+            if not keys:
+                raise SonicDbNoCommandOutput("No keys match %s in %s" % (pattern, self.database))
+            return keys
+
+        return self._run_and_raise(self._cli_prefix() + "KEYS %s" % pattern)["stdout_lines"]
+
 
 class AsicDbCli(SonicDbCli):
     """
@@ -224,11 +347,11 @@ class AsicDbCli(SonicDbCli):
     ASIC_ROUTERINTF_TABLE = "ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE"
     ASIC_NEIGH_ENTRY_TABLE = "ASIC_STATE:SAI_OBJECT_TYPE_NEIGHBOR_ENTRY"
 
-    def __init__(self, host):
+    def __init__(self, host, use_pipeline=False):
         """
         Initializes a connection to the ASIC DB (database 1)
         """
-        super(AsicDbCli, self).__init__(host, 'ASIC_DB')
+        super(AsicDbCli, self).__init__(host, 'ASIC_DB', use_pipeline=use_pipeline)
         # cache this to improve speed
         self.hostif_portidlist = []
         self.hostif_table = []
@@ -238,16 +361,14 @@ class AsicDbCli(SonicDbCli):
 
     def get_switch_key(self):
         """Returns a list of keys in the switch table"""
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_SWITCH_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"][0]
+        return self._get_key_list("%s*" % AsicDbCli.ASIC_SWITCH_TABLE)[0]
 
     def get_system_port_key_list(self, refresh=False):
         """Returns a list of keys in the system port table"""
         if self.system_port_key_list != [] and refresh is False:
             return self.system_port_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_SYSPORT_TABLE
-        self.system_port_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.system_port_key_list = self._get_key_list("%s*" % AsicDbCli.ASIC_SYSPORT_TABLE)
         return self.system_port_key_list
 
     def get_port_key_list(self, refresh=False):
@@ -256,38 +377,32 @@ class AsicDbCli(SonicDbCli):
         if self.port_key_list != [] and refresh is False:
             return self.port_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s*" % AsicDbCli.ASIC_PORT_TABLE
-        self.port_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.port_key_list = self._get_key_list("%s*" % AsicDbCli.ASIC_PORT_TABLE)
         return self.port_key_list
 
     def get_hostif_list(self):
         """Returns a list of keys in the host interface table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_HOSTIF_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("%s:*" % AsicDbCli.ASIC_HOSTIF_TABLE)
 
     def get_asic_db_lag_list(self, refresh=False):
         """Returns a list of keys in the lag table"""
         if self.lagid_key_list != [] and refresh is False:
             return self.lagid_key_list
 
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_LAG_TABLE
-        self.lagid_key_list = self._run_and_raise(cmd)["stdout_lines"]
+        self.lagid_key_list = self._get_key_list("%s:*" % AsicDbCli.ASIC_LAG_TABLE)
         return self.lagid_key_list
 
     def get_asic_db_lag_member_list(self):
         """Returns a list of keys in the lag member table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_LAG_MEMBER_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("%s:*" % AsicDbCli.ASIC_LAG_MEMBER_TABLE)
 
     def get_router_if_list(self):
         """Returns a list of keys in the router interface table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_ROUTERINTF_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("%s:*" % AsicDbCli.ASIC_ROUTERINTF_TABLE)
 
     def get_neighbor_list(self):
         """Returns a list of keys in the neighbor table"""
-        cmd = self._cli_prefix() + "KEYS %s:*" % AsicDbCli.ASIC_NEIGH_ENTRY_TABLE
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("%s:*" % AsicDbCli.ASIC_NEIGH_ENTRY_TABLE)
 
     def get_neighbor_key_by_ip(self, ipaddr):
         """Returns the key in the neighbor table that is for a specific IP neighbor
@@ -296,9 +411,9 @@ class AsicDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS %s*%s*" % (AsicDbCli.ASIC_NEIGH_ENTRY_TABLE, ipaddr))
+        keys = self._get_key_list("%s*%s*" % (AsicDbCli.ASIC_NEIGH_ENTRY_TABLE, ipaddr))
         match_str = '"ip":"%s"' % ipaddr
-        for key in result["stdout_lines"]:
+        for key in keys:
             if match_str in key:
                 neighbor_key = key
                 break
@@ -319,6 +434,9 @@ class AsicDbCli(SonicDbCli):
             neighbor_key: The full key of the neighbor table.
             field: The field to get in the neighbor hash table.
         """
+        if self.pipeline:
+            return self.pipeline.hget(neighbor_key, field)
+
         cmd = "%s ASIC_DB HGET '%s' %s" % (self.host.sonic_db_cli, neighbor_key, field)
 
         result = self.host.sonichost.shell(cmd)
@@ -389,6 +507,33 @@ class AsicDbCli(SonicDbCli):
 
         raise SonicDbKeyNotFound("Can't find hostif in asicdb with portid: %s", portid)
 
+    def load_port_tables(self, refresh=False):
+        """
+        Fills the port, system port, lag and hostif caches in a single pipelined batch.
+
+        Only used with the pipeline backend; get_rif_porttype calls it so that classifying a port costs one round
+        trip no matter how many tables have to be consulted. Subsequent calls are served from the cache unless
+        refresh is set.
+
+        Args:
+            refresh: Forces the DB to be queried even if the caches are filled.
+        """
+        if not refresh and self.port_key_list and self.system_port_key_list and self.lagid_key_list \
+                and self.hostif_table:
+            return
+
+        port_keys, sysport_keys, lag_keys, hostif_entries = self.pipeline.execute([
+            ["keys", "%s*" % AsicDbCli.ASIC_PORT_TABLE],
+            ["keys", "%s*" % AsicDbCli.ASIC_SYSPORT_TABLE],
+            ["keys", "%s:*" % AsicDbCli.ASIC_LAG_TABLE],
+            ["scan_hgetall", "*%s:*" % AsicDbCli.ASIC_HOSTIF_TABLE],
+        ])
+        self.port_key_list = port_keys
+        self.system_port_key_list = sysport_keys
+        self.lagid_key_list = lag_keys
+        self.hostif_table = self._format_dump(hostif_entries)
+        self.hostif_portidlist = [entry['value']['SAI_HOSTIF_ATTR_OBJ_ID'] for entry in self.hostif_table.values()]
+
     def get_rif_porttype(self, portid, refresh=False):
         """
         Determines whether a specific port OID referenced in a router interface entry is a local port or a system port.
@@ -405,6 +550,10 @@ class AsicDbCli(SonicDbCli):
             "other" if it is not found in any port table
         """
 
+        if self.pipeline:
+            self.load_port_tables(refresh=refresh)
+            refresh = False
+
         port_key_list = self.get_port_key_list(refresh=refresh)
         system_port_keylist = self.get_system_port_key_list(refresh=refresh)
         lag_keylist = self.get_asic_db_lag_list(refresh=refresh)
@@ -445,8 +594,8 @@ class AppDbCli(SonicDbCli):
     APP_LAG_TABLE = "LAG_TABLE"
     APP_LAG_MEMBER_TABLE = "LAG_MEMBER_TABLE"
 
-    def __init__(self, host):
-        super(AppDbCli, self).__init__(host, 'APPL_DB')
+    def __init__(self, host, use_pipeline=False):
+        super(AppDbCli, self).__init__(host, 'APPL_DB', use_pipeline=use_pipeline)
 
     def get_neighbor_key_by_ip(self, ipaddr):
         """Returns the key in the neighbor table that is for a specific IP neighbor
@@ -455,9 +604,9 @@ class AppDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS %s:*%s" % (AppDbCli.APP_NEIGH_TABLE, ipaddr))
+        keys = self._get_key_list("%s:*%s" % (AppDbCli.APP_NEIGH_TABLE, ipaddr))
         neighbor_key = None
-        for key in result["stdout_lines"]:
+        for key in keys:
             if key.endswith(ipaddr):
                 neighbor_key = key
                 break
@@ -468,15 +617,13 @@ class AppDbCli(SonicDbCli):
         """
         Retuns lag list in app db
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS *%s*" % AppDbCli.APP_LAG_TABLE)
-        return result["stdout_lines"]
+        return self._get_key_list("*%s*" % AppDbCli.APP_LAG_TABLE)
 
     def get_app_db_lag_member_list(self):
         """
         return lag member list in app db
         """
-        result = self._run_and_raise(self._cli_prefix() + "KEYS *{}:*".format(AppDbCli.APP_LAG_MEMBER_TABLE))
-        return result["stdout_lines"]
+        return self._get_key_list("*{}:*".format(AppDbCli.APP_LAG_MEMBER_TABLE))
 
     def dump_neighbor_table(self):
         """
@@ -497,9 +644,9 @@ class VoqDbCli(SonicDbCli):
     SYSTEM_LAG_MEMBER_TABLE = "SYSTEM_LAG_MEMBER_TABLE"
     SYSTEM_NEIGHBOR_TABLE = "SYSTEM_NEIGH"
 
-    def __init__(self, host):
+    def __init__(self, host, use_pipeline=False):
         """Initializes the class with the database parameters and finds the IP address of the database"""
-        super(VoqDbCli, self).__init__(host, 'CHASSIS_APP_DB')
+        super(VoqDbCli, self).__init__(host, 'CHASSIS_APP_DB', use_pipeline=use_pipeline)
         output = host.command("grep chassis_db_address /etc/sonic/chassisdb.conf")
         self.ip = output['stdout'].split("=")[1]
 
@@ -510,10 +657,12 @@ class VoqDbCli(SonicDbCli):
             ipaddr: The IP address to search for in the neighbor table.
 
         """
-        cmd = self._cli_prefix() + 'KEYS "%s|*%s"' % (VoqDbCli.SYSTEM_NEIGHBOR_TABLE, ipaddr)
-        result = self._run_and_raise(cmd)
+        if self.pipeline:
+            keys = self._get_key_list("%s|*%s" % (VoqDbCli.SYSTEM_NEIGHBOR_TABLE, ipaddr))
+        else:
+            keys = self._get_key_list('"%s|*%s"' % (VoqDbCli.SYSTEM_NEIGHBOR_TABLE, ipaddr))
         neighbor_key = None
-        for key in result["stdout_lines"]:
+        for key in keys:
             if key.endswith(ipaddr):
                 neighbor_key = key
                 break
@@ -547,13 +696,11 @@ class VoqDbCli(SonicDbCli):
 
     def get_lag_list(self):
         """Returns a list of keys in the system lag table"""
-        cmd = self._cli_prefix() + "KEYS *{}*".format(VoqDbCli.SYSTEM_LAG_TABLE)
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("*{}*".format(VoqDbCli.SYSTEM_LAG_TABLE))
 
     def get_lag_member_list(self):
         """Returns a list of keys in the ststem lag member table"""
-        cmd = self._cli_prefix() + "KEYS *{}*".format(VoqDbCli.SYSTEM_LAG_MEMBER_TABLE)
-        return self._run_and_raise(cmd)["stdout_lines"]
+        return self._get_key_list("*{}*".format(VoqDbCli.SYSTEM_LAG_MEMBER_TABLE))
 
     def dump_neighbor_table(self):
         """
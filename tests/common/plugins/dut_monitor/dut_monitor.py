@@ -1,94 +1,322 @@
+"""
+Hardware resources sampler running on the DUT.
+
+The sampler reads everything from /proc, statvfs and the docker cgroup files, it does not fork any process per
+sample, so it barely shows up in the CPU numbers it measures. Samples are packed into a fixed-size binary ring
+buffer held in memory, and served over a UNIX socket so that the test server can fetch only the samples taken
+since its last fetch:
+
+    python3 dut_monitor.py --start                  # run the sampler (until the SSH channel is closed)
+    python3 dut_monitor.py --fetch --since 120      # print samples with sequence number > 120 as JSON
+    python3 dut_monitor.py --fetch --since 120 --bucket 10
+                                                    # same, downsampled to min/max/avg per 10 samples
+"""
 import argparse
-import time
+import json
 import os
+import socket
+import struct
+import sys
+import threading
+import time
 
 from datetime import datetime
 
 
-FETCH_CPU_CMD = "ps -eo pcpu,args | sort -k 1 -r | tail -n +2"
-FETCH_HDD_CMD = "df -hm /"
 MEASURE_DELAY = 2
+RING_SIZE = 3600                # Samples kept in memory, 2 hours with the default delay
+TOP_PROCESSES = 10
+MAX_CONTAINERS = 48
+CONTAINER_REFRESH = 30          # Seconds between refreshes of the container id to name mapping
+MAX_PROCESS_NAMES = 8192
+SOCKET_PATH = "/tmp/dut_monitor.sock"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# seq, timestamp, cpu total %, ram used %, hdd used %
+HEADER = struct.Struct("<Qdfff")
+# pid, cpu %
+PROCESS = struct.Struct("<If")
+# container index, cpu %, memory MB
+CONTAINER = struct.Struct("<Hff")
+RECORD_SIZE = HEADER.size + TOP_PROCESSES * PROCESS.size + MAX_CONTAINERS * CONTAINER.size
+NO_CONTAINER = 0xFFFF
 
-def process_cpu(log_file):
-    """
-    @summary: Fetch CPU utilization. Write to the file total and top 10 process CPU utilization.
-    @param log_file: Opened file object to store fetched CPU utilization.
-    """
-    general_template = """
-"{timestamp}":
-    total: {total}
-    top_consumer:
-"""
-    per_process_template = "        {cpu_utilization}: \"{process}\""
-    top_consumer_list = []
-    total = 0
-    top_consumer_counter = 10
-
-    for line in os.popen(FETCH_CPU_CMD).readlines():
-        process_consumed = float(line.split()[0])
-        total += process_consumed
-        if top_consumer_counter:
-            top_consumer_list.append(per_process_template.format(cpu_utilization=process_consumed,
-                                     process=" ".join(line.split()[1:])))
-            top_consumer_counter -= 1
-
-    result = general_template.format(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total=total) \
-        + "\n".join(top_consumer_list)
-    log_file.write(result)
-
-
-def process_ram(log_file):
-    """
-    @summary: Fetch RAM utilization and write it to the file.
-              Use 'MemTotal' and 'MemAvailable' from '/proc/meminfo' to obtain used RAM amount.
-    @param log_file: Opened file object to store fetched RAM utilization.
-    """
-    with open('/proc/meminfo') as stream:
-        for line in stream:
-            if 'MemAvailable' in line:
-                available_mem_in_kb = int(line.split()[1])
-            if 'MemTotal' in line:
-                total_mem_in_kb = int(line.split()[1])
-
-    used = total_mem_in_kb - available_mem_in_kb
-    used_percent = used * 100 / total_mem_in_kb
-    log_file.write("\"{date}\": {used_ram}\n".format(date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                   used_ram=used_percent))
-
-
-def process_hdd(log_file):
-    """
-    @summary: Fetch used amount of HDD and write it to the file. Execute command defined in FETCH_HDD_CMD.
-    @param log_file: Opened file object to store fetched HDD utilization.
-    """
-    output_line_id = 1
-    use_value_id = 4
-    hdd_usage = os.popen(FETCH_HDD_CMD).read().split("\n")[output_line_id].split()[use_value_id].rstrip("%")
-    log_file.write("\"{date}\": {used_ram}\n".format(date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                   used_ram=hdd_usage))
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def read_file(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+
+class RingBuffer(object):
+    """Fixed-size buffer of packed sample records, indexed by a monotonically increasing sequence number."""
+
+    def __init__(self, size):
+        self.size = size
+        self.buf = bytearray(size * RECORD_SIZE)
+        self.last_seq = 0
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, cpu, ram, hdd, processes, containers):
+        record = bytearray(RECORD_SIZE)
+        with self.lock:
+            seq = self.last_seq + 1
+        HEADER.pack_into(record, 0, seq, timestamp, cpu, ram, hdd)
+        offset = HEADER.size
+        for index in range(TOP_PROCESSES):
+            pid, usage = processes[index] if index < len(processes) else (0, 0.0)
+            PROCESS.pack_into(record, offset, pid, usage)
+            offset += PROCESS.size
+        for index in range(MAX_CONTAINERS):
+            cidx, usage, mem = containers[index] if index < len(containers) else (NO_CONTAINER, 0.0, 0.0)
+            CONTAINER.pack_into(record, offset, cidx, usage, mem)
+            offset += CONTAINER.size
+
+        with self.lock:
+            position = (seq - 1) % self.size * RECORD_SIZE
+            self.buf[position:position + RECORD_SIZE] = record
+            self.last_seq = seq
+
+    def records_since(self, since):
+        with self.lock:
+            first = max(since + 1, self.last_seq - self.size + 1, 1)
+            records = []
+            for seq in range(first, self.last_seq + 1):
+                position = (seq - 1) % self.size * RECORD_SIZE
+                records.append(bytes(self.buf[position:position + RECORD_SIZE]))
+            return self.last_seq, records
+
+
+class Sampler(object):
+    def __init__(self, ring):
+        self.ring = ring
+        self.prev_cpu = None
+        self.prev_procs = {}
+        self.prev_containers = {}
+        self.prev_time = None
+        self.process_names = {}
+        self.container_names = []
+        self.container_ids = {}
+        self.container_refresh_time = 0
+        self.cgroup_v2 = os.path.exists("/sys/fs/cgroup/cgroup.controllers")
+
+    def read_total_cpu(self):
+        fields = read_file("/proc/stat").split("\n", 1)[0].split()[1:]
+        values = [int(v) for v in fields]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return sum(values), idle
+
+    def read_processes(self):
+        procs = {}
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            stat = read_file("/proc/{}/stat".format(pid))
+            if not stat:
+                continue
+            # The command name may contain spaces, fields after it start after the last ')'
+            fields = stat[stat.rfind(")") + 2:].split()
+            procs[int(pid)] = int(fields[11]) + int(fields[12])
+        return procs
+
+    def process_name(self, pid):
+        if pid not in self.process_names:
+            if len(self.process_names) > MAX_PROCESS_NAMES:
+                self.process_names = {}
+            cmdline = read_file("/proc/{}/cmdline".format(pid)) or ""
+            name = cmdline.replace("\0", " ").strip()
+            if not name:
+                name = "[{}]".format((read_file("/proc/{}/comm".format(pid)) or "").strip())
+            self.process_names[pid] = name
+        return self.process_names[pid]
+
+    def refresh_containers(self, now):
+        if now - self.container_refresh_time < CONTAINER_REFRESH:
+            return
+        self.container_refresh_time = now
+        output = os.popen("docker ps --no-trunc --format '{{.ID}} {{.Names}}' 2>/dev/null").read()
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) != 2 or parts[0] in self.container_ids:
+                continue
+            if len(self.container_names) >= MAX_CONTAINERS:
+                break
+            self.container_ids[parts[0]] = len(self.container_names)
+            self.container_names.append(parts[1])
+
+    def read_container(self, container_id):
+        """Returns (cpu time in seconds, memory in bytes) of a container from its cgroup."""
+        if self.cgroup_v2:
+            base = "/sys/fs/cgroup/system.slice/docker-{}.scope/".format(container_id)
+            cpu_stat = read_file(base + "cpu.stat")
+            memory = read_file(base + "memory.current")
+            if cpu_stat is None or memory is None:
+                return None
+            usage_usec = int(cpu_stat.split("\n", 1)[0].split()[1])
+            return usage_usec / 1e6, int(memory)
+        cpu = read_file("/sys/fs/cgroup/cpuacct/docker/{}/cpuacct.usage".format(container_id))
+        memory = read_file("/sys/fs/cgroup/memory/docker/{}/memory.usage_in_bytes".format(container_id))
+        if cpu is None or memory is None:
+            return None
+        return int(cpu) / 1e9, int(memory)
+
+    def read_ram(self):
+        meminfo = {}
+        for line in read_file("/proc/meminfo").splitlines():
+            parts = line.split()
+            meminfo[parts[0].rstrip(":")] = int(parts[1])
+        return (meminfo["MemTotal"] - meminfo["MemAvailable"]) * 100.0 / meminfo["MemTotal"]
+
+    def read_hdd(self):
+        st = os.statvfs("/")
+        used = st.f_blocks - st.f_bfree
+        # Same rounding as the Use% column of df
+        return float(-(-used * 100 // (used + st.f_bavail)))
+
+    def sample(self):
+        now = time.time()
+        self.refresh_containers(now)
+        total, idle = self.read_total_cpu()
+        procs = self.read_processes()
+        containers = {}
+        for container_id, cidx in self.container_ids.items():
+            usage = self.read_container(container_id)
+            if usage is not None:
+                containers[cidx] = usage
+
+        if self.prev_cpu is not None:
+            elapsed = now - self.prev_time
+            delta_total = total - self.prev_cpu[0]
+            delta_idle = idle - self.prev_cpu[1]
+            cpu = (delta_total - delta_idle) * 100.0 / delta_total if delta_total else 0.0
+
+            process_usage = []
+            for pid, ticks in procs.items():
+                prev = self.prev_procs.get(pid)
+                if prev is not None and ticks > prev:
+                    process_usage.append((pid, (ticks - prev) * 100.0 / CLK_TCK / elapsed))
+            process_usage.sort(key=lambda item: item[1], reverse=True)
+            process_usage = process_usage[:TOP_PROCESSES]
+            for pid, _ in process_usage:
+                self.process_name(pid)
+
+            container_usage = []
+            for cidx, (cpu_seconds, memory) in containers.items():
+                prev = self.prev_containers.get(cidx)
+                if prev is not None:
+                    container_usage.append((cidx, (cpu_seconds - prev[0]) * 100.0 / elapsed, memory / 1048576.0))
+
+            self.ring.append(now, cpu, self.read_ram(), self.read_hdd(), process_usage, container_usage)
+
+        self.prev_cpu = (total, idle)
+        self.prev_procs = procs
+        self.prev_containers = containers
+        self.prev_time = now
+
+    def unpack(self, record):
+        seq, timestamp, cpu, ram, hdd = HEADER.unpack_from(record, 0)
+        offset = HEADER.size
+        top_consumer = {}
+        for _ in range(TOP_PROCESSES):
+            pid, usage = PROCESS.unpack_from(record, offset)
+            offset += PROCESS.size
+            if pid:
+                top_consumer[round(usage, 1)] = self.process_names.get(pid, str(pid))
+        containers = {}
+        for _ in range(MAX_CONTAINERS):
+            cidx, usage, mem = CONTAINER.unpack_from(record, offset)
+            offset += CONTAINER.size
+            if cidx != NO_CONTAINER:
+                containers[self.container_names[cidx]] = {"cpu": round(usage, 2), "mem_mb": round(mem, 1)}
+        return {"seq": seq, "timestamp": datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT),
+                "total": round(cpu, 2), "ram": round(ram, 2), "hdd": hdd,
+                "top_consumer": top_consumer, "containers": containers}
+
+
+def downsample(samples, bucket):
+    """Aggregates every 'bucket' consecutive samples into one with min/max/avg of each metric."""
+    result = []
+    for start in range(0, len(samples), bucket):
+        chunk = samples[start:start + bucket]
+        aggregated = {"seq": chunk[-1]["seq"], "timestamp": chunk[0]["timestamp"], "count": len(chunk)}
+        for metric in ("total", "ram", "hdd"):
+            values = [s[metric] for s in chunk]
+            aggregated[metric] = {"min": min(values), "max": max(values), "avg": sum(values) / len(values)}
+        containers = {}
+        for sample in chunk:
+            for name, usage in sample["containers"].items():
+                containers.setdefault(name, []).append(usage["cpu"])
+        aggregated["containers"] = {name: {"min": min(v), "max": max(v), "avg": sum(v) / len(v)}
+                                    for name, v in containers.items()}
+        result.append(aggregated)
+    return result
+
+
+def serve(sampler, ring):
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen(4)
+    while True:
+        conn, _ = server.accept()
+        try:
+            request = json.loads(conn.makefile().readline() or "{}")
+            last_seq, records = ring.records_since(int(request.get("since", 0)))
+            samples = [sampler.unpack(record) for record in records]
+            bucket = int(request.get("bucket", 0))
+            if bucket > 1:
+                samples = downsample(samples, bucket)
+            conn.sendall(json.dumps({"last_seq": last_seq, "samples": samples}).encode("utf-8"))
+        except Exception as err:
+            conn.sendall(json.dumps({"error": repr(err)}).encode("utf-8"))
+        finally:
+            conn.close()
+
+
+def fetch(since, bucket):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(SOCKET_PATH)
+    client.sendall((json.dumps({"since": since, "bucket": bucket}) + "\n").encode("utf-8"))
+    chunks = []
+    while True:
+        chunk = client.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    client.close()
+    sys.stdout.write(b"".join(chunks).decode("utf-8"))
 
 
 def main():
-    cpu_log = open("/tmp/cpu.log", "w")
-    ram_log = open("/tmp/ram.log", "w")
-    hdd_log = open("/tmp/hdd.log", "w")
+    ring = RingBuffer(RING_SIZE)
+    sampler = Sampler(ring)
+    server = threading.Thread(name="fetch server", target=serve, args=(sampler, ring))
+    server.daemon = True
+    server.start()
 
     print("Started resources monitoring ...")
+    sys.stdout.flush()
     while True:
-        process_cpu(cpu_log)
-        process_ram(ram_log)
-        process_hdd(hdd_log)
-        time.sleep(MEASURE_DELAY)
-        cpu_log.flush()
-        ram_log.flush()
-        hdd_log.flush()
+        started = time.time()
+        sampler.sample()
+        time.sleep(max(0, MEASURE_DELAY - (time.time() - started)))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--start", help="device file", action="store_true", default=False)
+    parser.add_argument("--start", help="start sampling", action="store_true", default=False)
+    parser.add_argument("--fetch", help="print samples taken by the running sampler", action="store_true",
+                        default=False)
+    parser.add_argument("--since", help="only fetch samples after this sequence number", type=int, default=0)
+    parser.add_argument("--bucket", help="downsample by this many samples", type=int, default=0)
     args = parser.parse_args()
 
     if args.start:
         main()
+    elif args.fetch:
+        fetch(args.since, args.bucket)
@@ -2,6 +2,7 @@ import pytest
 import paramiko
 import threading
 import logging
+import json
 import time
 import os
 import yaml
@@ -13,9 +14,6 @@ from .errors import HDDThresholdExceeded, RAMThresholdExceeded, CPUThresholdExce
 
 logger = logging.getLogger(__name__)
 DUT_MONITOR = "/tmp/dut_monitor.py"
-DUT_CPU_LOG = "/tmp/cpu.log"
-DUT_RAM_LOG = "/tmp/ram.log"
-DUT_HDD_LOG = "/tmp/hdd.log"
 
 
 class DUTMonitorPlugin(object):
@@ -34,7 +32,10 @@ class DUTMonitorPlugin(object):
         duthost = duthosts[rand_one_dut_hostname]
         ssh = DUTMonitorClient(host=duthost.hostname, user=creds["sonicadmin_user"],
                                password=creds["sonicadmin_password"])
+        # The sampler keeps running for the whole module, each test fetches only the samples taken during it
+        ssh.start()
         yield ssh
+        ssh.stop()
 
     @pytest.fixture(autouse=True, scope="function")
     def dut_monitor(self, dut_ssh, localhost, duthosts, rand_one_dut_hostname):
@@ -44,8 +45,8 @@ class DUTMonitorPlugin(object):
         duthost = duthosts[rand_one_dut_hostname]
         dut_thresholds = {}
         monitor_exceptions = []
-        # Start monitoring on DUT
-        dut_ssh.start()
+        # Include the last sample taken before the test as the baseline
+        since = max(dut_ssh.last_seq() - 1, 0)
 
         # Read file with defined thresholds
         with open(self.thresholds) as stream:
@@ -61,10 +62,11 @@ class DUTMonitorPlugin(object):
 
         yield dut_thresholds
 
-        # Stop monitoring on DUT
-        dut_ssh.stop()
-        # Download log files with CPU, RAM and HDD measurements data
-        measurements = dut_ssh.get_log_files()
+        # Fetch CPU, RAM and HDD measurements taken during the test
+        measurements = dut_ssh.get_measurements(since)
+        if not measurements["cpu"]:
+            logger.warning("No resources measurements were taken on the DUT during the test, "
+                           "thresholds are not verified")
         # Verify hardware resources consumption does not exceed defined threshold
         if measurements["hdd"]:
             try:
@@ -84,6 +86,12 @@ class DUTMonitorPlugin(object):
             except CPUThresholdExceeded as err:
                 monitor_exceptions.append(err)
 
+        if measurements["containers"]:
+            try:
+                self.assert_containers(container_meas=measurements["containers"], thresholds=dut_thresholds)
+            except CPUThresholdExceeded as err:
+                monitor_exceptions.append(err)
+
         if monitor_exceptions:
             raise Exception("\n".join(item.message for item in monitor_exceptions))
 
@@ -224,6 +232,24 @@ class DUTMonitorPlugin(object):
         if fail_msg:
             raise CPUThresholdExceeded(cpu_thresholds + fail_msg)
 
+    def assert_containers(self, container_meas, thresholds):
+        """
+        Verify that the average CPU consumption of each container does not exceed the optional
+        'container_cpu_average' threshold
+        """
+        logger.debug("Container CPU/RAM consumption during test: {}".format(container_meas))
+        if "container_cpu_average" not in thresholds:
+            return
+
+        overused = []
+        for container, usage in list(container_meas.items()):
+            if usage["cpu"]["avg"] > thresholds["container_cpu_average"]:
+                overused.append((container, usage["cpu"]["avg"]))
+
+        if overused:
+            raise CPUThresholdExceeded("Container average CPU threshold - {}\nContainer CPU overuse:\n{}\n".format(
+                thresholds["container_cpu_average"], "\n".join(str(item) for item in overused)))
+
 
 class DUTMonitorClient(object):
     """
@@ -303,7 +329,7 @@ class DUTMonitorClient(object):
     def start(self):
         """
         @summary: Start HW resources monitoring on the DUT.
-                  Write obtained values to the following files on the DUT: DUT_CPU_LOG, DUT_RAM_LOG, DUT_HDD_LOG
+                  The sampler keeps the measurements in memory until the run channel is closed.
         """
         self.running = True
         self._upload_to_dut()
@@ -313,9 +339,9 @@ class DUTMonitorClient(object):
         self.run_channel.get_pty()
         self.run_channel.settimeout(5)
         # Start monitoring on DUT
-        self.run_channel.exec_command("python {} --start".format(DUT_MONITOR))
+        self.run_channel.exec_command("python3 {} --start".format(DUT_MONITOR))
         # Ensure monitoring started
-        output = self.run_channel.recv(1024)
+        output = self.run_channel.recv(1024).decode("utf-8", "replace")
         if "Started resources monitoring ..." not in output:
             raise Exception("Failed to start monitoring on DUT: {}".format(output))
 
@@ -328,32 +354,88 @@ class DUTMonitorClient(object):
         if not self.run_channel.closed:
             self.run_channel.close()
 
-    def read_yml(self, file_pointer):
+    def fetch(self, since, bucket=0):
+        """
+        @summary: Fetch the samples taken by the sampler on the DUT after sequence number 'since'.
+        @param bucket: If bigger than 1, samples are downsampled on the DUT to min/max/avg per 'bucket' samples.
+        @return: Dictionary with keys "last_seq" and "samples", or None if the sampler could not be reached.
+        """
+        cmd = "python3 {} --fetch --since {} --bucket {}".format(DUT_MONITOR, since, bucket)
+        try:
+            _, stdout, _ = self.ssh.exec_command(cmd, timeout=30)
+            response = json.loads(stdout.read().decode("utf-8"))
+        except Exception as err:
+            logger.warning("Failed to fetch measurements from the DUT - {}".format(repr(err)))
+            return None
+        if "error" in response:
+            logger.warning("Failed to fetch measurements from the DUT - {}".format(response["error"]))
+            return None
+        return response
+
+    def last_seq(self):
         """
-        @summary: Read yaml file content. Convert it to the ordered data.
-        @return: OrderedDict with sorted keys by timestamp, or empty dict for empty file.
+        @summary: Sequence number of the latest sample taken by the sampler on the DUT.
         """
-        with file_pointer as fp:
-            measurements = yaml.safe_load("".join(fp))
-        if measurements is None:
-            return {}
-        # Sort json data to process logs chronologically
-        keys = list(measurements.keys())
-        keys.sort()
-        key_value_pairs = [(item, measurements[item]) for item in keys]
-        return OrderedDict(key_value_pairs)
+        response = self.fetch(since=2 ** 63 - 1)
+        if response is None:
+            self.restart()
+            response = self.fetch(since=2 ** 63 - 1)
+        return response["last_seq"] if response else 0
 
-    def get_log_files(self):
+    def restart(self):
         """
-        @summary: Fetch monitoring logs from device, parse, convert to dictionary with sorted order.
-        @return: Dictionary with keys "cpu", "ram", "hdd", values contains appropriate measurements made on DUT.
+        @summary: Restart the sampler on the DUT, after a DUT reboot, a config reload or a dropped channel.
+                  Raises if it cannot be restarted, so that the thresholds are not silently left unchecked.
         """
-        logger.debug("Downloading file from the DUT...")
-        cpu_log_fp = self.ssh.open_sftp().file(DUT_CPU_LOG)
-        ram_log_fp = self.ssh.open_sftp().file(DUT_RAM_LOG)
-        hdd_log_fp = self.ssh.open_sftp().file(DUT_HDD_LOG)
+        logger.warning("Resources monitoring is not running on the DUT, restarting it...")
+        if self.run_channel is not None and not self.run_channel.closed:
+            self.run_channel.close()
+        try:
+            self.start()
+        except Exception as err:
+            # The SSH connection itself may be broken
+            logger.debug("Failed to restart monitoring - {}, reconnecting...".format(repr(err)))
+            self.close()
+            self.init()
+            self.start()
 
-        cpu_meas = self.read_yml(cpu_log_fp)
-        ram_meas = self.read_yml(ram_log_fp)
-        hdd_meas = self.read_yml(hdd_log_fp)
-        return {"cpu": cpu_meas, "ram": ram_meas, "hdd": hdd_meas}
+    def get_measurements(self, since):
+        """
+        @summary: Fetch samples taken after sequence number 'since', convert them to dictionaries sorted by timestamp.
+        @return: Dictionary with keys "cpu", "ram", "hdd" and "containers", values contains appropriate measurements
+                 made on DUT. "containers" holds min/max/avg CPU and memory per container over the whole interval.
+        """
+        response = self.fetch(since)
+        if response is None:
+            # The sampler died with its channel (DUT reboot, config reload, etc.)
+            self.restart()
+            logger.warning("Resources monitoring was restarted, the measurements of the test are incomplete")
+            response = self.fetch(0)
+        elif response["last_seq"] < since:
+            # The sampler was restarted by the connection tracker, sequence numbers start over
+            logger.warning("Resources monitoring was restarted, the measurements of the test are incomplete")
+            response = self.fetch(0)
+        if response is None:
+            raise Exception("Failed to fetch measurements from the DUT after restarting resources monitoring")
+        samples = response["samples"]
+
+        cpu_meas = OrderedDict()
+        ram_meas = OrderedDict()
+        hdd_meas = OrderedDict()
+        containers = {}
+        for sample in samples:
+            # JSON object keys are strings, CPU consumption is the key of "top_consumer"
+            top_consumer = {float(usage): name for usage, name in list(sample["top_consumer"].items())}
+            cpu_meas[sample["timestamp"]] = {"total": sample["total"], "top_consumer": top_consumer}
+            ram_meas[sample["timestamp"]] = sample["ram"]
+            hdd_meas[sample["timestamp"]] = sample["hdd"]
+            for name, usage in list(sample["containers"].items()):
+                for metric in ("cpu", "mem_mb"):
+                    containers.setdefault(name, {}).setdefault(metric, []).append(usage[metric])
+
+        container_meas = {}
+        for name, metrics in list(containers.items()):
+            container_meas[name] = {metric: {"min": min(values), "max": max(values),
+                                             "avg": sum(values) / len(values)}
+                                    for metric, values in list(metrics.items())}
+        return {"cpu": cpu_meas, "ram": ram_meas, "hdd": hdd_meas, "containers": container_meas}
@@ -13,6 +13,7 @@ from tests.common.plugins.sanity_check import constants
 from tests.common.plugins.sanity_check import checks
 from tests.common.plugins.sanity_check.checks import *      # noqa: F401, F403
 from tests.common.plugins.sanity_check.recover import recover, recover_chassis
+from tests.common.plugins.sanity_check.snapshot import state_snapshot
 from tests.common.plugins.sanity_check.constants import STAGE_PRE_TEST, STAGE_POST_TEST
 from tests.common.helpers.assertions import pytest_assert as pt_assert
 from tests.common.helpers.custom_msg_utils import add_custom_msg
@@ -149,10 +150,27 @@ def filter_check_items(tbinfo, duthosts, check_items):
 
 
 def do_checks(request, check_items, *args, **kwargs):
+    """
+    @summary: Run the check items and collect their results.
+
+    A snapshot of the DUT state needed by the check items is collected first, with one batch of commands per DUT,
+    so that the check items do not each re-fetch the same data for their first attempt. With the
+    --concurrent_sanity_check option the check items are then evaluated concurrently instead of one by one.
+    """
+    check_fixtures = [request.getfixturevalue(item) for item in check_items]
+    state_snapshot.collect(request.getfixturevalue("duthosts"), check_items)
+    try:
+        if request.config.getoption("--concurrent_sanity_check") and len(check_fixtures) > 1:
+            with SafeThreadPoolExecutor(max_workers=len(check_fixtures)) as executor:
+                async_results = [executor.submit(check_fixture, *args, **kwargs) for check_fixture in check_fixtures]
+            all_results = [async_result.get() for async_result in async_results]
+        else:
+            all_results = [check_fixture(*args, **kwargs) for check_fixture in check_fixtures]
+    finally:
+        state_snapshot.clear()
+
     check_results = []
-    for item in check_items:
-        check_fixture = request.getfixturevalue(item)
-        results = check_fixture(*args, **kwargs)
+    for results in all_results:
         logger.debug("check results of each item {}".format(results))
         if results and isinstance(results, list):
             check_results.extend(results)
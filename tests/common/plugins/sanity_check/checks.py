@@ -15,6 +15,8 @@ from tests.common.dualtor.constants import UPPER_TOR, LOWER_TOR, NIC
 from tests.common.dualtor.dual_tor_common import CableType, active_standby_ports                # noqa: F401
 from tests.common.cache import FactsCache
 from tests.common.plugins.sanity_check.constants import STAGE_PRE_TEST, STAGE_POST_TEST
+from tests.common.plugins.sanity_check import snapshot
+from tests.common.plugins.sanity_check.snapshot import state_snapshot, get_networking_uptime
 from tests.common.helpers.parallel import parallel_run, reset_ansible_local_tmp
 from tests.common.dualtor.mux_simulator_control import _probe_mux_ports
 from tests.common.fixtures.duthost_utils import check_bgp_router_id
@@ -115,7 +117,7 @@ def check_interfaces(duthosts, tbinfo):
         results = kwargs['results']
         logger.info("Checking interfaces status on %s..." % dut.hostname)
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = get_networking_uptime(dut)
         timeout = max((SYSTEM_STABILIZE_MAX_TIME - networking_uptime), MIN_PROCESS_CHECK_TIMEOUT)
         if dut.get_facts().get("modular_chassis"):
             timeout = max(timeout, 600)
@@ -308,7 +310,7 @@ def check_bgp(duthosts, tbinfo):
             results[dut.hostname] = check_result
             return
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = get_networking_uptime(dut)
         if SYSTEM_STABILIZE_MAX_TIME - networking_uptime + 480 > 500:
             # If max_timeout is higher than 600, it will exceed parallel_run's timeout
             # the check will be killed by parallel_run, we can't get expected results.
@@ -387,9 +389,13 @@ def check_dbmemory(duthosts):
         logger.info("Checking database memory on %s..." % dut.hostname)
         redis_cmd = "client list"
         check_result = {"failed": False, "check_item": "dbmemory", "host": dut.hostname}
+        client_lists = state_snapshot.get(dut.hostname, snapshot.REDIS_CLIENT_LIST) or {}
         # check the db memory on the redis instance running on each instance
         for asic in dut.asics:
-            res = asic.run_redis_cli_cmd(redis_cmd)['stdout_lines']
+            if asic.asic_index in client_lists:
+                res = client_lists[asic.asic_index]
+            else:
+                res = asic.run_redis_cli_cmd(redis_cmd)['stdout_lines']
             result, total_omem, non_zero_output = _is_db_omem_over_threshold(res)
             check_result["total_omem"] = total_omem
             if result:
@@ -852,7 +858,7 @@ def check_monit(duthosts):
         results = kwargs['results']
 
         logger.info("Checking status of each Monit service...")
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = get_networking_uptime(dut)
         timeout = max((MONIT_STABILIZE_MAX_TIME - networking_uptime), 0)
         interval = 20
         logger.info("networking_uptime = {} seconds, timeout = {} seconds, interval = {} seconds"
@@ -860,8 +866,14 @@ def check_monit(duthosts):
 
         check_result = {"failed": False, "check_item": "monit", "host": dut.hostname}
 
+        def _get_monit_services_status(first_attempt):
+            snapshot_result = state_snapshot.get(dut.hostname, snapshot.MONIT_STATUS) if first_attempt else None
+            if snapshot_result is not None:
+                return dut.parse_monit_services_status(snapshot_result)
+            return dut.get_monit_services_status()
+
         if timeout == 0:
-            monit_services_status = dut.get_monit_services_status()
+            monit_services_status = _get_monit_services_status(first_attempt=True)
             if not monit_services_status:
                 logger.info("Monit was not running.")
                 check_result["failed"] = True
@@ -875,9 +887,11 @@ def check_monit(duthosts):
             start = time.time()
             elapsed = 0
             is_monit_running = False
+            first_attempt = True
             while elapsed < timeout:
                 check_result["failed"] = False
-                monit_services_status = dut.get_monit_services_status()
+                monit_services_status = _get_monit_services_status(first_attempt)
+                first_attempt = False
                 if not monit_services_status:
                     wait(interval, msg="Monit was not started and wait {} seconds to retry. Remaining time: {}."
                          .format(interval, timeout - elapsed))
@@ -924,7 +938,7 @@ def check_processes(duthosts):
         results = kwargs['results']
         logger.info("Checking process status on %s..." % dut.hostname)
 
-        networking_uptime = dut.get_networking_uptime().seconds
+        networking_uptime = get_networking_uptime(dut)
         timeout = max((SYSTEM_STABILIZE_MAX_TIME - networking_uptime), MIN_PROCESS_CHECK_TIMEOUT)
         interval = 20
         logger.info("networking_uptime=%d seconds, timeout=%d seconds, interval=%d seconds" %
@@ -1218,10 +1232,10 @@ def check_orchagent_usage(duthosts):
         results = kwargs['results']
         logger.info("Checking orchagent CPU usage on %s..." % dut.hostname)
         check_result = {"failed": False, "check_item": "orchagent_usage", "host": dut.hostname}
-        res = dut.shell(
-            "COLUMNS=512 show processes cpu | grep orchagent | awk '{print $9}'",
-            module_ignore_errors=True,
-        )["stdout_lines"]
+        res = state_snapshot.get(dut.hostname, snapshot.ORCHAGENT_USAGE)
+        if res is None:
+            res = dut.shell(snapshot.ORCHAGENT_USAGE_CMD, module_ignore_errors=True)
+        res = res["stdout_lines"]
 
         check_result["orchagent_usage"] = res
         logger.info("Done checking orchagent CPU usage on %s" % dut.hostname)
@@ -1408,7 +1422,9 @@ def check_disk_usage(duthosts):
         logger.info("Checking disk usage on %s..." % dut.hostname)
         check_result = {"failed": False, "check_item": "disk_usage", "host": dut.hostname}
 
-        res = dut.shell("df --output=pcent,target,source", module_ignore_errors=True)
+        res = state_snapshot.get(dut.hostname, snapshot.DISK_USAGE)
+        if res is None:
+            res = dut.shell(snapshot.DISK_USAGE_CMD, module_ignore_errors=True)
         if res["rc"] != 0:
             logger.error("Failed to get disk usage on %s: %s" % (dut.hostname, res.get("stderr", "")))
             check_result["failed"] = True
@@ -0,0 +1,156 @@
+"""
+Shared per-DUT state snapshot for the sanity check items.
+
+Several check items fetch the same data from every DUT before evaluating it: check_interfaces, check_bgp,
+check_monit and check_processes all start by reading the networking service start time (two Ansible calls each),
+and check_monit, check_dbmemory, check_disk_usage and check_orchagent_usage each run one more command.
+
+Before the checks run, do_checks collects everything the selected check items need with a single shell_cmds call
+per DUT (all DUTs in parallel). Check items evaluate their first attempt against the snapshot and only query the
+DUT themselves when they retry, so only the items that are still failing cost extra round trips.
+
+The snapshot is module level state: it is filled in the pytest process before the checks start, and inherited by
+the processes that parallel_run forks for the per-DUT check functions.
+"""
+import logging
+import threading
+
+from datetime import datetime
+
+from tests.common.helpers.multi_thread_utils import SafeThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+NETWORKING_UPTIME = "networking_uptime"
+MONIT_STATUS = "monit_status"
+REDIS_CLIENT_LIST = "redis_client_list"
+DISK_USAGE = "disk_usage"
+ORCHAGENT_USAGE = "orchagent_usage"
+
+CHECK_SNAPSHOT_ITEMS = {
+    "check_interfaces": [NETWORKING_UPTIME],
+    "check_bgp": [NETWORKING_UPTIME],
+    "check_monit": [NETWORKING_UPTIME, MONIT_STATUS],
+    "check_processes": [NETWORKING_UPTIME],
+    "check_dbmemory": [REDIS_CLIENT_LIST],
+    "check_disk_usage": [DISK_USAGE],
+    "check_orchagent_usage": [ORCHAGENT_USAGE],
+}
+
+DISK_USAGE_CMD = "df --output=pcent,target,source"
+MONIT_STATUS_CMD = "sudo monit status"
+ORCHAGENT_USAGE_CMD = "COLUMNS=512 show processes cpu | grep orchagent | awk '{print $9}'"
+NETWORKING_START_CMD = "systemctl -p ExecMainStartTimestamp show networking"
+NOW_CMD = 'date +"%Y-%m-%d %H:%M:%S"'
+REDIS_CLIENT_LIST_CMD = "/usr/bin/redis-cli client list"
+
+
+def _redis_client_list_cmd(asic):
+    if asic.namespace:
+        return "sudo ip netns exec {} {}".format(asic.namespace, REDIS_CLIENT_LIST_CMD)
+    return REDIS_CLIENT_LIST_CMD
+
+
+def _parse_networking_uptime(start_output, now_output):
+    """Same computation as SonicHost.get_networking_uptime, from the two command outputs."""
+    start_time = start_output.strip().split("=", 1)[-1]
+    return datetime.strptime(now_output.strip(), "%Y-%m-%d %H:%M:%S") - \
+        datetime.strptime(start_time, "%a %Y-%m-%d %H:%M:%S %Z")
+
+
+class DutStateSnapshot(object):
+    """
+    Per-DUT results of the commands needed by the selected check items.
+
+    Check items use get() for their first attempt only and query the DUT again on retry.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _collect_on_dut(self, dut, items):
+        cmds = {}
+        if NETWORKING_UPTIME in items:
+            cmds["networking_start"] = NETWORKING_START_CMD
+            cmds["now"] = NOW_CMD
+        if MONIT_STATUS in items:
+            cmds[MONIT_STATUS] = MONIT_STATUS_CMD
+        if DISK_USAGE in items:
+            cmds[DISK_USAGE] = DISK_USAGE_CMD
+        if ORCHAGENT_USAGE in items:
+            cmds[ORCHAGENT_USAGE] = ORCHAGENT_USAGE_CMD
+        if REDIS_CLIENT_LIST in items:
+            for asic in dut.asics:
+                cmds["{}:{}".format(REDIS_CLIENT_LIST, asic.asic_index)] = _redis_client_list_cmd(asic)
+
+        names = list(cmds.keys())
+        results = dut.shell_cmds(cmds=[cmds[name] for name in names], continue_on_fail=True,
+                                 module_ignore_errors=True, verbose=False, timeout=60)["results"]
+        outputs = dict(zip(names, results))
+
+        snapshot = {}
+        if NETWORKING_UPTIME in items:
+            try:
+                snapshot[NETWORKING_UPTIME] = _parse_networking_uptime(outputs["networking_start"]["stdout"],
+                                                                       outputs["now"]["stdout"])
+            except (KeyError, ValueError) as e:
+                logger.info("Could not get networking uptime of %s from snapshot: %s", dut.hostname, repr(e))
+        for name in (MONIT_STATUS, DISK_USAGE, ORCHAGENT_USAGE):
+            if name in outputs:
+                snapshot[name] = outputs[name]
+        if REDIS_CLIENT_LIST in items:
+            client_lists = {}
+            for asic in dut.asics:
+                res = outputs.get("{}:{}".format(REDIS_CLIENT_LIST, asic.asic_index))
+                if res is not None and res["rc"] == 0:
+                    client_lists[asic.asic_index] = res["stdout_lines"]
+            if len(client_lists) == len(dut.asics):
+                snapshot[REDIS_CLIENT_LIST] = client_lists
+
+        with self._lock:
+            self._data[dut.hostname] = snapshot
+
+    def collect(self, duthosts, check_items):
+        """
+        Collects the data needed by check_items on all DUTs, one batch of commands per DUT.
+
+        A DUT that can not be reached is logged and left out, its check items then query it directly.
+        """
+        self.clear()
+        items = set()
+        for check_item in check_items:
+            items.update(CHECK_SNAPSHOT_ITEMS.get(check_item, []))
+        if not items:
+            return
+
+        def _collect(dut):
+            try:
+                self._collect_on_dut(dut, items)
+            except Exception as e:
+                logger.warning("Failed to collect sanity check snapshot on %s: %s", dut.hostname, repr(e))
+
+        logger.info("Collecting sanity check snapshot %s", sorted(items))
+        with SafeThreadPoolExecutor(max_workers=8) as executor:
+            for dut in duthosts:
+                executor.submit(_collect, dut)
+
+    def get(self, hostname, item):
+        """Returns the snapshot value of item for a DUT, or None if it was not collected."""
+        with self._lock:
+            return self._data.get(hostname, {}).get(item)
+
+    def clear(self):
+        with self._lock:
+            self._data = {}
+
+
+state_snapshot = DutStateSnapshot()
+
+
+def get_networking_uptime(dut):
+    """Networking uptime in seconds from the snapshot, falling back to querying the DUT."""
+    uptime = state_snapshot.get(dut.hostname, NETWORKING_UPTIME)
+    if uptime is None:
+        uptime = dut.get_networking_uptime()
+    return uptime.seconds
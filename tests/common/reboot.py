@@ -9,6 +9,7 @@ from multiprocessing.pool import ThreadPool
 from collections import deque
 
 from .helpers.assertions import pytest_assert
+from .helpers.boot_readiness import BootReadinessError, BootReadinessTracker
 from .helpers.parallel_utils import synchronized_reboot
 from .platform.interface_utils import check_interface_status_of_up_ports
 from .platform.processes_utils import wait_critical_processes
@@ -447,27 +448,21 @@ def reboot(duthost, localhost, reboot_type='cold', delay=10,
         # minutes to the maximum wait time. If it's ready sooner, then the
         # function will return sooner.
 
-        # Update critical service list after rebooting in case critical services changed after rebooting
-        pytest_assert(wait_until(300, 10, 0, duthost.is_host_service_running, "docker"),
-                      "Docker service failed to start on {}".format(hostname))
-        pytest_assert(wait_until(200, 10, 0, duthost.is_critical_processes_running_per_asic_or_host, "database"),
-                      "Database not start.")
-        pytest_assert(wait_until(20, 5, 0, duthost.is_service_running, "redis", "database"), "Redis DB not start")
-
-        duthost.critical_services_tracking_list()
-        pytest_assert(wait_until(wait + 400, 20, 0, duthost.critical_services_fully_started),
-                      "{}: All critical services should be fully started!".format(hostname))
+        tracker = BootReadinessTracker(duthost)
+        try:
+            bgp_ready = wait_until_ready(duthost, tracker, wait, check_intf_up_ports, wait_for_bgp, wait_for_ibgp)
+        except BootReadinessError as e:
+            logger.warning("{}, polling readiness from the test server".format(e))
+            bgp_ready = False
+            wait_until_ready_by_polling(duthost, wait, check_intf_up_ports)
         wait_critical_processes(duthost)
 
-        if check_intf_up_ports:
-            pytest_assert(wait_until(wait + 300, 20, 0, check_interface_status_of_up_ports, duthost),
-                          "{}: Not all ports that are admin up on are operationally up".format(hostname))
-
         if duthost.facts['asic_type'] == "cisco-8000":
             # Wait dshell initialization finish
             pytest_assert(wait_until(wait + 300, 20, 0, check_dshell_ready, duthost),
                           "dshell not ready")
     else:
+        bgp_ready = False
         time.sleep(wait)
 
     # Wait warmboot-finalizer service
@@ -511,7 +506,7 @@ def reboot(duthost, localhost, reboot_type='cold', delay=10,
         assert float(dut_uptime.strftime("%s")) > float(dut_datetime.strftime("%s")), "Device {} did not reboot". \
             format(hostname)
 
-    if wait_for_bgp:
+    if wait_for_bgp and not bgp_ready:
         bgp_neighbors = duthost.get_bgp_neighbors_per_asic(state="all")
         if not wait_for_ibgp:
             # Filter out iBGP neighbors
@@ -533,6 +528,66 @@ def reboot(duthost, localhost, reboot_type='cold', delay=10,
         )
 
 
+def wait_until_ready(duthost, tracker, wait, check_intf_up_ports, wait_for_bgp, wait_for_ibgp):
+    """
+    Waits until the DUT is ready after a reboot, with the DUT-side boot readiness helper.
+
+    The helper runs twice: until the database is up, as the critical services of a supervisor are read from it, and
+    until the critical services are running, the admin up ports are up and the BGP sessions established, as requested.
+
+    Returns:
+        True if the BGP sessions were waited for.
+
+    Raises:
+        BootReadinessError: the helper failed on the DUT.
+    """
+    hostname = duthost.hostname
+    pytest_assert(tracker.wait("database", 520, []),
+                  "Database not start on {}: {}".format(hostname, tracker.pending))
+
+    # Update critical service list after rebooting in case critical services changed after rebooting
+    duthost.critical_services_tracking_list()
+    check_ports = check_intf_up_ports and check_interface_status_needed(duthost)
+    timeout = wait + 400
+    if check_ports:
+        timeout += wait + 300
+    if wait_for_bgp:
+        timeout += wait + 300
+    ready = tracker.wait("bgp" if wait_for_bgp else "ports" if check_ports else "services", timeout,
+                         duthost.critical_services, check_ports=check_ports, ibgp=wait_for_ibgp)
+    pytest_assert("services" in tracker.timeline,
+                  "{}: All critical services should be fully started! {}".format(hostname, tracker.pending))
+    pytest_assert(not check_ports or "ports" in tracker.timeline,
+                  "{}: Not all ports that are admin up on are operationally up: {}".format(hostname, tracker.pending))
+    pytest_assert(ready, "Not all bgp sessions are established after reboot: {}".format(tracker.pending))
+    return wait_for_bgp
+
+
+def wait_until_ready_by_polling(duthost, wait, check_intf_up_ports):
+    hostname = duthost.hostname
+    # Update critical service list after rebooting in case critical services changed after rebooting
+    pytest_assert(wait_until(300, 10, 0, duthost.is_host_service_running, "docker"),
+                  "Docker service failed to start on {}".format(hostname))
+    pytest_assert(wait_until(200, 10, 0, duthost.is_critical_processes_running_per_asic_or_host, "database"),
+                  "Database not start.")
+    pytest_assert(wait_until(20, 5, 0, duthost.is_service_running, "redis", "database"), "Redis DB not start")
+
+    duthost.critical_services_tracking_list()
+    pytest_assert(wait_until(wait + 400, 20, 0, duthost.critical_services_fully_started),
+                  "{}: All critical services should be fully started!".format(hostname))
+
+    if check_intf_up_ports:
+        pytest_assert(wait_until(wait + 300, 20, 0, check_interface_status_of_up_ports, duthost),
+                      "{}: Not all ports that are admin up on are operationally up".format(hostname))
+
+
+def check_interface_status_needed(duthost):
+    # Same exceptions as check_interface_status_of_up_ports
+    if duthost.facts['asic_type'] == 'vs' and duthost.is_supervisor_node():
+        return False
+    return not duthost.is_bmc()
+
+
 def positive_uptime(duthost, dut_datetime):
     dut_uptime = duthost.get_up_time()
     if float(dut_uptime.strftime("%s")) < float(dut_datetime.strftime("%s")):
@@ -50,6 +50,9 @@ from tests.common.helpers.constants import (
     ASIC_PARAM_TYPE_ALL, ASIC_PARAM_TYPE_FRONTEND, DEFAULT_ASIC_ID, NAMESPACE_PREFIX,
     ASICS_PRESENT, DUT_CHECK_NAMESPACE
 )
+from tests.common.helpers.boot_readiness import pop_boot_timelines
+from tests.common.helpers.config_digest import ConfigDigest, changed_tables, changed_keys
+from tests.common.helpers.config_digest import RELOAD_REQUIRED_TABLES, config_patch
 from tests.common.helpers.custom_msg_utils import add_custom_msg
 from tests.common.helpers.dut_ports import encode_dut_port_name
 from tests.common.helpers.dut_utils import encode_dut_and_container_name
@@ -237,6 +240,8 @@ def pytest_addoption(parser):
                      help="Change (add|remove) post test check items based on pre test check items")
     parser.addoption("--recover_method", action="store", default="adaptive",
                      help="Set method to use for recover if sanity failed")
+    parser.addoption("--concurrent_sanity_check", action="store_true", default=False,
+                     help="Evaluate the sanity check items concurrently instead of one by one")
 
     ########################
     #   pre-test options   #
@@ -3006,6 +3011,16 @@ def collect_db_dump_on_duts(request, duthosts):
         duthosts.shell("rm -fr {} {}".format(db_dump_tarfile, db_dump_path))
 
 
+@pytest.fixture(autouse=True)
+def record_boot_timelines(request):
+    """This autoused fixture records the boot timelines of the DUTs rebooted by reboot() with safe_reboot during
+    a test, or during the setup of its fixtures, in the test results.
+    """
+    yield
+    for hostname, timeline in pop_boot_timelines().items():
+        add_custom_msg(request, "boot_timeline.{}".format(hostname), timeline)
+
+
 @pytest.fixture(autouse=True)
 def collect_db_dump(request, duthosts):
     """This autoused fixture is to generate DB dumps on DUT and collect them to local for later troubleshooting when
@@ -3041,6 +3056,67 @@ def restore_config_db_and_config_reload(duts_data, duthosts, request):
                             check_intf_up_ports=True, wait_for_bgp=wait_for_bgp)
 
 
+def restore_config_db_by_patch(duts_data, duthosts, config_digests, exclude_config_table_names):
+    """
+    Restores the running config of the DUTs with the generic config updater, reverting only what drifted.
+
+    pre_running_config and cur_running_config of duts_data hold the tables whose digest changed. They are turned
+    into a JSON patch applied with `config apply-patch`, then the digest of the running config is checked again
+    and the config is saved.
+
+    Returns:
+        True if the running config of all DUTs is restored, False if a config reload is needed: the drift touches
+        RELOAD_REQUIRED_TABLES, the patch failed or the digest still differs.
+    """
+    patches = {}
+    for duthost in duthosts:
+        patch = []
+        # Tables some keys of which are left out of the check, like MUX_LINKMGR on dualtor
+        partial_tables = set(key.split("|")[0] for key in config_digests[duthost.hostname].exclude_keys)
+        for cfg_context, pre_running_config in duts_data[duthost.hostname]["pre_running_config"].items():
+            cur_running_config = duts_data[duthost.hostname]["cur_running_config"][cfg_context]
+            tables = (set(pre_running_config) | set(cur_running_config)) - exclude_config_table_names
+            reload_tables = tables & RELOAD_REQUIRED_TABLES
+            if reload_tables:
+                logger.info("Config drift on {} touches {}, config reload is needed".format(
+                    duthost.hostname, sorted(reload_tables)))
+                return False
+            prefix = (cfg_context or "localhost") if duthost.is_multi_asic else None
+            patch.extend(config_patch({table: pre_running_config[table] for table in tables
+                                       if table in pre_running_config},
+                                      {table: cur_running_config[table] for table in tables
+                                       if table in cur_running_config},
+                                      prefix, partial_tables))
+        patches[duthost.hostname] = patch
+
+    for duthost in duthosts:
+        patch = patches[duthost.hostname]
+        if not patch:
+            continue
+        logger.info("Restoring config on {} with patch: {}".format(duthost.hostname, json.dumps(patch)))
+        patch_file = duthost.shell("mktemp")["stdout"]
+        try:
+            duthost.copy(content=json.dumps(patch, indent=4), dest=patch_file, verbose=False)
+            output = duthost.shell("config apply-patch {}".format(patch_file), module_ignore_errors=True)
+        finally:
+            duthost.file(path=patch_file, state="absent")
+        if output["rc"] != 0 or "Patch applied successfully" not in output["stdout"]:
+            logger.warning("Failed to apply patch on {}: {}".format(duthost.hostname, output["stdout"]))
+            return False
+
+        for cfg_context, pre_digest in duts_data[duthost.hostname]["pre_running_config_digest"].items():
+            pre_only_tables, cur_only_tables, changed = changed_tables(
+                pre_digest, config_digests[duthost.hostname].digest(namespace=cfg_context))
+            still_changed = (pre_only_tables | cur_only_tables | changed) - exclude_config_table_names
+            if still_changed:
+                logger.warning("Config of {} {} still differs after patch: {}".format(
+                    duthost.hostname, cfg_context or "host", sorted(still_changed)))
+                return False
+        duthost.shell("config save -y")
+        logger.info("Config of {} restored by patch".format(duthost.hostname))
+    return True
+
+
 def compare_running_config(pre_running_config, cur_running_config):
     if type(pre_running_config) != type(cur_running_config):
         return False
@@ -3116,6 +3192,33 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
 
         duts_data = {}
 
+        # The tables that we don't care
+        exclude_config_table_names = set([])
+        # The keys that we don't care
+        # Current skipped keys:
+        # 1. "MUX_LINKMGR|LINK_PROBER"
+        # 2. "MUX_LINKMGR|TIMED_OSCILLATION"
+        # 3. "LOGGER|linkmgrd"
+        # NOTE: this key is edited by the `run_icmp_responder_session` or `run_icmp_responder`
+        # to account for the lower performance of the ICMP responder/mux simulator compared to
+        # real servers and mux cables.
+        # Linkmgrd is the only service to consume this table so it should not affect other test cases.
+        # Let's keep this setting in db and we don't want any config reload caused by this key, so
+        # let's skip checking it.
+        if "dualtor" in tbinfo["topo"]["name"]:
+            exclude_config_key_names = [
+                'MUX_LINKMGR|LINK_PROBER',
+                'MUX_LINKMGR|TIMED_OSCILLATION',
+                'LOGGER|linkmgrd'
+            ]
+        else:
+            exclude_config_key_names = []
+
+        # The running config is digested on the DUT, only the tables whose digest changed during the
+        # module are fetched and compared
+        config_digests = {dut.hostname: ConfigDigest(dut, exclude_keys=exclude_config_key_names)
+                          for dut in duthosts}
+
         if check_flag:
 
             def collect_before_test(dut):
@@ -3132,13 +3235,14 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
                     pre_existing_core_dumps = dut.shell('ls /var/core/')['stdout'].split()
                 duts_data[dut.hostname]["pre_core_dumps"] = pre_existing_core_dumps
 
-                logger.info("Collecting running config before test on {}".format(dut.hostname))
+                logger.info("Collecting running config digest before test on {}".format(dut.hostname))
                 duts_data[dut.hostname]["pre_running_config"] = {}
+                duts_data[dut.hostname]["pre_running_config_file"] = {}
+                duts_data[dut.hostname]["pre_running_config_digest"] = {}
                 if not dut.stat(path="/etc/sonic/running_golden_config.json")['stat']['exists']:
                     logger.info("Collecting running golden config before test on {}".format(dut.hostname))
                     dut.shell("sonic-cfggen -d --print-data > /etc/sonic/running_golden_config.json")
-                duts_data[dut.hostname]["pre_running_config"][None] = \
-                    json.loads(dut.shell("cat /etc/sonic/running_golden_config.json", verbose=False)['stdout'])
+                duts_data[dut.hostname]["pre_running_config_file"][None] = "/etc/sonic/running_golden_config.json"
 
                 if dut.is_multi_asic:
                     for asic_index in range(0, dut.facts.get('num_asic')):
@@ -3151,9 +3255,12 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
                                     asic_index,
                                 )
                             )
-                        duts_data[dut.hostname]['pre_running_config'][asic_ns] = \
-                            json.loads(dut.shell("cat /etc/sonic/running_golden_config{}.json".format(asic_index),
-                                                 verbose=False)['stdout'])
+                        duts_data[dut.hostname]["pre_running_config_file"][asic_ns] = \
+                            "/etc/sonic/running_golden_config{}.json".format(asic_index)
+
+                for cfg_context, config_file in duts_data[dut.hostname]["pre_running_config_file"].items():
+                    duts_data[dut.hostname]["pre_running_config_digest"][cfg_context] = \
+                        config_digests[dut.hostname].digest(config_file=config_file)
 
             with SafeThreadPoolExecutor(max_workers=8) as executor:
                 for duthost in duthosts:
@@ -3216,17 +3323,26 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
                 pre_core_dumps_set = set(duts_data[dut.hostname]["pre_core_dumps"])
                 new_core_dumps[dut.hostname] = list(cur_core_dumps_set - pre_core_dumps_set)
 
-                logger.info("Collecting running config after test on {}".format(dut.hostname))
-                # get running config after running
+                logger.info("Collecting running config digest after test on {}".format(dut.hostname))
+                # get the tables of the running config whose digest changed after running
                 duts_data[dut.hostname]["cur_running_config"] = {}
-                duts_data[dut.hostname]["cur_running_config"][None] = \
-                    json.loads(dut.shell("sonic-cfggen -d --print-data", verbose=False)['stdout'])
-                if dut.is_multi_asic:
-                    for asic_index in range(0, dut.facts.get('num_asic')):
-                        asic_ns = "asic{}".format(asic_index)
-                        duts_data[dut.hostname]["cur_running_config"][asic_ns] = \
-                            json.loads(dut.shell("sonic-cfggen -n {} -d --print-data".format(asic_ns),
-                                                 verbose=False)['stdout'])
+                for cfg_context, config_file in duts_data[dut.hostname]["pre_running_config_file"].items():
+                    cur_digest = config_digests[dut.hostname].digest(namespace=cfg_context)
+                    pre_only_tables, cur_only_tables, changed = changed_tables(
+                        duts_data[dut.hostname]["pre_running_config_digest"][cfg_context], cur_digest)
+                    pre_tables = (pre_only_tables | changed) - exclude_config_table_names
+                    cur_tables = (cur_only_tables | changed) - exclude_config_table_names
+                    for table in sorted(changed - exclude_config_table_names):
+                        pre_only_keys, cur_only_keys, changed_keys_in_table = changed_keys(
+                            duts_data[dut.hostname]["pre_running_config_digest"][cfg_context][table],
+                            cur_digest[table])
+                        logger.info("Table {} changed on {} {}: removed {}, added {}, modified {}".format(
+                            table, dut.hostname, cfg_context or "host", sorted(pre_only_keys),
+                            sorted(cur_only_keys), sorted(changed_keys_in_table)))
+                    duts_data[dut.hostname]["pre_running_config"][cfg_context] = \
+                        config_digests[dut.hostname].dump(pre_tables, config_file=config_file)
+                    duts_data[dut.hostname]["cur_running_config"][cfg_context] = \
+                        config_digests[dut.hostname].dump(cur_tables, namespace=cfg_context)
 
             with SafeThreadPoolExecutor(max_workers=8) as executor:
                 for duthost in duthosts:
@@ -3240,28 +3356,6 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
                     for new_core_dump in new_core_dumps[duthost.hostname]:
                         duthost.fetch(src="/var/core/{}".format(new_core_dump), dest=os.path.join(base_dir, "logs"))
 
-                # The tables that we don't care
-                exclude_config_table_names = set([])
-                # The keys that we don't care
-                # Current skipped keys:
-                # 1. "MUX_LINKMGR|LINK_PROBER"
-                # 2. "MUX_LINKMGR|TIMED_OSCILLATION"
-                # 3. "LOGGER|linkmgrd"
-                # NOTE: this key is edited by the `run_icmp_responder_session` or `run_icmp_responder`
-                # to account for the lower performance of the ICMP responder/mux simulator compared to
-                # real servers and mux cables.
-                # Linkmgrd is the only service to consume this table so it should not affect other test cases.
-                # Let's keep this setting in db and we don't want any config reload caused by this key, so
-                # let's skip checking it.
-                if "dualtor" in tbinfo["topo"]["name"]:
-                    exclude_config_key_names = [
-                        'MUX_LINKMGR|LINK_PROBER',
-                        'MUX_LINKMGR|TIMED_OSCILLATION',
-                        'LOGGER|linkmgrd'
-                    ]
-                else:
-                    exclude_config_key_names = []
-
                 def _remove_entry(table_name, key_name, config):
                     if table_name in config and key_name in config[table_name]:
                         config[table_name].pop(key_name)
@@ -3360,7 +3454,16 @@ def core_dump_and_config_check(duthosts, tbinfo, parallel_run_context, request,
                 logger.warning("Core dump or config check failed for {}, results: {}"
                                .format(module_name, json.dumps(check_result)))
 
-                restore_config_db_and_config_reload(duts_data, duthosts, request)
+                # A config drift alone is reverted with a patch, new core dumps need a config reload
+                if core_dump_check_failed or not restore_config_db_by_patch(duts_data, duthosts, config_digests,
+                                                                            exclude_config_table_names):
+                    # Only the changed tables were fetched, the whole config is needed for restore
+                    for duthost in duthosts:
+                        for cfg_context, config_file in \
+                                duts_data[duthost.hostname]["pre_running_config_file"].items():
+                            duts_data[duthost.hostname]["pre_running_config"][cfg_context] = \
+                                config_digests[duthost.hostname].dump(config_file=config_file)
+                    restore_config_db_and_config_reload(duts_data, duthosts, request)
             else:
                 logger.info("Core dump and config check passed for {}".format(module_name))
 
@@ -1,6 +1,8 @@
+import base64
 import json
 import logging
 import math
+import os
 import time
 import uuid
 from functools import lru_cache
@@ -10,6 +12,10 @@ import pytest
 
 logger = logging.getLogger(__name__)
 
+GNMI_LOADER = "/root/gnmi_session_service.py"
+DASH_CONVERGENCE_SCRIPT_SRC = "scripts/dash_convergence.py"
+DASH_CONVERGENCE_SCRIPT_DEST = "/tmp/dash_convergence.py"
+
 
 @lru_cache(maxsize=None)
 class GNMIEnvironment(object):
@@ -454,3 +460,173 @@ def write_gnmi_files(localhost, duthost, ptfhost, env, delete_list, update_list,
     ptfhost.shell('rm -f updates.tar.gz')
     localhost.shell(f'rm -f {env.work_dir}update*')
     ptfhost.shell('rm -f update*')
+
+
+class DashConvergence(object):
+    """
+    Detects when a DPU is done programming a DASH configuration
+
+    The DUT-side helper scripts/dash_convergence.py is started in the background on the DPU before the configuration
+    is sent, and watches the ASIC_DB object counts and the sairedis recording until they stop changing. start()
+    returns once the helper has taken the counts before the configuration.
+    """
+
+    READY_TIMEOUT = 30
+
+    def __init__(self, dpuhost, settle=1.0, idle_timeout=5, timeout=120, patterns=None):
+        self.dpuhost = dpuhost
+        self.run_id = str(uuid.uuid4())
+        self.request = {
+            "result": "/tmp/dash_convergence.%s.json" % self.run_id,
+            "ready": "/tmp/dash_convergence.%s.ready" % self.run_id,
+            "applied": "/tmp/dash_convergence.%s.applied" % self.run_id,
+            "stop": "/tmp/dash_convergence.%s.stop" % self.run_id,
+            "settle": settle,
+            "idle_timeout": idle_timeout,
+            "timeout": timeout,
+        }
+        if patterns:
+            self.request["patterns"] = patterns
+
+    def start(self):
+        encoded = base64.b64encode(json.dumps(self.request).encode()).decode()
+        cmd = "test -f {script} || exit 3; sudo nohup python3 {script} {request} > /dev/null 2>&1 & " \
+              "timeout {timeout} sh -c 'until [ -f {ready} ]; do sleep 0.1; done'".format(
+                  script=DASH_CONVERGENCE_SCRIPT_DEST, request=encoded, timeout=self.READY_TIMEOUT,
+                  ready=self.request["ready"])
+        output = self.dpuhost.shell(cmd, module_ignore_errors=True)
+        if output["rc"] == 3:
+            # /tmp does not survive a reboot, so the helper is (re)deployed lazily.
+            self.dpuhost.copy(src=DASH_CONVERGENCE_SCRIPT_SRC, dest=DASH_CONVERGENCE_SCRIPT_DEST)
+            output = self.dpuhost.shell(cmd, module_ignore_errors=True)
+        if output["rc"] != 0:
+            self.stop()
+            raise Exception("DASH convergence watcher did not start on %s in %s seconds"
+                            % (self.dpuhost.hostname, self.READY_TIMEOUT))
+
+    def stop(self):
+        """
+        Ends the watch without a result, when the configuration could not be sent
+        """
+        cmd = "sudo touch {stop}; timeout 5 sh -c 'while [ -f {stop} ]; do sleep 0.1; done'; " \
+              "sudo rm -f /tmp/dash_convergence.{run_id}.*".format(run_id=self.run_id, **self.request)
+        self.dpuhost.shell(cmd, module_ignore_errors=True)
+
+    def wait(self):
+        """
+        Returns:
+            Result of the helper, with the time from start() returning to the last change in "time_to_program"
+        """
+        cmd = "sudo touch {applied}; timeout {timeout} sh -c 'until [ -f {result} ]; do sleep 0.1; done'; " \
+              "cat {result} && sudo rm -f {result}".format(timeout=self.request["timeout"] + 10, **self.request)
+        output = self.dpuhost.shell(cmd, module_ignore_errors=True)
+        if output["rc"] != 0:
+            raise Exception("DASH convergence watcher did not report on %s: %s"
+                            % (self.dpuhost.hostname, output["stderr"]))
+        return json.loads(output["stdout"])
+
+
+def _run_bulk_loader(ptfhost, request, local_file, ptf_file):
+    encoded = base64.b64encode(json.dumps(request).encode()).decode()
+    output = ptfhost.shell("/root/env-python3/bin/python %s --run %s; rm -f %s"
+                           % (GNMI_LOADER, encoded, ptf_file), module_ignore_errors=True)
+    try:
+        result = json.loads(output["stdout"])["results"][0]
+    except (ValueError, KeyError, IndexError):
+        raise Exception("gNMI bulk loader failed: " + output["stdout"] + output["stderr"])
+    finally:
+        os.remove(local_file)
+    if not result["ok"]:
+        raise Exception(result["error"])
+    return result
+
+
+def bulk_apply_messages(
+    duthost,
+    ptfhost,
+    messages,
+    dpu_index,
+    set_db=True,
+    dpuhost=None,
+    batch_size=64,
+    pipeline=4,
+    wait_after_apply=5,
+    convergence_timeout=120,
+):
+    """
+    Apply DASH messages with one in-process gNMI client on the PTF, and wait until they are programmed
+
+    The messages are shipped in one file and sent by gnmi_session_service.py as Set requests of batch_size
+    objects, with up to pipeline requests in flight, instead of one file and py_gnmicli call per chunk.
+
+    Args:
+        duthost: fixture for duthost, running the gNMI server
+        ptfhost: fixture for ptfhost
+        messages: dictionary of "TABLE:key" to config, like apply_messages
+        dpu_index: index of the DPU
+        set_db: True to set the messages, False to delete them
+        dpuhost: DPU to watch until the configuration is programmed, None to sleep wait_after_apply seconds
+        batch_size: number of objects per Set request
+        pipeline: number of Set requests in flight
+        wait_after_apply: the seconds to wait after the messages are applied when no dpuhost is given, and at most
+                          when the configuration changes nothing on the DPU
+        convergence_timeout: the seconds to wait for the DPU to program the configuration
+
+    Returns:
+        dict with the number of objects, the time spent by gNMI and the time to program the configuration, in
+        seconds, and the achieved objects per second
+    """
+    env = GNMIEnvironment(duthost)
+    data = {"delete": [], "update": []}
+    for key, config_dict in messages.items():
+        keys = key.split(":", 1)
+        path = "/DPU_APPL_DB/dpu%s/%s[key=%s]" % (dpu_index, keys[0], keys[1])
+        if not set_db:
+            data["delete"].append(path)
+        elif proto_utils.ENABLE_PROTO:
+            message = proto_utils.parse_dash_proto(key, config_dict)
+            data["update"].append([path, base64.b64encode(message.SerializeToString()).decode(), "proto"])
+        else:
+            data["update"].append([path, base64.b64encode(json.dumps(config_dict).encode()).decode(), "json"])
+
+    convergence = None
+    if dpuhost is not None:
+        convergence = DashConvergence(dpuhost, idle_timeout=wait_after_apply, timeout=convergence_timeout)
+        convergence.start()
+
+    try:
+        filename = "bulk_%s.json" % uuid.uuid4()
+        with open(env.work_dir + filename, "w") as file:
+            json.dump(data, file)
+        ptfhost.copy(src=env.work_dir + filename, dest="/root/" + filename)
+        ptfhost.copy(src="scripts/gnmi_session_service.py", dest=GNMI_LOADER)
+
+        request = {
+            "target": {"ip": duthost.mgmt_ip, "port": env.gnmi_port, "rcert": "/root/" + env.gnmi_ca_cert,
+                       "pkey": "/root/" + env.gnmi_client_key, "cchain": "/root/" + env.gnmi_client_cert},
+            "ops": [{"op": "bulk_set", "origin": "sonic-db", "file": "/root/" + filename,
+                     "batch_size": batch_size, "pipeline": pipeline}],
+        }
+        result = _run_bulk_loader(ptfhost, request, env.work_dir + filename, "/root/" + filename)
+    except Exception:
+        # The watcher would otherwise run until its timeout
+        if convergence is not None:
+            convergence.stop()
+        raise
+
+    objects = result["objects"]
+    stats = {"objects": objects, "requests": result["requests"], "gnmi_time": result["elapsed_s"]}
+    if convergence is None:
+        time.sleep(wait_after_apply)
+        stats["time_to_program"] = result["elapsed_s"] + wait_after_apply
+    else:
+        converged = convergence.wait()
+        if not converged["converged"]:
+            raise Exception("DPU did not finish programming the configuration in %s seconds" % convergence_timeout)
+        stats["time_to_program"] = converged["time_to_program"]
+        stats["asic_db_counts"] = converged["counts_after"]
+    stats["objects_per_sec"] = objects / stats["time_to_program"] if stats["time_to_program"] else 0
+    logger.info("Applied %u DASH objects in %u gNMI requests: %.2fs in gNMI, %.2fs to program, %.1f objects/s"
+                % (objects, stats["requests"], stats["gnmi_time"], stats["time_to_program"],
+                   stats["objects_per_sec"]))
+    return stats
@@ -1,11 +1,10 @@
 import logging
-import time
 
 import configs.privatelink_config as pl
 import pytest
 from dash_api.eni_pb2 import EniMode, State
 from dash_api.route_type_pb2 import RoutingType
-from gnmi_utils import apply_messages
+from gnmi_utils import bulk_apply_messages
 
 from tests.common import config_reload
 from tests.common.helpers.assertions import pytest_assert
@@ -45,7 +44,7 @@ def common_setup_teardown(
     }
     logger.info(base_config_messages)
 
-    apply_messages(localhost, duthost, ptfhost, base_config_messages, dpuhost.dpu_index)
+    bulk_apply_messages(duthost, ptfhost, base_config_messages, dpuhost.dpu_index, dpuhost=dpuhost)
 
     route_and_mapping_messages = {
         **pl.PE_VNET_MAPPING_CONFIG,
@@ -54,7 +53,7 @@ def common_setup_teardown(
         **pl.VM_SUBNET_ROUTE_CONFIG,
     }
     logger.info(route_and_mapping_messages)
-    apply_messages(localhost, duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index)
+    bulk_apply_messages(duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index, dpuhost=dpuhost)
 
     # inbound routing not implemented in Pensando SAI yet, so skip route rule programming
     if "pensando" not in dpuhost.facts["asic_type"]:
@@ -64,13 +63,13 @@ def common_setup_teardown(
             **pl.TRUSTED_VNI_ROUTE_RULE_CONFIG,
         }
         logger.info(route_rule_messages)
-        apply_messages(localhost, duthost, ptfhost, route_rule_messages, dpuhost.dpu_index)
+        bulk_apply_messages(duthost, ptfhost, route_rule_messages, dpuhost.dpu_index, dpuhost=dpuhost)
 
     logger.info(pl.ENI_FNIC_CONFIG)
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, dpuhost=dpuhost)
 
     logger.info(pl.ENI_ROUTE_GROUP1_CONFIG)
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, dpuhost=dpuhost)
 
     yield
 
@@ -93,8 +92,8 @@ def test_route_bind_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
     route_group2_config = {
         f"DASH_ROUTE_GROUP_TABLE:{pl.ROUTE_GROUP2}": {"guid": pl.ROUTE_GROUP2_GUID, "version": "rg_version"}
     }
-    apply_messages(localhost, duthost, ptfhost, pl.VNET2_CONFIG, dpuhost.dpu_index)
-    apply_messages(localhost, duthost, ptfhost, route_group2_config, dpuhost.dpu_index)
+    bulk_apply_messages(duthost, ptfhost, pl.VNET2_CONFIG, dpuhost.dpu_index, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, route_group2_config, dpuhost.dpu_index, dpuhost=dpuhost)
 
     pe_subnet_route_group2_config = {
         f"DASH_ROUTE_TABLE:{pl.ROUTE_GROUP2}:{pl.PE_CA_SUBNET}": {
@@ -104,19 +103,14 @@ def test_route_bind_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
             "metering_class_and": "4095",
         }
     }
-    apply_messages(localhost, duthost, ptfhost, pe_subnet_route_group2_config, dpuhost.dpu_index)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, pe_subnet_route_group2_config, dpuhost.dpu_index, dpuhost=dpuhost)
 
     eni_route_group2_config = {f"DASH_ENI_ROUTE_TABLE:{pl.ENI_ID}": {"group_id": pl.ROUTE_GROUP2}}
-    apply_messages(localhost, duthost, ptfhost, eni_route_group2_config, dpuhost.dpu_index)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, eni_route_group2_config, dpuhost.dpu_index, dpuhost=dpuhost)
 
     route_messages = {**pl.PE_SUBNET_ROUTE_CONFIG, **pl.VM_SUBNET_ROUTE_CONFIG}
-    apply_messages(localhost, duthost, ptfhost, route_messages, dpuhost.dpu_index, False)
-    apply_messages(localhost, duthost, ptfhost, pl.ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False)
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, route_messages, dpuhost.dpu_index, False, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, pl.ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     all_changes = parse_sairedis_changes(dpuhost, start_line)
 
@@ -158,9 +152,7 @@ def test_vnet_map_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
     # Record starting point for sairedis tracking
     start_line = get_sairedis_line_count(dpuhost)
 
-    apply_messages(localhost, duthost, ptfhost, pl.PE_VNET_MAPPING_CONFIG, dpuhost.dpu_index, False)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, pl.PE_VNET_MAPPING_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     new_underlay_ip = "102.2.3.4"
     pe_vnet_mapping_config_v2 = {
@@ -172,9 +164,7 @@ def test_vnet_map_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
             "metering_class_or": "1586",
         }
     }
-    apply_messages(localhost, duthost, ptfhost, pe_vnet_mapping_config_v2, dpuhost.dpu_index)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, pe_vnet_mapping_config_v2, dpuhost.dpu_index, dpuhost=dpuhost)
 
     all_changes = parse_sairedis_changes(dpuhost, start_line)
 
@@ -199,7 +189,7 @@ def test_eni_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
 
     start_line = get_sairedis_line_count(dpuhost)
 
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     if "pensando" not in dpuhost.facts["asic_type"]:
         route_rule_messages = {
@@ -208,11 +198,9 @@ def test_eni_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
             **pl.TRUSTED_VNI_ROUTE_RULE_CONFIG,
         }
         logger.info(route_rule_messages)
-        apply_messages(localhost, duthost, ptfhost, route_rule_messages, dpuhost.dpu_index, False)
+        bulk_apply_messages(duthost, ptfhost, route_rule_messages, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, False)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     new_underlay_ip = "26.2.2.2"  # Different underlay IP from VM1_PA (25.1.1.1)
     eni_fnic_config_v2 = {
@@ -228,9 +216,7 @@ def test_eni_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
             "trusted_vnis": [pl.VNET1_VNI],
         }
     }
-    apply_messages(localhost, duthost, ptfhost, eni_fnic_config_v2, dpuhost.dpu_index)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, eni_fnic_config_v2, dpuhost.dpu_index, dpuhost=dpuhost)
 
     all_changes = parse_sairedis_changes(dpuhost, start_line)
 
@@ -254,7 +240,7 @@ def test_vnet_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
     # Record starting point for sairedis tracking
     start_line = get_sairedis_line_count(dpuhost)
 
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     if "pensando" not in dpuhost.facts["asic_type"]:
         route_rule_messages = {
@@ -263,28 +249,24 @@ def test_vnet_churn(localhost, duthost, ptfhost, dpuhosts, dpu_index):
             **pl.TRUSTED_VNI_ROUTE_RULE_CONFIG,
         }
         logger.info(route_rule_messages)
-        apply_messages(localhost, duthost, ptfhost, route_rule_messages, dpuhost.dpu_index, False)
+        bulk_apply_messages(duthost, ptfhost, route_rule_messages, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, False)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
     route_and_mapping_messages = {
         **pl.PE_VNET_MAPPING_CONFIG,
         **pl.PE_SUBNET_ROUTE_CONFIG,
         **pl.VM_VNET_MAPPING_CONFIG,
         **pl.VM_SUBNET_ROUTE_CONFIG,
     }
-    apply_messages(localhost, duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index, False)
-    apply_messages(localhost, duthost, ptfhost, pl.VNET_CONFIG, dpuhost.dpu_index, False)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index, False, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, pl.VNET_CONFIG, dpuhost.dpu_index, False, dpuhost=dpuhost)
 
     new_vni = "3001"
     vnet_config_v2 = {f"DASH_VNET_TABLE:{pl.VNET1}": {"vni": new_vni, "guid": pl.VNET1_GUID}}
-    apply_messages(localhost, duthost, ptfhost, vnet_config_v2, dpuhost.dpu_index)
-    apply_messages(localhost, duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index)
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index)
-    apply_messages(localhost, duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index)
-
-    time.sleep(2)
+    bulk_apply_messages(duthost, ptfhost, vnet_config_v2, dpuhost.dpu_index, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, route_and_mapping_messages, dpuhost.dpu_index, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_FNIC_CONFIG, dpuhost.dpu_index, dpuhost=dpuhost)
+    bulk_apply_messages(duthost, ptfhost, pl.ENI_ROUTE_GROUP1_CONFIG, dpuhost.dpu_index, dpuhost=dpuhost)
 
     all_changes = parse_sairedis_changes(dpuhost, start_line)
 
@@ -5,6 +5,7 @@ from tests.common.helpers.assertions import pytest_require as pyrequire
 from tests.common.helpers.dut_utils import check_container_state
 from tests.gnmi.helper import gnmi_container, apply_cert_config, recover_cert_config
 from tests.gnmi.helper import GNMI_SERVER_START_WAIT_TIME, check_ntp_sync_status
+from tests.gnmi.helper import gnmi_session_start, gnmi_session_stop
 from tests.common.gu_utils import create_checkpoint, rollback
 from tests.common.helpers.gnmi_utils import create_revoked_cert_and_crl, create_gnmi_certs, \
     delete_gnmi_certs, prepare_root_cert, prepare_server_cert, prepare_client_cert, copy_certificate_to_dut, \
@@ -82,7 +83,7 @@ def setup_gnmi_rotated_server(duthosts, rand_one_dut_hostname, localhost, ptfhos
         check_container_state(duthost, gnmi_container(duthost), should_be_running=True),
         "Test was not supported on devices which do not support GNMI!"
     )
-    prepare_root_cert(localhost)
+    prepare_root_cert(localhost, rotate=True)
     prepare_server_cert(duthost, localhost)
     prepare_client_cert(localhost)
     copy_certificate_to_ptf(ptfhost)
@@ -106,3 +107,13 @@ def check_dut_timestamp(duthosts, rand_one_dut_hostname, localhost):
     time_diff = local_time - dut_time
     if time_diff >= GNMI_SERVER_START_WAIT_TIME:
         logger.warning("DUT time is wrong (%d), please check NTP" % (-time_diff))
+
+
+@pytest.fixture(scope="module")
+def gnmi_session(ptfhost):
+    '''
+    Run the persistent gNMI client service on PTF for the module
+    '''
+    gnmi_session_start(ptfhost)
+    yield
+    gnmi_session_stop(ptfhost)
@@ -2,6 +2,7 @@ import time
 import logging
 import pytest
 import json
+import base64
 from tests.common.utilities import wait_until
 from tests.common.platform.device_utils import get_dpu_ip, get_dpu_port
 from tests.common.helpers.gnmi_utils import GNMIEnvironment, add_gnmi_client_common_name, del_gnmi_client_common_name, \
@@ -17,6 +18,8 @@ GNMI_PROGRAM_NAME = ''
 GNMI_PORT = 0
 # Wait 15 seconds after starting GNMI server
 GNMI_SERVER_START_WAIT_TIME = 15
+GNMI_SESSION_SERVICE = '/root/gnmi_session_service.py'
+GNMI_SESSION_SOCKET = '/tmp/gnmi_session.sock'
 
 
 def apply_cert_config(duthost):
@@ -323,6 +326,95 @@ def gnmi_get(duthost, ptfhost, path_list):
         raise Exception("error:" + msg)
 
 
+def gnmi_session_start(ptfhost):
+    """
+    Start the persistent gNMI client service on PTF
+
+    The service keeps one authenticated channel per DUT, so requests sent with gnmi_session_request
+    do not pay the py_gnmicli start-up and TLS handshake.
+
+    Args:
+        ptfhost: fixture for ptfhost
+    """
+    ptfhost.copy(src='scripts/gnmi_session_service.py', dest=GNMI_SESSION_SERVICE)
+    gnmi_session_stop(ptfhost)
+    ptfhost.shell('nohup /root/env-python3/bin/python %s --serve --socket %s > /tmp/gnmi_session.log 2>&1 &'
+                  % (GNMI_SESSION_SERVICE, GNMI_SESSION_SOCKET))
+    ready = wait_until(30, 1, 0,
+                       lambda: ptfhost.shell('test -S %s' % GNMI_SESSION_SOCKET, module_ignore_errors=True)['rc'] == 0)
+    if not ready:
+        log = ptfhost.shell('cat /tmp/gnmi_session.log', module_ignore_errors=True)['stdout']
+        raise Exception("gNMI session service did not start:\n" + log)
+
+
+def gnmi_session_stop(ptfhost):
+    """
+    Stop the persistent gNMI client service on PTF
+
+    Args:
+        ptfhost: fixture for ptfhost
+    """
+    ptfhost.shell("pkill -f '%s --serve'" % GNMI_SESSION_SERVICE, module_ignore_errors=True)
+    ptfhost.shell('rm -f %s' % GNMI_SESSION_SOCKET, module_ignore_errors=True)
+
+
+def gnmi_session_request(duthost, ptfhost, ops, repeat=1, concurrency=1, cert=None):
+    """
+    Send a batch of gNMI operations to the session service on PTF
+
+    Args:
+        duthost: fixture for duthost
+        ptfhost: fixture for ptfhost
+        ops: list of operations, see tests/scripts/gnmi_session_service.py for the format
+        repeat: run the batch this many times (throughput mode)
+        concurrency: number of client threads used for the repeated batches
+        cert: client certificate name in /root, gnmiclient by default
+
+    Returns:
+        dict with 'results' (one per operation, from the last run) and 'stats' (latency percentiles and rate)
+    """
+    env = GNMIEnvironment(duthost, GNMIEnvironment.GNMI_MODE)
+    cert = cert or 'gnmiclient'
+    request = {
+        'target': {'ip': duthost.mgmt_ip, 'port': env.gnmi_port, 'rcert': '/root/gnmiCA.pem',
+                   'pkey': '/root/{}.key'.format(cert), 'cchain': '/root/{}.crt'.format(cert)},
+        'ops': ops,
+        'repeat': repeat,
+        'concurrency': concurrency,
+    }
+    encoded = base64.b64encode(json.dumps(request).encode()).decode()
+    output = ptfhost.shell('/root/env-python3/bin/python %s --socket %s --request %s'
+                           % (GNMI_SESSION_SERVICE, GNMI_SESSION_SOCKET, encoded), module_ignore_errors=True)
+    if output['rc'] != 0:
+        raise Exception("gNMI session service request failed:\n" + output['stdout'] + output['stderr'])
+    response = json.loads(output['stdout'])
+    if 'error' in response:
+        raise Exception("gNMI session service error: " + response['error'])
+    if response['stats']['errors']:
+        dump_gnmi_log(duthost)
+        dump_system_status(duthost)
+        raise Exception("GRPC error: %s" % response['stats']['first_errors'])
+    return response
+
+
+def gnmi_session_set_op(delete_list, update_list, replace_list):
+    """
+    Build a session service set operation from gnmi_set style lists
+    """
+    op = {'op': 'set', 'origin': 'sonic-db', 'delete': [], 'update': [], 'replace': []}
+    for path in delete_list:
+        op['delete'].append(path.replace('sonic-db:', ''))
+    for update in update_list:
+        result = update.replace('sonic-db:', '').rsplit(':', 1)
+        op['update'].append(result)
+    for replace in replace_list:
+        result = replace.replace('sonic-db:', '').rsplit(':', 1)
+        if '#' in result[1]:
+            result[1] = '""'
+        op['replace'].append(result)
+    return op
+
+
 # py_gnmicli does not fully support POLLING mode
 # Use gnmi_cli instead
 def gnmi_subscribe_polling(duthost, ptfhost, path_list, interval_ms, count):
@@ -2,7 +2,7 @@ import logging
 import pytest
 import time
 
-from .helper import gnmi_set
+from .helper import gnmi_set, gnmi_session_request, gnmi_session_set_op
 
 logger = logging.getLogger(__name__)
 
@@ -88,3 +88,61 @@ def test_gnmi_latency_01(duthosts, rand_one_dut_hostname, ptfhost):
     cmd = "lscpu"
     output = duthost.shell(cmd)
     logger.info("CPU Info:\n%s" % output['stdout'])
+
+
+def prepare_description_ops(duthost, ptfhost):
+    interface = get_first_interface(duthost)
+    if interface is None:
+        pytest.skip("No valid interface found on DUT '%s'" % duthost.hostname)
+    ops = []
+    for text in ["down", "up"]:
+        file_name = "%s.txt" % text
+        with open(file_name, 'w') as file:
+            file.write("\"%s\"" % text)
+        ptfhost.copy(src=file_name, dest='/root')
+        update = "/sonic-db:CONFIG_DB/localhost/PORT/%s/description:@/root/%s" % (interface, file_name)
+        ops.append(gnmi_session_set_op([], [update], []))
+    return interface, ops
+
+
+def log_session_stats(title, stats):
+    logger.info("=== %s ===" % title)
+    logger.info("Operations: %d in %.2fs, %.1f ops/s" % (stats['count'], stats['elapsed_s'], stats['ops_per_sec']))
+    if not stats['count']:
+        return
+    logger.info("Latency - Avg: %.2fms, Min: %.2fms, P50: %.2fms, P90: %.2fms, P99: %.2fms, Max: %.2fms" %
+                (stats['avg_ms'], stats['min_ms'], stats['p50_ms'], stats['p90_ms'], stats['p99_ms'],
+                 stats['max_ms']))
+
+
+def test_gnmi_session_latency_01(duthosts, rand_one_dut_hostname, ptfhost, gnmi_session):
+    '''
+    Verify GNMI native write latency over a persistent client session
+    Same updates as test_gnmi_latency_01, without the client start-up in the measurement
+    '''
+    duthost = duthosts[rand_one_dut_hostname]
+    if duthost.is_supervisor_node():
+        pytest.skip("gnmi test relies on port data not present on supervisor card '%s'" % rand_one_dut_hostname)
+    interface, ops = prepare_description_ops(duthost, ptfhost)
+
+    test_loop = 10
+    response = gnmi_session_request(duthost, ptfhost, ops, repeat=test_loop)
+    log_session_stats("GNMI SET SESSION LATENCY STATISTICS", response['stats'])
+    logger.info(f"Test completed: {test_loop} iterations on interface {interface}")
+
+
+def test_gnmi_session_throughput_01(duthosts, rand_one_dut_hostname, ptfhost, gnmi_session):
+    '''
+    Verify GNMI native write throughput
+    Update interface description from several concurrent clients sharing one channel
+    '''
+    duthost = duthosts[rand_one_dut_hostname]
+    if duthost.is_supervisor_node():
+        pytest.skip("gnmi test relies on port data not present on supervisor card '%s'" % rand_one_dut_hostname)
+    interface, ops = prepare_description_ops(duthost, ptfhost)
+
+    test_loop = 200
+    concurrency = 4
+    response = gnmi_session_request(duthost, ptfhost, ops, repeat=test_loop, concurrency=concurrency)
+    log_session_stats("GNMI SET THROUGHPUT STATISTICS (%d clients)" % concurrency, response['stats'])
+    logger.info(f"Test completed: {test_loop} iterations on interface {interface}")
@@ -11,6 +11,15 @@ TEST_DIR = "performance_meter"
 CONFIG_FILE_DIR = os.path.join(TEST_DIR, "config")
 
 
+def pytest_addoption(parser):
+    parser.addoption("--performance_meter_results_dir", action="store", default=None,
+                     help="Directory where results are stored per HwSKU and image, "
+                          "default: performance_meter/results")
+    parser.addoption("--performance_meter_baseline", action="store", default=None,
+                     help="Image whose stored results are the baseline for regression detection, "
+                          "default: the last stored results of another image on the same HwSKU")
+
+
 def load_test_config():
     if not os.path.exists(CONFIG_FILE_DIR):
         os.makedirs(CONFIG_FILE_DIR)
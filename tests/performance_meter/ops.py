@@ -1,4 +1,7 @@
 import asyncio
+import ipaddress
+import json
+import logging
 
 
 def get_op_by_name(op):
@@ -18,6 +21,14 @@ async def async_command_ignore_errors(duthost, command):
         return
 
 
+# helper function for ops
+async def async_shell_ignore_errors(duthost, command):
+    try:
+        return duthost.shell(command, module_ignore_errors=True)
+    except Exception:
+        return
+
+
 # Defining an op.
 # An op is seperated into 2 parts by yield.
 #     first part setup, prepare for checking
@@ -32,25 +43,109 @@ async def async_command_ignore_errors(duthost, command):
 # log the error, otherwise yielding True is expected.
 # Op is also expected to be async. If no async feature is needed, simply
 # add async before def.
+# Like success criteria, an op takes all variables defined in config that
+# start with its name as keyword args, e.g. "restart_container_by_cmd_container"
+# is passed to restart_container_by_cmd as "container". As one run of an op
+# serves all the tests using it, the variables of these tests are merged.
 
 
-async def noop(request):
+async def noop(request, **kwargs):
     yield True
 
 
-async def bad_op(request):
+async def bad_op(request, **kwargs):
     yield False
 
 
-async def reboot_by_cmd(request):
+async def reboot_by_cmd(request, **kwargs):
     duthost = request.getfixturevalue("duthost")
     command = asyncio.create_task(async_command_ignore_errors(duthost, "reboot"))
     yield True
     await command
 
 
-async def config_reload_by_cmd(request):
+async def warm_reboot_by_cmd(request, **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    command = asyncio.create_task(async_command_ignore_errors(duthost, "warm-reboot"))
+    yield True
+    await command
+
+
+async def fast_reboot_by_cmd(request, **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    command = asyncio.create_task(async_command_ignore_errors(duthost, "fast-reboot"))
+    yield True
+    await command
+
+
+async def config_reload_by_cmd(request, **kwargs):
     duthost = request.getfixturevalue("duthost")
     command = asyncio.create_task(async_command_ignore_errors(duthost, "config reload -f -y"))
     yield True
     await command
+
+
+# apply a json patch with generic config updater, the running config is
+# checkpointed before and rolled back after the op
+async def apply_patch_by_gcu(request, patch, checkpoint="performance_meter", **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    patch_file = duthost.shell("mktemp")["stdout"]
+    duthost.copy(content=json.dumps(patch, indent=4), dest=patch_file)
+    output = duthost.shell("config checkpoint {}".format(checkpoint), module_ignore_errors=True)
+    if output["rc"] != 0:
+        logging.error("Failed to create checkpoint {}: {}".format(checkpoint, output["stderr"]))
+        yield False
+        return
+    command = asyncio.create_task(async_shell_ignore_errors(duthost, "config apply-patch {}".format(patch_file)))
+    yield True
+    await command
+    output = duthost.shell("config rollback {}".format(checkpoint), module_ignore_errors=True)
+    if output["rc"] != 0 or "Config rolled back successfully" not in output["stdout"]:
+        logging.error("Failed to rollback to checkpoint {}: {}".format(checkpoint, output["stdout"]))
+    duthost.shell("config delete-checkpoint {}".format(checkpoint), module_ignore_errors=True)
+    duthost.file(path=patch_file, state="absent")
+
+
+async def restart_container_by_cmd(request, container="swss", **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    command = asyncio.create_task(async_command_ignore_errors(duthost,
+                                                              "systemctl restart {}".format(container)))
+    yield True
+    await command
+
+
+# helper function for route ops, swssconfig file with count routes of
+# prefix_len starting at prefix
+def _route_entries(prefix, prefix_len, count, nexthop, ifname, op):
+    network = ipaddress.ip_network("{}/{}".format(prefix, prefix_len), strict=False)
+    entries = []
+    for index in range(count):
+        route = ipaddress.ip_network((int(network.network_address) + index * network.num_addresses,
+                                      network.prefixlen))
+        key = "ROUTE_TABLE:{}".format(route)
+        if op == "SET":
+            entries.append({key: {"nexthop": nexthop, "ifname": ifname}, "OP": op})
+        else:
+            entries.append({key: {}, "OP": op})
+    return entries
+
+
+# program count routes to APPL_DB at once with swssconfig, to be checked with
+# routes_in_asic_db, and remove them after
+async def add_routes_by_swssconfig(request, nexthop, ifname, count=1000, prefix="192.168.0.0", prefix_len=24,
+                                   **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    route_file = duthost.shell("mktemp")["stdout"]
+    duthost.copy(content=json.dumps(_route_entries(prefix, prefix_len, count, nexthop, ifname, "SET")),
+                 dest=route_file)
+    command = asyncio.create_task(async_shell_ignore_errors(
+        duthost, "docker exec -i swss swssconfig /dev/stdin < {}".format(route_file)))
+    yield True
+    await command
+    duthost.copy(content=json.dumps(_route_entries(prefix, prefix_len, count, nexthop, ifname, "DEL")),
+                 dest=route_file)
+    output = duthost.shell("docker exec -i swss swssconfig /dev/stdin < {}".format(route_file),
+                           module_ignore_errors=True)
+    if output["rc"] != 0:
+        logging.error("Failed to remove routes: {}".format(output["stderr"]))
+    duthost.file(path=route_file, state="absent")
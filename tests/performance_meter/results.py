@@ -0,0 +1,167 @@
+import datetime
+import json
+import logging
+import math
+import os
+import statistics
+import pandas as pd
+
+
+RESULTS_DIR = os.path.join("performance_meter", "results")
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+# regressions are only flagged when the current runs are slower than baseline
+# with a one-sided p value below alpha and the median grew by more than threshold
+DEFAULT_REGRESSION_ALPHA = 0.05
+DEFAULT_REGRESSION_THRESHOLD = 0.05
+DEFAULT_REGRESSION_MIN_SAMPLES = 3
+
+
+# Results of a test case are the samples of every numeric variable collected
+# by runs that passed success criteria, time_to_pass and what the success
+# criteria stored in test result, like mem_used_perc. They are stored per
+# HwSKU and image:
+# RESULTS_DIR/HWSKU/OS_VERSION.json
+# {
+#   "hwsku": HWSKU,
+#   "os_version": OS_VERSION,
+#   "updated": TIMESTAMP,
+#   "tests": {
+#     CONFIG_FILE: {
+#       TEST_NAME: {
+#         VARIABLE: {"samples": [...], "count": N, "mean": ..., "p99": ..., ...},
+#       },
+#     },
+#   },
+# }
+# Higher is assumed to be worse for all variables.
+
+
+def collect_variables(single_test_results):
+    passed_success_criteria = [result for result in single_test_results
+                               if result is not None and result.get("op_precheck_success") and
+                               result.get("op_success") and result.get("passed")]
+    variables = {}
+    for result in passed_success_criteria:
+        for name, value in result.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                variables.setdefault(name, []).append(value)
+    return variables
+
+
+def summarize(samples):
+    summary = {"count": len(samples)}
+    if not samples:
+        return summary
+    series = pd.Series(samples)
+    summary["min"] = min(samples)
+    summary["max"] = max(samples)
+    summary["mean"] = statistics.mean(samples)
+    for name, quantile in QUANTILES.items():
+        summary[name] = float(series.quantile(quantile))
+    if len(samples) > 1:
+        summary["stdev"] = statistics.stdev(samples)
+        summary["variance"] = statistics.variance(samples)
+    return summary
+
+
+def summarize_variables(variables):
+    stats = {}
+    for name, samples in sorted(variables.items()):
+        summary = summarize(samples)
+        logging.warning("{}: {}".format(name, ", ".join("{} {}".format(key, value) for key, value in summary.items())))
+        stats[name] = {"samples": samples, **summary}
+    return stats
+
+
+# one-sided Mann-Whitney U test, p value of current being stochastically
+# greater than baseline, normal approximation with tie and continuity correction
+def mann_whitney_u(baseline, current):
+    n1, n2 = len(baseline), len(current)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    n = n1 + n2
+    rank_sum = 0.0
+    tie_term = 0.0
+    index = 0
+    while index < n:
+        end = index
+        while end + 1 < n and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        ties = end - index + 1
+        average_rank = (index + end) / 2.0 + 1
+        rank_sum += average_rank * sum(group for _, group in combined[index:end + 1])
+        tie_term += ties ** 3 - ties
+        index = end + 1
+    u = rank_sum - n2 * (n2 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def find_regressions(test_config, stats, baseline_stats):
+    alpha = test_config.get("regression_alpha", DEFAULT_REGRESSION_ALPHA)
+    threshold = test_config.get("regression_threshold", DEFAULT_REGRESSION_THRESHOLD)
+    min_samples = test_config.get("regression_min_samples", DEFAULT_REGRESSION_MIN_SAMPLES)
+    variables = test_config.get("regression_variables", sorted(stats))
+    regressions = []
+    for name in variables:
+        if name not in stats or name not in baseline_stats:
+            continue
+        samples = stats[name]["samples"]
+        baseline_samples = baseline_stats[name]["samples"]
+        if len(samples) < min_samples or len(baseline_samples) < min_samples:
+            logging.warning("Not enough samples of {} to compare with baseline".format(name))
+            continue
+        p_value = mann_whitney_u(baseline_samples, samples)
+        median = statistics.median(samples)
+        baseline_median = statistics.median(baseline_samples)
+        logging.warning("{} median {} baseline median {} p value {}".format(name, median, baseline_median, p_value))
+        if p_value < alpha and median > baseline_median * (1 + threshold):
+            regressions.append("{} median {} regressed from baseline median {} (p value {:.4f})"
+                               .format(name, median, baseline_median, p_value))
+    return regressions
+
+
+def _results_file(results_dir, hwsku, os_version):
+    return os.path.join(results_dir, hwsku, os_version.replace(os.sep, "_") + ".json")
+
+
+def load_results(results_dir, hwsku, os_version):
+    path = _results_file(results_dir, hwsku, os_version)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# results of os_version if given, otherwise the last stored results of
+# another image on the same HwSKU
+def load_baseline(results_dir, hwsku, os_version, baseline_os_version=None):
+    if baseline_os_version:
+        return load_results(results_dir, hwsku, baseline_os_version)
+    hwsku_dir = os.path.join(results_dir, hwsku)
+    if not os.path.isdir(hwsku_dir):
+        return None
+    current = os.path.basename(_results_file(results_dir, hwsku, os_version))
+    candidates = [os.path.join(hwsku_dir, name) for name in os.listdir(hwsku_dir)
+                  if name.endswith(".json") and name != current]
+    if not candidates:
+        return None
+    with open(max(candidates, key=os.path.getmtime)) as f:
+        return json.load(f)
+
+
+def save_results(results_dir, hwsku, os_version, tests):
+    path = _results_file(results_dir, hwsku, os_version)
+    results = load_results(results_dir, hwsku, os_version) or {"hwsku": hwsku, "os_version": os_version, "tests": {}}
+    for config_file, tests_for_config_file in tests.items():
+        results["tests"].setdefault(config_file, {}).update(tests_for_config_file)
+    results["updated"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(results, f, indent=2)
+    os.replace(path + ".tmp", path)
+    logging.warning("Saved results to {}".format(path))
+    return path
@@ -280,3 +280,42 @@ def startup_mem_usage_after_bgp_up_stats(passed_op_precheck, **kwargs):
     pytest_assert(mem_used_perc_stats["quantile_result"] < target_mem_used_perc_stats["p90"],
                   "mem_used_perc p90 {} is not lower than target mem_used_perc p90 {}"
                   .format(mem_used_perc_stats["quantile_result"], target_mem_used_perc_stats["p90"]))
+
+
+# utility function to count routes in ASIC_DB
+def _count_asic_db_routes(duthost):
+    cmd = "sonic-db-cli ASIC_DB eval \"return #redis.call('keys','ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:*')\" 0"
+    return int(duthost.shell(cmd)["stdout"])
+
+
+# passes when count routes more than before the op are in ASIC_DB, like
+# after add_routes_by_swssconfig
+def routes_in_asic_db(request, test_result, count, **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    routes_before = _count_asic_db_routes(duthost)
+
+    @suppress_exception
+    def checker():
+        routes_added = _count_asic_db_routes(duthost) - routes_before
+        test_result["routes_added"] = routes_added
+        return routes_added >= count
+    return checker
+
+
+# utility function to get when a container was last started
+def _container_started_at(duthost, container):
+    return duthost.command(r"docker inspect -f \{\{.State.StartedAt\}\} %s" % container)["stdout"]
+
+
+# passes when the container was started again since the op and has all its
+# critical processes running, like after restart_container_by_cmd
+def container_up(request, test_result, container="swss", **kwargs):
+    duthost = request.getfixturevalue("duthost")
+    started_at = _container_started_at(duthost, container)
+
+    @suppress_exception
+    def checker():
+        return (_container_started_at(duthost, container) != started_at and
+                duthost.is_service_fully_started(container) and
+                duthost.critical_processes_running(container))
+    return checker
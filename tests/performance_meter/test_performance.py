@@ -11,6 +11,8 @@ from ops import get_op_by_name
 from success_criteria import get_success_criteria_by_name
 from success_criteria import get_success_criteria_stats_by_name
 from success_criteria import filter_vars
+from results import RESULTS_DIR, collect_variables, summarize_variables, find_regressions
+from results import load_baseline, save_results
 
 
 pytestmark = [
@@ -58,12 +60,14 @@ async def run_test_performance_for_op(request, call_sanity_check, reorged_test_c
 
     # prior to op, prepare for checking success criteria
     coros = []
+    op_vars = {}
     for path, test_config_under_path in test_config_for_op.items():
         path_test_result = {}
         single_run_result[path] = path_test_result
         for test_name, test_config in test_config_under_path.items():
             if run_index > test_config["run"]:
                 continue
+            op_vars.update(filter_vars(test_config, op))
             test_result = {}
             path_test_result[test_name] = test_result
             timeout = test_config["timeout"]
@@ -77,7 +81,7 @@ async def run_test_performance_for_op(request, call_sanity_check, reorged_test_c
     # do the op setup, it can block but should NEVER block forever
     # return True on success, False on fail
     # failure will stop test for op
-    async with asynccontextmanager(get_op_by_name(op))(request) as op_success:
+    async with asynccontextmanager(get_op_by_name(op))(request, **op_vars) as op_success:
         single_run_result["op_success"] = op_success
         if op_success:
             await asyncio.gather(*coros)
@@ -155,17 +159,37 @@ def process_single_test_case(test_config, single_test_results):
     return True
 
 
-def test_performance_stats(filtered_test_config, store_test_result):
+# Results are stored per HwSKU and image, and compared with the stored
+# results of a baseline image to flag significant regressions
+def test_performance_stats(request, duthost, filtered_test_config, store_test_result):
+    results_dir = request.config.getoption("--performance_meter_results_dir") or RESULTS_DIR
+    hwsku = duthost.facts["hwsku"]
+    os_version = duthost.os_version
+    baseline = load_baseline(results_dir, hwsku, os_version,
+                             request.config.getoption("--performance_meter_baseline"))
+    if baseline:
+        logging.warning("Comparing with baseline {} on {}".format(baseline["os_version"], hwsku))
+    else:
+        logging.warning("No baseline found for {}".format(hwsku))
+    all_stats = {}
     failed_tests = []
     for path, test_config_for_path in filtered_test_config.items():
         logging.warning("Analyzing result for config file {}".format(path))
         for test_name, test_config in test_config_for_path["performance_meter"].items():
             logging.warning("Analyzing result for test case {}".format(test_name))
-            single_test_results = map(lambda result: {**result, **result[path][test_name]},
-                                      store_test_result[test_config["op"]][:test_config["run"]])
+            single_test_results = list(map(lambda result: {**result, **result[path][test_name]},
+                                           store_test_result[test_config["op"]][:test_config["run"]]))
             result = process_single_test_case(test_config, single_test_results)
             if result is not True:
                 failed_tests.append((path, test_name, result))
+            stats = summarize_variables(collect_variables(single_test_results))
+            all_stats.setdefault(path, {})[test_name] = stats
+            baseline_stats = (baseline or {}).get("tests", {}).get(path, {}).get(test_name)
+            if baseline_stats:
+                regressions = find_regressions(test_config, stats, baseline_stats)
+                if regressions:
+                    failed_tests.append((path, test_name, regressions))
             logging.warning("Finished analyzing result for test case {}".format(test_name))
         logging.warning("Finished analyzing result for config file {}".format(path))
+    save_results(results_dir, hwsku, os_version, all_stats)
     pytest_assert(len(failed_tests) == 0, "{} tests failed: {}".format(len(failed_tests), failed_tests))
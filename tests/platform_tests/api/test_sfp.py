@@ -5,6 +5,7 @@ import time
 
 from tests.common.helpers.assertions import pytest_assert
 from tests.common.helpers.platform_api import sfp
+from tests.common.helpers.platform_api.batch import PlatformApiLatency
 from tests.common.utilities import skip_release
 from tests.common.utilities import skip_release_for_platform
 from tests.common.platform.interface_utils import get_physical_port_indices
@@ -670,16 +671,22 @@ class TestSfpApi(PlatformApiTestBase):
         duthost = duthosts[enum_rand_one_per_hwsku_hostname]
         skip_release_for_platform(duthost, ["202012"], ["arista", "mlnx"])
 
-        for i in self.sfp_setup["sfp_test_port_indices"]:
-            info_dict = sfp.get_transceiver_info(platform_api_conn, i)
+        # Get the data of all transceivers in two round trips
+        latency = PlatformApiLatency()
+        indices = self.sfp_setup["sfp_test_port_indices"]
+        info_dicts = sfp.get_all(platform_api_conn, indices, ["get_transceiver_info"], latency=latency)
+        optical_indices = [i for i in indices if self.is_xcvr_optical(info_dicts[i]["get_transceiver_info"])]
+        results = sfp.get_all(platform_api_conn, optical_indices, ["get_temperature"], latency=latency)
+        latency.log()
 
-            if not self.is_xcvr_optical(info_dict):
+        for i in indices:
+            if i not in results:
                 logger.info(
                     "test_get_temperature: Skipping transceiver {} (not applicable for this transceiver type)"
                     .format(i))
                 continue
 
-            temp = sfp.get_temperature(platform_api_conn, i)
+            temp = results[i]["get_temperature"]
             if self.expect(temp is not None, "Unable to retrieve transceiver {} temperatue".format(i)):
                 self.expect(isinstance(temp, float), "Transceiver {} temperature appears incorrect".format(i))
         self.assert_expectations()
@@ -689,16 +696,22 @@ class TestSfpApi(PlatformApiTestBase):
         duthost = duthosts[enum_rand_one_per_hwsku_hostname]
         skip_release_for_platform(duthost, ["202012"], ["arista", "mlnx"])
 
-        for i in self.sfp_setup["sfp_test_port_indices"]:
-            info_dict = sfp.get_transceiver_info(platform_api_conn, i)
+        # Get the data of all transceivers in two round trips
+        latency = PlatformApiLatency()
+        indices = self.sfp_setup["sfp_test_port_indices"]
+        info_dicts = sfp.get_all(platform_api_conn, indices, ["get_transceiver_info"], latency=latency)
+        optical_indices = [i for i in indices if self.is_xcvr_optical(info_dicts[i]["get_transceiver_info"])]
+        results = sfp.get_all(platform_api_conn, optical_indices, ["get_voltage"], latency=latency)
+        latency.log()
 
-            if not self.is_xcvr_optical(info_dict):
+        for i in indices:
+            if i not in results:
                 logger.info(
                     "test_get_voltage: Skipping transceiver {} (not applicable for this transceiver type)"
                     .format(i))
                 continue
 
-            voltage = sfp.get_voltage(platform_api_conn, i)
+            voltage = results[i]["get_voltage"]
             if self.expect(voltage is not None, "Unable to retrieve transceiver {} voltage".format(i)):
                 self.expect(isinstance(voltage, float), "Transceiver {} voltage appears incorrect".format(i))
         self.assert_expectations()
@@ -8,11 +8,11 @@ import ptf.testutils as testutils
 import ptf.mask as mask
 import ptf.packet as packet
 from tests.common.dualtor.dual_tor_utils import get_t1_ptf_ports  # noqa F811
-from datetime import datetime
 from tests.common import config_reload
 from tests.common.helpers.assertions import pytest_assert
 from tests.common.helpers.generators import generate_ips
 from tests.route.utils import generate_intf_neigh, generate_route_file, prepare_dut, cleanup_dut
+from tests.common.helpers.route_profiler import RouteProfiler
 
 
 CRM_POLL_INTERVAL = 1
@@ -182,9 +182,7 @@ def exec_routes(
     generate_route_file(duthost, prefixes, str_intf_nexthop, route_file_dir, op)
     logger.info("Route file generated and copied")
 
-    # Check the number of routes in ASIC_DB
     asichost = duthost.asic_instance(enum_rand_one_frontend_asic_index)
-    start_num_route = asichost.count_routes(ROUTE_TABLE_NAME)
 
     # Calculate timeout as a function of the number of routes
     # Allow at least 1 second even when there is a limited number of routes
@@ -195,54 +193,27 @@ def exec_routes(
     else:
         route_timeout = max(len(prefixes) / 250, 1)
 
-    # Calculate expected number of route and record start time
-    if op == "SET":
-        expected_num_routes = start_num_route + len(prefixes)
-    elif op == "DEL":
-        expected_num_routes = start_num_route - len(prefixes)
-    else:
+    if op not in ["SET", "DEL"]:
         pytest.fail("Operation {} not supported".format(op))
-    start_time = datetime.now()
 
     logger.info("Before pushing route to swssconfig")
-    # Apply routes with swssconfig
-    json_name = "/dev/stdin < {}".format(route_file_dir)
-    result = duthost.docker_exec_swssconfig(
-        json_name, "swss", enum_rand_one_frontend_asic_index
-    )
-
-    if result["rc"] != 0:
-        pytest.fail(
-            "Failed to apply route configuration file: {}".format(result["stderr"])
-        )
-    logger.info("All route entries have been pushed")
-
-    total_delay = 0
-    actual_num_routes = asichost.count_routes(ROUTE_TABLE_NAME)
-    while actual_num_routes != expected_num_routes:
-        diff = abs(expected_num_routes - actual_num_routes)
-        delay = max(diff / 5000, 1)
-        now = datetime.now()
-        total_delay = (now - start_time).total_seconds()
-        logger.info(
-            "Current {} expected {} delayed {} will delay {}".format(
-                actual_num_routes, expected_num_routes, total_delay, delay
-            )
-        )
-        time.sleep(delay)
-        actual_num_routes = asichost.count_routes(ROUTE_TABLE_NAME)
-        if total_delay >= route_timeout:
-            break
-
-    logger.info("After pushing route to swssconfig, current {} expected {}".format(
-        actual_num_routes, expected_num_routes))
-
-    # Record time when all routes show up in ASIC_DB
-    end_time = datetime.now()
+    # Apply routes with swssconfig, the profiler timestamps every route arriving in APPL_DB and ASIC_DB
+    cmd = "docker exec -i {} swssconfig /dev/stdin < {}".format(asichost.get_docker_name("swss"), route_file_dir)
+    try:
+        report = RouteProfiler(asichost).run(cmd, op=op, route_file=route_file_dir, timeout=route_timeout)
+    except Exception as e:
+        pytest.fail("Failed to apply route configuration file: {}".format(e))
+    logger.info("All route entries have been pushed in {} seconds".format(report["command_time"]))
+
+    logger.info("After pushing route to swssconfig, {} of {} routes {} ASIC_DB".format(
+        report["asic_db"]["count"], len(prefixes), "installed in" if op == "SET" else "withdrawn from"))
+    logger.info("Route programming rate curve (s, APPL_DB routes/s, ASIC_DB routes/s): {}".format(
+        report["rate_curve"]))
+
+    # Time when all routes show up in ASIC_DB
+    elapsed = report["asic_db"]["last"] if report["complete"] else report["command_time"] + route_timeout
     logger.info(
-        "All route entries have been installed in ASIC_DB in {} seconds".format(
-            (end_time - start_time).total_seconds()
-        )
+        "All route entries have been installed in ASIC_DB in {} seconds".format(elapsed)
     )
 
     # Check route entries are correct
@@ -272,7 +243,7 @@ def exec_routes(
             )
 
     # Return time used for set/del routes
-    return (end_time - start_time).total_seconds()
+    return elapsed
 
 
 def test_perf_add_remove_routes(
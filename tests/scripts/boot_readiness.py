@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Wait on the DUT until it is ready after a reboot and report the boot timeline.
+
+The script is copied to the DUT by tests/common/helpers/boot_readiness.py right after SSH is back. Waiting for a
+DUT to be ready used to be a chain of `wait_until` polls from the test server, one Ansible round trip per check and
+up to a full poll interval of slack per stage. This helper polls locally, every second by default, and exits as soon
+as the requested milestones are reached. Requests are passed as base64 encoded JSON.
+
+Request format:
+    {
+        "wait_for": ["services", "ports", "bgp"],   # milestones to wait for
+        "timeout": 900,                             # seconds
+        "interval": 1,                              # seconds between two polls
+        "critical_services": ["swss", ...],         # containers that have to be running for "services"
+        "namespaces": ["", "asic0", ...],           # namespaces of the DUT, "" for the host
+        "port_namespaces": ["", "asic0", ...],      # namespaces whose admin up ports are checked, default: all
+        "ibgp": true                                # whether iBGP sessions are waited for
+    }
+
+Milestones, in boot order:
+    kernel    userspace started
+    docker    docker.service active
+    database  database services active and redis answering in every namespace
+    swss      swss services active
+    syncd     syncd services active
+    services  all critical containers running
+    ports     all admin up ports operationally up
+    bgp       all configured BGP sessions established
+
+Every milestone is printed to stdout as a JSON line when it is reached, {"milestone": NAME, "uptime": SECONDS},
+SECONDS being the time since the kernel started. The times of the systemd milestones are the activation times of
+the units, the others are the time of the poll that saw them. The last line is {"done": BOOL, "missing": [...],
+"pending": {MILESTONE: DETAIL}}. The exit code is 0 if all requested milestones were reached, 2 on timeout.
+"""
+import argparse
+import base64
+import json
+import subprocess
+import sys
+import time
+
+MILESTONES = ["kernel", "docker", "database", "swss", "syncd", "services", "ports", "bgp"]
+BGP_NEIGHBOR_TABLES = ["BGP_NEIGHBOR", "BGP_INTERNAL_NEIGHBOR", "BGP_VOQ_CHASSIS_NEIGHBOR"]
+
+
+def uptime():
+    with open("/proc/uptime") as f:
+        return float(f.read().split()[0])
+
+
+def unit_name(service, namespace):
+    if namespace.startswith("asic"):
+        return "{}@{}.service".format(service, namespace[len("asic"):])
+    return "{}.service".format(service)
+
+
+def unit_states(units):
+    """Returns {unit: (ActiveState, activation time in seconds since boot)}."""
+    cmd = ["systemctl", "show", "-p", "Id", "-p", "ActiveState", "-p", "ActiveEnterTimestampMonotonic"] + units
+    output = subprocess.run(cmd, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    states = {}
+    # `systemctl show` prints one block of properties per unit, separated by an empty line
+    for block in output.strip().split("\n\n"):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        if "Id" in props:
+            monotonic = int(props.get("ActiveEnterTimestampMonotonic") or 0)
+            states[props["Id"]] = (props.get("ActiveState"), monotonic / 1000000.0)
+    return states
+
+
+def userspace_start():
+    output = subprocess.run(["systemctl", "show", "-p", "UserspaceTimestampMonotonic"],
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    value = output.strip().split("=", 1)[-1]
+    return int(value) / 1000000.0 if value.isdigit() else 0.0
+
+
+def running_containers():
+    output = subprocess.run(["docker", "ps", "--filter", "status=running", "--format", "{{.Names}}"],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+    return set(output.split())
+
+
+class Databases(object):
+    """Connections to the redis databases of one namespace, opened on first use."""
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.dbs = None
+
+    def connect(self):
+        from swsscommon.swsscommon import SonicV2Connector, SonicDBConfig
+        if self.namespace:
+            if not SonicDBConfig.isGlobalInit():
+                SonicDBConfig.load_sonic_global_db_config()
+            dbs = SonicV2Connector(use_unix_socket_path=True, namespace=self.namespace)
+        else:
+            dbs = SonicV2Connector(use_unix_socket_path=True)
+        for db in ["CONFIG_DB", "APPL_DB", "STATE_DB"]:
+            dbs.connect(db, retry_on=False)
+        self.dbs = dbs
+
+    def get(self):
+        if self.dbs is None:
+            self.connect()
+        return self.dbs
+
+    def reset(self):
+        self.dbs = None
+
+
+def pending_ports(dbs):
+    """Returns the admin up ports of CONFIG_DB which are not operationally up."""
+    pending = []
+    for key in dbs.keys("CONFIG_DB", "PORT|*") or []:
+        port = key.split("|", 1)[1]
+        if dbs.get("CONFIG_DB", key, "admin_status") != "up":
+            continue
+        status = dbs.get("STATE_DB", "PORT_TABLE|{}".format(port), "netdev_oper_status")
+        if status is None:
+            status = dbs.get("APPL_DB", "PORT_TABLE:{}".format(port), "oper_status")
+        if status != "up":
+            pending.append(port)
+    return sorted(pending)
+
+
+def pending_bgp_neighbors(dbs, ibgp):
+    """Returns the BGP neighbors of CONFIG_DB whose session is not established."""
+    local_asn = dbs.get("CONFIG_DB", "DEVICE_METADATA|localhost", "bgp_asn")
+    pending = []
+    for table in BGP_NEIGHBOR_TABLES:
+        for key in dbs.keys("CONFIG_DB", "{}|*".format(table)) or []:
+            # keys are "TABLE|ip" or "TABLE|vrf|ip"
+            neighbor = key.split("|")[-1]
+            config = dbs.get_all("CONFIG_DB", key) or {}
+            if not ibgp and config.get("asn") == config.get("local_asn", local_asn):
+                continue
+            if dbs.get("STATE_DB", "NEIGH_STATE_TABLE|{}".format(neighbor), "state") != "Established":
+                pending.append(neighbor)
+    return sorted(pending)
+
+
+class BootReadiness(object):
+
+    def __init__(self, request):
+        self.request = request
+        self.namespaces = request.get("namespaces") or [""]
+        self.port_namespaces = request.get("port_namespaces", self.namespaces)
+        self.critical_services = request.get("critical_services", [])
+        self.ibgp = request.get("ibgp", True)
+        # redis of the host is also checked on multi-ASIC DUTs
+        self.databases = {namespace: Databases(namespace) for namespace in [""] + self.namespaces}
+        self.reached = {}
+        self.pending = {}
+
+        # swss and syncd are only milestones where they are critical services, not on a supervisor for instance
+        self.units = {"docker": ["docker.service"]}
+        namespaced = ["database"] + [service for service in ["swss", "syncd"]
+                                     if any(name.startswith(service) for name in self.critical_services)]
+        multi_asic = any(self.namespaces)
+        for service in namespaced:
+            units = [unit_name(service, namespace) for namespace in self.namespaces if namespace]
+            if not multi_asic or service == "database":
+                units.insert(0, unit_name(service, ""))
+            self.units[service] = units
+
+    def reach(self, milestone, at):
+        self.reached[milestone] = at
+        self.pending.pop(milestone, None)
+        print(json.dumps({"milestone": milestone, "uptime": round(at, 3)}))
+        sys.stdout.flush()
+
+    def check_units(self):
+        pending_units = [unit for units in self.units.values() for unit in units]
+        states = unit_states(pending_units)
+        for milestone in MILESTONES:
+            if milestone not in self.units or milestone in self.reached:
+                continue
+            units = self.units[milestone]
+            inactive = [unit for unit in units if states.get(unit, (None, 0))[0] != "active"]
+            if inactive:
+                self.pending[milestone] = inactive
+                continue
+            if milestone == "database" and not self.check_redis():
+                continue
+            self.reach(milestone, max(states[unit][1] for unit in units))
+
+    def check_redis(self):
+        pending = []
+        for namespace, databases in self.databases.items():
+            try:
+                databases.get()
+            except Exception:
+                databases.reset()
+                pending.append(namespace or "host")
+        if pending:
+            self.pending["database"] = pending
+        return not pending
+
+    def check_db(self, milestone, pending_func, namespaces, *args):
+        pending = []
+        for namespace in namespaces:
+            databases = self.databases.setdefault(namespace, Databases(namespace))
+            try:
+                pending.extend(pending_func(databases.get(), *args))
+            except Exception as e:
+                # redis may still be restarting, try again on next poll
+                databases.reset()
+                pending.append("{}: {}".format(namespace or "host", repr(e)))
+        if pending:
+            self.pending[milestone] = pending
+            return
+        self.reach(milestone, uptime())
+
+    def poll(self):
+        if "kernel" not in self.reached:
+            self.reach("kernel", userspace_start())
+        self.check_units()
+        if "database" not in self.reached:
+            return
+        if "services" not in self.reached:
+            running = running_containers()
+            not_running = [service for service in self.critical_services if service not in running]
+            if not_running:
+                self.pending["services"] = not_running
+            else:
+                self.reach("services", uptime())
+        # ports and BGP sessions are only checked once their containers run, for entries left from before a
+        # warm reboot not to be taken for fresh ones
+        if "services" not in self.reached:
+            return
+        if "ports" not in self.reached and "ports" in self.request["wait_for"]:
+            self.check_db("ports", pending_ports, self.port_namespaces)
+        if "bgp" not in self.reached and "bgp" in self.request["wait_for"]:
+            self.check_db("bgp", pending_bgp_neighbors, self.namespaces, self.ibgp)
+
+    def missing(self):
+        return [milestone for milestone in self.request["wait_for"] if milestone not in self.reached]
+
+    def run(self):
+        deadline = time.time() + self.request.get("timeout", 900)
+        interval = self.request.get("interval", 1)
+        while True:
+            self.poll()
+            if not self.missing() or time.time() > deadline:
+                break
+            time.sleep(interval)
+        missing = self.missing()
+        print(json.dumps({"done": not missing, "missing": missing,
+                          "pending": {milestone: self.pending.get(milestone) for milestone in missing}}))
+        return 0 if not missing else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boot readiness")
+    parser.add_argument("request", help="base64 encoded JSON request")
+    args = parser.parse_args()
+
+    request = json.loads(base64.b64decode(args.request).decode("utf-8"))
+    sys.exit(BootReadiness(request).run())
+
+
+if __name__ == "__main__":
+    main()
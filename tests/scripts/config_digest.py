@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Digest the running config (CONFIG_DB) or a saved config file on the DUT.
+
+The script is copied to the DUT by tests/common/helpers/config_digest.py. Comparing the running config before and
+after a test module used to ship the whole `sonic-cfggen -d --print-data` output of the host and every ASIC
+namespace to the test server. This helper returns a digest per table and per key instead, so that only the tables
+whose digest changed have to be fetched ("dump") and compared. Requests are passed as base64 encoded JSON.
+
+Request format:
+    {
+        "action": "digest" | "dump",
+        "namespace": "asic0",              # optional
+        "file": "/etc/sonic/running_golden_config.json",   # optional, default: CONFIG_DB
+        "tables": ["PORT", ...],           # dump only, default: all tables
+        "exclude_tables": ["TABLE", ...],  # optional
+        "exclude_keys": ["TABLE|key", ...] # optional
+    }
+
+Response (printed to stdout as JSON):
+    digest: {"TABLE": {"digest": "<sha1>", "keys": {"key": "<sha1>", ...}}, ...}
+    dump:   {"TABLE": {"key": {...}, ...}, ...}, the same format as `sonic-cfggen --print-data`
+
+Digests are computed on a canonical form where lists are compared as sets, like compare_running_config in
+tests/conftest.py: equal digests mean equal config, different digests are checked on the test server.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import subprocess
+import sys
+
+
+def load_running_config(namespace):
+    """Same data as `sonic-cfggen -d --print-data`, read directly from CONFIG_DB."""
+    try:
+        from swsscommon.swsscommon import ConfigDBPipeConnector, SonicDBConfig
+    except ImportError:
+        cmd = ["sonic-cfggen", "-d", "--print-data"]
+        if namespace:
+            cmd[1:1] = ["-n", namespace]
+        return json.loads(subprocess.check_output(cmd))
+
+    if namespace:
+        if not SonicDBConfig.isGlobalInit():
+            SonicDBConfig.load_sonic_global_db_config()
+        configdb = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+    else:
+        configdb = ConfigDBPipeConnector(use_unix_socket_path=True)
+    configdb.connect()
+    config = {}
+    for table, entries in configdb.get_config().items():
+        config[table] = {configdb.serialize_key(key): value for key, value in entries.items()}
+    return config
+
+
+def load_config(request):
+    if request.get("file"):
+        with open(request["file"]) as f:
+            return json.load(f)
+    return load_running_config(request.get("namespace"))
+
+
+def apply_excludes(config, exclude_tables, exclude_keys):
+    for table in exclude_tables:
+        config.pop(table, None)
+    for exclude_key in exclude_keys:
+        fields = exclude_key.split("|")
+        if len(fields) != 2:
+            continue
+        table, key = fields
+        if table in config and key in config[table]:
+            config[table].pop(key)
+            if len(config[table]) == 0:
+                config.pop(table)
+    return config
+
+
+def canonical(value):
+    if isinstance(value, dict):
+        return {key: canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [canonical(item) for item in value]
+        try:
+            return sorted(set(items))
+        except TypeError:
+            return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    return value
+
+
+def digest(value):
+    data = json.dumps(canonical(value), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def digest_config(config):
+    result = {}
+    for table, entries in config.items():
+        if isinstance(entries, dict):
+            keys = {key: digest(value) for key, value in entries.items()}
+            table_digest = digest(keys)
+        else:
+            keys = {}
+            table_digest = digest(entries)
+        result[table] = {"digest": table_digest, "keys": keys}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Config digest")
+    parser.add_argument("request", help="base64 encoded JSON request")
+    args = parser.parse_args()
+
+    request = json.loads(base64.b64decode(args.request).decode("utf-8"))
+    config = apply_excludes(load_config(request), request.get("exclude_tables", []),
+                            request.get("exclude_keys", []))
+    if request["action"] == "digest":
+        json.dump(digest_config(config), sys.stdout)
+    else:
+        tables = request.get("tables")
+        if tables is not None:
+            config = {table: config[table] for table in tables if table in config}
+        json.dump(config, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
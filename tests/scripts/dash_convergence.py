@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Watch a DPU until the DASH configuration being applied is programmed.
+
+The script is started in the background on the DPU by tests/dash/gnmi_utils.py before a configuration is applied
+with gNMI, instead of sleeping a fixed time after it. It polls the object counts of some redis databases, ASIC_DB by
+default, and the size of the sairedis recording. The "ready" file is created once the counts before the apply are
+taken, the test waits for it before sending the configuration. Once the test creates the "applied" file, the
+configuration is programmed when nothing has changed for "settle" seconds, or when nothing at all changed
+"idle_timeout" seconds after the apply, for a configuration which does not change anything. The test creates the
+"stop" file to end the watch early, when the configuration could not be sent. Requests are passed as base64 encoded
+JSON.
+
+Request format:
+    {
+        "result": "/tmp/dash_convergence.<id>.json",    # written when done
+        "ready": "/tmp/dash_convergence.<id>.ready",     # created by the script once the watch is started
+        "applied": "/tmp/dash_convergence.<id>.applied", # created by the test once the configuration is sent
+        "stop": "/tmp/dash_convergence.<id>.stop",       # created by the test to end the watch, no result is written
+        "patterns": [["ASIC_DB", "ASIC_STATE:SAI_OBJECT_TYPE_*"], ...],
+        "recording": "/var/log/swss/sairedis.rec",       # optional
+        "interval": 0.1,
+        "settle": 1.0,
+        "idle_timeout": 5,
+        "timeout": 120
+    }
+
+Result:
+    {
+        "converged": true,
+        "time_to_program": 2.3,     # seconds from the "ready" file to the last change
+        "changes": 42,              # number of polls that saw a change
+        "counts_before": {"ASIC_DB|SAI_OBJECT_TYPE_ENI": 1, ...},
+        "counts_after": {...},
+        "errors": [...]
+    }
+
+The keys matching a pattern are counted per object type: the second field of the key, split on ':', like
+"SAI_OBJECT_TYPE_ENI" in "ASIC_STATE:SAI_OBJECT_TYPE_ENI:oid:0x...".
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+
+def connect(db_names):
+    from swsscommon.swsscommon import SonicV2Connector
+
+    dbs = SonicV2Connector(use_unix_socket_path=True)
+    errors = []
+    for db_name in db_names:
+        try:
+            dbs.connect(db_name)
+        except Exception as e:
+            errors.append("{}: {}".format(db_name, repr(e)))
+    return dbs, errors
+
+
+def count_objects(dbs, patterns, skip):
+    counts = {}
+    for db_name, pattern in patterns:
+        if db_name in skip:
+            continue
+        for key in dbs.keys(db_name, pattern) or []:
+            fields = key.split(":")
+            name = "{}|{}".format(db_name, fields[1] if len(fields) > 1 else fields[0])
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def recording_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def watch(request):
+    patterns = request.get("patterns", [["ASIC_DB", "ASIC_STATE:SAI_OBJECT_TYPE_*"]])
+    interval = request.get("interval", 0.1)
+    settle = request.get("settle", 1.0)
+    idle_timeout = request.get("idle_timeout", 5)
+    timeout = request.get("timeout", 120)
+    recording = request.get("recording", "/var/log/swss/sairedis.rec")
+
+    dbs, errors = connect(set(db_name for db_name, _ in patterns))
+    skip = set(error.split(":", 1)[0] for error in errors)
+    counts = count_objects(dbs, patterns, skip)
+    size = recording_size(recording)
+    result = {"converged": False, "stopped": False, "time_to_program": 0.0, "changes": 0, "counts_before": counts,
+              "errors": errors}
+    # The configuration is only sent once the counts before it are taken
+    start = time.time()
+    open(request["ready"], "w").close()
+    last_change = None
+    applied_at = None
+
+    while True:
+        time.sleep(interval)
+        now = time.time()
+        new_counts = count_objects(dbs, patterns, skip)
+        new_size = recording_size(recording)
+        if new_counts != counts or new_size != size:
+            last_change = now
+            result["changes"] += 1
+            counts, size = new_counts, new_size
+        if os.path.exists(request["stop"]):
+            result["stopped"] = True
+            break
+        if applied_at is None and os.path.exists(request["applied"]):
+            applied_at = now
+        if applied_at is not None:
+            if last_change is not None and now - last_change >= settle and now - applied_at >= settle:
+                result["converged"] = True
+                break
+            if last_change is None and now - applied_at >= idle_timeout:
+                result["converged"] = True
+                break
+        if now - start > timeout:
+            break
+
+    result["time_to_program"] = (last_change or start) - start
+    result["counts_after"] = counts
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DASH convergence watcher")
+    parser.add_argument("request", help="base64 encoded JSON request")
+    args = parser.parse_args()
+
+    request = json.loads(base64.b64decode(args.request).decode("utf-8"))
+    try:
+        result = watch(request)
+        if not result["stopped"]:
+            # written to a temporary file first, the test polls for the result file
+            with open(request["result"] + ".tmp", "w") as f:
+                json.dump(result, f)
+            os.rename(request["result"] + ".tmp", request["result"])
+    finally:
+        for name in ["ready", "applied", "stop"]:
+            if os.path.exists(request[name]):
+                os.remove(request[name])
+    sys.exit(0 if result["converged"] else 2)
+
+
+if __name__ == "__main__":
+    main()
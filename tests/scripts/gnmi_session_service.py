@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Long-running gNMI client service for the PTF container.
+
+py_gnmicli.py pays an interpreter start, certificate loading and a TLS handshake on every call. This service keeps
+one authenticated channel per DUT gNMI server and executes batches of Get/Set/Subscribe operations received over a
+UNIX socket, so that the time measured per operation is the time spent by the DUT.
+
+It is copied to the PTF container by tests/gnmi/helper.py and tests/dash/gnmi_utils.py and run with the gnxi
+virtualenv, which provides grpc and the gnmi_pb2 modules:
+
+    /root/env-python3/bin/python gnmi_session_service.py --serve
+    /root/env-python3/bin/python gnmi_session_service.py --request <base64 encoded JSON request>
+    /root/env-python3/bin/python gnmi_session_service.py --run <base64 encoded JSON request>
+
+--run handles one request in the calling process, without the service.
+
+Request format:
+    {
+        "target": {"ip": "10.0.0.1", "port": 50052, "rcert": "/root/gnmiCA.pem",
+                   "pkey": "/root/gnmiclient.key", "cchain": "/root/gnmiclient.crt"},
+        "ops": [
+            {"op": "get", "paths": ["/CONFIG_DB/localhost/PORT/Ethernet0/description"], "origin": "sonic-db"},
+            {"op": "set", "origin": "sonic-db", "delete": ["<path>"], "update": [["<path>", "<json or @file>"]],
+             "replace": [["<path>", "<json or @file>"]]},
+            {"op": "subscribe", "paths": ["<path>"], "origin": "sonic-db", "mode": "stream", "submode": "sample",
+             "interval_ms": 1000, "count": 3, "timeout": 30},
+            {"op": "bulk_set", "origin": "sonic-db", "file": "/root/bulk.json", "batch_size": 64, "pipeline": 4}
+        ],
+        "repeat": 1,            # throughput mode: run the ops this many times ...
+        "concurrency": 1        # ... spread over this many threads
+    }
+
+Response (printed to stdout as JSON):
+    {"results": [<one result per op>], "stats": {...}}
+
+A get result is {"ok": true, "values": ["<json>", ...], "latency_ms": ...}, a failed operation is
+{"ok": false, "error": "GRPC error ..."}. With repeat > 1, "results" are those of the last run and "stats" holds the
+per-operation latency percentiles and the operation rate.
+
+Values are JSON, '@file' reads a JSON value from a file and '$file' a serialized protobuf, like py_gnmicli.
+
+A bulk_set file is {"delete": ["<path>", ...], "update": [["<path>", "<base64 value>", "proto" | "json"], ...]}. The
+deletes, then the updates, are sent as Set requests of batch_size paths, with up to pipeline requests in flight. A
+bulk_set result is {"ok": true, "objects": N, "requests": N, "elapsed_s": ...}.
+"""
+import argparse
+import base64
+import collections
+import json
+import os
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+GNXI_DIR = "/root/gnxi/gnmi_cli_py"
+SOCKET_PATH = "/tmp/gnmi_session.sock"
+MAX_MESSAGE_LENGTH = 64 * 1024 * 1024
+
+sys.path.insert(0, GNXI_DIR)
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def get_stub(target):
+    """Return the gNMI stub of the persistent channel to a target, creating the channel on first use."""
+    import grpc
+    import gnmi_pb2_grpc
+
+    key = (target["ip"], int(target["port"]), target.get("rcert"), target.get("pkey"), target.get("cchain"),
+           target.get("target_name"))
+    with _channels_lock:
+        if key not in _channels:
+            address = "{}:{}".format(target["ip"], target["port"])
+            if ":" in target["ip"]:
+                address = "[{}]:{}".format(target["ip"], target["port"])
+            options = [("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
+                       ("grpc.keepalive_time_ms", 30000)]
+            if target.get("target_name"):
+                options.append(("grpc.ssl_target_name_override", target["target_name"]))
+            if target.get("rcert"):
+                creds = grpc.ssl_channel_credentials(
+                    root_certificates=_read(target["rcert"]),
+                    private_key=_read(target["pkey"]) if target.get("pkey") else None,
+                    certificate_chain=_read(target["cchain"]) if target.get("cchain") else None)
+                channel = grpc.secure_channel(address, creds, options=options)
+            else:
+                channel = grpc.insecure_channel(address, options=options)
+            _channels[key] = gnmi_pb2_grpc.gNMIStub(channel)
+        return _channels[key]
+
+
+def parse_path(xpath, origin=None):
+    import gnmi_pb2
+
+    elems = []
+    for part in re.findall(r"(?:[^/\[]|\[(?:[^\]\\]|\\.)*\])+", xpath):
+        name = part.split("[", 1)[0]
+        keys = {}
+        for key, value in re.findall(r"\[([^=\]]+)=((?:[^\]\\]|\\.)*)\]", part):
+            keys[key] = re.sub(r"\\(.)", r"\1", value)
+        elems.append(gnmi_pb2.PathElem(name=name, key=keys))
+    return gnmi_pb2.Path(elem=elems, origin=origin or "")
+
+
+def _value(value):
+    """Same convention as py_gnmicli: '@file' reads the JSON value from a file, '$file' a serialized protobuf."""
+    import gnmi_pb2
+
+    if value.startswith("$"):
+        return gnmi_pb2.TypedValue(proto_bytes=_read(value[1:]))
+    if value.startswith("@"):
+        return gnmi_pb2.TypedValue(json_ietf_val=_read(value[1:]))
+    return gnmi_pb2.TypedValue(json_ietf_val=value.encode())
+
+
+def _decode(typed_value):
+    kind = typed_value.WhichOneof("value")
+    if kind in ("json_ietf_val", "json_val"):
+        raw = getattr(typed_value, kind)
+        return json.dumps(json.loads(raw)) if raw else ""
+    if kind is None:
+        return ""
+    return json.dumps(getattr(typed_value, kind).decode() if kind == "bytes_val" else getattr(typed_value, kind))
+
+
+def do_get(stub, op, timeout):
+    import gnmi_pb2
+
+    request = gnmi_pb2.GetRequest(path=[parse_path(p, op.get("origin")) for p in op["paths"]],
+                                  encoding=op.get("encoding", 4))
+    response = stub.Get(request, timeout=timeout)
+    values = []
+    for notification in response.notification:
+        for update in notification.update:
+            values.append(_decode(update.val))
+    return {"values": values}
+
+
+def do_set(stub, op, timeout):
+    import gnmi_pb2
+
+    origin = op.get("origin")
+    request = gnmi_pb2.SetRequest(
+        delete=[parse_path(p, origin) for p in op.get("delete", [])],
+        update=[gnmi_pb2.Update(path=parse_path(p, origin), val=_value(v)) for p, v in op.get("update", [])],
+        replace=[gnmi_pb2.Update(path=parse_path(p, origin), val=_value(v)) for p, v in op.get("replace", [])])
+    response = stub.Set(request, timeout=timeout)
+    return {"ops": [gnmi_pb2.UpdateResult.Operation.Name(r.op) for r in response.response]}
+
+
+def do_bulk_set(stub, op, timeout):
+    import gnmi_pb2
+
+    with open(op["file"]) as f:
+        data = json.load(f)
+    origin = op.get("origin")
+    batch_size = max(1, int(op.get("batch_size", 64)))
+    pipeline = max(1, int(op.get("pipeline", 4)))
+
+    deletes = [parse_path(p, origin) for p in data.get("delete", [])]
+    updates = []
+    for path, value, kind in data.get("update", []):
+        raw = base64.b64decode(value)
+        val = gnmi_pb2.TypedValue(proto_bytes=raw) if kind == "proto" else gnmi_pb2.TypedValue(json_ietf_val=raw)
+        updates.append(gnmi_pb2.Update(path=parse_path(path, origin), val=val))
+    phases = [[gnmi_pb2.SetRequest(delete=deletes[i:i + batch_size]) for i in range(0, len(deletes), batch_size)],
+              [gnmi_pb2.SetRequest(update=updates[i:i + batch_size]) for i in range(0, len(updates), batch_size)]]
+
+    start = time.time()
+    for requests in phases:
+        # all deletes are done before the first update is sent
+        in_flight = collections.deque()
+        for request in requests:
+            if len(in_flight) >= pipeline:
+                in_flight.popleft().result()
+            in_flight.append(stub.Set.future(request, timeout=timeout))
+        while in_flight:
+            in_flight.popleft().result()
+    return {"objects": len(deletes) + len(updates), "requests": sum(len(requests) for requests in phases),
+            "elapsed_s": time.time() - start}
+
+
+def do_subscribe(stub, op, timeout):
+    import gnmi_pb2
+
+    mode = op.get("mode", "stream").upper()
+    submode = {"sample": gnmi_pb2.SAMPLE, "on_change": gnmi_pb2.ON_CHANGE}.get(op.get("submode", "sample"))
+    subscriptions = [gnmi_pb2.Subscription(path=parse_path(p, op.get("origin")), mode=submode,
+                                           sample_interval=int(op.get("interval_ms", 1000)) * 1000000)
+                     for p in op["paths"]]
+    request = gnmi_pb2.SubscribeRequest(subscribe=gnmi_pb2.SubscriptionList(
+        subscription=subscriptions, mode=gnmi_pb2.SubscriptionList.Mode.Value(mode),
+        encoding=op.get("encoding", 4)))
+    count = op.get("count", 1)
+    updates = []
+    synced = False
+    call = stub.Subscribe(iter([request]), timeout=op.get("timeout", timeout))
+    try:
+        for response in call:
+            if response.HasField("sync_response"):
+                synced = True
+                if mode == "ONCE":
+                    break
+                continue
+            for update in response.update.update:
+                updates.append({"path": "/".join(e.name for e in update.path.elem), "val": _decode(update.val),
+                                "timestamp": response.update.timestamp})
+            if len(updates) >= count:
+                break
+    finally:
+        call.cancel()
+    return {"updates": updates, "sync_response": synced}
+
+
+OPERATIONS = {"get": do_get, "set": do_set, "bulk_set": do_bulk_set, "subscribe": do_subscribe}
+
+
+def _refresh_neighbor(ip):
+    """Ping the DUT so that a stale ARP/ND entry does not fail the retry."""
+    try:
+        subprocess.call(["ping6" if ":" in ip else "ping", ip, "-c", "3"], stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL)
+    except OSError:
+        pass
+
+
+def run_op(target, op, timeout):
+    import grpc
+
+    start = time.time()
+    for attempt in range(2):
+        try:
+            result = OPERATIONS[op["op"]](get_stub(target), op, timeout)
+            result["ok"] = True
+            break
+        except grpc.RpcError as e:
+            if attempt == 0 and e.code() == grpc.StatusCode.UNAVAILABLE:
+                _refresh_neighbor(target["ip"])
+                continue
+            result = {"ok": False, "error": "GRPC error\n{}: {}".format(e.code(), e.details())}
+            break
+        except Exception as e:
+            result = {"ok": False, "error": repr(e)}
+            break
+    result["latency_ms"] = (time.time() - start) * 1000
+    return result
+
+
+def _percentile(values, percent):
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def handle_request(request):
+    target = request["target"]
+    ops = request["ops"]
+    timeout = request.get("timeout", 30)
+    repeat = max(1, int(request.get("repeat", 1)))
+    concurrency = max(1, min(int(request.get("concurrency", 1)), repeat))
+
+    latencies = []
+    errors = []
+    last_results = [None]
+    lock = threading.Lock()
+    counter = iter(range(repeat))
+
+    def _worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            results = [run_op(target, op, timeout) for op in ops]
+            with lock:
+                latencies.extend(r["latency_ms"] for r in results)
+                errors.extend(r["error"] for r in results if not r["ok"])
+                last_results[0] = results
+
+    start = time.time()
+    threads = [threading.Thread(target=_worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    latencies.sort()
+    stats = {"count": len(latencies), "errors": len(errors), "elapsed_s": elapsed,
+             "ops_per_sec": len(latencies) / elapsed if elapsed else 0, "first_errors": errors[:5]}
+    if latencies:
+        stats.update({"min_ms": latencies[0], "max_ms": latencies[-1], "avg_ms": sum(latencies) / len(latencies),
+                      "p50_ms": _percentile(latencies, 50), "p90_ms": _percentile(latencies, 90),
+                      "p99_ms": _percentile(latencies, 99)})
+    return {"results": last_results[0], "stats": stats}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            response = handle_request(json.loads(self.rfile.readline().decode()))
+        except Exception as e:
+            response = {"error": repr(e)}
+        self.wfile.write(json.dumps(response).encode())
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path):
+    if os.path.exists(path):
+        os.unlink(path)
+    server = Server(path, RequestHandler)
+    print("gNMI session service listening on {}".format(path))
+    sys.stdout.flush()
+    server.serve_forever()
+
+
+def send_request(path, encoded):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    client.sendall(base64.b64decode(encoded) + b"\n")
+    chunks = []
+    while True:
+        chunk = client.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    client.close()
+    sys.stdout.write(b"".join(chunks).decode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent gNMI client service")
+    parser.add_argument("--serve", action="store_true", help="run the service")
+    parser.add_argument("--request", help="base64 encoded JSON request to send to the running service")
+    parser.add_argument("--run", help="base64 encoded JSON request to handle in this process")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="UNIX socket of the service")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.socket)
+    elif args.request:
+        send_request(args.socket, args.request)
+    elif args.run:
+        json.dump(handle_request(json.loads(base64.b64decode(args.run).decode())), sys.stdout)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
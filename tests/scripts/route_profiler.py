@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Timestamp route programming on the DUT.
+
+The profiler subscribes to Redis keyspace notifications for the route tables of APPL_DB (ROUTE_TABLE and the
+_ROUTE_TABLE producer table written by fpmsyncd/swssconfig) and ASIC_DB (SAI_OBJECT_TYPE_ROUTE_ENTRY) and records
+when each prefix first shows up in (SET) or disappears from (DEL) each database. Timestamps are taken on the DUT
+when the notification arrives, so they are accurate to milliseconds and nothing polls the databases.
+
+It is copied to the DUT together with sonic_db_batch.py by tests/common/helpers/route_profiler.py.
+
+    # subscribe, run the command that pushes the routes, wait until they are all in ASIC_DB
+    python3 route_profiler.py run --op SET --route-file /tmp/routes.json \
+        --command "docker exec -i swss swssconfig /dev/stdin < /tmp/routes.json" --timeout 60
+
+    # record in the background until SIGTERM (routes learnt from BGP, flaps, ...)
+    python3 route_profiler.py record --op DEL --prefix-file /tmp/prefixes --output /tmp/route_profile.json
+
+The report printed (run) or written to --output (record) is a JSON object:
+    {
+        "op": "SET", "expected": 8000, "complete": true, "command_time": 4.1,
+        "appl_db": {"count": 8000, "first": 0.05, "last": 3.9},
+        "asic_db": {"count": 8000, "first": 0.31, "last": 6.2},
+        "latency": {"p50": 3.1, "p90": 5.4, "p99": 6.1, "max": 6.2},     # start to ASIC_DB, seconds
+        "lag": {"p50": 0.8, "p90": 2.1, "p99": 2.6, "max": 2.7},         # APPL_DB to ASIC_DB, seconds
+        "rate_curve": [[0.5, 1200, 0], [1.0, 2600, 900], ...]            # bucket end, APPL_DB and ASIC_DB
+    }                                                                    # routes/s in the bucket
+All times are seconds since the profiler started listening (run: right before the command).
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from sonic_db_batch import get_redis_client, keyspace_enabled  # noqa: E402
+
+APPL_DB_PATTERN = "*ROUTE_TABLE:*"
+ASIC_DB_PATTERN = "ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:*"
+SET_EVENTS = ("hset", "hmset")
+DEL_EVENTS = ("del",)
+ASIC_DEST_RE = re.compile(r'"dest":"([^"]+)"')
+
+
+def appl_prefix(key):
+    """ROUTE_TABLE:10.0.0.0/24, _ROUTE_TABLE:Vrf1:10.0.0.0/24 -> prefix"""
+    prefix = key.split("ROUTE_TABLE:", 1)[1]
+    if prefix.startswith("Vrf"):
+        prefix = prefix.split(":", 1)[1]
+    return prefix
+
+
+def asic_prefix(key):
+    match = ASIC_DEST_RE.search(key)
+    return match.group(1) if match else None
+
+
+def load_prefixes(route_file=None, prefix_file=None):
+    """Prefixes of a swssconfig route file ([{"ROUTE_TABLE:<prefix>": {...}, "OP": ...}]) or a plain list"""
+    prefixes = set()
+    if route_file:
+        with open(route_file) as f:
+            for entry in json.load(f):
+                for key in entry:
+                    if key.startswith("ROUTE_TABLE:"):
+                        prefixes.add(appl_prefix(key))
+    if prefix_file:
+        with open(prefix_file) as f:
+            prefixes.update(line.strip() for line in f if line.strip())
+    return prefixes
+
+
+class Listener(threading.Thread):
+    """Record the first matching notification of every prefix of one database"""
+
+    def __init__(self, db, pattern, to_prefix, events, prefixes, namespace, stop):
+        super(Listener, self).__init__()
+        self.daemon = True
+        self.client = get_redis_client(db, namespace)
+        self.to_prefix = to_prefix
+        self.events = events
+        self.prefixes = prefixes
+        self.stop = stop
+        self.times = {}
+        self.keyspace_config = None
+        if not keyspace_enabled(self.client, absent=events == DEL_EVENTS):
+            # Turn keyspace notifications on for the run, the original setting is restored by close()
+            self.keyspace_config = self.client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+            self.client.config_set("notify-keyspace-events", self.keyspace_config + "KA")
+        db_id = self.client.connection_pool.connection_kwargs.get("db", 0)
+        self.channel_prefix = "__keyspace@{}__:".format(db_id)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.psubscribe(self.channel_prefix + pattern)
+
+    def run(self):
+        while True:
+            stopping = self.stop.is_set()
+            # Once stopped, drain the notifications already queued on the connection
+            message = self.pubsub.get_message(timeout=0 if stopping else 0.1)
+            if message is None:
+                if stopping:
+                    break
+                continue
+            now = time.time()
+            if message["data"] not in self.events:
+                continue
+            prefix = self.to_prefix(message["channel"][len(self.channel_prefix):])
+            if prefix is None or prefix in self.times:
+                continue
+            if self.prefixes and prefix not in self.prefixes:
+                continue
+            self.times[prefix] = now
+
+    def close(self):
+        self.pubsub.close()
+        if self.keyspace_config is not None:
+            self.client.config_set("notify-keyspace-events", self.keyspace_config)
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def _at(percent):
+        return round(values[min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))], 6)
+
+    return {"p50": _at(50), "p90": _at(90), "p99": _at(99), "max": round(values[-1], 6),
+            "avg": round(sum(values) / len(values), 6)}
+
+
+def rate_curve(appl_times, asic_times, start, bucket):
+    end = max(list(appl_times) + list(asic_times) + [start])
+    buckets = int((end - start) / bucket) + 1
+    appl = [0] * buckets
+    asic = [0] * buckets
+    for t in appl_times:
+        appl[int((t - start) / bucket)] += 1
+    for t in asic_times:
+        asic[int((t - start) / bucket)] += 1
+    return [[round((i + 1) * bucket, 3), appl[i] / bucket, asic[i] / bucket] for i in range(buckets)]
+
+
+class RouteProfiler(object):
+
+    def __init__(self, op, prefixes, namespace=None, expected=None):
+        self.op = op.upper()
+        self.prefixes = prefixes
+        self.expected = expected or len(prefixes)
+        events = SET_EVENTS if self.op == "SET" else DEL_EVENTS
+        self.stop = threading.Event()
+        self.appl = Listener("APPL_DB", APPL_DB_PATTERN, appl_prefix, events, prefixes, namespace, self.stop)
+        self.asic = Listener("ASIC_DB", ASIC_DB_PATTERN, asic_prefix, events, prefixes, namespace, self.stop)
+        self.start_time = None
+        self.command_time = None
+
+    def start(self):
+        self.start_time = time.time()
+        self.appl.start()
+        self.asic.start()
+
+    def done(self):
+        return self.expected and len(self.asic.times) >= self.expected
+
+    def wait(self, timeout):
+        deadline = time.time() + timeout
+        while not self.done() and time.time() < deadline and not self.stop.is_set():
+            time.sleep(0.05)
+
+    def finish(self, bucket=0.5):
+        self.stop.set()
+        self.appl.join()
+        self.asic.join()
+        self.appl.close()
+        self.asic.close()
+        return self.report(bucket)
+
+    def report(self, bucket):
+        appl, asic = dict(self.appl.times), dict(self.asic.times)
+        start = self.start_time
+
+        def _span(times):
+            if not times:
+                return {"count": 0}
+            return {"count": len(times), "first": round(min(times.values()) - start, 6),
+                    "last": round(max(times.values()) - start, 6)}
+
+        return {
+            "op": self.op,
+            "expected": self.expected,
+            "complete": bool(self.done()),
+            "command_time": self.command_time,
+            "appl_db": _span(appl),
+            "asic_db": _span(asic),
+            "latency": percentiles([t - start for t in asic.values()]),
+            "lag": percentiles([t - appl[p] for p, t in asic.items() if p in appl]),
+            "rate_curve": rate_curve(appl.values(), asic.values(), start, bucket),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route programming profiler")
+    parser.add_argument("mode", choices=["run", "record"])
+    parser.add_argument("--op", default="SET", choices=["SET", "DEL"])
+    parser.add_argument("--namespace", default=None)
+    parser.add_argument("--route-file", help="swssconfig route file with the prefixes to track")
+    parser.add_argument("--prefix-file", help="file with one prefix to track per line")
+    parser.add_argument("--expected", type=int, help="number of routes to wait for, default: all tracked prefixes")
+    parser.add_argument("--command", help="run: command that programs the routes")
+    parser.add_argument("--timeout", type=float,
+                        help="run: seconds to wait after the command completed (60), record: maximum duration (3600)")
+    parser.add_argument("--bucket", type=float, default=0.5, help="rate curve bucket in seconds")
+    parser.add_argument("--output", help="record: report file")
+    args = parser.parse_args()
+
+    prefixes = load_prefixes(args.route_file, args.prefix_file)
+    profiler = RouteProfiler(args.op, prefixes, args.namespace, args.expected)
+    profiler.start()
+
+    if args.mode == "run":
+        if args.command:
+            rc = subprocess.call(args.command, shell=True)
+            profiler.command_time = round(time.time() - profiler.start_time, 6)
+            if rc != 0:
+                profiler.finish()
+                sys.exit("Command failed with rc {}: {}".format(rc, args.command))
+        profiler.wait(args.timeout or 60)
+        json.dump(profiler.finish(args.bucket), sys.stdout)
+        return
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: profiler.stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: profiler.stop.set())
+    # Tell the caller the subscriptions are in place
+    print("ready")
+    sys.stdout.flush()
+    profiler.wait(args.timeout or 3600)
+    with open(args.output + ".tmp", "w") as f:
+        json.dump(profiler.finish(args.bucket), f)
+    os.rename(args.output + ".tmp", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Run a batch of read-only Redis operations against a SONiC database over a single connection.
+
+The script is copied to the DUT by tests/common/helpers/sonic_db.py and invoked once per batch, so
+that a list of HGET/HGETALL/KEYS operations costs one Ansible round trip instead of one sonic-db-cli
+process per key. Requests are passed as base64 encoded JSON so that ASIC_DB keys (which contain quotes
+and braces) survive the shell untouched.
+
+Request format:
+    {
+        "db": "ASIC_DB",
+        "namespace": "asic0",          # optional
+        "ops": [
+            ["hget", "<key>", "<field>"],
+            ["hgetall", "<key>"],
+            ["keys", "<pattern>"],
+            ["scan_hgetall", "<pattern>"],
+            ["wait", "<pattern>", {"field": ..., "value": ..., "absent": ..., "min_keys": ...}, <timeout>]
+        ]
+    }
+
+The "wait" operation blocks until the entries matching the pattern satisfy the condition, re-evaluating it on
+every keyspace notification for the pattern (or every WAIT_POLL_INTERVAL seconds if keyspace notifications are
+disabled), and returns {"satisfied": bool, "elapsed": seconds, "events": count, "mode": "keyspace"|"poll"}.
+
+Response (printed to stdout as JSON): a list with one result per op, in request order.
+"""
+import argparse
+import base64
+import json
+import sys
+import time
+
+import redis
+
+SCAN_COUNT = 1000
+WAIT_POLL_INTERVAL = 0.1
+# Re-check the condition at least this often even with notifications, in case one was dropped.
+WAIT_RECHECK_INTERVAL = 1.0
+
+
+def get_redis_client(db_name, namespace):
+    from swsscommon.swsscommon import SonicDBConfig
+
+    if namespace:
+        if not SonicDBConfig.isGlobalInit():
+            SonicDBConfig.load_sonic_global_db_config()
+    elif not SonicDBConfig.isInit():
+        SonicDBConfig.load_sonic_db_config()
+
+    namespace = namespace or ""
+    db_id = SonicDBConfig.getDbId(db_name, namespace)
+    try:
+        sock = SonicDBConfig.getDbSock(db_name, namespace)
+    except Exception:
+        sock = None
+
+    # CHASSIS_APP_DB and friends live on the supervisor and are only reachable over TCP.
+    if sock and db_name not in ("CHASSIS_APP_DB", "CHASSIS_STATE_DB"):
+        return redis.Redis(unix_socket_path=sock, db=db_id, decode_responses=True)
+    return redis.Redis(host=SonicDBConfig.getDbHostname(db_name, namespace),
+                       port=SonicDBConfig.getDbPort(db_name, namespace),
+                       db=db_id, decode_responses=True)
+
+
+def scan_keys(client, pattern):
+    return sorted(set(client.scan_iter(match=pattern, count=SCAN_COUNT)))
+
+
+def read_entries(client, pattern):
+    keys = scan_keys(client, pattern)
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+    return dict(zip(keys, pipe.execute()))
+
+
+def condition_met(entries, condition):
+    """Keep in sync with DbCondition.is_met in tests/common/helpers/db_wait.py."""
+    if condition.get("absent"):
+        return not entries
+
+    field = condition.get("field")
+    expected = condition.get("value")
+    matched = [key for key, fields in entries.items()
+               if field is None or (field in fields and (expected is None or fields[field] == expected))]
+    min_keys = condition.get("min_keys")
+    if min_keys is not None:
+        return len(matched) >= min_keys
+    return bool(entries) and len(matched) == len(entries)
+
+
+def keyspace_enabled(client, absent=False):
+    try:
+        flags = client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+    except redis.exceptions.ResponseError:
+        return False
+    if "K" not in flags:
+        return False
+    # Keys are removed with DEL, a generic ("g") command, hash changes are "h" events
+    return "A" in flags or ("h" in flags and (not absent or "g" in flags))
+
+
+def wait_for(client, pattern, condition, timeout):
+    start = time.time()
+    deadline = start + timeout
+    events = 0
+    pubsub = None
+
+    if keyspace_enabled(client, absent=condition.get("absent", False)):
+        db_id = client.connection_pool.connection_kwargs.get("db", 0)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe("__keyspace@{}__:{}".format(db_id, pattern))
+
+    try:
+        # Subscribe before the first check so that no change can slip in between.
+        satisfied = condition_met(read_entries(client, pattern), condition)
+        last_check = time.time()
+        while not satisfied and time.time() < deadline:
+            if pubsub:
+                wait = max(0, min(WAIT_RECHECK_INTERVAL, deadline - time.time()))
+                message = pubsub.get_message(timeout=wait)
+                if message is None and time.time() - last_check < WAIT_RECHECK_INTERVAL:
+                    continue
+                if message is not None:
+                    events += 1
+                    # Drain whatever else arrived so that a burst of changes costs one evaluation.
+                    while pubsub.get_message(timeout=0) is not None:
+                        events += 1
+            else:
+                time.sleep(WAIT_POLL_INTERVAL)
+            satisfied = condition_met(read_entries(client, pattern), condition)
+            last_check = time.time()
+    finally:
+        if pubsub:
+            pubsub.close()
+
+    return {"satisfied": satisfied, "elapsed": time.time() - start, "events": events,
+            "mode": "keyspace" if pubsub else "poll"}
+
+
+def run_ops(client, ops):
+    """Resolve the key scans first, then issue every hash read in a single pipeline."""
+    results = [None] * len(ops)
+    pipe = client.pipeline(transaction=False)
+    pending = []
+
+    for index, op in enumerate(ops):
+        name = op[0].lower()
+        if name == "hget":
+            pipe.hget(op[1], op[2])
+            pending.append((index, None))
+        elif name == "hgetall":
+            pipe.hgetall(op[1])
+            pending.append((index, None))
+        elif name == "keys":
+            results[index] = scan_keys(client, op[1])
+        elif name == "wait":
+            results[index] = wait_for(client, op[1], op[2], op[3])
+        elif name == "scan_hgetall":
+            keys = scan_keys(client, op[1])
+            results[index] = {}
+            for key in keys:
+                pipe.hgetall(key)
+                pending.append((index, key))
+        else:
+            raise ValueError("Unsupported operation: {}".format(op[0]))
+
+    for (index, key), value in zip(pending, pipe.execute()):
+        if key is None:
+            results[index] = value
+        else:
+            results[index][key] = value
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched SONiC database reader")
+    parser.add_argument("request", help="base64 encoded JSON request")
+    args = parser.parse_args()
+
+    request = json.loads(base64.b64decode(args.request).decode("utf-8"))
+    client = get_redis_client(request["db"], request.get("namespace"))
+    json.dump(run_ops(client, request["ops"]), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
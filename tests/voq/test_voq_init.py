@@ -210,7 +210,7 @@ def check_voq_interfaces(duthosts, per_host, asic, cfg_facts):
     rif_ports_in_asicdb = []
 
     # intf_list = get_router_interface_list(dev_intfs)
-    asicdb = AsicDbCli(asic)
+    asicdb = AsicDbCli(asic, use_pipeline=True)
     asicdb_rif_table = asicdb.dump(asicdb.ASIC_ROUTERINTF_TABLE)
     sys_port_table = asicdb.dump(asicdb.ASIC_SYSPORT_TABLE)
     asicdb_lag_table = asicdb.dump(asicdb.ASIC_LAG_TABLE + ":")